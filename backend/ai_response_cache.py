@@ -0,0 +1,210 @@
+"""
+Response cache for the deterministic AI helpers.
+
+Expense categorization, invoice descriptions, task suggestions and the
+command router's LLM fallback get the same questions over and over, and
+documents get re-analyzed unchanged (or with only a few sections edited, so
+most chunk notes are reused). Replies
+are cached under a hash of the purpose, model, system prompt and normalized
+user prompt: whitespace is collapsed, and for purposes whose reply does not
+echo the input ("Fuel for generator" vs "fuel for  generator") case is
+folded too. Lookups hit an in-process LRU first, then, when a database is
+given, the ``ai_response_cache`` collection, which survives restarts and is
+shared between servers. Entries expire after the purpose's TTL; Mongo drops
+persisted ones through a TTL index on ``expires_at``.
+
+Each entry remembers how long the model took to produce it, so stats()
+reports per purpose not just the hit rate but the model time the hits saved.
+"""
+from collections import OrderedDict
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Optional
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# Seconds a reply stays cached, per purpose; purposes not listed are never cached
+CACHE_TTL_SECONDS = {
+    "expense_categorization": 7 * 24 * 3600,
+    "command": 24 * 3600,
+    "task_suggestions": 24 * 3600,
+    "invoice_generation": 3600,
+    "document_chunk": 30 * 24 * 3600,
+    "document_analysis": 7 * 24 * 3600,
+}
+
+# Purposes whose reply doesn't depend on the capitalization of the prompt
+CASE_INSENSITIVE = {"expense_categorization", "command"}
+
+WHITESPACE = re.compile(r"\s+")
+
+def normalize_prompt(purpose: str, prompt: str) -> str:
+    prompt = WHITESPACE.sub(" ", prompt).strip()
+    return prompt.casefold() if purpose in CASE_INSENSITIVE else prompt
+
+def cache_key(purpose: str, model: str, system_message: str, prompt: str) -> str:
+    text = "\0".join((purpose, model, system_message, normalize_prompt(purpose, prompt)))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class AIResponseCache:
+    """Two-tier (memory LRU, optional Mongo) cache of AI replies with per-purpose TTLs"""
+
+    def __init__(self, db=None, max_size: int = 2048, ttl_seconds: Optional[Dict[str, float]] = None):
+        self.db = db
+        self.max_size = max_size
+        self.ttl_seconds = dict(CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds)
+        self._entries = OrderedDict()  # key -> (purpose, response, latency_seconds, expires_at_monotonic)
+        self._lock = threading.Lock()
+        self._stats: Dict[str, dict] = {}
+        self.evictions = 0
+        self.invalidations = 0
+
+    def caches(self, purpose: str) -> bool:
+        return self.ttl_seconds.get(purpose, 0) > 0
+
+    async def get(self, purpose: str, key: str) -> Optional[str]:
+        """Cached reply, or None on miss/expiry"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[3] <= time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._record_hit(purpose, "memory_hits", entry[2])
+                return entry[1]
+
+        if self.db is not None:
+            try:
+                doc = await self.db.ai_response_cache.find_one(
+                    {"key": key, "expires_at": {"$gt": datetime.now(timezone.utc)}},
+                    {"_id": 0, "response": 1, "latency_seconds": 1, "expires_at": 1}
+                )
+            except PyMongoError as e:
+                logger.error(f"AI response cache lookup failed: {str(e)}")
+                doc = None
+            if doc is not None:
+                expires_at = doc["expires_at"]
+                if expires_at.tzinfo is None:
+                    expires_at = expires_at.replace(tzinfo=timezone.utc)
+                remaining = (expires_at - datetime.now(timezone.utc)).total_seconds()
+                with self._lock:
+                    self._store(key, purpose, doc["response"], doc.get("latency_seconds", 0.0), remaining)
+                    self._record_hit(purpose, "mongo_hits", doc.get("latency_seconds", 0.0))
+                return doc["response"]
+
+        with self._lock:
+            self._purpose_stats(purpose)["misses"] += 1
+        return None
+
+    async def set(self, purpose: str, key: str, response: str, latency_seconds: float):
+        """Cache a fresh reply and how long the model took to produce it"""
+        ttl = self.ttl_seconds.get(purpose, 0)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._store(key, purpose, response, latency_seconds, ttl)
+            self._purpose_stats(purpose)["model_seconds"] += latency_seconds
+
+        if self.db is not None:
+            now = datetime.now(timezone.utc)
+            try:
+                await self.db.ai_response_cache.update_one(
+                    {"key": key},
+                    {"$set": {
+                        "key": key,
+                        "purpose": purpose,
+                        "response": response,
+                        "latency_seconds": latency_seconds,
+                        "created_at": now,
+                        "expires_at": now + timedelta(seconds=ttl)
+                    }},
+                    upsert=True
+                )
+            except PyMongoError as e:
+                logger.error(f"AI response cache write failed: {str(e)}")
+
+    async def invalidate(self, purpose: Optional[str] = None) -> int:
+        """Drop cached replies for one purpose (all purposes if None); returns how many were removed"""
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if purpose is None or entry[0] == purpose]
+            for key in keys:
+                del self._entries[key]
+            removed = len(keys)
+
+        if self.db is not None:
+            result = await self.db.ai_response_cache.delete_many({} if purpose is None else {"purpose": purpose})
+            removed = max(removed, result.deleted_count)
+
+        with self._lock:
+            self.invalidations += removed
+        logger.info(f"Invalidated {removed} cached AI replies ({purpose or 'all purposes'})")
+        return removed
+
+    def stats(self) -> dict:
+        with self._lock:
+            purposes = {}
+            for purpose, counts in self._stats.items():
+                hits = counts["memory_hits"] + counts["mongo_hits"]
+                lookups = hits + counts["misses"]
+                purposes[purpose] = {
+                    "hits": hits,
+                    "memory_hits": counts["memory_hits"],
+                    "mongo_hits": counts["mongo_hits"],
+                    "misses": counts["misses"],
+                    "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                    "saved_seconds": round(counts["saved_seconds"], 3),
+                    "model_seconds": round(counts["model_seconds"], 3)
+                }
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "persistent": self.db is not None,
+                "ttl_seconds": self.ttl_seconds,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "purposes": purposes
+            }
+
+    def _purpose_stats(self, purpose: str) -> dict:
+        # Caller must hold self._lock
+        counts = self._stats.get(purpose)
+        if counts is None:
+            counts = self._stats[purpose] = {"memory_hits": 0, "mongo_hits": 0, "misses": 0, "saved_seconds": 0.0, "model_seconds": 0.0}
+        return counts
+
+    def _record_hit(self, purpose: str, tier: str, latency_seconds: float):
+        # Caller must hold self._lock
+        counts = self._purpose_stats(purpose)
+        counts[tier] += 1
+        counts["saved_seconds"] += latency_seconds
+
+    def _store(self, key: str, purpose: str, response: str, latency_seconds: float, ttl: float):
+        # Caller must hold self._lock
+        self._entries[key] = (purpose, response, latency_seconds, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+
+# Global AI response cache instance
+_ai_response_cache = None
+
+def get_ai_response_cache(db) -> AIResponseCache:
+    """Get or create AI response cache instance"""
+    global _ai_response_cache
+    if _ai_response_cache is None:
+        persistent = os.environ.get('AI_CACHE_PERSISTENT', 'true').lower() in ('1', 'true', 'yes')
+        _ai_response_cache = AIResponseCache(
+            db if persistent else None,
+            max_size=int(os.environ.get('AI_CACHE_SIZE', 2048))
+        )
+    return _ai_response_cache
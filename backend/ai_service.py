@@ -1,95 +1,185 @@
 import os
 from dotenv import load_dotenv
 from emergentintegrations.llm.chat import LlmChat, UserMessage
-from typing import Optional
+from typing import AsyncIterator, List, Optional
+import asyncio
 import logging
+import time
+
+from ai_prompts import DOCUMENT_ANALYSIS_PROMPTS, DOCUMENT_CHUNK_PROMPTS, DOCUMENT_REDUCE_PROMPTS, SYSTEM_PROMPTS
+from ai_response_cache import AIResponseCache, cache_key
+from document_chunks import pack_notes, split_document
+from fake_llm import FakeLlmChat
+from llm_gateway import get_llm_gateway
 
 # Load environment variables
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# (provider, model) per purpose; each purpose's system prompt is ai_prompts.SYSTEM_PROMPTS[purpose]
+MODELS = {
+    "chat": ("gemini", "gemini-2.5-flash"),
+    "proposal": ("gemini", "gemini-2.5-flash"),
+    "formfill": ("gemini", "gemini-2.5-pro"),
+    "command": ("gemini", "gemini-2.5-flash"),
+    "form_assist": ("gemini", "gemini-2.5-flash"),
+    "generation": ("openai", "gpt-4o-mini"),
+    "document_analysis": ("openai", "gpt-4o-mini"),
+    "document_chunk": ("openai", "gpt-4o-mini"),
+    "task_suggestions": ("openai", "gpt-4o-mini"),
+    "expense_categorization": ("openai", "gpt-4o-mini"),
+    "invoice_generation": ("openai", "gpt-4o-mini"),
+    "safety_analysis": ("openai", "gpt-4o-mini"),
+    "chat_assistant": ("openai", "gpt-4o-mini"),
+}
+
 class AIService:
     def __init__(self):
         self.api_key = os.environ.get('EMERGENT_LLM_KEY')
         if not self.api_key:
             logger.warning("EMERGENT_LLM_KEY not found in environment")
+        # Tests and benchmarks: replace the provider with a local fake emitting this many tokens/s
+        fake_rate = os.environ.get('AI_FAKE_LLM_TOKENS_PER_SECOND')
+        self.fake_tokens_per_second = float(fake_rate) if fake_rate else None
+        if self.fake_tokens_per_second is not None:
+            logger.warning(f"Using the fake LLM ({self.fake_tokens_per_second:g} tokens/s) instead of the provider")
+        self.gateway = get_llm_gateway()
+        # Documents longer than this are analyzed chunk by chunk, this many chunks at a time
+        self.document_chunk_tokens = int(os.environ.get('DOCUMENT_CHUNK_TOKENS', 3000))
+        self.document_reduce_tokens = int(os.environ.get('DOCUMENT_REDUCE_TOKENS', 8000))
+        self.document_concurrency = int(os.environ.get('DOCUMENT_ANALYSIS_CONCURRENCY', 4))
             
-    def create_chat(self, session_id: str, system_message: str) -> LlmChat:
-        """Create a new chat instance"""
-        chat = LlmChat(
+    def model(self, purpose: str) -> str:
+        """Model serving a purpose; the gateway limits concurrency per model"""
+        return "fake" if self.fake_tokens_per_second is not None else MODELS[purpose][1]
+    
+    def chat(self, purpose: str, session_id: str, system_message: str) -> LlmChat:
+        """Chat for one request with the purpose's model
+
+        LlmChat carries the conversation, so it is built per request rather than shared.
+        """
+        if self.fake_tokens_per_second is not None:
+            return FakeLlmChat(purpose, session_id, system_message, self.fake_tokens_per_second)
+        provider, model = MODELS[purpose]
+        return LlmChat(
             api_key=self.api_key,
             session_id=session_id,
             system_message=system_message
-        )
-        chat.with_model("openai", "gpt-4o-mini")
-        return chat
+        ).with_model(provider, model)
+    
+    async def complete(self, purpose: str, session_id: str, prompt: str, priority: Optional[int] = None, **slots) -> str:
+        """One-shot reply to prompt through the LLM gateway, served from the response cache when the purpose is cached"""
+        system_message = SYSTEM_PROMPTS[purpose].render(**slots)
+        cache = _ai_response_cache
+        key = None
+        if cache is not None and cache.caches(purpose):
+            model = "fake" if self.fake_tokens_per_second is not None else "/".join(MODELS[purpose])
+            key = cache_key(purpose, model, system_message, prompt)
+            response = await cache.get(purpose, key)
+            if response is not None:
+                return response
+
+        started = time.perf_counter()
+        chat = self.chat(purpose, session_id, system_message)
+        response = await self.gateway.send(purpose, self.model(purpose), chat, prompt, system_message, priority)
+        if key is not None:
+            await cache.set(purpose, key, response, time.perf_counter() - started)
+        return response
+    
+    def stream_message(self, purpose: str, session_id: str, text: str, priority: Optional[int] = None, **slots) -> AsyncIterator[str]:
+        """Reply text in chunks as the model produces it, holding a gateway slot while streaming"""
+        system_message = SYSTEM_PROMPTS[purpose].render(**slots)
+        chat = self.chat(purpose, session_id, system_message)
+        return self.gateway.stream(purpose, self.model(purpose), self._chunks(chat, text), text, system_message, priority)
+    
+    @staticmethod
+    async def _chunks(chat: LlmChat, text: str) -> AsyncIterator[str]:
+        stream_message = getattr(chat, "stream_message", None)
+        if stream_message is None:
+            # LlmChat only returns the complete reply; pass it on as a single chunk
+            yield await chat.send_message(UserMessage(text=text))
+            return
+        async for chunk in stream_message(UserMessage(text=text)):
+            yield chunk
     
     async def generate_text(self, prompt: str, context: str = "") -> str:
         """Generate text using AI"""
         try:
             full_prompt = f"{context}\n\n{prompt}" if context else prompt
-            chat = self.create_chat("generation", "You are a helpful AI assistant for the Williams Diversified LLC Project Command Center.")
-            message = UserMessage(text=full_prompt)
-            response = await chat.send_message(message)
+            response = await self.complete("generation", "generation", full_prompt)
             return response
         except Exception as e:
             logger.error(f"AI generation error: {str(e)}")
             return f"AI generation failed: {str(e)}"
     
     async def analyze_document(self, document_content: str, analysis_type: str) -> str:
-        """Analyze documents and provide insights"""
+        """Analyze documents and provide insights
+
+        A document longer than one chunk is split along its sections; the
+        chunks are analyzed concurrently and their notes reduced to a single
+        answer. Chunk notes are cached by content, so re-analyzing an
+        unchanged document makes no model calls and an edited one only
+        re-reads the chunks that changed.
+        """
         try:
-            system_msg = "You are an expert document analyst. Provide clear, concise analysis."
-            chat = self.create_chat("document-analysis", system_msg)
-            
-            prompts = {
-                "summarize": f"Summarize the following document concisely:\n\n{document_content}",
-                "risks": f"Identify potential risks in this document:\n\n{document_content}",
-                "actions": f"Extract action items from this document:\n\n{document_content}",
-                "insights": f"Provide key insights from this document:\n\n{document_content}"
-            }
-            
-            prompt = prompts.get(analysis_type, prompts["insights"])
-            message = UserMessage(text=prompt)
-            response = await chat.send_message(message)
-            return response
+            if analysis_type not in DOCUMENT_ANALYSIS_PROMPTS:
+                analysis_type = "insights"
+            chunks = split_document(document_content, self.document_chunk_tokens)
+            if len(chunks) <= 1:
+                prompt = DOCUMENT_ANALYSIS_PROMPTS[analysis_type].render(document=document_content)
+                return await self.complete("document_analysis", "document-analysis", prompt)
+
+            limit = asyncio.Semaphore(self.document_concurrency)
+
+            async def analyze(prompt: str) -> str:
+                async with limit:
+                    return await self.complete("document_chunk", "document-analysis", prompt)
+
+            chunk_prompt = DOCUMENT_CHUNK_PROMPTS[analysis_type]
+            reduce_prompt = DOCUMENT_REDUCE_PROMPTS[analysis_type]
+            notes = await asyncio.gather(*(analyze(chunk_prompt.render(excerpt=chunk)) for chunk in chunks))
+            # Merge neighbouring notes until they all fit in the final prompt
+            while len(notes) > 1 and sum(len(note) for note in notes) > self.document_reduce_tokens * 4:
+                notes = await asyncio.gather(*(
+                    analyze(reduce_prompt.render(notes=self._join_notes(group)))
+                    for group in pack_notes(notes, self.document_reduce_tokens)
+                ))
+            prompt = reduce_prompt.render(notes=self._join_notes(notes))
+            return await self.complete("document_analysis", "document-analysis", prompt)
         except Exception as e:
             logger.error(f"Document analysis error: {str(e)}")
             return f"Analysis failed: {str(e)}"
     
+    @staticmethod
+    def _join_notes(notes: List[str]) -> str:
+        return "\n\n".join(f"[Part {i}]\n{note.strip()}" for i, note in enumerate(notes, 1))
+    
     async def suggest_tasks(self, project_title: str, project_description: str) -> str:
         """Generate task suggestions for a project"""
         try:
-            system_msg = "You are a project management expert. Generate specific, actionable tasks."
-            chat = self.create_chat("task-suggestions", system_msg)
-            
             prompt = f"""Given this project:
 Title: {project_title}
 Description: {project_description}
 
 Generate 5-8 specific, actionable tasks needed to complete this project. Format as a numbered list."""
             
-            message = UserMessage(text=prompt)
-            response = await chat.send_message(message)
+            response = await self.complete("task_suggestions", "task-suggestions", prompt)
             return response
         except Exception as e:
             logger.error(f"Task suggestion error: {str(e)}")
             return f"Task suggestion failed: {str(e)}"
     
-    async def categorize_expense(self, expense_description: str) -> str:
+    async def categorize_expense(self, expense_description: str, priority: Optional[int] = None) -> str:
         """Auto-categorize an expense"""
         try:
-            chat = self.create_chat("expense-categorization", "You are a financial categorization expert.")
-            
             prompt = f"""Categorize this expense into ONE of these categories: Materials, Labor, Equipment, Transportation, Utilities, Office Supplies, Professional Services, Insurance, Maintenance, Other.
 
 Expense: {expense_description}
 
 Respond with ONLY the category name, nothing else."""
             
-            message = UserMessage(text=prompt)
-            response = await chat.send_message(message)
+            response = await self.complete("expense_categorization", "expense-categorization", prompt, priority)
             return response.strip()
         except Exception as e:
             logger.error(f"Expense categorization error: {str(e)}")
@@ -98,8 +188,6 @@ Respond with ONLY the category name, nothing else."""
     async def generate_invoice_description(self, project_name: str, work_items: list) -> str:
         """Generate professional invoice descriptions"""
         try:
-            chat = self.create_chat("invoice-generation", "You are a professional invoice writer.")
-            
             items_str = "\n".join(f"- {item}" for item in work_items)
             prompt = f"""Generate a professional invoice description for:
 Project: {project_name}
@@ -108,8 +196,7 @@ Work completed:
 
 Write a clear, professional description suitable for an invoice (2-3 sentences)."""
             
-            message = UserMessage(text=prompt)
-            response = await chat.send_message(message)
+            response = await self.complete("invoice_generation", "invoice-generation", prompt)
             return response
         except Exception as e:
             logger.error(f"Invoice description generation error: {str(e)}")
@@ -118,8 +205,6 @@ Write a clear, professional description suitable for an invoice (2-3 sentences).
     async def safety_analysis(self, incident_description: str) -> dict:
         """Analyze safety incidents and provide recommendations"""
         try:
-            chat = self.create_chat("safety-analysis", "You are a workplace safety expert.")
-            
             prompt = f"""Analyze this safety incident:
 {incident_description}
 
@@ -130,8 +215,7 @@ Provide:
 
 Format as JSON with keys: severity, root_cause, recommendations"""
             
-            message = UserMessage(text=prompt)
-            response = await chat.send_message(message)
+            response = await self.complete("safety_analysis", "safety-analysis", prompt)
             
             # Parse response
             import json
@@ -156,16 +240,14 @@ Format as JSON with keys: severity, root_cause, recommendations"""
     async def chat_assistant(self, user_message: str, conversation_history: list, user_context: dict) -> str:
         """General chat assistant with context awareness"""
         try:
-            context_info = f"""You are an AI assistant for Williams Diversified LLC Project Command Center.
-User: {user_context.get('username', 'User')} (Role: {user_context.get('role', 'employee')})
-Current Page: {user_context.get('current_page', 'Dashboard')}
-
-Help the user with project management, tasks, and business operations."""
-
-            chat = self.create_chat(f"chat-{user_context.get('user_id', 'unknown')}", context_info)
-            
-            message = UserMessage(text=user_message)
-            response = await chat.send_message(message)
+            response = await self.complete(
+                "chat_assistant",
+                f"chat-{user_context.get('user_id', 'unknown')}",
+                user_message,
+                username=user_context.get('username', 'User'),
+                role=user_context.get('role', 'employee'),
+                current_page=user_context.get('current_page', 'Dashboard')
+            )
             return response
         except Exception as e:
             logger.error(f"Chat assistant error: {str(e)}")
@@ -173,6 +255,12 @@ Help the user with project management, tasks, and business operations."""
 
 # Global AI service instance
 _ai_service = None
+_ai_response_cache = None
+
+def use_ai_response_cache(cache: Optional[AIResponseCache]):
+    """Serve cached purposes through a response cache (None to always call the model)"""
+    global _ai_response_cache
+    _ai_response_cache = cache
 
 def get_ai_service() -> AIService:
     """Get or create AI service instance"""
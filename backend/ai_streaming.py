@@ -0,0 +1,112 @@
+"""
+Server-Sent Events for the streaming /ai endpoints.
+
+chat_events() forwards reply text as ``token`` events and ends with a
+``done`` event holding the full reply. proposal_events() parses the streamed
+proposal JSON as it arrives and emits a ``section`` event for each top-level
+member (scopeOfWork, inclusions, itemizedPricing, ...) as soon as its value
+is complete, then ``done`` with the whole proposal. Errors after the
+response has started become an ``error`` event. When the client
+disconnects, Starlette cancels the response and the upstream reply stream
+is closed, so generation stops instead of running to completion.
+"""
+from typing import Any, AsyncIterator, List, Optional, Tuple
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+class JSONSectionParser:
+    """Incrementally scans a streamed JSON object, returning each top-level member once its value is complete
+
+    Text before the opening brace (e.g. a ```json fence) is skipped.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.member_start: Optional[int] = None
+        self.complete = False
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        self.buffer += text
+        sections = []
+        while self.pos < len(self.buffer) and not self.complete:
+            ch = self.buffer[self.pos]
+            if self.member_start is None:
+                if ch == "{":
+                    self.depth = 1
+                    self.member_start = self.pos + 1
+            elif self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch in "{[":
+                self.depth += 1
+            elif ch in "}]":
+                self.depth -= 1
+                if self.depth == 0:
+                    sections += self._member()
+                    self.complete = True
+            elif ch == "," and self.depth == 1:
+                sections += self._member()
+                self.member_start = self.pos + 1
+            self.pos += 1
+        return sections
+
+    def _member(self) -> List[Tuple[str, Any]]:
+        text = self.buffer[self.member_start:self.pos].strip()
+        if not text:
+            return []
+        try:
+            return list(json.loads("{" + text + "}").items())
+        except ValueError:
+            return []
+
+async def chat_events(chunks: AsyncIterator[str]) -> AsyncIterator[Tuple[str, Any]]:
+    reply = []
+    try:
+        async for chunk in chunks:
+            reply.append(chunk)
+            yield "token", {"text": chunk}
+        yield "done", {"reply": "".join(reply)}
+    except asyncio.CancelledError:
+        logger.info("AI chat stream cancelled by the client")
+        raise
+    except Exception as e:
+        logger.error(f"AI chat stream error: {str(e)}")
+        yield "error", {"detail": f"AI service error: {str(e)}"}
+    finally:
+        await chunks.aclose()
+
+async def proposal_events(chunks: AsyncIterator[str]) -> AsyncIterator[Tuple[str, Any]]:
+    parser = JSONSectionParser()
+    reply = []
+    try:
+        async for chunk in chunks:
+            reply.append(chunk)
+            for name, value in parser.feed(chunk):
+                yield "section", {"name": name, "value": value}
+
+        response = "".join(reply)
+        try:
+            yield "done", json.loads(response)
+        except ValueError:
+            yield "done", {"error": "Could not parse proposal", "raw_response": response}
+    except asyncio.CancelledError:
+        logger.info("AI proposal stream cancelled by the client")
+        raise
+    except Exception as e:
+        logger.error(f"AI proposal stream error: {str(e)}")
+        yield "error", {"detail": f"AI service error: {str(e)}"}
+    finally:
+        await chunks.aclose()
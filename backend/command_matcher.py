@@ -0,0 +1,232 @@
+"""
+Offline intent matcher for the /ai/command navigation bar.
+
+The matcher is built once from SCREEN_REGISTRY: every screen key, path and
+alias becomes a phrase of normalized terms (lowercased, plurals folded,
+hyphenated words kept both joined and split: "wh-347" -> "wh347" and
+"wh 347"), and a character-trigram index over those terms finds fuzzy
+candidates for a misspelled word without comparing it to the whole
+vocabulary.
+
+A command is reduced to its content words (filler such as "open", "show me",
+"where are my" is dropped). Each word is matched against the vocabulary
+exactly, as a prefix, or within a small Damerau-Levenshtein distance
+("paytoll" -> "payroll"). A screen scores by its best phrase whose terms
+were all found (the mean term similarity, weighted by phrase kind), scaled
+by how much of the command its matched phrases explain, so "safety reports"
+goes to safety rather than reports and "job sites" to projects. When two screens score within
+AMBIGUITY_MARGIN of each other ("jobs" is an alias of both projects and
+work orders) confidence is reduced below CONFIDENCE_THRESHOLD and the other
+screen is returned as an alternative. Callers fall back to the LLM below
+CONFIDENCE_THRESHOLD, so ambiguous commands always reach it.
+"""
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+import re
+
+SCREEN_REGISTRY = [
+    {"key": "dashboard", "path": "/", "aliases": ["home", "command center", "main"]},
+    {"key": "projects", "path": "/projects", "aliases": ["jobs", "sites"]},
+    {"key": "tasks", "path": "/tasks", "aliases": ["to-do", "todos"]},
+    {"key": "work-orders", "path": "/work-orders", "aliases": ["work orders", "jobs"]},
+    {"key": "clients", "path": "/clients", "aliases": ["customers", "contacts"]},
+    {"key": "employees", "path": "/employees", "aliases": ["staff", "team", "workers"]},
+    {"key": "invoices", "path": "/invoices", "aliases": ["billing", "accounts receivable"]},
+    {"key": "expenses", "path": "/expenses", "aliases": ["costs", "spending"]},
+    {"key": "contracts", "path": "/contracts", "aliases": ["agreements"]},
+    {"key": "equipment", "path": "/equipment", "aliases": ["tools", "machinery"]},
+    {"key": "timesheets", "path": "/timesheets", "aliases": ["timecards", "hours", "clock"]},
+    {"key": "inventory", "path": "/inventory", "aliases": ["stock", "materials"]},
+    {"key": "schedules", "path": "/schedules", "aliases": ["calendar", "appointments"]},
+    {"key": "safety", "path": "/safety-reports", "aliases": ["safety reports", "incidents"]},
+    {"key": "certifications", "path": "/certifications", "aliases": ["licenses", "credentials"]},
+    {"key": "reports", "path": "/reports", "aliases": ["analytics", "metrics"]},
+    {"key": "compliance", "path": "/compliance", "aliases": ["regulations"]},
+    {"key": "handbook", "path": "/handbook-policies", "aliases": ["policies", "procedures"]},
+    {"key": "fleet", "path": "/fleet", "aliases": ["fleet inspection", "trucks", "vehicles"]},
+    {"key": "admin", "path": "/admin", "aliases": ["admin panel", "settings", "users"]},
+    {"key": "notifications", "path": "/notifications", "aliases": ["alerts", "email settings"]},
+    {"key": "payroll", "path": "/payroll", "aliases": ["certified payroll", "wh-347", "pay run"]},
+]
+
+# Below this the router asks the LLM instead
+CONFIDENCE_THRESHOLD = 0.65
+# Screens scoring within this of the best one make the match ambiguous
+AMBIGUITY_MARGIN = 0.1
+# Scores are at most 1.0, so an ambiguous match always lands below CONFIDENCE_THRESHOLD
+AMBIGUITY_PENALTY = 0.6
+
+# Phrase weights: the screen's own name beats an alias
+PHRASE_WEIGHTS = {"key": 1.0, "path": 1.0, "alias": 0.95}
+PREFIX_SIMILARITY = 0.85
+MIN_FUZZY_SIMILARITY = 0.75
+MIN_FUZZY_LENGTH = 4
+
+# Navigation filler that says nothing about the destination
+STOPWORDS = frozenset("""
+    a all an and any are at bring can check display do find for get give go goto head i in into is it jump
+    let lets list look me my need of on open our over page please pull screen section see show take tab
+    the to up view want what whats where which with you your
+""".split())
+
+WORD = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+
+def stem(term: str) -> str:
+    """Fold simple plurals so "invoice" and "invoices" are the same term"""
+    if len(term) > 4 and term.endswith("ies"):
+        return term[:-3] + "y"
+    if len(term) > 3 and term.endswith("s") and not term.endswith("ss"):
+        return term[:-1]
+    return term
+
+def phrase_variants(text: str) -> List[Tuple[str, ...]]:
+    """Term tuples for a registry phrase, with hyphenated words both joined and split"""
+    joined, split = [], []
+    for word in WORD.findall(text.lower()):
+        joined.append(word.replace("-", ""))
+        split.extend(word.split("-"))
+    variants = []
+    for words in (joined, split):
+        terms = tuple(stem(w) for w in words if w not in STOPWORDS)
+        if terms and terms not in variants:
+            variants.append(terms)
+    return variants
+
+def query_terms(text: str) -> List[str]:
+    """Content words of a command (unstemmed), in order, without duplicates"""
+    terms = []
+    for word in WORD.findall(text.lower()):
+        term = word.replace("-", "")
+        if word not in STOPWORDS and term not in terms:
+            terms.append(term)
+    return terms
+
+def trigrams(term: str) -> set:
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance, or limit + 1 once it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+class CommandMatcher:
+    """Scores navigation commands against the screen registry without calling the LLM"""
+
+    def __init__(self, registry: List[dict]):
+        self.registry = registry
+        # (screen index, kind, terms) per phrase
+        self.phrases: List[Tuple[int, str, Tuple[str, ...]]] = []
+        for index, screen in enumerate(registry):
+            sources = [("key", screen["key"]), ("path", screen["path"].strip("/"))]
+            sources += [("alias", alias) for alias in screen["aliases"]]
+            for kind, text in sources:
+                for terms in phrase_variants(text):
+                    self.phrases.append((index, kind, terms))
+
+        self.vocabulary = sorted({term for _, _, terms in self.phrases for term in terms})
+        self.phrases_by_term: Dict[str, List[int]] = defaultdict(list)
+        for position, (_, _, terms) in enumerate(self.phrases):
+            for term in set(terms):
+                self.phrases_by_term[term].append(position)
+        self.trigram_index: Dict[str, List[str]] = defaultdict(list)
+        for term in self.vocabulary:
+            for gram in trigrams(term):
+                self.trigram_index[gram].append(term)
+
+    def similar_terms(self, word: str) -> Dict[str, float]:
+        """Vocabulary terms matching a command word, with their similarity (1.0 = exact)"""
+        term = stem(word)
+        if term in self.phrases_by_term:
+            # Correctly spelled: fuzzy neighbours would only add noise ("work" vs "worker")
+            return {term: 1.0}
+        matches = {}
+        if len(word) < MIN_FUZZY_LENGTH:
+            return matches
+
+        # Misspellings are compared both as typed and stemmed ("taks" is one swap from "task")
+        for form in {word, term}:
+            grams = trigrams(form)
+            shared = defaultdict(int)
+            for gram in grams:
+                for candidate in self.trigram_index.get(gram, ()):
+                    shared[candidate] += 1
+            for candidate, count in shared.items():
+                if matches.get(candidate, 0.0) >= PREFIX_SIMILARITY:
+                    continue
+                if candidate.startswith(form):
+                    matches[candidate] = PREFIX_SIMILARITY
+                    continue
+                longest = max(len(form), len(candidate))
+                limit = int(longest * (1 - MIN_FUZZY_SIMILARITY))
+                # One edit (or swap of adjacent letters) changes at most four trigrams, so fewer shared ones rule the candidate out
+                if count < len(grams) - 4 * limit:
+                    continue
+                distance = edit_distance(form, candidate, limit)
+                if distance <= limit:
+                    matches[candidate] = max(matches.get(candidate, 0.0), 1 - distance / longest)
+        return matches
+
+    def match(self, command: str) -> Optional[dict]:
+        """Best screen for a command, or None if nothing in the registry matches it"""
+        terms = query_terms(command)
+        if not terms:
+            return None
+
+        # vocabulary term -> (similarity, command word) for the command word matching it best
+        found: Dict[str, Tuple[float, str]] = {}
+        for word in terms:
+            for candidate, similarity in self.similar_terms(word).items():
+                if similarity > found.get(candidate, (0.0, None))[0]:
+                    found[candidate] = (similarity, word)
+
+        # Per screen: its best fully matched phrase, and every command word its matched phrases explain
+        best_phrases: Dict[int, Tuple[float, str, float]] = {}  # screen index -> (weighted quality, kind, quality)
+        explained: Dict[int, set] = defaultdict(set)
+        positions = {position for candidate in found for position in self.phrases_by_term[candidate]}
+        for position in positions:
+            index, kind, phrase_terms = self.phrases[position]
+            if any(term not in found for term in phrase_terms):
+                continue
+            quality = sum(found[term][0] for term in phrase_terms) / len(phrase_terms)
+            explained[index].update(found[term][1] for term in phrase_terms)
+            if quality * PHRASE_WEIGHTS[kind] > best_phrases.get(index, (0.0,))[0]:
+                best_phrases[index] = (quality * PHRASE_WEIGHTS[kind], kind, quality)
+        if not best_phrases:
+            return None
+
+        scores = {
+            index: (weighted * (0.6 + 0.4 * len(explained[index]) / len(terms)), kind, quality)
+            for index, (weighted, kind, quality) in best_phrases.items()
+        }
+
+        # Highest score first; registry order breaks ties so the result is stable
+        ranked = sorted(scores.items(), key=lambda item: (-item[1][0], item[0]))
+        best_index, (best, kind, quality) = ranked[0]
+        alternatives = [self.registry[index]["path"] for index, (score, _, _) in ranked[1:] if score >= best - AMBIGUITY_MARGIN]
+        confidence = best * AMBIGUITY_PENALTY if alternatives else best
+
+        screen = self.registry[best_index]
+        result = {
+            "intent": "NAVIGATE",
+            "route": screen["path"],
+            "screen_key": screen["key"],
+            "confidence": round(confidence, 3),
+            "reason": "fuzzy_match" if quality < 1.0 else ("alias_match" if kind == "alias" else "keyword_match")
+        }
+        if alternatives:
+            result["alternatives"] = alternatives
+        return result
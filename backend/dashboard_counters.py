@@ -0,0 +1,172 @@
+"""
+Materialized dashboard counters.
+
+The counts behind /dashboard/stats live in one document of the ``counters``
+collection. The create/update/delete handlers keep it current with $inc
+deltas (including status transitions), the endpoint serves it from memory
+with a short TTL, and a periodic reconciliation recomputes the real counts
+to correct any drift (concurrent writes, out-of-band edits, crashes between
+the write and the $inc).
+"""
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+import asyncio
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+COUNTERS_ID = "dashboard"
+
+# counter name -> (collection, equality filter)
+COUNTERS: Dict[str, Tuple[str, dict]] = {
+    "total_clients": ("clients", {}),
+    "total_projects": ("projects", {}),
+    "total_tasks": ("tasks", {}),
+    "total_employees": ("employees", {}),
+    "active_projects": ("projects", {"status": "in_progress"}),
+    "completed_tasks": ("tasks", {"status": "completed"}),
+}
+
+def matches(doc: Optional[dict], criteria: dict) -> bool:
+    return doc is not None and all(doc.get(field) == value for field, value in criteria.items())
+
+class DashboardCounters:
+    """Incrementally maintained dashboard counts with an in-memory TTL cache"""
+
+    def __init__(self, db, ttl_seconds: float = 15, reconcile_interval_seconds: float = 600):
+        self.db = db
+        self.ttl_seconds = ttl_seconds
+        self.reconcile_interval_seconds = reconcile_interval_seconds
+        self._cached: Optional[dict] = None
+        self._cached_at = 0.0
+        self._reconcile_task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        self.last_reconciled_at: Optional[datetime] = None
+        self.last_drift: Dict[str, int] = {}
+
+    async def record(self, collection_name: str, before: Optional[dict], after: Optional[dict]):
+        """Apply the counter deltas for a write: before=None for inserts, after=None for deletes"""
+        deltas = {}
+        for name, (collection, criteria) in COUNTERS.items():
+            if collection != collection_name:
+                continue
+            delta = int(matches(after, criteria)) - int(matches(before, criteria))
+            if delta:
+                deltas[name] = delta
+        if not deltas:
+            return
+        try:
+            await self.db.counters.update_one({"_id": COUNTERS_ID}, {"$inc": deltas}, upsert=True)
+        except Exception as e:
+            # Reconciliation will repair the drift; never fail the user's write over a counter
+            logger.error(f"Failed to update dashboard counters {deltas}: {str(e)}")
+        self._cached = None
+
+    async def get(self) -> dict:
+        """Counts from memory if fresh enough, else from the counters document"""
+        if self._cached is not None and time.monotonic() - self._cached_at < self.ttl_seconds:
+            self.hits += 1
+            return self._cached
+
+        self.misses += 1
+        stored = await self.db.counters.find_one({"_id": COUNTERS_ID}, {"_id": 0})
+        if stored is None or any(name not in stored for name in COUNTERS):
+            # First run (or a new counter was added): materialize from the collections
+            return await self.reconcile()
+        counts = {name: max(int(stored[name]), 0) for name in COUNTERS}
+        self._remember(counts)
+        return counts
+
+    async def compute(self) -> dict:
+        """Exact counts: one $facet per collection, all collections queried concurrently"""
+        by_collection: Dict[str, Dict[str, dict]] = {}
+        for name, (collection, criteria) in COUNTERS.items():
+            by_collection.setdefault(collection, {})[name] = criteria
+
+        async def facet_counts(collection: str, facets: Dict[str, dict]) -> dict:
+            pipeline = [{"$facet": {
+                name: ([{"$match": criteria}] if criteria else []) + [{"$count": "n"}]
+                for name, criteria in facets.items()
+            }}]
+            result = await self.db[collection].aggregate(pipeline).to_list(1)
+            row = result[0] if result else {}
+            return {name: (row.get(name) or [{"n": 0}])[0]["n"] for name in facets}
+
+        results = await asyncio.gather(*(
+            facet_counts(collection, facets) for collection, facets in by_collection.items()
+        ))
+        counts = {}
+        for partial in results:
+            counts.update(partial)
+        self._remember(counts)
+        return {name: counts[name] for name in COUNTERS}
+
+    async def reconcile(self) -> dict:
+        """Recompute the counts and overwrite the stored counters, recording any drift found"""
+        stored = await self.db.counters.find_one({"_id": COUNTERS_ID}, {"_id": 0}) or {}
+        counts = await self.compute()
+        self.last_drift = {
+            name: counts[name] - stored[name]
+            for name in COUNTERS if name in stored and stored[name] != counts[name]
+        }
+        if self.last_drift:
+            logger.warning(f"Dashboard counter drift corrected: {self.last_drift}")
+        self.last_reconciled_at = datetime.now(timezone.utc)
+        await self.db.counters.update_one(
+            {"_id": COUNTERS_ID},
+            {"$set": {**counts, "reconciled_at": self.last_reconciled_at}},
+            upsert=True
+        )
+        return counts
+
+    def start_reconciliation(self):
+        if self._reconcile_task is None or self._reconcile_task.done():
+            self._reconcile_task = asyncio.create_task(self._reconcile_loop())
+
+    async def stop_reconciliation(self):
+        if self._reconcile_task is not None:
+            self._reconcile_task.cancel()
+            try:
+                await self._reconcile_task
+            except asyncio.CancelledError:
+                pass
+            self._reconcile_task = None
+
+    async def _reconcile_loop(self):
+        while True:
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.error(f"Dashboard counter reconciliation failed: {str(e)}")
+            await asyncio.sleep(self.reconcile_interval_seconds)
+
+    def _remember(self, counts: dict):
+        self._cached = counts
+        self._cached_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "last_reconciled_at": self.last_reconciled_at.isoformat() if self.last_reconciled_at else None,
+            "last_drift": self.last_drift
+        }
+
+
+# Global dashboard counters instance
+_dashboard_counters = None
+
+def get_dashboard_counters(db) -> DashboardCounters:
+    """Get or create dashboard counters instance"""
+    global _dashboard_counters
+    if _dashboard_counters is None:
+        _dashboard_counters = DashboardCounters(
+            db,
+            ttl_seconds=float(os.environ.get('DASHBOARD_CACHE_TTL_SECONDS', 15)),
+            reconcile_interval_seconds=float(os.environ.get('DASHBOARD_RECONCILE_INTERVAL_SECONDS', 600))
+        )
+    return _dashboard_counters
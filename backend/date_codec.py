@@ -0,0 +1,59 @@
+"""
+Storage codec for date fields.
+
+Dates are written as native BSON dates: handlers store the datetimes produced
+by the pydantic models as-is, and the tz-aware Motor client reads them back as
+UTC-aware datetimes, so no per-row parsing is needed on the read path.
+
+Rows written before the switch hold ISO-8601 strings. DATE_FIELDS lists every
+field that is converted in place by the ``0002_native_bson_dates`` migration
+(see db_migrations.py); until that has run, to_datetime() accepts either shape.
+"""
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+# Top-level date fields per collection
+DATE_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "users": ("created_at", "onboarding_completed_at"),
+    "user_sessions": ("created_at", "expires_at"),
+    "invitations": ("created_at", "expires_at"),
+    "vendor_invitations": ("created_at", "expires_at", "completed_at"),
+    "notification_settings": ("updated_at",),
+    "clients": ("created_at",),
+    "projects": ("created_at", "deadline"),
+    "tasks": ("created_at", "due_date"),
+    "work_orders": ("created_at", "due_date"),
+    "employees": ("created_at", "hire_date"),
+    "policies": ("created_at", "updated_at", "effective_date"),
+    "fleet_inspections": ("created_at", "inspection_date"),
+    "invoices": ("created_at", "due_date"),
+    "expenses": ("created_at", "expense_date"),
+    "reports": ("created_at",),
+    "compliance": ("created_at",),
+    "contracts": ("created_at", "start_date", "end_date"),
+    "equipment": ("created_at", "purchase_date"),
+    "timesheets": ("created_at", "date"),
+    "safety_reports": ("created_at", "incident_date"),
+    "certifications": ("created_at", "issue_date", "expiry_date"),
+    "inventory": ("created_at",),
+    "documents": ("created_at",),
+    "notifications": ("created_at",),
+    "vendors": ("created_at",),
+    "vendor_documents": ("uploaded_at", "approved_at", "rejected_at"),
+    "vendor_invoices": ("created_at",),
+    "vendor_payments": ("created_at",),
+    "paystubs": ("created_at",),
+    "payroll_employees": ("created_at",),
+    "employee_tax_info": ("signed_at",),
+    "legal_agreements": ("signed_at",),
+}
+
+def to_datetime(value) -> Optional[datetime]:
+    """Coerce a stored date (BSON date or legacy ISO string) to a UTC-aware datetime"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
@@ -0,0 +1,205 @@
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import PyMongoError
+from typing import Dict, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Collections whose documents are addressed by the app-level "id" field
+ID_COLLECTIONS = [
+    "users", "clients", "projects", "tasks", "work_orders", "employees", "policies",
+    "fleet_inspections", "invoices", "expenses", "reports", "compliance", "contracts",
+    "equipment", "timesheets", "safety_reports", "certifications", "inventory", "documents",
+    "invitations", "vendor_invitations", "vendors", "vendor_documents", "vendor_invoices",
+    "vendor_payments", "paystubs", "notifications", "payroll_employees", "email_outbox",
+]
+
+# Required indexes per collection: (keys, options)
+INDEX_SPECS: Dict[str, List[tuple]] = {name: [([("id", ASCENDING)], {"name": "id_unique", "unique": True})] for name in ID_COLLECTIONS}
+
+INDEX_SPECS["users"] += [
+    ([("username", ASCENDING)], {"name": "username"}),
+    ([("email", ASCENDING)], {"name": "email"}),
+    ([("role", ASCENDING)], {"name": "role"}),
+]
+INDEX_SPECS["user_sessions"] = [
+    ([("session_token", ASCENDING)], {"name": "session_token_unique", "unique": True}),
+    ([("user_id", ASCENDING)], {"name": "user_id"}),
+    # Expired sessions are removed by Mongo once expires_at (a BSON date) has passed
+    ([("expires_at", ASCENDING)], {"name": "expires_at_ttl", "expireAfterSeconds": 0}),
+]
+INDEX_SPECS["invitations"] += [
+    ([("invitation_code", ASCENDING)], {"name": "invitation_code"}),
+    ([("email", ASCENDING), ("used", ASCENDING)], {"name": "email_used"}),
+]
+INDEX_SPECS["vendor_invitations"] += [
+    ([("invitation_code", ASCENDING)], {"name": "invitation_code_unique", "unique": True}),
+]
+for _name in ("projects", "tasks", "work_orders"):
+    INDEX_SPECS[_name] += [
+        ([("assigned_to", ASCENDING)], {"name": "assigned_to"}),
+        ([("status", ASCENDING)], {"name": "status"}),
+    ]
+for _name in ("tasks", "work_orders", "inventory", "expenses", "invoices", "timesheets"):
+    INDEX_SPECS[_name] += [
+        ([("project_id", ASCENDING)], {"name": "project_id"}),
+    ]
+INDEX_SPECS["employees"] += [
+    ([("employee_id", ASCENDING)], {"name": "employee_id"}),
+]
+INDEX_SPECS["vendors"] += [
+    ([("user_id", ASCENDING)], {"name": "user_id"}),
+]
+for _name in ("vendor_documents", "vendor_invoices", "vendor_payments"):
+    INDEX_SPECS[_name] += [
+        ([("vendor_id", ASCENDING)], {"name": "vendor_id"}),
+    ]
+INDEX_SPECS["paystubs"] += [
+    ([("employee_id", ASCENDING), ("year", ASCENDING)], {"name": "employee_id_year"}),
+    ([("employee_id", ASCENDING), ("pay_date", DESCENDING)], {"name": "employee_id_pay_date"}),
+]
+INDEX_SPECS["employee_tax_documents"] = [
+    ([("employee_id", ASCENDING), ("tax_year", DESCENDING)], {"name": "employee_id_tax_year"}),
+]
+# Keyset pagination walks (created_at desc, id desc); see pagination.paginate
+PAGINATED_COLLECTIONS = [
+    "users", "clients", "projects", "tasks", "work_orders", "employees", "policies",
+    "fleet_inspections", "invoices", "expenses", "reports", "compliance", "contracts",
+    "equipment", "timesheets", "safety_reports", "certifications", "inventory", "documents",
+    "invitations",
+]
+for _name in PAGINATED_COLLECTIONS:
+    INDEX_SPECS[_name] += [
+        ([("created_at", DESCENDING), ("id", DESCENDING)], {"name": "created_at_id"}),
+    ]
+for _name in ("projects", "tasks", "work_orders"):
+    INDEX_SPECS[_name] += [
+        ([("assigned_to", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], {"name": "assigned_to_created_at_id"}),
+    ]
+INDEX_SPECS["users"] += [
+    ([("role", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], {"name": "role_created_at_id"}),
+]
+# Extra sort keys accepted by ?sort= (see query_filters.sortable_fields)
+SORT_FIELDS = {
+    "clients": ("name",),
+    "projects": ("deadline", "name"),
+    "tasks": ("due_date",),
+    "work_orders": ("due_date",),
+    "employees": ("name", "hire_date"),
+    "fleet_inspections": ("inspection_date",),
+    "invoices": ("due_date", "amount"),
+    "expenses": ("expense_date", "amount"),
+    "compliance": ("due_date",),
+    "contracts": ("end_date",),
+    "timesheets": ("date",),
+    "safety_reports": ("incident_date",),
+    "certifications": ("expiry_date",),
+    "inventory": ("item_name", "quantity"),
+}
+for _name, _fields in SORT_FIELDS.items():
+    INDEX_SPECS[_name] += [
+        ([(_field, DESCENDING), ("id", DESCENDING)], {"name": f"{_field}_id"}) for _field in _fields
+    ]
+INDEX_SPECS["inventory"] += [
+    ([("project_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], {"name": "project_id_created_at_id"}),
+]
+INDEX_SPECS["inventory_valuations"] = [
+    ([("project_id", ASCENDING)], {"name": "project_id_unique", "unique": True}),
+]
+INDEX_SPECS["email_outbox"] += [
+    # Worker claim query: oldest due message per status
+    ([("status", ASCENDING), ("next_attempt_at", ASCENDING)], {"name": "status_next_attempt_at"}),
+    ([("status", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], {"name": "status_created_at_id"}),
+    # Delivered messages are kept for a week, then removed by Mongo
+    ([("sent_at", ASCENDING)], {"name": "sent_at_ttl", "expireAfterSeconds": 7 * 24 * 3600}),
+]
+INDEX_SPECS["notification_digests"] = [
+    ([("id", ASCENDING)], {"name": "id_unique", "unique": True}),
+    # At most one open digest per recipient, so concurrent assignments push onto the same one
+    ([("user_id", ASCENDING)], {"name": "user_id_open_unique", "unique": True, "partialFilterExpression": {"status": "open"}}),
+    ([("status", ASCENDING), ("flush_at", ASCENDING)], {"name": "status_flush_at"}),
+]
+INDEX_SPECS["notifications"] += [
+    ([("user_id", ASCENDING), ("created_at", DESCENDING)], {"name": "user_id_created_at"}),
+]
+INDEX_SPECS["ai_response_cache"] = [
+    ([("key", ASCENDING)], {"name": "key_unique", "unique": True}),
+    ([("purpose", ASCENDING)], {"name": "purpose"}),
+    # Cached replies are removed by Mongo once their purpose's TTL has passed
+    ([("expires_at", ASCENDING)], {"name": "expires_at_ttl", "expireAfterSeconds": 0}),
+]
+
+# Index options that must match for an existing index to count as in sync
+COMPARED_OPTIONS = ("unique", "expireAfterSeconds", "sparse", "partialFilterExpression")
+
+class IndexManager:
+    """Declares the required Mongo indexes and builds them idempotently"""
+
+    def __init__(self, db, specs: Dict[str, List[tuple]] = None):
+        self.db = db
+        self.specs = specs if specs is not None else INDEX_SPECS
+        self.last_run = None
+
+    async def ensure_indexes(self) -> dict:
+        """Create any missing indexes; existing identical indexes are a no-op"""
+        results = {"created": [], "failed": {}}
+        for collection_name, specs in self.specs.items():
+            models = [IndexModel(keys, **options) for keys, options in specs]
+            try:
+                names = await self.db[collection_name].create_indexes(models)
+                results["created"].extend(f"{collection_name}.{name}" for name in names)
+            except PyMongoError as e:
+                # Fall back to one index at a time so one conflict doesn't block the rest
+                logger.warning(f"Bulk index build for {collection_name} failed, retrying one index at a time: {str(e)}")
+                for model in models:
+                    name = model.document["name"]
+                    try:
+                        await self.db[collection_name].create_indexes([model])
+                        results["created"].append(f"{collection_name}.{name}")
+                    except PyMongoError as index_error:
+                        logger.error(f"Failed to build index {collection_name}.{name}: {str(index_error)}")
+                        results["failed"][f"{collection_name}.{name}"] = str(index_error)
+
+        self.last_run = results
+        logger.info(f"Index bootstrap finished: {len(results['created'])} ensured, {len(results['failed'])} failed")
+        return results
+
+    async def drift_report(self) -> dict:
+        """Compare declared indexes with what the database actually has"""
+        report = {"missing": [], "mismatched": [], "unexpected": []}
+        for collection_name, specs in self.specs.items():
+            existing = await self.db[collection_name].index_information()
+            declared_names = set()
+
+            for keys, options in specs:
+                name = options["name"]
+                declared_names.add(name)
+                actual = existing.get(name)
+                if actual is None:
+                    report["missing"].append(f"{collection_name}.{name}")
+                    continue
+
+                expected = {"key": [(field, direction) for field, direction in keys]}
+                expected.update({option: options[option] for option in COMPARED_OPTIONS if option in options})
+                found = {"key": [(field, direction) for field, direction in actual["key"]]}
+                found.update({option: actual[option] for option in COMPARED_OPTIONS if option in actual})
+                if expected != found:
+                    report["mismatched"].append({"index": f"{collection_name}.{name}", "expected": expected, "found": found})
+
+            for name in existing:
+                if name != "_id_" and name not in declared_names:
+                    report["unexpected"].append(f"{collection_name}.{name}")
+
+        report["in_sync"] = not (report["missing"] or report["mismatched"])
+        return report
+
+
+# Global index manager instance
+_index_manager = None
+
+def get_index_manager(db) -> IndexManager:
+    """Get or create index manager instance"""
+    global _index_manager
+    if _index_manager is None:
+        _index_manager = IndexManager(db)
+    return _index_manager
@@ -0,0 +1,143 @@
+"""
+Registry of one-shot data migrations.
+
+Each migration is an idempotent coroutine taking the database handle. Applied
+migrations are recorded in the ``schema_migrations`` collection so they run
+once; a migration interrupted mid-way is simply re-run (and resumes, since it
+only touches documents still in the old shape).
+
+Run pending migrations manually with:
+    python db_migrations.py
+"""
+from datetime import datetime, timezone
+from pymongo import UpdateOne
+from typing import Callable, List, Tuple
+import logging
+
+from date_codec import DATE_FIELDS, to_datetime
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS: List[Tuple[str, Callable]] = []
+
+BATCH_SIZE = 500
+
+def migration(name: str):
+    """Register a migration; migrations run in registration order"""
+    def decorator(func):
+        MIGRATIONS.append((name, func))
+        return func
+    return decorator
+
+async def convert_string_dates(collection, field: str) -> int:
+    """Convert ISO-8601 string values of a field into BSON dates, in batches.
+
+    Walks the collection in _id order so an unparseable legacy value is logged
+    and left in place without stalling the loop.
+    """
+    converted = 0
+    last_id = None
+    while True:
+        query = {field: {"$type": "string"}}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        docs = await collection.find(query, {"_id": 1, field: 1}).sort("_id", 1).limit(BATCH_SIZE).to_list(BATCH_SIZE)
+        if not docs:
+            return converted
+
+        updates = []
+        for doc in docs:
+            try:
+                value = to_datetime(doc[field])
+            except ValueError:
+                logger.warning(f"Skipping unparseable {collection.name}.{field} value {doc[field]!r} on {doc['_id']}")
+                continue
+            updates.append(UpdateOne({"_id": doc["_id"]}, {"$set": {field: value}}))
+
+        if updates:
+            await collection.bulk_write(updates, ordered=False)
+            converted += len(updates)
+        last_id = docs[-1]["_id"]
+
+@migration("0001_user_sessions_expires_at_to_date")
+async def user_sessions_expires_at_to_date(db):
+    """TTL indexes only expire documents whose field is a BSON date"""
+    return await convert_string_dates(db.user_sessions, "expires_at")
+
+@migration("0002_native_bson_dates")
+async def native_bson_dates(db):
+    """Store every declared date field as a BSON date instead of an ISO string"""
+    converted = {}
+    for collection_name, fields in DATE_FIELDS.items():
+        for field in fields:
+            count = await convert_string_dates(db[collection_name], field)
+            if count:
+                converted[f"{collection_name}.{field}"] = count
+    return converted
+
+async def run_pending_migrations(db) -> dict:
+    """Apply every registered migration that has not completed yet"""
+    completed = {
+        doc["name"] for doc in await db.schema_migrations.find(
+            {"status": "completed"}, {"_id": 0, "name": 1}
+        ).to_list(None)
+    }
+
+    applied = []
+    for name, func in MIGRATIONS:
+        if name in completed:
+            continue
+
+        logger.info(f"Running migration {name}")
+        await db.schema_migrations.update_one(
+            {"name": name},
+            {"$set": {"name": name, "status": "running", "started_at": datetime.now(timezone.utc)}},
+            upsert=True
+        )
+        try:
+            result = await func(db)
+        except Exception as e:
+            logger.error(f"Migration {name} failed: {str(e)}")
+            await db.schema_migrations.update_one(
+                {"name": name},
+                {"$set": {"status": "failed", "error": str(e)}}
+            )
+            break
+
+        await db.schema_migrations.update_one(
+            {"name": name},
+            {"$set": {"status": "completed", "result": result, "completed_at": datetime.now(timezone.utc)}}
+        )
+        applied.append(name)
+
+    return {"applied": applied, "registered": [name for name, _ in MIGRATIONS]}
+
+async def migration_status(db) -> list:
+    recorded = {
+        doc["name"]: doc for doc in await db.schema_migrations.find({}, {"_id": 0}).to_list(None)
+    }
+    return [
+        {"name": name, **recorded.get(name, {"status": "pending"})}
+        for name, _ in MIGRATIONS
+    ]
+
+
+if __name__ == "__main__":
+    import asyncio
+    import os
+    from pathlib import Path
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).parent / '.env')
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    async def main():
+        client = AsyncIOMotorClient(os.environ['MONGO_URL'], tz_aware=True)
+        try:
+            result = await run_pending_migrations(client[os.environ['DB_NAME']])
+            print(f"Applied: {result['applied'] or 'nothing pending'}")
+        finally:
+            client.close()
+
+    asyncio.run(main())
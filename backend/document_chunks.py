@@ -0,0 +1,118 @@
+"""
+Splitting long documents for map-reduce analysis.
+
+Contracts and USACE specs run to hundreds of pages, far past what one prompt
+should hold. split_document() cuts a document into chunks of at most a token
+budget along its own structure: sections start at headings (markdown
+``#``, "SECTION 01 10 00", "PART 2", "1.3 SUBMITTALS", all-caps lines), a
+section that does not fit is split between paragraphs, a paragraph between
+sentences, and only a single oversized sentence is cut mid-text. Small
+sections are packed together; a chunk that continues a section starts with
+the section's heading so the model knows where it is.
+
+Tokens are estimated at four characters each, like the LLM gateway does.
+"""
+from typing import Iterator, List, Tuple
+import re
+
+CHARS_PER_TOKEN = 4
+
+HEADING = re.compile(
+    r"#{1,6}\s+\S.*"
+    r"|(?i:section|part|article|division|chapter|appendix|exhibit|attachment)\s+[\w.-]+.*"
+    r"|\d+(?:\.\d+)*\.?\s+[A-Z].*"
+    r"|[A-Z][A-Z0-9 ,&/()'-]*[A-Z0-9)]"
+)
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+SENTENCE_END = re.compile(r"(?<=[.!?;])\s+")
+
+def is_heading(line: str) -> bool:
+    return 2 < len(line) <= 80 and not line.endswith((".", ",", ";", ":")) and HEADING.fullmatch(line) is not None
+
+def split_sections(text: str) -> List[Tuple[str, str]]:
+    """(heading, text including the heading line) per section; text before the first heading has no heading"""
+    sections = []
+    heading, lines = "", []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if is_heading(stripped):
+            body = "\n".join(lines).strip()
+            if body:
+                sections.append((heading, body))
+            heading, lines = stripped.lstrip("#").strip(), []
+        lines.append(line)
+    body = "\n".join(lines).strip()
+    if body:
+        sections.append((heading, body))
+    return sections
+
+def pieces(text: str, max_chars: int) -> Iterator[str]:
+    """Paragraphs of text, with those longer than max_chars broken at sentences, then hard-wrapped"""
+    for paragraph in PARAGRAPH_BREAK.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            yield paragraph
+            continue
+        sentences, size = [], 0
+        for sentence in SENTENCE_END.split(paragraph):
+            if sentences and size + len(sentence) + 1 > max_chars:
+                yield " ".join(sentences)
+                sentences, size = [], 0
+            while len(sentence) > max_chars:
+                yield sentence[:max_chars]
+                sentence = sentence[max_chars:]
+            sentences.append(sentence)
+            size += len(sentence) + 1
+        if sentences:
+            yield " ".join(sentences)
+
+def split_document(text: str, max_tokens: int) -> List[str]:
+    """Chunks of at most max_tokens (estimated), cut along the document's structure"""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+
+    def flush():
+        nonlocal current, size
+        if current:
+            chunks.append("\n\n".join(current))
+        current, size = [], 0
+
+    for heading, section in split_sections(text):
+        # Start a section on a fresh chunk unless the current one is still mostly empty
+        if current and size + len(section) > max_chars and size >= max_chars // 2:
+            flush()
+        first = True
+        for piece in pieces(section, max_chars):
+            if current and size + len(piece) + 2 > max_chars:
+                flush()
+                if heading and not first:
+                    marker = f"[{heading}, continued]"
+                    if len(marker) + len(piece) + 2 <= max_chars:
+                        current, size = [marker], len(marker) + 2
+            current.append(piece)
+            size += len(piece) + 2
+            first = False
+    flush()
+    return chunks
+
+def pack_notes(notes: List[str], max_tokens: int) -> List[List[str]]:
+    """Consecutive notes grouped to at most max_tokens each (at least two per group, so merging always shrinks the list)"""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    groups: List[List[str]] = []
+    group: List[str] = []
+    size = 0
+    for note in notes:
+        if len(group) >= 2 and size + len(note) > max_chars:
+            groups.append(group)
+            group, size = [], 0
+        group.append(note)
+        size += len(note) + 2
+    if len(group) == 1 and groups:
+        groups[-1].append(group[0])
+    elif group:
+        groups.append(group)
+    return groups
@@ -0,0 +1,213 @@
+"""
+Durable outbox for outgoing email.
+
+Request handlers only insert a message into the ``email_outbox`` collection;
+a pool of background workers claims batches of pending messages, sends each
+batch over one pooled SMTP session on a thread (smtplib is blocking) and
+records the outcome. Failed sends are retried with exponential backoff;
+after max_attempts the message is parked in the ``dead`` state until an
+admin retries it. A message left in ``sending`` by a crashed worker is
+reclaimed once its lease expires.
+"""
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from pymongo import ReturnDocument
+from typing import List, Optional
+import asyncio
+import logging
+import os
+import statistics
+import time
+import uuid
+
+from email_service import get_email_service
+
+logger = logging.getLogger(__name__)
+
+class EmailOutbox:
+    """Mongo-backed email queue drained by a pool of async workers"""
+
+    def __init__(self, db, workers: int = 4, batch_size: int = 10, max_attempts: int = 5, backoff_seconds: float = 30,
+                 max_backoff_seconds: float = 3600, poll_interval_seconds: float = 5, lease_seconds: float = 300):
+        self.db = db
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self.lease_seconds = lease_seconds
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self.enqueued = 0
+        self.sent = 0
+        self.failed_attempts = 0
+        self.dead_lettered = 0
+        self._send_ms = deque(maxlen=500)
+        self._delivery_ms = deque(maxlen=500)
+
+    async def enqueue(self, to_email: str, subject: str, body: str, html: bool = True) -> str:
+        """Store a message for delivery and wake a worker; returns the message id"""
+        now = datetime.now(timezone.utc)
+        message_id = str(uuid.uuid4())
+        await self.db.email_outbox.insert_one({
+            "id": message_id,
+            "to_email": to_email,
+            "subject": subject,
+            "body": body,
+            "html": html,
+            "status": "pending",
+            "attempts": 0,
+            "next_attempt_at": now,
+            "created_at": now
+        })
+        self.enqueued += 1
+        self._wakeup.set()
+        return message_id
+
+    async def retry(self, message_id: str) -> bool:
+        """Move a dead-lettered message back to pending with a fresh attempt budget"""
+        result = await self.db.email_outbox.update_one(
+            {"id": message_id, "status": "dead"},
+            {"$set": {"status": "pending", "attempts": 0, "next_attempt_at": datetime.now(timezone.utc)}}
+        )
+        if result.modified_count:
+            self._wakeup.set()
+        return bool(result.modified_count)
+
+    def start(self):
+        self._tasks = [t for t in self._tasks if not t.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self):
+        while True:
+            try:
+                batch = await self._claim_batch()
+            except Exception as e:
+                logger.error(f"Email outbox claim failed: {str(e)}")
+                batch = []
+            if not batch:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+            await self._send(batch)
+
+    async def _claim_batch(self) -> List[dict]:
+        """Claim up to batch_size due messages, to be sent over one SMTP session"""
+        batch = []
+        while len(batch) < self.batch_size:
+            message = await self._claim()
+            if message is None:
+                break
+            batch.append(message)
+        return batch
+
+    async def _claim(self) -> Optional[dict]:
+        now = datetime.now(timezone.utc)
+        message = await self.db.email_outbox.find_one_and_update(
+            {"$or": [
+                {"status": "pending", "next_attempt_at": {"$lte": now}},
+                {"status": "sending", "locked_at": {"$lte": now - timedelta(seconds=self.lease_seconds)}}
+            ]},
+            {"$set": {"status": "sending", "locked_at": now}, "$inc": {"attempts": 1}},
+            sort=[("next_attempt_at", 1)],
+            projection={"_id": 0},
+            return_document=ReturnDocument.BEFORE
+        )
+        if message:
+            message["attempts"] += 1
+        return message
+
+    async def _send(self, batch: List[dict]):
+        started_at = time.perf_counter()
+        try:
+            errors = await asyncio.to_thread(get_email_service().deliver_batch, batch)
+        except Exception as e:
+            errors = [e] * len(batch)
+        per_message_ms = (time.perf_counter() - started_at) * 1000 / len(batch)
+
+        now = datetime.now(timezone.utc)
+        for message, error in zip(batch, errors):
+            if error is not None:
+                await self._failed(message, str(error))
+                continue
+            self.sent += 1
+            self._send_ms.append(per_message_ms)
+            self._delivery_ms.append((now - message["created_at"]).total_seconds() * 1000)
+            await self.db.email_outbox.update_one(
+                {"id": message["id"]},
+                {"$set": {"status": "sent", "sent_at": now}, "$unset": {"locked_at": "", "body": ""}}
+            )
+
+    async def _failed(self, message: dict, error: str):
+        self.failed_attempts += 1
+        attempts = message["attempts"]
+        if attempts >= self.max_attempts:
+            self.dead_lettered += 1
+            logger.error(f"Email to {message['to_email']} dead-lettered after {attempts} attempts: {error}")
+            update = {"status": "dead", "last_error": error, "dead_at": datetime.now(timezone.utc)}
+        else:
+            delay = min(self.backoff_seconds * 2 ** (attempts - 1), self.max_backoff_seconds)
+            logger.warning(f"Email to {message['to_email']} failed (attempt {attempts}), retrying in {delay:.0f}s: {error}")
+            update = {
+                "status": "pending",
+                "last_error": error,
+                "next_attempt_at": datetime.now(timezone.utc) + timedelta(seconds=delay)
+            }
+        await self.db.email_outbox.update_one({"id": message["id"]}, {"$set": update, "$unset": {"locked_at": ""}})
+
+    async def stats(self) -> dict:
+        by_status = await self.db.email_outbox.aggregate([
+            {"$match": {"status": {"$in": ["pending", "sending", "dead"]}}},
+            {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+        ]).to_list(None)
+        counts = {row["_id"]: row["count"] for row in by_status}
+
+        def percentiles(samples) -> dict:
+            if not samples:
+                return {"p50": 0.0, "p95": 0.0}
+            ordered = sorted(samples)
+            return {
+                "p50": round(statistics.median(ordered), 2),
+                "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2)
+            }
+
+        return {
+            "workers": len([t for t in self._tasks if not t.done()]),
+            "queue_depth": counts.get("pending", 0),
+            "in_flight": counts.get("sending", 0),
+            "dead": counts.get("dead", 0),
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "failed_attempts": self.failed_attempts,
+            "dead_lettered": self.dead_lettered,
+            "send_ms": percentiles(self._send_ms),
+            "delivery_ms": percentiles(self._delivery_ms)
+        }
+
+
+# Global email outbox instance
+_email_outbox = None
+
+def get_email_outbox(db) -> EmailOutbox:
+    """Get or create email outbox instance"""
+    global _email_outbox
+    if _email_outbox is None:
+        _email_outbox = EmailOutbox(
+            db,
+            workers=int(os.environ.get('EMAIL_OUTBOX_WORKERS', 4)),
+            batch_size=int(os.environ.get('EMAIL_OUTBOX_BATCH_SIZE', 10)),
+            max_attempts=int(os.environ.get('EMAIL_MAX_ATTEMPTS', 5)),
+            backoff_seconds=float(os.environ.get('EMAIL_RETRY_BACKOFF_SECONDS', 30))
+        )
+    return _email_outbox
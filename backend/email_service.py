@@ -1,10 +1,20 @@
 import smtplib
+from collections import deque
+from email.message import Message
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Optional
+from typing import List, Optional, Tuple
+import asyncio
 import logging
 import os
+import threading
+import time
 from email_templates import (
+    admin_task_created_email,
+    admin_file_upload_email,
+    admin_task_status_change_email,
+    assignment_emails,
+    assignment_notification_email,
     employee_work_order_assignment,
     employee_project_assignment,
     employee_task_assignment,
@@ -15,131 +25,240 @@ from email_templates import (
 
 logger = logging.getLogger(__name__)
 
+class SMTPConnectionPool:
+    """Authenticated SMTP sessions kept open and reused across sends
+
+    At most max_connections sessions are open to the server at once; callers
+    beyond that wait for a session to be returned. Sessions idle for longer
+    than idle_timeout_seconds are assumed dropped by the server and replaced,
+    and a session the server closed mid-send is reconnected once.
+    """
+
+    def __init__(self, smtp_server: str, smtp_port: int, username: str, password: str,
+                 max_connections: int = 4, idle_timeout_seconds: float = 60, timeout_seconds: float = 30,
+                 use_tls: bool = True):
+        self.smtp_server = smtp_server
+        self.smtp_port = smtp_port
+        self.username = username
+        self.password = password
+        self.max_connections = max_connections
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.timeout_seconds = timeout_seconds
+        self.use_tls = use_tls
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._lock = threading.Lock()
+        self._idle = deque()
+        self.closed = False
+        self.connections_opened = 0
+        self.sessions_reused = 0
+        self.reconnects = 0
+        self.messages_sent = 0
+
+    def matches(self, smtp_server: str, smtp_port: int, username: str, password: str) -> bool:
+        return (self.smtp_server, self.smtp_port, self.username, self.password) == (smtp_server, smtp_port, username, password)
+
+    def send(self, messages: List[Message]) -> List[Optional[Exception]]:
+        """Send messages over one session; returns the error for each message (None if sent)"""
+        errors = []
+        self._slots.acquire()
+        session = None
+        try:
+            for msg in messages:
+                try:
+                    if session is None:
+                        session = self._checkout()
+                    try:
+                        session.send_message(msg)
+                    except smtplib.SMTPServerDisconnected:
+                        # Dropped by the server (idle timeout, restart): reconnect once and resend
+                        self._quit(session)
+                        session = None
+                        with self._lock:
+                            self.reconnects += 1
+                        session = self._connect()
+                        session.send_message(msg)
+                    with self._lock:
+                        self.messages_sent += 1
+                    errors.append(None)
+                except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused) as e:
+                    # Rejected by the server (sender, recipient, content); the session is still usable
+                    errors.append(e)
+                except Exception as e:
+                    errors.append(e)
+                    self._quit(session)
+                    session = None
+        finally:
+            if session is not None:
+                self._checkin(session)
+            self._slots.release()
+        return errors
+
+    def _checkout(self) -> smtplib.SMTP:
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                session, returned_at = self._idle.pop()
+            if time.monotonic() - returned_at < self.idle_timeout_seconds:
+                with self._lock:
+                    self.sessions_reused += 1
+                return session
+            self._quit(session)
+        return self._connect()
+
+    def _checkin(self, session: smtplib.SMTP):
+        with self._lock:
+            if not self.closed:
+                self._idle.append((session, time.monotonic()))
+                return
+        self._quit(session)
+
+    def _connect(self) -> smtplib.SMTP:
+        session = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=self.timeout_seconds)
+        try:
+            if self.use_tls:
+                session.starttls()
+            if self.username:
+                session.login(self.username, self.password)
+        except Exception:
+            self._quit(session)
+            raise
+        with self._lock:
+            self.connections_opened += 1
+        return session
+
+    def _quit(self, session: Optional[smtplib.SMTP]):
+        if session is None:
+            return
+        try:
+            session.quit()
+        except Exception:
+            session.close()
+
+    def close(self):
+        """Close idle sessions now and sessions in use when they are returned"""
+        with self._lock:
+            self.closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+        for session, _ in idle:
+            self._quit(session)
+
+    def stats(self) -> dict:
+        with self._lock:
+            idle = len(self._idle)
+        return {
+            "server": f"{self.smtp_server}:{self.smtp_port}",
+            "max_connections": self.max_connections,
+            "idle_sessions": idle,
+            "connections_opened": self.connections_opened,
+            "sessions_reused": self.sessions_reused,
+            "reconnects": self.reconnects,
+            "messages_sent": self.messages_sent
+        }
+
 class EmailService:
-    def __init__(self, smtp_server: str, smtp_port: int, username: str, password: str, from_email: str):
+    def __init__(self, smtp_server: str, smtp_port: int, username: str, password: str, from_email: str,
+                 pool: Optional[SMTPConnectionPool] = None):
         self.smtp_server = smtp_server
         self.smtp_port = smtp_port
         self.username = username
         self.password = password
         self.from_email = from_email
         self.enabled = bool(smtp_server and username and password)
+        self.pool = pool or SMTPConnectionPool(
+            smtp_server, smtp_port, username, password,
+            max_connections=int(os.environ.get('SMTP_MAX_CONNECTIONS', 4)),
+            idle_timeout_seconds=float(os.environ.get('SMTP_IDLE_TIMEOUT_SECONDS', 60)),
+            use_tls=os.environ.get('SMTP_STARTTLS', 'true').lower() not in ('0', 'false', 'no')
+        )
     
-    def send_email(self, to_email: str, subject: str, body: str, html: bool = True) -> bool:
-        """Send an email notification"""
+    async def send_email(self, to_email: str, subject: str, body: str, html: bool = True) -> bool:
+        """Queue an email notification (sent inline, off the event loop, when no outbox is running)"""
         if not self.enabled:
             logger.warning("Email service not configured. Skipping email send.")
             return False
         
+        if _email_outbox is None:
+            return await self.send_now(to_email, subject, body, html)
+        
         try:
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = self.from_email
-            msg['To'] = to_email
-            
-            if html:
-                html_part = MIMEText(body, 'html')
-                msg.attach(html_part)
-            else:
-                text_part = MIMEText(body, 'plain')
-                msg.attach(text_part)
-            
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.username, self.password)
-                server.send_message(msg)
-            
-            logger.info(f"Email sent successfully to {to_email}")
+            await _email_outbox.enqueue(to_email, subject, body, html)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to queue email to {to_email}: {str(e)}")
+            return False
+    
+    async def send_now(self, to_email: str, subject: str, body: str, html: bool = True) -> bool:
+        """Send immediately, bypassing the outbox, and report whether it went through"""
+        if not self.enabled:
+            logger.warning("Email service not configured. Skipping email send.")
+            return False
+        
+        try:
+            await asyncio.to_thread(self.deliver, to_email, subject, body, html)
             return True
         except Exception as e:
             logger.error(f"Failed to send email to {to_email}: {str(e)}")
             return False
     
-    def send_task_created_notification(self, admin_email: str, task_title: str, created_by: str, project_name: str = "N/A"):
+    def build_message(self, to_email: str, subject: str, body: str, html: bool = True) -> Message:
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = subject
+        msg['From'] = self.from_email
+        msg['To'] = to_email
+        
+        if html:
+            html_part = MIMEText(body, 'html')
+            msg.attach(html_part)
+        else:
+            text_part = MIMEText(body, 'plain')
+            msg.attach(text_part)
+        return msg
+    
+    def deliver(self, to_email: str, subject: str, body: str, html: bool = True):
+        """Blocking SMTP send; raises on failure so the outbox can retry"""
+        error = self.deliver_batch([{"to_email": to_email, "subject": subject, "body": body, "html": html}])[0]
+        if error is not None:
+            raise error
+    
+    def deliver_batch(self, messages: List[dict]) -> List[Optional[Exception]]:
+        """Blocking send of several messages over one pooled session; per-message error or None"""
+        if not self.enabled:
+            return [RuntimeError("Email service not configured")] * len(messages)
+        
+        errors = self.pool.send([
+            self.build_message(m["to_email"], m["subject"], m["body"], m.get("html", True)) for m in messages
+        ])
+        for message, error in zip(messages, errors):
+            if error is None:
+                logger.info(f"Email sent successfully to {message['to_email']}")
+        return errors
+    
+    async def send_task_created_notification(self, admin_email: str, task_title: str, created_by: str, project_name: str = "N/A"):
         """Notify admin when a new task is created"""
-        subject = f"New Task Created: {task_title}"
-        body = f"""
-        <html>
-            <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                <div style="max-width: 600px; margin: 0 auto; padding: 20px; background-color: #000; color: #C9A961; border: 2px solid #C9A961; border-radius: 8px;">
-                    <h2 style="color: #C9A961; border-bottom: 2px solid #C9A961; padding-bottom: 10px;">New Task Created</h2>
-                    <p><strong>Task Title:</strong> {task_title}</p>
-                    <p><strong>Created By:</strong> {created_by}</p>
-                    <p><strong>Project:</strong> {project_name}</p>
-                    <p style="margin-top: 20px; padding-top: 20px; border-top: 1px solid #C9A961; color: #888;">
-                        <em>Williams Diversified LLC - Project Command Center</em>
-                    </p>
-                </div>
-            </body>
-        </html>
-        """
-        return self.send_email(admin_email, subject, body)
+        email_data = admin_task_created_email(task_title=task_title, created_by=created_by, project_name=project_name)
+        return await self.send_email(admin_email, email_data['subject'], email_data['html'])
     
-    def send_file_upload_notification(self, admin_email: str, filename: str, uploaded_by: str, item_type: str, item_title: str):
+    async def send_file_upload_notification(self, admin_email: str, filename: str, uploaded_by: str, item_type: str, item_title: str):
         """Notify admin when a file is uploaded"""
-        subject = f"File Uploaded: {filename}"
-        body = f"""
-        <html>
-            <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                <div style="max-width: 600px; margin: 0 auto; padding: 20px; background-color: #000; color: #C9A961; border: 2px solid #C9A961; border-radius: 8px;">
-                    <h2 style="color: #C9A961; border-bottom: 2px solid #C9A961; padding-bottom: 10px;">File Uploaded</h2>
-                    <p><strong>Filename:</strong> {filename}</p>
-                    <p><strong>Uploaded By:</strong> {uploaded_by}</p>
-                    <p><strong>{item_type}:</strong> {item_title}</p>
-                    <p style="margin-top: 20px; padding-top: 20px; border-top: 1px solid #C9A961; color: #888;">
-                        <em>Williams Diversified LLC - Project Command Center</em>
-                    </p>
-                </div>
-            </body>
-        </html>
-        """
-        return self.send_email(admin_email, subject, body)
+        email_data = admin_file_upload_email(filename=filename, uploaded_by=uploaded_by, item_type=item_type, item_title=item_title)
+        return await self.send_email(admin_email, email_data['subject'], email_data['html'])
     
-    def send_task_status_change_notification(self, admin_email: str, task_title: str, old_status: str, new_status: str, changed_by: str):
+    async def send_task_status_change_notification(self, admin_email: str, task_title: str, old_status: str, new_status: str, changed_by: str):
         """Notify admin when task status changes"""
-        subject = f"Task Status Changed: {task_title}"
-        body = f"""
-        <html>
-            <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                <div style="max-width: 600px; margin: 0 auto; padding: 20px; background-color: #000; color: #C9A961; border: 2px solid #C9A961; border-radius: 8px;">
-                    <h2 style="color: #C9A961; border-bottom: 2px solid #C9A961; padding-bottom: 10px;">Task Status Updated</h2>
-                    <p><strong>Task:</strong> {task_title}</p>
-                    <p><strong>Status Changed:</strong> {old_status} → {new_status}</p>
-                    <p><strong>Changed By:</strong> {changed_by}</p>
-                    <p style="margin-top: 20px; padding-top: 20px; border-top: 1px solid #C9A961; color: #888;">
-                        <em>Williams Diversified LLC - Project Command Center</em>
-                    </p>
-                </div>
-            </body>
-        </html>
-        """
-        return self.send_email(admin_email, subject, body)
+        email_data = admin_task_status_change_email(task_title=task_title, old_status=old_status, new_status=new_status, changed_by=changed_by)
+        return await self.send_email(admin_email, email_data['subject'], email_data['html'])
     
-    def send_assignment_notification(self, user_email: str, user_name: str, item_type: str, item_title: str, assigned_by: str):
+    async def send_assignment_notification(self, user_email: str, user_name: str, item_type: str, item_title: str, assigned_by: str):
         """Notify user when they are assigned to a task or project"""
-        subject = f"You've Been Assigned to {item_type}: {item_title}"
-        body = f"""
-        <html>
-            <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                <div style="max-width: 600px; margin: 0 auto; padding: 20px; background-color: #000; color: #C9A961; border: 2px solid #C9A961; border-radius: 8px;">
-                    <h2 style="color: #C9A961; border-bottom: 2px solid #C9A961; padding-bottom: 10px;">New Assignment</h2>
-                    <p>Hello {user_name},</p>
-                    <p>You have been assigned to a {item_type.lower()}:</p>
-                    <p><strong>{item_type}:</strong> {item_title}</p>
-                    <p><strong>Assigned By:</strong> {assigned_by}</p>
-                    <p style="margin-top: 20px;">Please log in to the Project Command Center to view details and take action.</p>
-                    <p style="margin-top: 20px; padding-top: 20px; border-top: 1px solid #C9A961; color: #888;">
-                        <em>Williams Diversified LLC - Project Command Center</em>
-                    </p>
-                </div>
-            </body>
-        </html>
-        """
-        return self.send_email(user_email, subject, body)
+        email_data = assignment_notification_email(user_name=user_name, item_type=item_type, item_title=item_title, assigned_by=assigned_by)
+        return await self.send_email(user_email, email_data['subject'], email_data['html'])
     
-    async def send_task_assignment_email(self, to_email: str, user_name: str, user_role: str, task_title: str, 
-                                        task_description: str, due_date: str, priority: str, assigned_by: str, 
-                                        portal_url: str):
-        """Send task assignment notification based on user role"""
+    def build_task_assignment_email(self, user_name: str, user_role: str, task_title: str, 
+                                    task_description: str, due_date: str, priority: str, assigned_by: str, 
+                                    portal_url: str):
+        """Task assignment email (subject/html) for the user's role"""
         if user_role == 'vendor':
             email_data = vendor_task_assignment(
                 vendor_name=user_name,
@@ -161,12 +280,12 @@ class EmailService:
                 portal_url=portal_url
             )
         
-        return self.send_email(to_email, email_data['subject'], email_data['html'])
+        return email_data
     
-    async def send_project_assignment_email(self, to_email: str, user_name: str, user_role: str, project_name: str,
-                                           project_description: str, start_date: str, end_date: str, 
-                                           assigned_by: str, portal_url: str):
-        """Send project assignment notification based on user role"""
+    def build_project_assignment_email(self, user_name: str, user_role: str, project_name: str,
+                                       project_description: str, start_date: str, end_date: str, 
+                                       assigned_by: str, portal_url: str):
+        """Project assignment email (subject/html) for the user's role"""
         if user_role == 'vendor':
             email_data = vendor_project_assignment(
                 vendor_name=user_name,
@@ -188,13 +307,13 @@ class EmailService:
                 portal_url=portal_url
             )
         
-        return self.send_email(to_email, email_data['subject'], email_data['html'])
+        return email_data
     
-    async def send_work_order_assignment_email(self, to_email: str, user_name: str, user_role: str, 
-                                               work_order_number: str, work_order_title: str, 
-                                               assigned_by: str, start_date: str, location: str, 
-                                               portal_url: str):
-        """Send work order assignment notification based on user role"""
+    def build_work_order_assignment_email(self, user_name: str, user_role: str, 
+                                          work_order_number: str, work_order_title: str, 
+                                          assigned_by: str, start_date: str, location: str, 
+                                          portal_url: str):
+        """Work order assignment email (subject/html) for the user's role"""
         if user_role == 'vendor':
             email_data = vendor_work_order_assignment(
                 vendor_name=user_name,
@@ -216,12 +335,44 @@ class EmailService:
                 portal_url=portal_url
             )
         
-        return self.send_email(to_email, email_data['subject'], email_data['html'])
+        return email_data
+    
+    def build_assignment_emails(self, item_type: str, recipients: List[Tuple[str, str]], **details) -> List[dict]:
+        """Assignment emails (subject/html) for every (user_name, user_role) assigned to one item
+
+        item_type is task, project or work_order and details are the fields of
+        the matching build_*_assignment_email besides user_name/user_role.
+        Rendered in one batch per role template, so shared fields render once.
+        """
+        return assignment_emails(item_type, recipients, **details)
+
+    async def send_task_assignment_email(self, to_email: str, **kwargs):
+        """Send task assignment notification based on user role"""
+        email_data = self.build_task_assignment_email(**kwargs)
+        return await self.send_email(to_email, email_data['subject'], email_data['html'])
+    
+    async def send_project_assignment_email(self, to_email: str, **kwargs):
+        """Send project assignment notification based on user role"""
+        email_data = self.build_project_assignment_email(**kwargs)
+        return await self.send_email(to_email, email_data['subject'], email_data['html'])
+    
+    async def send_work_order_assignment_email(self, to_email: str, **kwargs):
+        """Send work order assignment notification based on user role"""
+        email_data = self.build_work_order_assignment_email(**kwargs)
+        return await self.send_email(to_email, email_data['subject'], email_data['html'])
 
 
 # Global email service instance
 _email_service = None
 
+# Outbox that send_email() enqueues into, set at startup
+_email_outbox = None
+
+def use_email_outbox(outbox):
+    """Route send_email() through a running outbox (None to send inline again)"""
+    global _email_outbox
+    _email_outbox = outbox
+
 def get_email_service(smtp_server: Optional[str] = None, smtp_port: Optional[int] = None, 
                      username: Optional[str] = None, password: Optional[str] = None, 
                      from_email: Optional[str] = None) -> EmailService:
@@ -230,12 +381,26 @@ def get_email_service(smtp_server: Optional[str] = None, smtp_port: Optional[int
     
     if _email_service is None or smtp_server is not None:
         # Create new instance with provided settings or defaults
+        smtp_server = smtp_server or os.environ.get('SMTP_SERVER', '')
+        smtp_port = smtp_port or int(os.environ.get('SMTP_PORT', 587))
+        username = username or os.environ.get('SMTP_USERNAME', '')
+        password = password or os.environ.get('SMTP_PASSWORD', '')
+        
+        # Keep the open sessions if the connection settings didn't change, otherwise drop them
+        pool = None
+        if _email_service is not None:
+            if _email_service.pool.matches(smtp_server, smtp_port, username, password):
+                pool = _email_service.pool
+            else:
+                _email_service.pool.close()
+        
         _email_service = EmailService(
-            smtp_server=smtp_server or os.environ.get('SMTP_SERVER', ''),
-            smtp_port=smtp_port or int(os.environ.get('SMTP_PORT', 587)),
-            username=username or os.environ.get('SMTP_USERNAME', ''),
-            password=password or os.environ.get('SMTP_PASSWORD', ''),
-            from_email=from_email or os.environ.get('SMTP_FROM_EMAIL', '')
+            smtp_server=smtp_server,
+            smtp_port=smtp_port,
+            username=username,
+            password=password,
+            from_email=from_email or os.environ.get('SMTP_FROM_EMAIL', ''),
+            pool=pool
         )
     
     return _email_service
@@ -1,7 +1,20 @@
 """
 Branded Email Templates for Williams Diversified LLC
 All notifications use consistent professional branding
+
+Templates are Jinja2, compiled once when this module is imported. The
+branded frame from get_base_template() is built once and reused, and brand
+colors / company details are inlined into each template before compiling,
+so a render only evaluates the per-message fields (which are HTML-escaped).
+Each template is split at its tags (SplitTemplate) so that rendering joins
+static text with just those fields, and render_batch() renders the fields
+all recipients share once per batch.
 """
+from jinja2 import Environment, StrictUndefined, UndefinedError, meta
+from markupsafe import Markup, escape
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+import re
 
 COMPANY_INFO = {
     "name": "Williams Diversified LLC",
@@ -92,24 +105,223 @@ def get_button_html(text: str, url: str) -> str:
     </table>
     """
 
+# ============================================
+# TEMPLATE REGISTRY
+# ============================================
+
+BRAND_PLACEHOLDER = re.compile(r"\{\{ (colors|company)\.(\w+) \}\}")
+FRAME_SLOT = "<!-- content -->"
+
+def inline_brand(source: str, html: bool = True) -> str:
+    """Replace {{ colors.x }} / {{ company.x }} with their values so they are static text after compiling"""
+    def value(match):
+        text = (COLORS if match.group(1) == "colors" else COMPANY_INFO)[match.group(2)]
+        return str(escape(text)) if html else text
+    return BRAND_PLACEHOLDER.sub(value, source)
+
+def button(text: str, url: str) -> Markup:
+    return Markup(get_button_html(escape(text), escape(url)))
+
+SPLIT_BLOCKS = ("for", "if")
+HTML_SPECIAL = re.compile(r"[&<>'\"]")
+MISSING = object()
+
+def html_text(value) -> str:
+    """escape(value), without the Markup copy for plain strings that have nothing to escape"""
+    if type(value) is str and HTML_SPECIAL.search(value) is None:
+        return value
+    return escape(value)
+
+def template_segments(env: Environment, source: str) -> Optional[List[Tuple[str, str]]]:
+    """Top-level pieces of source, in order: ("data", text), ("name", variable) for a bare
+    {{ variable }}, ("tag", source) for any other output or for/if block. None if the
+    template uses any other tag, since those (set, macro, ...) can affect what follows."""
+    segments, current, words, depth = [], [], [], 0
+    for _, token, value in env.lex(source):
+        if not current and token == "data":
+            segments.append(("data", value))
+            continue
+        if token.startswith(("raw_", "line")):
+            return None
+        current.append(value)
+        if token == "whitespace":
+            continue
+        if words and words[-1] == "block_begin" and token == "name":
+            if value in SPLIT_BLOCKS:
+                depth += 1
+            elif value.startswith("end"):
+                depth -= 1
+            elif value not in ("elif", "else"):
+                return None
+        words.append(token if token.endswith(("_begin", "_end")) else value)
+        if token in ("variable_end", "block_end", "comment_end") and depth == 0:
+            if words[0] == "variable_begin":
+                bare = len(words) == 3 and words[1].isidentifier() and words[1].lower() not in ("true", "false", "none")
+                segments.append(("name", words[1]) if bare else ("tag", "".join(current)))
+            elif words[0] == "block_begin":
+                segments.append(("tag", "".join(current)))
+            current, words = [], []
+    return None if current else segments
+
+class SplitTemplate:
+    """A template rendered as static text plus the slots that depend on the context
+
+    Bare {{ name }} outputs are looked up (and escaped) directly. Any other
+    tag, e.g. a button() call, a filter or a for/if block, is compiled as a
+    template of its own, with its output cached per argument values.
+    Templates using other tags render whole. Either way the output is what
+    Template.render() gives for the full source.
+    """
+
+    def __init__(self, env: Environment, source: str, prefix: str = "", suffix: str = ""):
+        self.text = html_text if env.autoescape else str
+        segments = template_segments(env, source) or [("tag", source)]
+        # A part is static text or a slot: (variable names, variable name or fragment renderer)
+        parts = []
+        for kind, value in [("data", prefix)] + segments + [("data", suffix)]:
+            if kind == "data":
+                parts.append(value)
+            elif kind == "name" and value not in env.globals:
+                parts.append(((value,), value))
+            else:
+                parts.append(self.fragment(env, value))
+        # Tags without variables, e.g. buttons with a fixed URL, become static text here
+        self.parts = self.bind(parts, {})
+        self.head, self.slots = self.split(self.parts)
+
+    @staticmethod
+    def fragment(env: Environment, source: str) -> tuple:
+        template = env.from_string(source)
+        names = tuple(sorted(meta.find_undeclared_variables(env.parse(source)) - set(env.globals)))
+
+        @lru_cache(maxsize=256, typed=True)
+        def cached(*values) -> str:
+            return template.render(**dict(zip(names, values)))
+
+        def render(context: dict) -> str:
+            try:
+                return cached(*[context[name] for name in names])
+            except (KeyError, TypeError):
+                # Missing (Jinja raises its usual error) or unhashable (e.g. lists for loops) values
+                return template.render(**context)
+        return names, render
+
+    def bind(self, parts: list, shared: dict) -> list:
+        """parts with every slot whose variables are all in shared rendered to text"""
+        return [self.fill("", [(part[1], "")], shared) if type(part) is not str and all(name in shared for name in part[0])
+                else part for part in parts]
+
+    @staticmethod
+    def split(parts: list) -> Tuple[str, list]:
+        """The static text before the first slot, and (slot renderer, static text after it) pairs"""
+        head, slots = "", []
+        for part in parts:
+            if type(part) is str:
+                if slots:
+                    slots[-1] = (slots[-1][0], slots[-1][1] + part)
+                else:
+                    head += part
+            else:
+                slots.append((part[1], ""))
+        return head, slots
+
+    def fill(self, head: str, slots: list, context: dict) -> str:
+        if not slots:
+            return head
+        text = self.text
+        out = [head]
+        append = out.append
+        try:
+            for slot, tail in slots:
+                append(text(context[slot]) if type(slot) is str else slot(context))
+                append(tail)
+        except KeyError as e:
+            raise UndefinedError(f"{e.args[0]!r} is undefined") from None
+        return "".join(out)
+
+    def render(self, context: dict) -> str:
+        return self.fill(self.head, self.slots, context)
+
+    def render_batch(self, contexts: List[dict], shared: dict) -> List[str]:
+        """Render for each context; slots using only shared values are rendered once"""
+        head, slots = self.split(self.bind(self.parts, shared))
+        return [self.fill(head, slots, context) for context in contexts]
+
+    @staticmethod
+    def shared(contexts: List[dict]) -> dict:
+        """The variables that have the same value (and type) in every context"""
+        shared = dict(contexts[0])
+        for context in contexts[1:]:
+            for name, value in list(shared.items()):
+                other = context.get(name, MISSING)
+                if other is not value and (type(other) is not type(value) or other != value):
+                    del shared[name]
+        return shared
+
+class EmailTemplateRegistry:
+    """Named subject/body template pairs, compiled once"""
+
+    def __init__(self):
+        self.html_env = Environment(autoescape=True, keep_trailing_newline=True, undefined=StrictUndefined)
+        self.text_env = Environment(autoescape=False, keep_trailing_newline=True, undefined=StrictUndefined)
+        # Every render copies the globals into its context; the templates use none of Jinja's defaults (range, lipsum, ...)
+        self.html_env.globals = {"button": button}
+        self.text_env.globals = {}
+        self.frame: Tuple[str, str] = tuple(get_base_template(FRAME_SLOT).split(FRAME_SLOT))
+        self._templates: Dict[str, Tuple[SplitTemplate, SplitTemplate]] = {}
+
+    def register(self, name: str, subject: str, body: str, framed: bool = True):
+        """framed=False for bodies that are complete HTML documents"""
+        self._templates[name] = (
+            SplitTemplate(self.text_env, inline_brand(subject, html=False)),
+            SplitTemplate(self.html_env, inline_brand(body), *(self.frame if framed else ("", "")))
+        )
+
+    def render(self, name: str, **context) -> dict:
+        subject, body = self._templates[name]
+        return {"subject": subject.render(context), "html": body.render(context)}
+
+    def render_batch(self, name: str, contexts: Iterable[dict], shared: Optional[dict] = None) -> List[dict]:
+        """Render one template for many recipients, e.g. every assignee of a project
+
+        shared holds values that are the same in every context, if the caller
+        knows them; otherwise they are found by comparing the contexts.
+        """
+        subject, body = self._templates[name]
+        contexts = list(contexts)
+        if len(contexts) < 2:
+            return [{"subject": subject.render(context), "html": body.render(context)} for context in contexts]
+        # Whatever all recipients share (the item, the sender, the URLs) is rendered once
+        if shared is None:
+            shared = SplitTemplate.shared(contexts)
+        return [{"subject": text, "html": html}
+                for text, html in zip(subject.render_batch(contexts, shared), body.render_batch(contexts, shared))]
+
+    def names(self) -> List[str]:
+        return sorted(self._templates)
+
+
+templates = EmailTemplateRegistry()
+
 # ============================================
 # VENDOR EMAIL TEMPLATES
 # ============================================
 
-def vendor_invitation_email(vendor_name: str, invitation_code: str, portal_url: str) -> dict:
-    """Vendor invitation email"""
-    content = f"""
-    <h2 style="color: {COLORS['primary']}; margin-top: 0;">Vendor Invitation</h2>
-    <p style="font-size: 16px; line-height: 1.6;">Dear {vendor_name},</p>
+templates.register(
+    "vendor_invitation",
+    subject="Vendor Invitation - {{ company.name }}",
+    body="""
+    <h2 style="color: {{ colors.primary }}; margin-top: 0;">Vendor Invitation</h2>
+    <p style="font-size: 16px; line-height: 1.6;">Dear {{ vendor_name }},</p>
     <p style="font-size: 16px; line-height: 1.6;">
         You have been invited to join the Williams Diversified LLC Vendor Portal. 
         This portal will allow you to submit invoices, track payments, and manage your company documents.
     </p>
     
-    <div style="background-color: rgba(201, 169, 97, 0.1); border-left: 4px solid {COLORS['primary']}; padding: 15px; margin: 20px 0;">
-        <p style="margin: 0; color: {COLORS['primary']}; font-size: 14px; font-weight: bold;">YOUR INVITATION CODE:</p>
-        <p style="margin: 10px 0 0 0; font-size: 24px; font-weight: bold; letter-spacing: 2px; color: {COLORS['primary']};">
-            {invitation_code}
+    <div style="background-color: rgba(201, 169, 97, 0.1); border-left: 4px solid {{ colors.primary }}; padding: 15px; margin: 20px 0;">
+        <p style="margin: 0; color: {{ colors.primary }}; font-size: 14px; font-weight: bold;">YOUR INVITATION CODE:</p>
+        <p style="margin: 10px 0 0 0; font-size: 24px; font-weight: bold; letter-spacing: 2px; color: {{ colors.primary }};">
+            {{ invitation_code }}
         </p>
     </div>
     
@@ -117,158 +329,190 @@ def vendor_invitation_email(vendor_name: str, invitation_code: str, portal_url:
         Click the button below to create your account and complete your vendor profile:
     </p>
     
-    {get_button_html('Create My Account', portal_url)}
+    {{ button('Create My Account', portal_url) }}
     
-    <p style="font-size: 14px; line-height: 1.6; color: {COLORS['muted']};">
-        If you have any questions, please contact our Accounts Payable department at {COMPANY_INFO['email']} or {COMPANY_INFO['phone']}.
+    <p style="font-size: 14px; line-height: 1.6; color: {{ colors.muted }};">
+        If you have any questions, please contact our Accounts Payable department at {{ company.email }} or {{ company.phone }}.
     </p>
     """
-    return {
-        "subject": f"Vendor Invitation - {COMPANY_INFO['name']}",
-        "html": get_base_template(content)
-    }
+)
 
-def vendor_invoice_submitted_email(vendor_name: str, invoice_number: str, amount: str, portal_url: str) -> dict:
-    """Confirmation email when vendor submits invoice"""
-    content = f"""
-    <h2 style="color: {COLORS['primary']}; margin-top: 0;">Invoice Submitted Successfully</h2>
-    <p style="font-size: 16px; line-height: 1.6;">Dear {vendor_name},</p>
+def vendor_invitation_email(vendor_name: str, invitation_code: str, portal_url: str) -> dict:
+    """Vendor invitation email"""
+    return templates.render("vendor_invitation", vendor_name=vendor_name, invitation_code=invitation_code, portal_url=portal_url)
+
+templates.register(
+    "vendor_invoice_submitted",
+    subject="Invoice {{ invoice_number }} Submitted - {{ company.name }}",
+    body="""
+    <h2 style="color: {{ colors.primary }}; margin-top: 0;">Invoice Submitted Successfully</h2>
+    <p style="font-size: 16px; line-height: 1.6;">Dear {{ vendor_name }},</p>
     <p style="font-size: 16px; line-height: 1.6;">
         We have received your invoice and it is now under review.
     </p>
     
-    <div style="background-color: rgba(201, 169, 97, 0.1); border: 1px solid {COLORS['primary']}; border-radius: 5px; padding: 15px; margin: 20px 0;">
-        <p style="margin: 0 0 10px 0; color: {COLORS['primary']}; font-weight: bold;">Invoice Details:</p>
-        <p style="margin: 5px 0; color: {COLORS['text']};"><strong>Invoice Number:</strong> {invoice_number}</p>
-        <p style="margin: 5px 0; color: {COLORS['text']};"><strong>Amount:</strong> ${amount}</p>
-        <p style="margin: 5px 0; color: {COLORS['text']};"><strong>Status:</strong> <span style="color: #FFA500;">Pending Review</span></p>
+    <div style="background-color: rgba(201, 169, 97, 0.1); border: 1px solid {{ colors.primary }}; border-radius: 5px; padding: 15px; margin: 20px 0;">
+        <p style="margin: 0 0 10px 0; color: {{ colors.primary }}; font-weight: bold;">Invoice Details:</p>
+        <p style="margin: 5px 0; color: {{ colors.text }};"><strong>Invoice Number:</strong> {{ invoice_number }}</p>
+        <p style="margin: 5px 0; color: {{ colors.text }};"><strong>Amount:</strong> ${{ amount }}</p>
+        <p style="margin: 5px 0; color: {{ colors.text }};"><strong>Status:</strong> <span style="color: #FFA500;">Pending Review</span></p>
     </div>
     
     <p style="font-size: 16px; line-height: 1.6;">
         You will receive another notification when your invoice status changes.
     </p>
     
-    {get_button_html('View Invoice', portal_url)}
+    {{ button('View Invoice', portal_url) }}
     """
-    return {
-        "subject": f"Invoice {invoice_number} Submitted - {COMPANY_INFO['name']}",
-        "html": get_base_template(content)
-    }
+)
 
-def vendor_invoice_approved_email(vendor_name: str, invoice_number: str, amount: str, payment_date: str, portal_url: str) -> dict:
-    """Email when vendor invoice is approved"""
-    content = f"""
+def vendor_invoice_submitted_email(vendor_name: str, invoice_number: str, amount: str, portal_url: str) -> dict:
+    """Confirmation email when vendor submits invoice"""
+    return templates.render("vendor_invoice_submitted", vendor_name=vendor_name, invoice_number=invoice_number, amount=amount, portal_url=portal_url)
+
+templates.register(
+    "vendor_invoice_approved",
+    subject="Invoice {{ invoice_number }} Approved - Payment Processing",
+    body="""
     <h2 style="color: #4CAF50; margin-top: 0;">✓ Invoice Approved</h2>
-    <p style="font-size: 16px; line-height: 1.6;">Dear {vendor_name},</p>
+    <p style="font-size: 16px; line-height: 1.6;">Dear {{ vendor_name }},</p>
     <p style="font-size: 16px; line-height: 1.6;">
         Great news! Your invoice has been approved for payment.
     </p>
     
     <div style="background-color: rgba(76, 175, 80, 0.1); border: 1px solid #4CAF50; border-radius: 5px; padding: 15px; margin: 20px 0;">
         <p style="margin: 0 0 10px 0; color: #4CAF50; font-weight: bold;">Approved Invoice:</p>
-        <p style="margin: 5px 0; color: {COLORS['text']};"><strong>Invoice Number:</strong> {invoice_number}</p>
-        <p style="margin: 5px 0; color: {COLORS['text']};"><strong>Amount:</strong> ${amount}</p>
-        <p style="margin: 5px 0; color: {COLORS['text']};"><strong>Expected Payment Date:</strong> {payment_date}</p>
+        <p style="margin: 5px 0; color: {{ colors.text }};"><strong>Invoice Number:</strong> {{ invoice_number }}</p>
+        <p style="margin: 5px 0; color: {{ colors.text }};"><strong>Amount:</strong> ${{ amount }}</p>
+        <p style="margin: 5px 0; color: {{ colors.text }};"><strong>Expected Payment Date:</strong> {{ payment_date }}</p>
     </div>
     
     <p style="font-size: 16px; line-height: 1.6;">
         Payment will be processed shortly. You will receive a remittance advice when payment is complete.
     </p>
     
-    {get_button_html('View Invoice', portal_url)}
+    {{ button('View Invoice', portal_url) }}
     """
-    return {
-        "subject": f"Invoice {invoice_number} Approved - Payment Processing",
-        "html": get_base_template(content)
-    }
+)
 
-def vendor_invoice_rejected_email(vendor_name: str, invoice_number: str, amount: str, reason: str, portal_url: str) -> dict:
-    """Email when vendor invoice is rejected"""
-    content = f"""
+def vendor_invoice_approved_email(vendor_name: str, invoice_number: str, amount: str, payment_date: str, portal_url: str) -> dict:
+    """Email when vendor invoice is approved"""
+    return templates.render("vendor_invoice_approved", vendor_name=vendor_name, invoice_number=invoice_number, amount=amount, payment_date=payment_date, portal_url=portal_url)
+
+templates.register(
+    "vendor_invoice_rejected",
+    subject="Action Required: Invoice {{ invoice_number }} Needs Revision",
+    body="""
     <h2 style="color: #F44336; margin-top: 0;">Invoice Requires Attention</h2>
-    <p style="font-size: 16px; line-height: 1.6;">Dear {vendor_name},</p>
+    <p style="font-size: 16px; line-height: 1.6;">Dear {{ vendor_name }},</p>
     <p style="font-size: 16px; line-height: 1.6;">
         Your invoice requires revision before we can proceed with payment.
     </p>
     
     <div style="background-color: rgba(244, 67, 54, 0.1); border: 1px solid #F44336; border-radius: 5px; padding: 15px; margin: 20px 0;">
         <p style="margin: 0 0 10px 0; color: #F44336; font-weight: bold;">Invoice Details:</p>
-        <p style="margin: 5px 0; color: {COLORS['text']};"><strong>Invoice Number:</strong> {invoice_number}</p>
-        <p style="margin: 5px 0; color: {COLORS['text']};"><strong>Amount:</strong> ${amount}</p>
+        <p style="margin: 5px 0; color: {{ colors.text }};"><strong>Invoice Number:</strong> {{ invoice_number }}</p>
+        <p style="margin: 5px 0; color: {{ colors.text }};"><strong>Amount:</strong> ${{ amount }}</p>
         <p style="margin: 15px 0 5px 0; color: #F44336; font-weight: bold;">Reason for Rejection:</p>
-        <p style="margin: 5px 0; color: {COLORS['text']};">{reason}</p>
+        <p style="margin: 5px 0; color: {{ colors.text }};">{{ reason }}</p>
     </div>
     
     <p style="font-size: 16px; line-height: 1.6;">
         Please correct the issue and resubmit your invoice. If you have questions, please contact our Accounts Payable team.
     </p>
     
-    {get_button_html('Resubmit Invoice', portal_url)}
+    {{ button('Resubmit Invoice', portal_url) }}
     """
-    return {
-        "subject": f"Action Required: Invoice {invoice_number} Needs Revision",
-        "html": get_base_template(content)
-    }
+)
 
-def vendor_payment_approved_email(vendor_name: str, invoice_numbers: list, total_amount: str, payment_method: str, expected_date: str) -> dict:
-    """Pre-notification that payment has been approved"""
-    invoices_html = "".join([f"<li>{inv}</li>" for inv in invoice_numbers])
-    
-    content = f"""
-    <h2 style="color: {COLORS['primary']}; margin-top: 0;">Payment Approved - Processing Soon</h2>
-    <p style="font-size: 16px; line-height: 1.6;">Dear {vendor_name},</p>
+def vendor_invoice_rejected_email(vendor_name: str, invoice_number: str, amount: str, reason: str, portal_url: str) -> dict:
+    """Email when vendor invoice is rejected"""
+    return templates.render("vendor_invoice_rejected", vendor_name=vendor_name, invoice_number=invoice_number, amount=amount, reason=reason, portal_url=portal_url)
+
+templates.register(
+    "vendor_payment_approved",
+    subject="Payment Approved - ${{ total_amount }} - {{ company.name }}",
+    body="""
+    <h2 style="color: {{ colors.primary }}; margin-top: 0;">Payment Approved - Processing Soon</h2>
+    <p style="font-size: 16px; line-height: 1.6;">Dear {{ vendor_name }},</p>
     <p style="font-size: 16px; line-height: 1.6;">
         Your payment has been approved and will be processed shortly.
     </p>
     
-    <div style="background-color: rgba(201, 169, 97, 0.1); border: 1px solid {COLORS['primary']}; border-radius: 5px; padding: 15px; margin: 20px 0;">
-        <p style="margin: 0 0 10px 0; color: {COLORS['primary']}; font-weight: bold;">Payment Details:</p>
-        <p style="margin: 5px 0; color: {COLORS['text']};"><strong>Total Amount:</strong> ${total_amount}</p>
-        <p style="margin: 5px 0; color: {COLORS['text']};"><strong>Payment Method:</strong> {payment_method}</p>
-        <p style="margin: 5px 0; color: {COLORS['text']};"><strong>Expected Deposit Date:</strong> {expected_date}</p>
-        <p style="margin: 15px 0 5px 0; color: {COLORS['primary']}; font-weight: bold;">Invoices Paid:</p>
-        <ul style="margin: 5px 0; color: {COLORS['text']};">{invoices_html}</ul>
+    <div style="background-color: rgba(201, 169, 97, 0.1); border: 1px solid {{ colors.primary }}; border-radius: 5px; padding: 15px; margin: 20px 0;">
+        <p style="margin: 0 0 10px 0; color: {{ colors.primary }}; font-weight: bold;">Payment Details:</p>
+        <p style="margin: 5px 0; color: {{ colors.text }};"><strong>Total Amount:</strong> ${{ total_amount }}</p>
+        <p style="margin: 5px 0; color: {{ colors.text }};"><strong>Payment Method:</strong> {{ payment_method }}</p>
+        <p style="margin: 5px 0; color: {{ colors.text }};"><strong>Expected Deposit Date:</strong> {{ expected_date }}</p>
+        <p style="margin: 15px 0 5px 0; color: {{ colors.primary }}; font-weight: bold;">Invoices Paid:</p>
+        <ul style="margin: 5px 0; color: {{ colors.text }};">{% for invoice_number in invoice_numbers %}<li>{{ invoice_number }}</li>{% endfor %}</ul>
     </div>
     
     <p style="font-size: 16px; line-height: 1.6;">
         You will receive a final remittance advice with transaction details once payment is processed.
     </p>
     """
-    return {
-        "subject": f"Payment Approved - ${total_amount} - {COMPANY_INFO['name']}",
-        "html": get_base_template(content)
-    }
+)
 
-def vendor_remittance_advice_email(vendor_name: str, invoice_numbers: list, total_amount: str, payment_method: str, payment_date: str, transaction_ref: str) -> dict:
-    """Final remittance advice when payment is processed"""
-    invoices_html = "".join([f"<li>{inv}</li>" for inv in invoice_numbers])
-    
-    content = f"""
+def vendor_payment_approved_email(vendor_name: str, invoice_numbers: list, total_amount: str, payment_method: str, expected_date: str) -> dict:
+    """Pre-notification that payment has been approved"""
+    return templates.render("vendor_payment_approved", vendor_name=vendor_name, invoice_numbers=invoice_numbers, total_amount=total_amount, payment_method=payment_method, expected_date=expected_date)
+
+templates.register(
+    "vendor_remittance_advice",
+    subject="Remittance Advice - Payment ${{ total_amount }} Processed",
+    body="""
     <h2 style="color: #4CAF50; margin-top: 0;">✓ Payment Processed - Remittance Advice</h2>
-    <p style="font-size: 16px; line-height: 1.6;">Dear {vendor_name},</p>
+    <p style="font-size: 16px; line-height: 1.6;">Dear {{ vendor_name }},</p>
     <p style="font-size: 16px; line-height: 1.6;">
         Your payment has been successfully processed.
     </p>
     
     <div style="background-color: rgba(76, 175, 80, 0.1); border: 2px solid #4CAF50; border-radius: 5px; padding: 20px; margin: 20px 0;">
         <p style="margin: 0 0 15px 0; color: #4CAF50; font-weight: bold; font-size: 18px;">Payment Confirmation</p>
-        <p style="margin: 5px 0; color: {COLORS['text']};"><strong>Payment Amount:</strong> <span style="color: #4CAF50; font-size: 20px;">${total_amount}</span></p>
-        <p style="margin: 5px 0; color: {COLORS['text']};"><strong>Payment Date:</strong> {payment_date}</p>
-        <p style="margin: 5px 0; color: {COLORS['text']};"><strong>Payment Method:</strong> {payment_method}</p>
-        <p style="margin: 5px 0; color: {COLORS['text']};"><strong>Transaction Reference:</strong> {transaction_ref}</p>
-        <p style="margin: 15px 0 5px 0; color: {COLORS['text']}; font-weight: bold;">Invoices Paid:</p>
-        <ul style="margin: 5px 0; color: {COLORS['text']};">{invoices_html}</ul>
+        <p style="margin: 5px 0; color: {{ colors.text }};"><strong>Payment Amount:</strong> <span style="color: #4CAF50; font-size: 20px;">${{ total_amount }}</span></p>
+        <p style="margin: 5px 0; color: {{ colors.text }};"><strong>Payment Date:</strong> {{ payment_date }}</p>
+        <p style="margin: 5px 0; color: {{ colors.text }};"><strong>Payment Method:</strong> {{ payment_method }}</p>
+        <p style="margin: 5px 0; color: {{ colors.text }};"><strong>Transaction Reference:</strong> {{ transaction_ref }}</p>
+        <p style="margin: 15px 0 5px 0; color: {{ colors.text }}; font-weight: bold;">Invoices Paid:</p>
+        <ul style="margin: 5px 0; color: {{ colors.text }};">{% for invoice_number in invoice_numbers %}<li>{{ invoice_number }}</li>{% endfor %}</ul>
     </div>
     
-    <p style="font-size: 14px; line-height: 1.6; color: {COLORS['muted']};">
+    <p style="font-size: 14px; line-height: 1.6; color: {{ colors.muted }};">
         For ACH payments, funds typically arrive within 1-2 business days. If you have any questions about this payment, 
         please reference the transaction number above when contacting us.
     </p>
     """
-    return {
-        "subject": f"Remittance Advice - Payment ${total_amount} Processed",
-        "html": get_base_template(content)
-    }
+)
+
+def vendor_remittance_advice_email(vendor_name: str, invoice_numbers: list, total_amount: str, payment_method: str, payment_date: str, transaction_ref: str) -> dict:
+    """Final remittance advice when payment is processed"""
+    return templates.render("vendor_remittance_advice", vendor_name=vendor_name, invoice_numbers=invoice_numbers, total_amount=total_amount, payment_method=payment_method, payment_date=payment_date, transaction_ref=transaction_ref)
+
+templates.register(
+    "vendor_document_status",
+    subject="Document {{ status|title }}: {{ document_type }}",
+    body="""
+    <h2 style="color: {{ color }}; margin-top: 0;">{{ title }}</h2>
+    <p style="font-size: 16px; line-height: 1.6;">Dear {{ vendor_name }},</p>
+    <p style="font-size: 16px; line-height: 1.6;">{{ message }}</p>
+    
+    <div style="background-color: rgba(201, 169, 97, 0.1); border: 1px solid {{ colors.primary }}; border-radius: 5px; padding: 15px; margin: 20px 0;">
+        <p style="margin: 0 0 10px 0; color: {{ colors.primary }}; font-weight: bold;">Document:</p>
+        <p style="margin: 5px 0; color: {{ colors.text }};"><strong>Type:</strong> {{ document_type }}</p>
+        <p style="margin: 5px 0; color: {{ colors.text }};"><strong>Status:</strong> <span style="color: {{ color }};">{{ status|upper }}</span></p>
+    </div>
+    
+    {% if reason %}
+    <div style="background-color: rgba(244, 67, 54, 0.1); border-left: 4px solid #F44336; padding: 15px; margin: 15px 0;">
+        <p style="margin: 0; color: #F44336; font-weight: bold;">Reason:</p>
+        <p style="margin: 10px 0 0 0; color: {{ colors.text }};">{{ reason }}</p>
+    </div>
+    {% endif %}
+    
+    {{ button('Manage Documents', 'https://williams-portal.preview.emergentagent.com/company-documents') }}
+    """
+)
 
 def vendor_document_status_email(vendor_name: str, document_type: str, status: str, reason: str = "", expiry_days: int = 0) -> dict:
     """Document approval/rejection/expiration notification"""
@@ -285,180 +529,199 @@ def vendor_document_status_email(vendor_name: str, document_type: str, status: s
         color = "#FFA500"
         message = f"Your {document_type} will expire in {expiry_days} days. Please upload an updated document."
     
-    reason_html = f"""
-    <div style="background-color: rgba(244, 67, 54, 0.1); border-left: 4px solid #F44336; padding: 15px; margin: 15px 0;">
-        <p style="margin: 0; color: #F44336; font-weight: bold;">Reason:</p>
-        <p style="margin: 10px 0 0 0; color: {COLORS['text']};">{reason}</p>
-    </div>
-    """ if reason else ""
-    
-    content = f"""
-    <h2 style="color: {color}; margin-top: 0;">{title}</h2>
-    <p style="font-size: 16px; line-height: 1.6;">Dear {vendor_name},</p>
-    <p style="font-size: 16px; line-height: 1.6;">{message}</p>
-    
-    <div style="background-color: rgba(201, 169, 97, 0.1); border: 1px solid {COLORS['primary']}; border-radius: 5px; padding: 15px; margin: 20px 0;">
-        <p style="margin: 0 0 10px 0; color: {COLORS['primary']}; font-weight: bold;">Document:</p>
-        <p style="margin: 5px 0; color: {COLORS['text']};"><strong>Type:</strong> {document_type}</p>
-        <p style="margin: 5px 0; color: {COLORS['text']};"><strong>Status:</strong> <span style="color: {color};">{status.upper()}</span></p>
-    </div>
-    
-    {reason_html}
-    
-    {get_button_html('Manage Documents', 'https://williams-portal.preview.emergentagent.com/company-documents')}
-    """
-    return {
-        "subject": f"Document {status.title()}: {document_type}",
-        "html": get_base_template(content)
-    }
+    return templates.render("vendor_document_status", vendor_name=vendor_name, document_type=document_type, status=status, reason=reason, expiry_days=expiry_days, title=title, color=color, message=message)
 
 # ============================================
 # EMPLOYEE EMAIL TEMPLATES
 # ============================================
 
-def employee_paystub_available_email(employee_name: str, pay_period: str, gross_amount: str, net_amount: str, pay_date: str, portal_url: str) -> dict:
-    """Notification when paystub is available"""
-    content = f"""
-    <h2 style="color: {COLORS['primary']}; margin-top: 0;">Your Paystub is Ready</h2>
-    <p style="font-size: 16px; line-height: 1.6;">Hello {employee_name},</p>
+templates.register(
+    "employee_paystub_available",
+    subject="Paystub Available - {{ pay_period }}",
+    body="""
+    <h2 style="color: {{ colors.primary }}; margin-top: 0;">Your Paystub is Ready</h2>
+    <p style="font-size: 16px; line-height: 1.6;">Hello {{ employee_name }},</p>
     <p style="font-size: 16px; line-height: 1.6;">
-        Your paystub for {pay_period} is now available for viewing and download.
+        Your paystub for {{ pay_period }} is now available for viewing and download.
     </p>
     
-    <div style="background-color: rgba(201, 169, 97, 0.1); border: 1px solid {COLORS['primary']}; border-radius: 5px; padding: 15px; margin: 20px 0;">
-        <p style="margin: 0 0 10px 0; color: {COLORS['primary']}; font-weight: bold;">Pay Period Summary:</p>
-        <p style="margin: 5px 0; color: {COLORS['text']};"><strong>Pay Period:</strong> {pay_period}</p>
-        <p style="margin: 5px 0; color: {COLORS['text']};"><strong>Gross Pay:</strong> ${gross_amount}</p>
-        <p style="margin: 5px 0; color: {COLORS['text']};"><strong>Net Pay:</strong> <span style="color: {COLORS['primary']}; font-size: 18px;">${net_amount}</span></p>
-        <p style="margin: 5px 0; color: {COLORS['text']};"><strong>Pay Date:</strong> {pay_date}</p>
+    <div style="background-color: rgba(201, 169, 97, 0.1); border: 1px solid {{ colors.primary }}; border-radius: 5px; padding: 15px; margin: 20px 0;">
+        <p style="margin: 0 0 10px 0; color: {{ colors.primary }}; font-weight: bold;">Pay Period Summary:</p>
+        <p style="margin: 5px 0; color: {{ colors.text }};"><strong>Pay Period:</strong> {{ pay_period }}</p>
+        <p style="margin: 5px 0; color: {{ colors.text }};"><strong>Gross Pay:</strong> ${{ gross_amount }}</p>
+        <p style="margin: 5px 0; color: {{ colors.text }};"><strong>Net Pay:</strong> <span style="color: {{ colors.primary }}; font-size: 18px;">${{ net_amount }}</span></p>
+        <p style="margin: 5px 0; color: {{ colors.text }};"><strong>Pay Date:</strong> {{ pay_date }}</p>
     </div>
     
-    {get_button_html('View Paystub', portal_url)}
+    {{ button('View Paystub', portal_url) }}
     """
-    return {
-        "subject": f"Paystub Available - {pay_period}",
-        "html": get_base_template(content)
-    }
+)
 
-def employee_payment_processed_email(employee_name: str, amount: str, pay_date: str, account_last4: str) -> dict:
-    """Confirmation when direct deposit is processed"""
-    content = f"""
+def employee_paystub_available_email(employee_name: str, pay_period: str, gross_amount: str, net_amount: str, pay_date: str, portal_url: str) -> dict:
+    """Notification when paystub is available"""
+    return templates.render("employee_paystub_available", employee_name=employee_name, pay_period=pay_period, gross_amount=gross_amount, net_amount=net_amount, pay_date=pay_date, portal_url=portal_url)
+
+templates.register(
+    "employee_payment_processed",
+    subject="Payment Deposited - ${{ amount }}",
+    body="""
     <h2 style="color: #4CAF50; margin-top: 0;">✓ Payment Processed</h2>
-    <p style="font-size: 16px; line-height: 1.6;">Hello {employee_name},</p>
+    <p style="font-size: 16px; line-height: 1.6;">Hello {{ employee_name }},</p>
     <p style="font-size: 16px; line-height: 1.6;">
         Your payment has been successfully processed and deposited.
     </p>
     
     <div style="background-color: rgba(76, 175, 80, 0.1); border: 2px solid #4CAF50; border-radius: 5px; padding: 20px; margin: 20px 0;">
         <p style="margin: 0 0 15px 0; color: #4CAF50; font-weight: bold; font-size: 18px;">Direct Deposit Confirmation</p>
-        <p style="margin: 5px 0; color: {COLORS['text']};"><strong>Amount Deposited:</strong> <span style="color: #4CAF50; font-size: 20px;">${amount}</span></p>
-        <p style="margin: 5px 0; color: {COLORS['text']};"><strong>Deposit Date:</strong> {pay_date}</p>
-        <p style="margin: 5px 0; color: {COLORS['text']};"><strong>Account Ending In:</strong> {account_last4}</p>
+        <p style="margin: 5px 0; color: {{ colors.text }};"><strong>Amount Deposited:</strong> <span style="color: #4CAF50; font-size: 20px;">${{ amount }}</span></p>
+        <p style="margin: 5px 0; color: {{ colors.text }};"><strong>Deposit Date:</strong> {{ pay_date }}</p>
+        <p style="margin: 5px 0; color: {{ colors.text }};"><strong>Account Ending In:</strong> {{ account_last4 }}</p>
     </div>
     
-    <p style="font-size: 14px; line-height: 1.6; color: {COLORS['muted']};">
+    <p style="font-size: 14px; line-height: 1.6; color: {{ colors.muted }};">
         Funds are typically available in your account within 1-2 business days. 
         View your complete paystub in the employee portal.
     </p>
     
-    {get_button_html('View Paystub', 'https://williams-portal.preview.emergentagent.com/my-payroll-documents')}
+    {{ button('View Paystub', 'https://williams-portal.preview.emergentagent.com/my-payroll-documents') }}
     """
-    return {
-        "subject": f"Payment Deposited - ${amount}",
-        "html": get_base_template(content)
-    }
+)
 
-def employee_assignment_notification(employee_name: str, item_type: str, item_title: str, assigned_by: str, due_date: str, portal_url: str) -> dict:
-    """Notification when employee is assigned to task/project/work order"""
-    content = f"""
-    <h2 style="color: {COLORS['primary']}; margin-top: 0;">New {item_type} Assignment</h2>
-    <p style="font-size: 16px; line-height: 1.6;">Hello {employee_name},</p>
+def employee_payment_processed_email(employee_name: str, amount: str, pay_date: str, account_last4: str) -> dict:
+    """Confirmation when direct deposit is processed"""
+    return templates.render("employee_payment_processed", employee_name=employee_name, amount=amount, pay_date=pay_date, account_last4=account_last4)
+
+templates.register(
+    "employee_assignment_notification",
+    subject="New Assignment: {{ item_title }}",
+    body="""
+    <h2 style="color: {{ colors.primary }}; margin-top: 0;">New {{ item_type }} Assignment</h2>
+    <p style="font-size: 16px; line-height: 1.6;">Hello {{ employee_name }},</p>
     <p style="font-size: 16px; line-height: 1.6;">
-        You have been assigned to a new {item_type.lower()}.
+        You have been assigned to a new {{ item_type|lower }}.
     </p>
     
-    <div style="background-color: rgba(201, 169, 97, 0.1); border: 1px solid {COLORS['primary']}; border-radius: 5px; padding: 15px; margin: 20px 0;">
-        <p style="margin: 0 0 10px 0; color: {COLORS['primary']}; font-weight: bold;">Assignment Details:</p>
-        <p style="margin: 5px 0; color: {COLORS['text']};"><strong>{item_type}:</strong> {item_title}</p>
-        <p style="margin: 5px 0; color: {COLORS['text']};"><strong>Assigned By:</strong> {assigned_by}</p>
-        <p style="margin: 5px 0; color: {COLORS['text']};"><strong>Due Date:</strong> {due_date}</p>
+    <div style="background-color: rgba(201, 169, 97, 0.1); border: 1px solid {{ colors.primary }}; border-radius: 5px; padding: 15px; margin: 20px 0;">
+        <p style="margin: 0 0 10px 0; color: {{ colors.primary }}; font-weight: bold;">Assignment Details:</p>
+        <p style="margin: 5px 0; color: {{ colors.text }};"><strong>{{ item_type }}:</strong> {{ item_title }}</p>
+        <p style="margin: 5px 0; color: {{ colors.text }};"><strong>Assigned By:</strong> {{ assigned_by }}</p>
+        <p style="margin: 5px 0; color: {{ colors.text }};"><strong>Due Date:</strong> {{ due_date }}</p>
     </div>
     
     <p style="font-size: 16px; line-height: 1.6;">
         Please log in to the portal to view full details and begin work.
     </p>
     
-    {get_button_html(f'View {item_type}', portal_url)}
+    {{ button('View ' ~ item_type, portal_url) }}
     """
-    return {
-        "subject": f"New Assignment: {item_title}",
-        "html": get_base_template(content)
-    }
+)
+
+def employee_assignment_notification(employee_name: str, item_type: str, item_title: str, assigned_by: str, due_date: str, portal_url: str) -> dict:
+    """Notification when employee is assigned to task/project/work order"""
+    return templates.render("employee_assignment_notification", employee_name=employee_name, item_type=item_type, item_title=item_title, assigned_by=assigned_by, due_date=due_date, portal_url=portal_url)
+
+templates.register(
+    "assignment_digest",
+    subject="{{ items|length }} New Assignments - {{ company.name }}",
+    body="""
+    <h2 style="color: {{ colors.primary }}; margin-top: 0;">New Assignments</h2>
+    <p style="font-size: 16px; line-height: 1.6;">Hello {{ user_name }},</p>
+    <p style="font-size: 16px; line-height: 1.6;">
+        You have been assigned to {{ items|length }} new items.
+    </p>
+
+    <div style="background-color: rgba(201, 169, 97, 0.1); border: 1px solid {{ colors.primary }}; border-radius: 5px; padding: 15px; margin: 20px 0;">
+        <p style="margin: 0 0 10px 0; color: {{ colors.primary }}; font-weight: bold;">Assignment Details:</p>
+        {% for item in items %}
+        <p style="margin: 5px 0; color: {{ colors.text }};"><strong>{{ item.item_type }}:</strong> <a href="{{ item.portal_url }}" style="color: {{ colors.primary }};">{{ item.item_title }}</a> <span style="color: {{ colors.muted }};">(assigned by {{ item.assigned_by }})</span></p>
+        {% endfor %}
+    </div>
+
+    <p style="font-size: 16px; line-height: 1.6;">
+        Please log in to the portal to view full details and begin work.
+    </p>
+
+    {{ button('View My Assignments', portal_url) }}
+    """
+)
+
+def assignment_digest_email(user_name: str, items: List[dict], portal_url: str) -> dict:
+    """Several assignments coalesced into one email; items have item_type, item_title, assigned_by, portal_url"""
+    return templates.render("assignment_digest", user_name=user_name, items=items, portal_url=portal_url)
+
+def assignment_digest_emails(recipients: List[Tuple[str, List[dict]]], portal_url: str) -> List[dict]:
+    """assignment_digest_email for each (user_name, items), rendered in one render_batch"""
+    return templates.render_batch("assignment_digest", [
+        {"user_name": user_name, "items": items, "portal_url": portal_url} for user_name, items in recipients
+    ])
 
 # ============================================
 # GENERAL NOTIFICATION TEMPLATES
 # ============================================
 
-def schedule_change_notification(user_name: str, change_type: str, old_value: str, new_value: str, changed_by: str) -> dict:
-    """Schedule or assignment change notification"""
-    content = f"""
-    <h2 style="color: {COLORS['primary']}; margin-top: 0;">Schedule Updated</h2>
-    <p style="font-size: 16px; line-height: 1.6;">Hello {user_name},</p>
+templates.register(
+    "schedule_change_notification",
+    subject="Schedule Update: {{ change_type }}",
+    body="""
+    <h2 style="color: {{ colors.primary }}; margin-top: 0;">Schedule Updated</h2>
+    <p style="font-size: 16px; line-height: 1.6;">Hello {{ user_name }},</p>
     <p style="font-size: 16px; line-height: 1.6;">
         Your schedule has been updated.
     </p>
     
-    <div style="background-color: rgba(201, 169, 97, 0.1); border: 1px solid {COLORS['primary']}; border-radius: 5px; padding: 15px; margin: 20px 0;">
-        <p style="margin: 0 0 10px 0; color: {COLORS['primary']}; font-weight: bold;">Change Details:</p>
-        <p style="margin: 5px 0; color: {COLORS['text']};"><strong>Type:</strong> {change_type}</p>
-        <p style="margin: 5px 0; color: {COLORS['text']};"><strong>Previous:</strong> {old_value}</p>
-        <p style="margin: 5px 0; color: {COLORS['text']};"><strong>Updated:</strong> {new_value}</p>
-        <p style="margin: 5px 0; color: {COLORS['text']};"><strong>Changed By:</strong> {changed_by}</p>
+    <div style="background-color: rgba(201, 169, 97, 0.1); border: 1px solid {{ colors.primary }}; border-radius: 5px; padding: 15px; margin: 20px 0;">
+        <p style="margin: 0 0 10px 0; color: {{ colors.primary }}; font-weight: bold;">Change Details:</p>
+        <p style="margin: 5px 0; color: {{ colors.text }};"><strong>Type:</strong> {{ change_type }}</p>
+        <p style="margin: 5px 0; color: {{ colors.text }};"><strong>Previous:</strong> {{ old_value }}</p>
+        <p style="margin: 5px 0; color: {{ colors.text }};"><strong>Updated:</strong> {{ new_value }}</p>
+        <p style="margin: 5px 0; color: {{ colors.text }};"><strong>Changed By:</strong> {{ changed_by }}</p>
     </div>
     
-    {get_button_html('View Schedule', 'https://williams-portal.preview.emergentagent.com/schedules')}
+    {{ button('View Schedule', 'https://williams-portal.preview.emergentagent.com/schedules') }}
     """
-    return {
-        "subject": f"Schedule Update: {change_type}",
-        "html": get_base_template(content)
-    }
+)
 
+def schedule_change_notification(user_name: str, change_type: str, old_value: str, new_value: str, changed_by: str) -> dict:
+    """Schedule or assignment change notification"""
+    return templates.render("schedule_change_notification", user_name=user_name, change_type=change_type, old_value=old_value, new_value=new_value, changed_by=changed_by)
 
-def vendor_account_created_email(vendor_name: str, contact_name: str, email: str, temp_password: str, portal_url: str) -> dict:
-    """Email sent to vendor when account is created with login credentials"""
-    content = f"""
-    <h2 style="color: {COLORS['primary']}; margin-top: 0;">Welcome to Williams Diversified LLC Vendor Portal</h2>
-    <p style="font-size: 16px; line-height: 1.6;">Dear {contact_name},</p>
+
+templates.register(
+    "vendor_account_created",
+    subject="Your Vendor Portal Account - {{ company.name }}",
+    body="""
+    <h2 style="color: {{ colors.primary }}; margin-top: 0;">Welcome to Williams Diversified LLC Vendor Portal</h2>
+    <p style="font-size: 16px; line-height: 1.6;">Dear {{ contact_name }},</p>
     <p style="font-size: 16px; line-height: 1.6;">
-        Your vendor account has been created for <strong>{vendor_name}</strong>. 
+        Your vendor account has been created for <strong>{{ vendor_name }}</strong>. 
         You can now access the Vendor Portal to complete your company profile, upload required documents, 
         and manage invoices and payments.
     </p>
     
-    <div style="background-color: rgba(201, 169, 97, 0.1); border: 2px solid {COLORS['primary']}; border-radius: 8px; padding: 20px; margin: 25px 0;">
-        <p style="margin: 0 0 15px 0; color: {COLORS['primary']}; font-size: 18px; font-weight: bold; text-align: center;">
+    <div style="background-color: rgba(201, 169, 97, 0.1); border: 2px solid {{ colors.primary }}; border-radius: 8px; padding: 20px; margin: 25px 0;">
+        <p style="margin: 0 0 15px 0; color: {{ colors.primary }}; font-size: 18px; font-weight: bold; text-align: center;">
             YOUR LOGIN CREDENTIALS
         </p>
         <table width="100%" cellpadding="8" cellspacing="0">
             <tr>
-                <td style="color: {COLORS['muted']}; font-weight: bold; width: 40%;">Email/Username:</td>
-                <td style="color: {COLORS['primary']}; font-weight: bold; font-size: 16px;">{email}</td>
+                <td style="color: {{ colors.muted }}; font-weight: bold; width: 40%;">Email/Username:</td>
+                <td style="color: {{ colors.primary }}; font-weight: bold; font-size: 16px;">{{ email }}</td>
             </tr>
             <tr>
-                <td style="color: {COLORS['muted']}; font-weight: bold;">Temporary Password:</td>
-                <td style="color: {COLORS['primary']}; font-weight: bold; font-size: 16px; letter-spacing: 1px;">{temp_password}</td>
+                <td style="color: {{ colors.muted }}; font-weight: bold;">Temporary Password:</td>
+                <td style="color: {{ colors.primary }}; font-weight: bold; font-size: 16px; letter-spacing: 1px;">{{ temp_password }}</td>
             </tr>
         </table>
-        <p style="margin: 15px 0 0 0; font-size: 13px; color: {COLORS['muted']}; text-align: center;">
+        <p style="margin: 15px 0 0 0; font-size: 13px; color: {{ colors.muted }}; text-align: center;">
             ⚠️ You will be required to change your password on first login
         </p>
     </div>
     
     <div style="background-color: rgba(255, 165, 0, 0.1); border-left: 4px solid #FFA500; padding: 15px; margin: 20px 0;">
-        <p style="margin: 0; font-size: 14px; line-height: 1.6; color: {COLORS['text']};">
+        <p style="margin: 0; font-size: 14px; line-height: 1.6; color: {{ colors.text }};">
             <strong>Important:</strong> After logging in, you will need to complete your vendor profile by providing:
         </p>
-        <ul style="margin: 10px 0; padding-left: 20px; color: {COLORS['text']};">
+        <ul style="margin: 10px 0; padding-left: 20px; color: {{ colors.text }};">
             <li>Company EIN (Tax ID)</li>
             <li>Insurance Information (Certificate of Insurance)</li>
             <li>Banking Information for payments</li>
@@ -466,58 +729,60 @@ def vendor_account_created_email(vendor_name: str, contact_name: str, email: str
         </ul>
     </div>
     
-    {get_button_html('Access Vendor Portal', portal_url)}
+    {{ button('Access Vendor Portal', portal_url) }}
     
-    <p style="font-size: 14px; line-height: 1.6; color: {COLORS['muted']};">
-        If you have any questions or need assistance, please contact us at {COMPANY_INFO['email']} or {COMPANY_INFO['phone']}.
+    <p style="font-size: 14px; line-height: 1.6; color: {{ colors.muted }};">
+        If you have any questions or need assistance, please contact us at {{ company.email }} or {{ company.phone }}.
     </p>
     
-    <p style="font-size: 13px; line-height: 1.6; color: {COLORS['muted']}; margin-top: 30px;">
-        <em>This is an automated message from {COMPANY_INFO['name']} Project Command Center.</em>
+    <p style="font-size: 13px; line-height: 1.6; color: {{ colors.muted }}; margin-top: 30px;">
+        <em>This is an automated message from {{ company.name }} Project Command Center.</em>
     </p>
     """
-    return {
-        "subject": f"Your Vendor Portal Account - {COMPANY_INFO['name']}",
-        "html": get_base_template(content)
-    }
+)
+
+def vendor_account_created_email(vendor_name: str, contact_name: str, email: str, temp_password: str, portal_url: str) -> dict:
+    """Email sent to vendor when account is created with login credentials"""
+    return templates.render("vendor_account_created", vendor_name=vendor_name, contact_name=contact_name, email=email, temp_password=temp_password, portal_url=portal_url)
 
 # ============================================
 # VENDOR ASSIGNMENT NOTIFICATIONS
 # ============================================
 
-def vendor_work_order_assignment(vendor_name: str, work_order_number: str, work_order_title: str, assigned_by: str, start_date: str, location: str, portal_url: str) -> dict:
-    """Notification when work order is assigned to vendor"""
-    content = f"""
-    <h2 style="color: {COLORS['primary']}; margin-top: 0;">New Work Order Assignment</h2>
-    <p style="font-size: 16px; line-height: 1.6;">Dear {vendor_name},</p>
+templates.register(
+    "vendor_work_order_assignment",
+    subject="New Work Order Assignment: {{ work_order_number }}",
+    body="""
+    <h2 style="color: {{ colors.primary }}; margin-top: 0;">New Work Order Assignment</h2>
+    <p style="font-size: 16px; line-height: 1.6;">Dear {{ vendor_name }},</p>
     <p style="font-size: 16px; line-height: 1.6;">
         You have been assigned to a new work order in the Williams Diversified LLC system.
     </p>
     
-    <div style="background-color: rgba(201, 169, 97, 0.1); border: 2px solid {COLORS['primary']}; border-radius: 8px; padding: 20px; margin: 25px 0;">
-        <p style="margin: 0 0 15px 0; color: {COLORS['primary']}; font-size: 18px; font-weight: bold;">
+    <div style="background-color: rgba(201, 169, 97, 0.1); border: 2px solid {{ colors.primary }}; border-radius: 8px; padding: 20px; margin: 25px 0;">
+        <p style="margin: 0 0 15px 0; color: {{ colors.primary }}; font-size: 18px; font-weight: bold;">
             Work Order Details
         </p>
         <table width="100%" cellpadding="8" cellspacing="0">
             <tr>
-                <td style="color: {COLORS['muted']}; font-weight: bold; width: 40%;">Work Order #:</td>
-                <td style="color: {COLORS['primary']}; font-weight: bold; font-size: 16px;">{work_order_number}</td>
+                <td style="color: {{ colors.muted }}; font-weight: bold; width: 40%;">Work Order #:</td>
+                <td style="color: {{ colors.primary }}; font-weight: bold; font-size: 16px;">{{ work_order_number }}</td>
             </tr>
             <tr>
-                <td style="color: {COLORS['muted']}; font-weight: bold;">Title:</td>
-                <td style="color: {COLORS['text']}; font-size: 16px;">{work_order_title}</td>
+                <td style="color: {{ colors.muted }}; font-weight: bold;">Title:</td>
+                <td style="color: {{ colors.text }}; font-size: 16px;">{{ work_order_title }}</td>
             </tr>
             <tr>
-                <td style="color: {COLORS['muted']}; font-weight: bold;">Start Date:</td>
-                <td style="color: {COLORS['text']}; font-size: 16px;">{start_date}</td>
+                <td style="color: {{ colors.muted }}; font-weight: bold;">Start Date:</td>
+                <td style="color: {{ colors.text }}; font-size: 16px;">{{ start_date }}</td>
             </tr>
             <tr>
-                <td style="color: {COLORS['muted']}; font-weight: bold;">Location:</td>
-                <td style="color: {COLORS['text']}; font-size: 16px;">{location}</td>
+                <td style="color: {{ colors.muted }}; font-weight: bold;">Location:</td>
+                <td style="color: {{ colors.text }}; font-size: 16px;">{{ location }}</td>
             </tr>
             <tr>
-                <td style="color: {COLORS['muted']}; font-weight: bold;">Assigned By:</td>
-                <td style="color: {COLORS['text']}; font-size: 16px;">{assigned_by}</td>
+                <td style="color: {{ colors.muted }}; font-weight: bold;">Assigned By:</td>
+                <td style="color: {{ colors.text }}; font-size: 16px;">{{ assigned_by }}</td>
             </tr>
         </table>
     </div>
@@ -526,50 +791,52 @@ def vendor_work_order_assignment(vendor_name: str, work_order_number: str, work_
         Please review the work order details and requirements in the vendor portal.
     </p>
     
-    {get_button_html('View Work Order', portal_url)}
+    {{ button('View Work Order', portal_url) }}
     
-    <p style="font-size: 14px; line-height: 1.6; color: {COLORS['muted']};">
-        If you have any questions about this work order, please contact the project manager or reach out to us at {COMPANY_INFO['email']}.
+    <p style="font-size: 14px; line-height: 1.6; color: {{ colors.muted }};">
+        If you have any questions about this work order, please contact the project manager or reach out to us at {{ company.email }}.
     </p>
     """
-    return {
-        "subject": f"New Work Order Assignment: {work_order_number}",
-        "html": get_base_template(content)
-    }
+)
 
-def vendor_project_assignment(vendor_name: str, project_name: str, project_description: str, assigned_by: str, start_date: str, end_date: str, portal_url: str) -> dict:
-    """Notification when project is assigned to vendor"""
-    content = f"""
-    <h2 style="color: {COLORS['primary']}; margin-top: 0;">New Project Assignment</h2>
-    <p style="font-size: 16px; line-height: 1.6;">Dear {vendor_name},</p>
+def vendor_work_order_assignment(vendor_name: str, work_order_number: str, work_order_title: str, assigned_by: str, start_date: str, location: str, portal_url: str) -> dict:
+    """Notification when work order is assigned to vendor"""
+    return templates.render("vendor_work_order_assignment", vendor_name=vendor_name, work_order_number=work_order_number, work_order_title=work_order_title, assigned_by=assigned_by, start_date=start_date, location=location, portal_url=portal_url)
+
+templates.register(
+    "vendor_project_assignment",
+    subject="New Project Assignment: {{ project_name }}",
+    body="""
+    <h2 style="color: {{ colors.primary }}; margin-top: 0;">New Project Assignment</h2>
+    <p style="font-size: 16px; line-height: 1.6;">Dear {{ vendor_name }},</p>
     <p style="font-size: 16px; line-height: 1.6;">
         You have been assigned to a new project. We look forward to working with you on this engagement.
     </p>
     
-    <div style="background-color: rgba(201, 169, 97, 0.1); border: 2px solid {COLORS['primary']}; border-radius: 8px; padding: 20px; margin: 25px 0;">
-        <p style="margin: 0 0 15px 0; color: {COLORS['primary']}; font-size: 18px; font-weight: bold;">
+    <div style="background-color: rgba(201, 169, 97, 0.1); border: 2px solid {{ colors.primary }}; border-radius: 8px; padding: 20px; margin: 25px 0;">
+        <p style="margin: 0 0 15px 0; color: {{ colors.primary }}; font-size: 18px; font-weight: bold;">
             Project Details
         </p>
         <table width="100%" cellpadding="8" cellspacing="0">
             <tr>
-                <td style="color: {COLORS['muted']}; font-weight: bold; width: 40%;">Project Name:</td>
-                <td style="color: {COLORS['primary']}; font-weight: bold; font-size: 16px;">{project_name}</td>
+                <td style="color: {{ colors.muted }}; font-weight: bold; width: 40%;">Project Name:</td>
+                <td style="color: {{ colors.primary }}; font-weight: bold; font-size: 16px;">{{ project_name }}</td>
             </tr>
             <tr>
-                <td style="color: {COLORS['muted']}; font-weight: bold;">Description:</td>
-                <td style="color: {COLORS['text']}; font-size: 14px;">{project_description}</td>
+                <td style="color: {{ colors.muted }}; font-weight: bold;">Description:</td>
+                <td style="color: {{ colors.text }}; font-size: 14px;">{{ project_description }}</td>
             </tr>
             <tr>
-                <td style="color: {COLORS['muted']}; font-weight: bold;">Start Date:</td>
-                <td style="color: {COLORS['text']}; font-size: 16px;">{start_date}</td>
+                <td style="color: {{ colors.muted }}; font-weight: bold;">Start Date:</td>
+                <td style="color: {{ colors.text }}; font-size: 16px;">{{ start_date }}</td>
             </tr>
             <tr>
-                <td style="color: {COLORS['muted']}; font-weight: bold;">End Date:</td>
-                <td style="color: {COLORS['text']}; font-size: 16px;">{end_date}</td>
+                <td style="color: {{ colors.muted }}; font-weight: bold;">End Date:</td>
+                <td style="color: {{ colors.text }}; font-size: 16px;">{{ end_date }}</td>
             </tr>
             <tr>
-                <td style="color: {COLORS['muted']}; font-weight: bold;">Assigned By:</td>
-                <td style="color: {COLORS['text']}; font-size: 16px;">{assigned_by}</td>
+                <td style="color: {{ colors.muted }}; font-weight: bold;">Assigned By:</td>
+                <td style="color: {{ colors.text }}; font-size: 16px;">{{ assigned_by }}</td>
             </tr>
         </table>
     </div>
@@ -578,117 +845,113 @@ def vendor_project_assignment(vendor_name: str, project_name: str, project_descr
         Access the vendor portal to view complete project details, deliverables, and timelines.
     </p>
     
-    {get_button_html('View Project', portal_url)}
+    {{ button('View Project', portal_url) }}
     
-    <p style="font-size: 14px; line-height: 1.6; color: {COLORS['muted']};">
-        For any project-related questions, please contact us at {COMPANY_INFO['email']} or {COMPANY_INFO['phone']}.
+    <p style="font-size: 14px; line-height: 1.6; color: {{ colors.muted }};">
+        For any project-related questions, please contact us at {{ company.email }} or {{ company.phone }}.
     </p>
     """
-    return {
-        "subject": f"New Project Assignment: {project_name}",
-        "html": get_base_template(content)
-    }
+)
 
-def vendor_task_assignment(vendor_name: str, task_title: str, task_description: str, assigned_by: str, due_date: str, priority: str, portal_url: str) -> dict:
-    """Notification when task is assigned to vendor"""
-    
-    priority_colors = {
-        "high": "#ff4444",
-        "medium": "#FFA500",
-        "low": "#4CAF50"
-    }
-    priority_color = priority_colors.get(priority.lower(), "#FFA500")
-    
-    content = f"""
-    <h2 style="color: {COLORS['primary']}; margin-top: 0;">New Task Assignment</h2>
-    <p style="font-size: 16px; line-height: 1.6;">Dear {vendor_name},</p>
+def vendor_project_assignment(vendor_name: str, project_name: str, project_description: str, assigned_by: str, start_date: str, end_date: str, portal_url: str) -> dict:
+    """Notification when project is assigned to vendor"""
+    return templates.render("vendor_project_assignment", vendor_name=vendor_name, project_name=project_name, project_description=project_description, assigned_by=assigned_by, start_date=start_date, end_date=end_date, portal_url=portal_url)
+
+templates.register(
+    "vendor_task_assignment",
+    subject="New Task Assignment: {{ task_title }}",
+    body="""
+    <h2 style="color: {{ colors.primary }}; margin-top: 0;">New Task Assignment</h2>
+    <p style="font-size: 16px; line-height: 1.6;">Dear {{ vendor_name }},</p>
     <p style="font-size: 16px; line-height: 1.6;">
         A new task has been assigned to you in the Project Command Center.
     </p>
     
-    <div style="background-color: rgba(201, 169, 97, 0.1); border: 2px solid {COLORS['primary']}; border-radius: 8px; padding: 20px; margin: 25px 0;">
-        <p style="margin: 0 0 15px 0; color: {COLORS['primary']}; font-size: 18px; font-weight: bold;">
+    <div style="background-color: rgba(201, 169, 97, 0.1); border: 2px solid {{ colors.primary }}; border-radius: 8px; padding: 20px; margin: 25px 0;">
+        <p style="margin: 0 0 15px 0; color: {{ colors.primary }}; font-size: 18px; font-weight: bold;">
             Task Details
         </p>
         <table width="100%" cellpadding="8" cellspacing="0">
             <tr>
-                <td style="color: {COLORS['muted']}; font-weight: bold; width: 40%;">Task:</td>
-                <td style="color: {COLORS['primary']}; font-weight: bold; font-size: 16px;">{task_title}</td>
+                <td style="color: {{ colors.muted }}; font-weight: bold; width: 40%;">Task:</td>
+                <td style="color: {{ colors.primary }}; font-weight: bold; font-size: 16px;">{{ task_title }}</td>
             </tr>
             <tr>
-                <td style="color: {COLORS['muted']}; font-weight: bold;">Description:</td>
-                <td style="color: {COLORS['text']}; font-size: 14px;">{task_description}</td>
+                <td style="color: {{ colors.muted }}; font-weight: bold;">Description:</td>
+                <td style="color: {{ colors.text }}; font-size: 14px;">{{ task_description }}</td>
             </tr>
             <tr>
-                <td style="color: {COLORS['muted']}; font-weight: bold;">Due Date:</td>
-                <td style="color: {COLORS['text']}; font-size: 16px;">{due_date}</td>
+                <td style="color: {{ colors.muted }}; font-weight: bold;">Due Date:</td>
+                <td style="color: {{ colors.text }}; font-size: 16px;">{{ due_date }}</td>
             </tr>
             <tr>
-                <td style="color: {COLORS['muted']}; font-weight: bold;">Priority:</td>
-                <td style="color: {priority_color}; font-weight: bold; font-size: 16px; text-transform: uppercase;">{priority}</td>
+                <td style="color: {{ colors.muted }}; font-weight: bold;">Priority:</td>
+                <td style="color: {{ priority_color }}; font-weight: bold; font-size: 16px; text-transform: uppercase;">{{ priority }}</td>
             </tr>
             <tr>
-                <td style="color: {COLORS['muted']}; font-weight: bold;">Assigned By:</td>
-                <td style="color: {COLORS['text']}; font-size: 16px;">{assigned_by}</td>
+                <td style="color: {{ colors.muted }}; font-weight: bold;">Assigned By:</td>
+                <td style="color: {{ colors.text }}; font-size: 16px;">{{ assigned_by }}</td>
             </tr>
         </table>
     </div>
     
-    <div style="background-color: rgba(255, 165, 0, 0.1); border-left: 4px solid {priority_color}; padding: 15px; margin: 20px 0;">
-        <p style="margin: 0; font-size: 14px; line-height: 1.6; color: {COLORS['text']};">
+    <div style="background-color: rgba(255, 165, 0, 0.1); border-left: 4px solid {{ priority_color }}; padding: 15px; margin: 20px 0;">
+        <p style="margin: 0; font-size: 14px; line-height: 1.6; color: {{ colors.text }};">
             <strong>Action Required:</strong> Please review this task and update its status in the vendor portal as you make progress.
         </p>
     </div>
     
-    {get_button_html('View Task', portal_url)}
+    {{ button('View Task', portal_url) }}
     
-    <p style="font-size: 14px; line-height: 1.6; color: {COLORS['muted']};">
-        Questions? Contact us at {COMPANY_INFO['email']} or {COMPANY_INFO['phone']}.
+    <p style="font-size: 14px; line-height: 1.6; color: {{ colors.muted }};">
+        Questions? Contact us at {{ company.email }} or {{ company.phone }}.
     </p>
     """
-    return {
-        "subject": f"New Task Assignment: {task_title}",
-        "html": get_base_template(content)
-    }
+)
+
+def vendor_task_assignment(vendor_name: str, task_title: str, task_description: str, assigned_by: str, due_date: str, priority: str, portal_url: str) -> dict:
+    """Notification when task is assigned to vendor"""
+    return templates.render("vendor_task_assignment", vendor_name=vendor_name, task_title=task_title, task_description=task_description, assigned_by=assigned_by, due_date=due_date, priority=priority, portal_url=portal_url, priority_color=priority_color(priority, "vendor"))
 
 
 # ============================================
 # EMPLOYEE ASSIGNMENT NOTIFICATIONS
 # ============================================
 
-def employee_work_order_assignment(employee_name: str, work_order_number: str, work_order_title: str, assigned_by: str, start_date: str, location: str, portal_url: str) -> dict:
-    """Notification when work order is assigned to employee"""
-    content = f"""
-    <h2 style="color: {COLORS['primary']}; margin-top: 0;">New Work Order Assignment</h2>
-    <p style="font-size: 16px; line-height: 1.6;">Dear {employee_name},</p>
+templates.register(
+    "employee_work_order_assignment",
+    subject="New Work Order Assignment: {{ work_order_number }}",
+    body="""
+    <h2 style="color: {{ colors.primary }}; margin-top: 0;">New Work Order Assignment</h2>
+    <p style="font-size: 16px; line-height: 1.6;">Dear {{ employee_name }},</p>
     <p style="font-size: 16px; line-height: 1.6;">
         You have been assigned to a new work order.
     </p>
     
-    <div style="background-color: rgba(201, 169, 97, 0.1); border: 2px solid {COLORS['primary']}; border-radius: 8px; padding: 20px; margin: 25px 0;">
-        <p style="margin: 0 0 15px 0; color: {COLORS['primary']}; font-size: 18px; font-weight: bold;">
+    <div style="background-color: rgba(201, 169, 97, 0.1); border: 2px solid {{ colors.primary }}; border-radius: 8px; padding: 20px; margin: 25px 0;">
+        <p style="margin: 0 0 15px 0; color: {{ colors.primary }}; font-size: 18px; font-weight: bold;">
             Work Order Details
         </p>
         <table width="100%" cellpadding="8" cellspacing="0">
             <tr>
-                <td style="color: {COLORS['muted']}; font-weight: bold; width: 40%;">Work Order #:</td>
-                <td style="color: {COLORS['primary']}; font-weight: bold; font-size: 16px;">{work_order_number}</td>
+                <td style="color: {{ colors.muted }}; font-weight: bold; width: 40%;">Work Order #:</td>
+                <td style="color: {{ colors.primary }}; font-weight: bold; font-size: 16px;">{{ work_order_number }}</td>
             </tr>
             <tr>
-                <td style="color: {COLORS['muted']}; font-weight: bold;">Title:</td>
-                <td style="color: {COLORS['text']}; font-size: 16px;">{work_order_title}</td>
+                <td style="color: {{ colors.muted }}; font-weight: bold;">Title:</td>
+                <td style="color: {{ colors.text }}; font-size: 16px;">{{ work_order_title }}</td>
             </tr>
             <tr>
-                <td style="color: {COLORS['muted']}; font-weight: bold;">Start Date:</td>
-                <td style="color: {COLORS['text']}; font-size: 16px;">{start_date}</td>
+                <td style="color: {{ colors.muted }}; font-weight: bold;">Start Date:</td>
+                <td style="color: {{ colors.text }}; font-size: 16px;">{{ start_date }}</td>
             </tr>
             <tr>
-                <td style="color: {COLORS['muted']}; font-weight: bold;">Location:</td>
-                <td style="color: {COLORS['text']}; font-size: 16px;">{location}</td>
+                <td style="color: {{ colors.muted }}; font-weight: bold;">Location:</td>
+                <td style="color: {{ colors.text }}; font-size: 16px;">{{ location }}</td>
             </tr>
             <tr>
-                <td style="color: {COLORS['muted']}; font-weight: bold;">Assigned By:</td>
-                <td style="color: {COLORS['text']}; font-size: 16px;">{assigned_by}</td>
+                <td style="color: {{ colors.muted }}; font-weight: bold;">Assigned By:</td>
+                <td style="color: {{ colors.text }}; font-size: 16px;">{{ assigned_by }}</td>
             </tr>
         </table>
     </div>
@@ -697,50 +960,52 @@ def employee_work_order_assignment(employee_name: str, work_order_number: str, w
         Please review the work order details and requirements in the portal.
     </p>
     
-    {get_button_html('View Work Order', portal_url)}
+    {{ button('View Work Order', portal_url) }}
     
-    <p style="font-size: 14px; line-height: 1.6; color: {COLORS['muted']};">
-        If you have any questions about this work order, please contact your supervisor or reach out to us at {COMPANY_INFO['email']}.
+    <p style="font-size: 14px; line-height: 1.6; color: {{ colors.muted }};">
+        If you have any questions about this work order, please contact your supervisor or reach out to us at {{ company.email }}.
     </p>
     """
-    return {
-        "subject": f"New Work Order Assignment: {work_order_number}",
-        "html": get_base_template(content)
-    }
+)
 
-def employee_project_assignment(employee_name: str, project_name: str, project_description: str, assigned_by: str, start_date: str, end_date: str, portal_url: str) -> dict:
-    """Notification when project is assigned to employee"""
-    content = f"""
-    <h2 style="color: {COLORS['primary']}; margin-top: 0;">New Project Assignment</h2>
-    <p style="font-size: 16px; line-height: 1.6;">Dear {employee_name},</p>
+def employee_work_order_assignment(employee_name: str, work_order_number: str, work_order_title: str, assigned_by: str, start_date: str, location: str, portal_url: str) -> dict:
+    """Notification when work order is assigned to employee"""
+    return templates.render("employee_work_order_assignment", employee_name=employee_name, work_order_number=work_order_number, work_order_title=work_order_title, assigned_by=assigned_by, start_date=start_date, location=location, portal_url=portal_url)
+
+templates.register(
+    "employee_project_assignment",
+    subject="New Project Assignment: {{ project_name }}",
+    body="""
+    <h2 style="color: {{ colors.primary }}; margin-top: 0;">New Project Assignment</h2>
+    <p style="font-size: 16px; line-height: 1.6;">Dear {{ employee_name }},</p>
     <p style="font-size: 16px; line-height: 1.6;">
         You have been assigned to a new project.
     </p>
     
-    <div style="background-color: rgba(201, 169, 97, 0.1); border: 2px solid {COLORS['primary']}; border-radius: 8px; padding: 20px; margin: 25px 0;">
-        <p style="margin: 0 0 15px 0; color: {COLORS['primary']}; font-size: 18px; font-weight: bold;">
+    <div style="background-color: rgba(201, 169, 97, 0.1); border: 2px solid {{ colors.primary }}; border-radius: 8px; padding: 20px; margin: 25px 0;">
+        <p style="margin: 0 0 15px 0; color: {{ colors.primary }}; font-size: 18px; font-weight: bold;">
             Project Details
         </p>
         <table width="100%" cellpadding="8" cellspacing="0">
             <tr>
-                <td style="color: {COLORS['muted']}; font-weight: bold; width: 40%;">Project Name:</td>
-                <td style="color: {COLORS['primary']}; font-weight: bold; font-size: 16px;">{project_name}</td>
+                <td style="color: {{ colors.muted }}; font-weight: bold; width: 40%;">Project Name:</td>
+                <td style="color: {{ colors.primary }}; font-weight: bold; font-size: 16px;">{{ project_name }}</td>
             </tr>
             <tr>
-                <td style="color: {COLORS['muted']}; font-weight: bold;">Description:</td>
-                <td style="color: {COLORS['text']}; font-size: 14px;">{project_description}</td>
+                <td style="color: {{ colors.muted }}; font-weight: bold;">Description:</td>
+                <td style="color: {{ colors.text }}; font-size: 14px;">{{ project_description }}</td>
             </tr>
             <tr>
-                <td style="color: {COLORS['muted']}; font-weight: bold;">Start Date:</td>
-                <td style="color: {COLORS['text']}; font-size: 16px;">{start_date}</td>
+                <td style="color: {{ colors.muted }}; font-weight: bold;">Start Date:</td>
+                <td style="color: {{ colors.text }}; font-size: 16px;">{{ start_date }}</td>
             </tr>
             <tr>
-                <td style="color: {COLORS['muted']}; font-weight: bold;">End Date:</td>
-                <td style="color: {COLORS['text']}; font-size: 16px;">{end_date}</td>
+                <td style="color: {{ colors.muted }}; font-weight: bold;">End Date:</td>
+                <td style="color: {{ colors.text }}; font-size: 16px;">{{ end_date }}</td>
             </tr>
             <tr>
-                <td style="color: {COLORS['muted']}; font-weight: bold;">Assigned By:</td>
-                <td style="color: {COLORS['text']}; font-size: 16px;">{assigned_by}</td>
+                <td style="color: {{ colors.muted }}; font-weight: bold;">Assigned By:</td>
+                <td style="color: {{ colors.text }}; font-size: 16px;">{{ assigned_by }}</td>
             </tr>
         </table>
     </div>
@@ -749,74 +1014,211 @@ def employee_project_assignment(employee_name: str, project_name: str, project_d
         Please access the portal to view complete project details, milestones, and related tasks.
     </p>
     
-    {get_button_html('View Project', portal_url)}
+    {{ button('View Project', portal_url) }}
     
-    <p style="font-size: 14px; line-height: 1.6; color: {COLORS['muted']};">
-        Questions? Contact us at {COMPANY_INFO['email']} or {COMPANY_INFO['phone']}.
+    <p style="font-size: 14px; line-height: 1.6; color: {{ colors.muted }};">
+        Questions? Contact us at {{ company.email }} or {{ company.phone }}.
     </p>
     """
-    return {
-        "subject": f"New Project Assignment: {project_name}",
-        "html": get_base_template(content)
-    }
+)
 
-def employee_task_assignment(employee_name: str, task_title: str, task_description: str, due_date: str, priority: str, assigned_by: str, portal_url: str) -> dict:
-    """Notification when task is assigned to employee"""
-    priority_colors = {
-        "high": "#FF0000",
-        "medium": "#FFA500", 
-        "low": "#00FF00"
-    }
-    priority_color = priority_colors.get(priority.lower(), COLORS['primary'])
-    
-    content = f"""
-    <h2 style="color: {COLORS['primary']}; margin-top: 0;">New Task Assignment</h2>
-    <p style="font-size: 16px; line-height: 1.6;">Dear {employee_name},</p>
+def employee_project_assignment(employee_name: str, project_name: str, project_description: str, assigned_by: str, start_date: str, end_date: str, portal_url: str) -> dict:
+    """Notification when project is assigned to employee"""
+    return templates.render("employee_project_assignment", employee_name=employee_name, project_name=project_name, project_description=project_description, assigned_by=assigned_by, start_date=start_date, end_date=end_date, portal_url=portal_url)
+
+templates.register(
+    "employee_task_assignment",
+    subject="New Task Assignment: {{ task_title }}",
+    body="""
+    <h2 style="color: {{ colors.primary }}; margin-top: 0;">New Task Assignment</h2>
+    <p style="font-size: 16px; line-height: 1.6;">Dear {{ employee_name }},</p>
     <p style="font-size: 16px; line-height: 1.6;">
         A new task has been assigned to you in the Project Command Center.
     </p>
     
-    <div style="background-color: rgba(201, 169, 97, 0.1); border: 2px solid {COLORS['primary']}; border-radius: 8px; padding: 20px; margin: 25px 0;">
-        <p style="margin: 0 0 15px 0; color: {COLORS['primary']}; font-size: 18px; font-weight: bold;">
+    <div style="background-color: rgba(201, 169, 97, 0.1); border: 2px solid {{ colors.primary }}; border-radius: 8px; padding: 20px; margin: 25px 0;">
+        <p style="margin: 0 0 15px 0; color: {{ colors.primary }}; font-size: 18px; font-weight: bold;">
             Task Details
         </p>
         <table width="100%" cellpadding="8" cellspacing="0">
             <tr>
-                <td style="color: {COLORS['muted']}; font-weight: bold; width: 40%;">Task:</td>
-                <td style="color: {COLORS['primary']}; font-weight: bold; font-size: 16px;">{task_title}</td>
+                <td style="color: {{ colors.muted }}; font-weight: bold; width: 40%;">Task:</td>
+                <td style="color: {{ colors.primary }}; font-weight: bold; font-size: 16px;">{{ task_title }}</td>
             </tr>
             <tr>
-                <td style="color: {COLORS['muted']}; font-weight: bold;">Description:</td>
-                <td style="color: {COLORS['text']}; font-size: 14px;">{task_description}</td>
+                <td style="color: {{ colors.muted }}; font-weight: bold;">Description:</td>
+                <td style="color: {{ colors.text }}; font-size: 14px;">{{ task_description }}</td>
             </tr>
             <tr>
-                <td style="color: {COLORS['muted']}; font-weight: bold;">Due Date:</td>
-                <td style="color: {COLORS['text']}; font-size: 16px;">{due_date}</td>
+                <td style="color: {{ colors.muted }}; font-weight: bold;">Due Date:</td>
+                <td style="color: {{ colors.text }}; font-size: 16px;">{{ due_date }}</td>
             </tr>
             <tr>
-                <td style="color: {COLORS['muted']}; font-weight: bold;">Priority:</td>
-                <td style="color: {priority_color}; font-weight: bold; font-size: 16px; text-transform: uppercase;">{priority}</td>
+                <td style="color: {{ colors.muted }}; font-weight: bold;">Priority:</td>
+                <td style="color: {{ priority_color }}; font-weight: bold; font-size: 16px; text-transform: uppercase;">{{ priority }}</td>
             </tr>
             <tr>
-                <td style="color: {COLORS['muted']}; font-weight: bold;">Assigned By:</td>
-                <td style="color: {COLORS['text']}; font-size: 16px;">{assigned_by}</td>
+                <td style="color: {{ colors.muted }}; font-weight: bold;">Assigned By:</td>
+                <td style="color: {{ colors.text }}; font-size: 16px;">{{ assigned_by }}</td>
             </tr>
         </table>
     </div>
     
-    <div style="background-color: rgba(255, 165, 0, 0.1); border-left: 4px solid {priority_color}; padding: 15px; margin: 20px 0;">
-        <p style="margin: 0; font-size: 14px; line-height: 1.6; color: {COLORS['text']};">
+    <div style="background-color: rgba(255, 165, 0, 0.1); border-left: 4px solid {{ priority_color }}; padding: 15px; margin: 20px 0;">
+        <p style="margin: 0; font-size: 14px; line-height: 1.6; color: {{ colors.text }};">
             <strong>Action Required:</strong> Please review this task and update its status in the portal as you make progress.
         </p>
     </div>
     
-    {get_button_html('View Task', portal_url)}
+    {{ button('View Task', portal_url) }}
     
-    <p style="font-size: 14px; line-height: 1.6; color: {COLORS['muted']};">
-        Questions? Contact us at {COMPANY_INFO['email']} or {COMPANY_INFO['phone']}.
+    <p style="font-size: 14px; line-height: 1.6; color: {{ colors.muted }};">
+        Questions? Contact us at {{ company.email }} or {{ company.phone }}.
     </p>
     """
-    return {
-        "subject": f"New Task Assignment: {task_title}",
-        "html": get_base_template(content)
-    }
+)
+
+def employee_task_assignment(employee_name: str, task_title: str, task_description: str, due_date: str, priority: str, assigned_by: str, portal_url: str) -> dict:
+    """Notification when task is assigned to employee"""
+    return templates.render("employee_task_assignment", employee_name=employee_name, task_title=task_title, task_description=task_description, due_date=due_date, priority=priority, assigned_by=assigned_by, portal_url=portal_url, priority_color=priority_color(priority, "employee"))
+
+# ============================================
+# ASSIGNMENT FAN-OUT
+# ============================================
+
+# Per audience: task priority -> color, and the color for anything else
+PRIORITY_COLORS = {
+    "vendor": ({"high": "#ff4444", "medium": "#FFA500", "low": "#4CAF50"}, "#FFA500"),
+    "employee": ({"high": "#FF0000", "medium": "#FFA500", "low": "#00FF00"}, COLORS['primary'])
+}
+
+def priority_color(priority: str, audience: str) -> str:
+    colors, default = PRIORITY_COLORS[audience]
+    return colors.get(priority.lower(), default)
+
+def assignment_emails(item_type: str, recipients: List[Tuple[str, str]], **details) -> List[dict]:
+    """{vendor,employee}_<item_type>_assignment emails for (user_name, user_role) recipients of one item
+
+    details are the template's other fields, the same for every recipient;
+    each audience's emails are rendered in one render_batch.
+    """
+    batches: Dict[str, list] = {}
+    for index, (user_name, user_role) in enumerate(recipients):
+        batches.setdefault("vendor" if user_role == "vendor" else "employee", []).append((index, user_name))
+
+    emails = [None] * len(recipients)
+    for audience, batch in batches.items():
+        shared = dict(details)
+        if item_type == "task":
+            shared["priority_color"] = priority_color(details["priority"], audience)
+        rendered = templates.render_batch(f"{audience}_{item_type}_assignment",
+                                          [dict(shared, **{f"{audience}_name": user_name}) for _, user_name in batch], shared)
+        for (index, _), email in zip(batch, rendered):
+            emails[index] = email
+    return emails
+
+# ============================================
+# PLAIN NOTIFICATION TEMPLATES (EmailService)
+# ============================================
+
+templates.register(
+    "admin_task_created",
+    subject="New Task Created: {{ task_title }}",
+    body="""
+    <html>
+        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+            <div style="max-width: 600px; margin: 0 auto; padding: 20px; background-color: #000; color: #C9A961; border: 2px solid #C9A961; border-radius: 8px;">
+                <h2 style="color: #C9A961; border-bottom: 2px solid #C9A961; padding-bottom: 10px;">New Task Created</h2>
+                <p><strong>Task Title:</strong> {{ task_title }}</p>
+                <p><strong>Created By:</strong> {{ created_by }}</p>
+                <p><strong>Project:</strong> {{ project_name }}</p>
+                <p style="margin-top: 20px; padding-top: 20px; border-top: 1px solid #C9A961; color: #888;">
+                    <em>Williams Diversified LLC - Project Command Center</em>
+                </p>
+            </div>
+        </body>
+    </html>
+    """,
+    framed=False
+)
+
+def admin_task_created_email(task_title: str, created_by: str, project_name: str = "N/A") -> dict:
+    """Notify admin when a new task is created"""
+    return templates.render("admin_task_created", task_title=task_title, created_by=created_by, project_name=project_name)
+
+templates.register(
+    "admin_file_upload",
+    subject="File Uploaded: {{ filename }}",
+    body="""
+    <html>
+        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+            <div style="max-width: 600px; margin: 0 auto; padding: 20px; background-color: #000; color: #C9A961; border: 2px solid #C9A961; border-radius: 8px;">
+                <h2 style="color: #C9A961; border-bottom: 2px solid #C9A961; padding-bottom: 10px;">File Uploaded</h2>
+                <p><strong>Filename:</strong> {{ filename }}</p>
+                <p><strong>Uploaded By:</strong> {{ uploaded_by }}</p>
+                <p><strong>{{ item_type }}:</strong> {{ item_title }}</p>
+                <p style="margin-top: 20px; padding-top: 20px; border-top: 1px solid #C9A961; color: #888;">
+                    <em>Williams Diversified LLC - Project Command Center</em>
+                </p>
+            </div>
+        </body>
+    </html>
+    """,
+    framed=False
+)
+
+def admin_file_upload_email(filename: str, uploaded_by: str, item_type: str, item_title: str) -> dict:
+    """Notify admin when a file is uploaded"""
+    return templates.render("admin_file_upload", filename=filename, uploaded_by=uploaded_by, item_type=item_type, item_title=item_title)
+
+templates.register(
+    "admin_task_status_change",
+    subject="Task Status Changed: {{ task_title }}",
+    body="""
+    <html>
+        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+            <div style="max-width: 600px; margin: 0 auto; padding: 20px; background-color: #000; color: #C9A961; border: 2px solid #C9A961; border-radius: 8px;">
+                <h2 style="color: #C9A961; border-bottom: 2px solid #C9A961; padding-bottom: 10px;">Task Status Updated</h2>
+                <p><strong>Task:</strong> {{ task_title }}</p>
+                <p><strong>Status Changed:</strong> {{ old_status }} → {{ new_status }}</p>
+                <p><strong>Changed By:</strong> {{ changed_by }}</p>
+                <p style="margin-top: 20px; padding-top: 20px; border-top: 1px solid #C9A961; color: #888;">
+                    <em>Williams Diversified LLC - Project Command Center</em>
+                </p>
+            </div>
+        </body>
+    </html>
+    """,
+    framed=False
+)
+
+def admin_task_status_change_email(task_title: str, old_status: str, new_status: str, changed_by: str) -> dict:
+    """Notify admin when task status changes"""
+    return templates.render("admin_task_status_change", task_title=task_title, old_status=old_status, new_status=new_status, changed_by=changed_by)
+
+templates.register(
+    "assignment_notification",
+    subject="You've Been Assigned to {{ item_type }}: {{ item_title }}",
+    body="""
+    <html>
+        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+            <div style="max-width: 600px; margin: 0 auto; padding: 20px; background-color: #000; color: #C9A961; border: 2px solid #C9A961; border-radius: 8px;">
+                <h2 style="color: #C9A961; border-bottom: 2px solid #C9A961; padding-bottom: 10px;">New Assignment</h2>
+                <p>Hello {{ user_name }},</p>
+                <p>You have been assigned to a {{ item_type|lower }}:</p>
+                <p><strong>{{ item_type }}:</strong> {{ item_title }}</p>
+                <p><strong>Assigned By:</strong> {{ assigned_by }}</p>
+                <p style="margin-top: 20px;">Please log in to the Project Command Center to view details and take action.</p>
+                <p style="margin-top: 20px; padding-top: 20px; border-top: 1px solid #C9A961; color: #888;">
+                    <em>Williams Diversified LLC - Project Command Center</em>
+                </p>
+            </div>
+        </body>
+    </html>
+    """,
+    framed=False
+)
+
+def assignment_notification_email(user_name: str, item_type: str, item_title: str, assigned_by: str) -> dict:
+    """Notify user when they are assigned to a task or project"""
+    return templates.render("assignment_notification", user_name=user_name, item_type=item_type, item_title=item_title, assigned_by=assigned_by)
@@ -0,0 +1,287 @@
+"""
+Local expense categorizer in front of the LLM.
+
+/ai/categorize-expense only ever picks one of ten fixed categories, and the
+``expenses`` collection already holds the answers users gave for thousands
+of descriptions. ExpenseClassifier trains a TF-IDF + softmax regression
+model on them (plain NumPy: word unigrams and bigrams plus character
+4-grams, so "generatr" still looks like "generator") and answers every
+description it is at least ``min_confidence`` sure about locally, in
+microseconds. Descriptions it is unsure about, or that share no feature
+with the training data, go to AIService.categorize_expense as before.
+
+The model is retrained from the collection every
+``retrain_interval_seconds`` in a worker thread and swapped in atomically;
+a fifth of the samples is held out first to report accuracy and how much
+traffic the confidence threshold keeps local.
+"""
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import logging
+import math
+import os
+import re
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# The categories the LLM prompt offers, in its spelling; expenses store them snake_cased
+EXPENSE_CATEGORIES = [
+    "Materials", "Labor", "Equipment", "Transportation", "Utilities",
+    "Office Supplies", "Professional Services", "Insurance", "Maintenance", "Other",
+]
+CATEGORY_BY_KEY = {name.lower().replace(" ", "_"): name for name in EXPENSE_CATEGORIES}
+CATEGORY_BY_KEY["travel"] = "Transportation"
+
+WORD = re.compile(r"[a-z0-9]+")
+
+def category_name(value) -> Optional[str]:
+    """Canonical category for a stored or LLM-produced value ("office_supplies" -> "Office Supplies")"""
+    key = re.sub(r"[\s-]+", "_", str(value or "").strip().strip(".").lower())
+    return CATEGORY_BY_KEY.get(key)
+
+def text_features(text: str) -> List[str]:
+    words = WORD.findall(text.lower())
+    features = [f"w:{word}" for word in words]
+    features += [f"b:{first} {second}" for first, second in zip(words, words[1:])]
+    for word in words:
+        padded = f"<{word}>"
+        features += [f"c:{padded[i:i + 4]}" for i in range(len(padded) - 3)]
+    return features
+
+class TfidfVectorizer:
+    """Sublinear TF-IDF rows (L2-normalized) as CSR arrays"""
+
+    def __init__(self, max_features: int = 50000):
+        self.max_features = max_features
+        self.vocabulary: Dict[str, int] = {}
+        self.idf = np.zeros(0, dtype=np.float64)
+
+    def fit(self, texts: List[str]) -> "TfidfVectorizer":
+        document_frequency: Dict[str, int] = {}
+        for text in texts:
+            for feature in set(text_features(text)):
+                document_frequency[feature] = document_frequency.get(feature, 0) + 1
+        kept = sorted(document_frequency, key=lambda feature: -document_frequency[feature])[:self.max_features]
+        self.vocabulary = {feature: index for index, feature in enumerate(kept)}
+        frequencies = np.array([document_frequency[feature] for feature in kept], dtype=np.float64)
+        self.idf = np.log((1 + len(texts)) / (1 + frequencies)) + 1
+        return self
+
+    def transform(self, texts: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(indptr, indices, data) with one row per text"""
+        indptr = [0]
+        indices: List[int] = []
+        data: List[float] = []
+        for text in texts:
+            counts: Dict[int, int] = {}
+            for feature in text_features(text):
+                index = self.vocabulary.get(feature)
+                if index is not None:
+                    counts[index] = counts.get(index, 0) + 1
+            row = sorted(counts)
+            weights = [(1 + math.log(counts[index])) * self.idf[index] for index in row]
+            norm = math.sqrt(sum(weight * weight for weight in weights)) or 1.0
+            indices += row
+            data += [weight / norm for weight in weights]
+            indptr.append(len(indices))
+        return np.array(indptr, dtype=np.int64), np.array(indices, dtype=np.int64), np.array(data, dtype=np.float64)
+
+def row_ids(indptr: np.ndarray) -> np.ndarray:
+    """Row of each stored value of a CSR matrix"""
+    return np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+
+def sparse_dot(rows: np.ndarray, indices: np.ndarray, data: np.ndarray, weights: np.ndarray, row_count: int) -> np.ndarray:
+    """(row_count x classes) product of CSR rows with (classes x features) weights"""
+    return np.stack([np.bincount(rows, weights=column[indices] * data, minlength=row_count) for column in weights], axis=1)
+
+def sparse_transpose_dot(rows: np.ndarray, indices: np.ndarray, data: np.ndarray, errors: np.ndarray, feature_count: int) -> np.ndarray:
+    """(classes x features) product of per-row errors with the CSR matrix, i.e. the gradient X^T E"""
+    return np.stack([np.bincount(indices, weights=column[rows] * data, minlength=feature_count) for column in errors.T])
+
+def softmax(logits: np.ndarray) -> np.ndarray:
+    exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return exp / exp.sum(axis=1, keepdims=True)
+
+class ExpenseModel:
+    """A trained vectorizer and softmax regression over the categories it saw"""
+
+    def __init__(self, vectorizer: TfidfVectorizer, weights: np.ndarray, bias: np.ndarray, categories: List[str]):
+        self.vectorizer = vectorizer
+        self.weights = weights
+        self.bias = bias
+        self.categories = categories
+
+    def predict(self, texts: List[str]) -> List[Optional[Tuple[str, float]]]:
+        """(category, probability) per text, None for texts with no known feature"""
+        indptr, indices, data = self.vectorizer.transform(texts)
+        probabilities = softmax(sparse_dot(row_ids(indptr), indices, data, self.weights, len(texts)) + self.bias)
+        best = probabilities.argmax(axis=1)
+        known = np.diff(indptr) > 0
+        return [
+            (self.categories[best[row]], float(probabilities[row, best[row]])) if known[row] else None
+            for row in range(len(texts))
+        ]
+
+def train_model(texts: List[str], labels: List[str], epochs: int = 150, learning_rate: float = 4.0, l2: float = 1e-4) -> ExpenseModel:
+    """Fit TF-IDF and a multinomial logistic regression by full-batch gradient descent with momentum"""
+    vectorizer = TfidfVectorizer().fit(texts)
+    indptr, indices, data = vectorizer.transform(texts)
+    categories = sorted(set(labels))
+    targets = np.zeros((len(texts), len(categories)))
+    targets[np.arange(len(texts)), [categories.index(label) for label in labels]] = 1.0
+
+    rows = row_ids(indptr)
+    feature_count = len(vectorizer.vocabulary)
+
+    weights = np.zeros((len(categories), feature_count))
+    bias = np.zeros(len(categories))
+    velocity_w = np.zeros_like(weights)
+    velocity_b = np.zeros_like(bias)
+    for _ in range(epochs):
+        errors = (softmax(sparse_dot(rows, indices, data, weights, len(texts)) + bias) - targets) / len(texts)
+        gradient_w = sparse_transpose_dot(rows, indices, data, errors, feature_count) + l2 * weights
+        velocity_w = 0.9 * velocity_w - learning_rate * gradient_w
+        velocity_b = 0.9 * velocity_b - learning_rate * errors.sum(axis=0)
+        weights += velocity_w
+        bias += velocity_b
+    return ExpenseModel(vectorizer, weights, bias, categories)
+
+class ExpenseClassifier:
+    """Periodically retrained local classifier that defers low-confidence expenses to the LLM"""
+
+    def __init__(self, db, min_confidence: float = 0.7, retrain_interval_seconds: float = 3600,
+                 min_samples: int = 50, max_samples: int = 50000):
+        self.db = db
+        self.min_confidence = min_confidence
+        self.retrain_interval_seconds = retrain_interval_seconds
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+        self._model: Optional[ExpenseModel] = None
+        self._task: Optional[asyncio.Task] = None
+        self.last_training: Optional[dict] = None
+        self.local = 0
+        self.deferred = 0
+
+    def predict(self, descriptions: List[str]) -> List[Optional[Tuple[str, float]]]:
+        """Local (category, confidence) per description; None where there is no model or no known feature"""
+        model = self._model
+        if model is None:
+            return [None] * len(descriptions)
+        return model.predict(descriptions)
+
+    async def categorize(self, descriptions: List[str], ai_service, priority: Optional[int] = None) -> List[dict]:
+        """Category per description: local when confident, otherwise from the LLM (once per distinct description)"""
+        results: List[Optional[dict]] = []
+        deferred: Dict[str, List[int]] = {}
+        for position, (description, prediction) in enumerate(zip(descriptions, self.predict(descriptions))):
+            if prediction is not None and prediction[1] >= self.min_confidence:
+                results.append({"category": prediction[0], "confidence": round(prediction[1], 4), "source": "local"})
+            else:
+                results.append(None)
+                deferred.setdefault(" ".join(description.lower().split()), []).append(position)
+        self.local += len(descriptions) - sum(len(positions) for positions in deferred.values())
+        self.deferred += sum(len(positions) for positions in deferred.values())
+
+        async def ask(positions: List[int]):
+            # The LLM gateway bounds how many of these run at once
+            answer = await ai_service.categorize_expense(descriptions[positions[0]], priority)
+            for position in positions:
+                results[position] = {"category": category_name(answer) or answer, "confidence": None, "source": "llm"}
+
+        await asyncio.gather(*(ask(positions) for positions in deferred.values()))
+        return results
+
+    async def retrain(self) -> Optional[dict]:
+        """Train on the newest labeled expenses and swap the model in; None if there isn't enough data"""
+        texts, labels = [], []
+        cursor = self.db.expenses.find(
+            {"description": {"$nin": [None, ""]}, "category": {"$nin": [None, ""]}},
+            {"_id": 0, "description": 1, "category": 1}
+        ).sort("created_at", -1).limit(self.max_samples)
+        async for expense in cursor:
+            category = category_name(expense["category"])
+            if category is not None:
+                texts.append(expense["description"])
+                labels.append(category)
+        if len(texts) < self.min_samples or len(set(labels)) < 2:
+            logger.info(f"Expense classifier not trained: {len(texts)} labeled expenses, {len(set(labels))} categories")
+            return None
+
+        started = time.perf_counter()
+        model, evaluation = await asyncio.to_thread(self._train, texts, labels)
+        self._model = model
+        self.last_training = {
+            "trained_at": datetime.now(timezone.utc).isoformat(),
+            "samples": len(texts),
+            "categories": len(model.categories),
+            "features": len(model.vectorizer.vocabulary),
+            "seconds": round(time.perf_counter() - started, 3),
+            **evaluation
+        }
+        logger.info(f"Expense classifier trained on {len(texts)} expenses: {evaluation}")
+        return self.last_training
+
+    def _train(self, texts: List[str], labels: List[str]) -> Tuple[ExpenseModel, dict]:
+        # Every fifth sample is held out to measure the model, which is then refit on everything
+        train = [i for i in range(len(texts)) if i % 5]
+        holdout = [i for i in range(len(texts)) if not i % 5]
+        evaluation = {}
+        if len({labels[i] for i in train}) >= 2:
+            predictions = train_model([texts[i] for i in train], [labels[i] for i in train]).predict([texts[i] for i in holdout])
+            correct = [p is not None and p[0] == labels[i] for i, p in zip(holdout, predictions)]
+            confident = [p is not None and p[1] >= self.min_confidence for p in predictions]
+            answered = sum(confident)
+            evaluation = {
+                "holdout_accuracy": round(sum(correct) / len(holdout), 4),
+                "holdout_local_share": round(answered / len(holdout), 4),
+                "holdout_local_accuracy": round(sum(c for c, k in zip(correct, confident) if k) / answered, 4) if answered else None
+            }
+        return train_model(texts, labels), evaluation
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._retrain_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _retrain_loop(self):
+        while True:
+            try:
+                await self.retrain()
+            except Exception as e:
+                logger.error(f"Expense classifier training failed: {str(e)}")
+            await asyncio.sleep(self.retrain_interval_seconds)
+
+    def stats(self) -> dict:
+        answered = self.local + self.deferred
+        return {
+            "trained": self._model is not None,
+            "min_confidence": self.min_confidence,
+            "local": self.local,
+            "deferred_to_llm": self.deferred,
+            "local_rate": round(self.local / answered, 4) if answered else 0.0,
+            "last_training": self.last_training
+        }
+
+
+# Global expense classifier instance
+_expense_classifier = None
+
+def get_expense_classifier(db) -> ExpenseClassifier:
+    """Get or create expense classifier instance"""
+    global _expense_classifier
+    if _expense_classifier is None:
+        _expense_classifier = ExpenseClassifier(
+            db,
+            min_confidence=float(os.environ.get('EXPENSE_CLASSIFIER_MIN_CONFIDENCE', 0.7)),
+            retrain_interval_seconds=float(os.environ.get('EXPENSE_CLASSIFIER_RETRAIN_SECONDS', 3600))
+        )
+    return _expense_classifier
@@ -0,0 +1,67 @@
+"""
+Local stand-in for LlmChat, for tests and benchmarks of the /ai endpoints.
+
+Set AI_FAKE_LLM_TOKENS_PER_SECOND and AIService.chat() hands out a
+FakeLlmChat instead of calling the provider. It replies with canned text
+(a proposal JSON document for the "proposal" purpose) and emits it token by
+token at the configured rate, through both send_message() and the
+stream_message() used by the streaming endpoints.
+"""
+from typing import AsyncIterator, List
+import asyncio
+import json
+import re
+
+FAKE_PROPOSAL = {
+    "scopeOfWork": "Mobilize a debris removal crew within 48 hours, clear and haul storm debris from the "
+                   "project right-of-way, and restore the site to its pre-storm condition.",
+    "inclusions": [
+        {"trade": "Debris Removal", "items": ["Vegetative debris pickup", "C&D debris haul-off", "Final site sweep"]},
+        {"trade": "Site Security", "items": ["Temporary fencing", "Nightly patrol"]}
+    ],
+    "itemizedPricing": [
+        {"description": "Mobilization", "cost": 12500.00},
+        {"description": "Debris removal (per cubic yard, est. 4,000 CY)", "cost": 68000.00},
+        {"description": "Site security (30 days)", "cost": 9600.00}
+    ],
+    "totalLumpSum": 90100.00,
+    "notes": "Pricing valid for 30 days. Quantities above the estimate are billed at the unit rate."
+}
+
+FAKE_REPLIES = {
+    "proposal": json.dumps(FAKE_PROPOSAL, indent=2),
+}
+
+DEFAULT_REPLY = (
+    "Here is a summary of what you asked for. Open the Projects page to review active jobs, "
+    "assign crews from the Work Orders page, and track hours under Timesheets. "
+    "Let me know if you want me to draft a message to the project team."
+)
+
+TOKEN_PATTERN = re.compile(r"\s*\S+|\s+")
+
+def tokenize(text: str) -> List[str]:
+    """Word-sized tokens that join back to the original text"""
+    return TOKEN_PATTERN.findall(text)
+
+class FakeLlmChat:
+    """Replies with canned text at a fixed token rate"""
+
+    def __init__(self, purpose: str, session_id: str, system_message: str, tokens_per_second: float = 50):
+        self.purpose = purpose
+        self.session_id = session_id
+        self.system_message = system_message
+        self.tokens_per_second = tokens_per_second
+        self.reply = FAKE_REPLIES.get(purpose, DEFAULT_REPLY)
+
+    def with_model(self, provider: str, model: str) -> "FakeLlmChat":
+        return self
+
+    async def send_message(self, message) -> str:
+        return "".join([token async for token in self.stream_message(message)])
+
+    async def stream_message(self, message) -> AsyncIterator[str]:
+        delay = 1 / self.tokens_per_second if self.tokens_per_second > 0 else 0
+        for token in tokenize(self.reply):
+            await asyncio.sleep(delay)
+            yield token
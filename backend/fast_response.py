@@ -0,0 +1,31 @@
+"""
+Response rendering for documents read from our own collections.
+
+For a route with a response_model, FastAPI validates the handler's return
+value, dumps it back into Python objects and then JSON-encodes those. Handlers
+that serve Mongo documents return render_documents() instead, which uses a
+precompiled TypeAdapter to validate and encode in one pydantic-core pass.
+
+Documents are always validated: stored documents can lack defaulted fields,
+carry fields the model doesn't declare (password hashes, onboarding
+details) and hold datetimes and floats that pydantic serializes its own way,
+so the output must come from the model, not the raw document.
+"""
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+from functools import lru_cache
+from typing import Any
+
+@lru_cache(maxsize=512)
+def model_adapter(response_type: Any) -> TypeAdapter:
+    """Compiled once per response type (a model, List[model] or Page[model])"""
+    return TypeAdapter(response_type)
+
+def document_serializer(response_type: Any):
+    """bytes-returning serializer for payloads of response_type"""
+    adapter = model_adapter(response_type)
+    return lambda payload: adapter.dump_json(adapter.validate_python(payload))
+
+def render_documents(response_type: Any, payload) -> Response:
+    """JSON response for documents, bypassing FastAPI's response_model validation pass"""
+    return Response(content=document_serializer(response_type)(payload), media_type="application/json")
@@ -0,0 +1,60 @@
+from fastapi import HTTPException, Query, Response
+from pydantic import BaseModel, create_model
+from functools import lru_cache
+from typing import List, Optional, Tuple, Type
+
+from fast_response import render_documents
+from pagination import Page
+from streaming import NDJSONResponse
+
+# Always projected so keyset cursors can be built from a sparse page
+CURSOR_FIELDS = ("id", "created_at")
+
+@lru_cache(maxsize=256)
+def sparse_model(model: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """A copy of model restricted to the selected fields, with their original types and defaults"""
+    return create_model(
+        f"{model.__name__}Fields",
+        **{name: (model.model_fields[name].annotation, model.model_fields[name]) for name in fields}
+    )
+
+class FieldSelection:
+    """`fields=` query parameter: a comma-separated list of fields to return"""
+
+    def __init__(
+        self,
+        fields: Optional[str] = Query(None, description="Comma-separated list of fields to return, e.g. fields=id,name,status"),
+        response: Response = None,
+    ):
+        # FastAPI's per-request response; headers set on it (e.g. by Paginated) are copied onto what we render
+        self.http_response = response
+        self.requested = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip())) if fields else ()
+
+    def resolve(self, model: Type[BaseModel]) -> Tuple[str, ...]:
+        """Validate the requested fields against the model; id/created_at are always included"""
+        unknown = [name for name in self.requested if name not in model.model_fields]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        always = tuple(name for name in CURSOR_FIELDS if name in model.model_fields)
+        return tuple(dict.fromkeys(always + self.requested))
+
+    def projection(self, model: Type[BaseModel], default: Optional[dict] = None) -> dict:
+        """Mongo projection for the selection, or the endpoint's default projection when none was requested"""
+        if not self.requested:
+            return default if default is not None else {"_id": 0}
+        return {"_id": 0, **{name: 1 for name in self.resolve(model)}}
+
+    def response(self, model: Type[BaseModel], payload, many: bool = True):
+        """Serialize documents against the model, slimmed to the selection when one was requested"""
+        target = sparse_model(model, self.resolve(model)) if self.requested else model
+        if isinstance(payload, NDJSONResponse):
+            return payload.use_model(target)
+        if many:
+            # A concrete List/Page type: serializing through the Union is markedly slower
+            rendered = render_documents(List[target] if isinstance(payload, list) else Page[target], payload)
+        else:
+            rendered = render_documents(target, payload)
+        if self.http_response is not None:
+            # FastAPI only merges them into responses it builds itself
+            rendered.headers.update(self.http_response.headers)
+        return rendered
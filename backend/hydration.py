@@ -0,0 +1,73 @@
+"""
+Batched hydration of related documents.
+
+Instead of one find_one per row (vendor profile per vendor user, user per
+assigned_to entry, ...), collect the foreign keys, fetch them with a single
+$in query and join in memory. For one root document plus its parents
+(invoice -> vendor, paystub -> employee), find_one_joined() does the
+match and the $lookup joins in one aggregation round trip.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+def collect_ids(docs: Iterable[dict], local_field: str) -> List:
+    """Distinct non-empty values of local_field (scalar or list) across docs, in first-seen order"""
+    seen = {}
+    for doc in docs:
+        value = doc.get(local_field)
+        for key in (value if isinstance(value, (list, tuple, set)) else [value]):
+            if key:
+                seen.setdefault(key, None)
+    return list(seen)
+
+async def fetch_by_ids(collection, ids: Iterable, key: str = "id", projection: Optional[dict] = None) -> Dict:
+    """key value -> document, fetched with one $in query"""
+    ids = list(dict.fromkeys(i for i in ids if i))
+    if not ids:
+        return {}
+    projection = projection if projection is not None else {"_id": 0}
+    if any(projection.values()):
+        projection = {"_id": 0, **projection, key: 1}
+    docs = await collection.find({key: {"$in": ids}}, projection).to_list(len(ids))
+    return {doc[key]: doc for doc in docs}
+
+async def hydrate(
+    docs: List[dict],
+    local_field: str,
+    collection,
+    as_field: str,
+    key: str = "id",
+    projection: Optional[dict] = None,
+) -> List[dict]:
+    """Attach related documents in place: docs[i][as_field] = related doc (or list, if local_field is a list)
+
+    Rows whose reference doesn't resolve get no as_field (or only the resolved entries, for lists).
+    """
+    related = await fetch_by_ids(collection, collect_ids(docs, local_field), key=key, projection=projection)
+    for doc in docs:
+        value = doc.get(local_field)
+        if isinstance(value, (list, tuple, set)):
+            doc[as_field] = [related[v] for v in value if v in related]
+        elif value in related:
+            doc[as_field] = related[value]
+    return docs
+
+async def find_one_joined(collection, query: dict, joins: List[Tuple[str, str, str]]) -> Optional[dict]:
+    """find_one plus $lookup joins in one round trip
+
+    joins is a list of (local_field, from_collection, as_field); each as_field
+    is the joined document (matched on its "id"), or None when it doesn't exist.
+    """
+    pipeline = [{"$match": query}, {"$limit": 1}]
+    for local_field, from_collection, as_field in joins:
+        pipeline += [
+            {"$lookup": {"from": from_collection, "localField": local_field, "foreignField": "id", "as": as_field}},
+            {"$addFields": {as_field: {"$arrayElemAt": [f"${as_field}", 0]}}},
+        ]
+    pipeline.append({"$project": {"_id": 0, **{f"{as_field}._id": 0 for _, _, as_field in joins}}})
+    docs = await collection.aggregate(pipeline).to_list(1)
+    if not docs:
+        return None
+    doc = docs[0]
+    for _, _, as_field in joins:
+        doc.setdefault(as_field, None)
+    return doc
@@ -0,0 +1,120 @@
+"""
+Per-project inventory valuation.
+
+``inventory_valuations`` holds one document per project with the number of
+inventory items and their total value (sum of unit_cost * quantity). The
+inventory write handlers keep it current with $inc deltas, so the
+/inventory/by-project summary never has to read raw items. rebuild()
+recomputes it from the inventory collection in a single $group, repairing
+drift from out-of-band writes (seed scripts, imports) and float rounding.
+"""
+from datetime import datetime, timezone
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+def item_value(item: Optional[dict]) -> float:
+    if not item:
+        return 0.0
+    return float(item.get("unit_cost") or 0) * float(item.get("quantity") or 0)
+
+class InventoryValuation:
+    """Incrementally maintained item count and value per project"""
+
+    def __init__(self, db):
+        self.db = db
+        self.last_rebuilt_at: Optional[datetime] = None
+
+    async def record(self, before: Optional[dict], after: Optional[dict]):
+        """Apply a write: before=None for inserts, after=None for deletes"""
+        deltas = {}
+        for doc, sign in ((before, -1), (after, 1)):
+            project_id = doc.get("project_id") if doc else None
+            if not project_id:
+                continue
+            delta = deltas.setdefault(project_id, {"total_items": 0, "total_value": 0.0})
+            delta["total_items"] += sign
+            delta["total_value"] += sign * item_value(doc)
+
+        for project_id, delta in deltas.items():
+            if not delta["total_items"] and not delta["total_value"]:
+                continue
+            try:
+                await self.db.inventory_valuations.update_one(
+                    {"project_id": project_id},
+                    {"$inc": delta},
+                    upsert=True
+                )
+            except Exception as e:
+                # rebuild() repairs this; never fail the inventory write over the summary
+                logger.error(f"Failed to update inventory valuation for project {project_id}: {str(e)}")
+
+    async def rebuild(self) -> int:
+        """Recompute every project's valuation from the inventory collection"""
+        pipeline = [
+            {"$match": {"project_id": {"$nin": [None, ""]}}},
+            {"$group": {
+                "_id": "$project_id",
+                "total_items": {"$sum": 1},
+                "total_value": {"$sum": {"$multiply": [
+                    {"$ifNull": ["$unit_cost", 0]},
+                    {"$ifNull": ["$quantity", 0]}
+                ]}}
+            }}
+        ]
+        valuations = await self.db.inventory.aggregate(pipeline).to_list(None)
+        seen = []
+        for valuation in valuations:
+            seen.append(valuation["_id"])
+            await self.db.inventory_valuations.update_one(
+                {"project_id": valuation["_id"]},
+                {"$set": {"total_items": valuation["total_items"], "total_value": valuation["total_value"]}},
+                upsert=True
+            )
+        await self.db.inventory_valuations.delete_many({"project_id": {"$nin": seen}})
+        self.last_rebuilt_at = datetime.now(timezone.utc)
+        logger.info(f"Inventory valuations rebuilt for {len(seen)} projects")
+        return len(seen)
+
+    def by_project_pipeline(self, include_items: bool = True, items_limit: Optional[int] = None) -> list:
+        """One pipeline over projects: valuation joined per project, items optionally embedded"""
+        pipeline = [
+            {"$project": {"_id": 0, "id": 1, "name": 1, "status": 1}},
+            {"$lookup": {
+                "from": "inventory_valuations",
+                "localField": "id",
+                "foreignField": "project_id",
+                "as": "valuation"
+            }},
+        ]
+        if include_items:
+            items_pipeline = [{"$match": {"$expr": {"$eq": ["$project_id", "$$project_id"]}}}, {"$project": {"_id": 0}}]
+            if items_limit is not None:
+                items_pipeline += [{"$sort": {"created_at": -1, "id": -1}}, {"$limit": items_limit}]
+            pipeline.append({"$lookup": {
+                "from": "inventory",
+                "let": {"project_id": "$id"},
+                "pipeline": items_pipeline,
+                "as": "items"
+            }})
+        pipeline.append({"$project": {
+            "project_id": "$id",
+            "project_name": {"$ifNull": ["$name", "Unknown Project"]},
+            "project_status": {"$ifNull": ["$status", "active"]},
+            "total_items": {"$ifNull": [{"$arrayElemAt": ["$valuation.total_items", 0]}, 0]},
+            "total_value": {"$round": [{"$ifNull": [{"$arrayElemAt": ["$valuation.total_value", 0]}, 0]}, 2]},
+            **({"items": 1} if include_items else {})
+        }})
+        return pipeline
+
+
+# Global inventory valuation instance
+_inventory_valuation = None
+
+def get_inventory_valuation(db) -> InventoryValuation:
+    """Get or create inventory valuation instance"""
+    global _inventory_valuation
+    if _inventory_valuation is None:
+        _inventory_valuation = InventoryValuation(db)
+    return _inventory_valuation
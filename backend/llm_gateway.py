@@ -0,0 +1,289 @@
+"""
+Gateway for every outbound LLM call.
+
+All AIService calls go through one LLMGateway, which
+
+- limits concurrent calls per model (``LLM_MAX_CONCURRENCY``, overridable per
+  model with ``LLM_MODEL_CONCURRENCY="gemini-2.5-pro=2,gpt-4o-mini=16"``) so
+  a burst of proposal generations queues instead of tripping provider rate
+  limits;
+- serves that queue by priority, so interactive chat and navigation go ahead
+  of standard generation and batch work (expense imports) and FIFO within a
+  priority;
+- coalesces identical in-flight calls (same purpose, model, system prompt
+  and message): the first caller makes the call and later ones await its
+  result. The call is cancelled only when every caller waiting on it has
+  gone away;
+- bounds each provider call with a per-purpose timeout (queue wait not
+  included), raising LLMTimeoutError.
+
+stats() reports per purpose the calls, coalesced calls, timeouts and errors,
+queue wait and provider latency, and token counts. LlmChat does not return
+usage, so tokens are estimated at four characters each.
+"""
+from collections import deque
+from typing import AsyncIterator, Deque, Dict, List, Optional, Tuple
+import asyncio
+import hashlib
+import heapq
+import itertools
+import logging
+import os
+import time
+
+from emergentintegrations.llm.chat import UserMessage
+
+logger = logging.getLogger(__name__)
+
+# Queue priorities, lowest served first
+INTERACTIVE = 0
+STANDARD = 1
+BATCH = 2
+
+PRIORITIES = {
+    "chat": INTERACTIVE,
+    "chat_assistant": INTERACTIVE,
+    "command": INTERACTIVE,
+    "form_assist": INTERACTIVE,
+}
+
+# Provider call timeout per purpose; others use the gateway default
+TIMEOUT_SECONDS = {
+    "chat": 60,
+    "command": 20,
+    "proposal": 120,
+    "formfill": 90,
+    "document_analysis": 120,
+}
+
+LATENCY_SAMPLES = 256
+
+class LLMTimeoutError(TimeoutError):
+    """The provider did not answer within the purpose's timeout"""
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + 3) // 4
+
+def percentile(samples: List[float], fraction: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 3)
+
+class PrioritySemaphore:
+    """Semaphore that wakes the waiter with the lowest priority value first (FIFO within a priority)"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._order = itertools.count()
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    async def acquire(self, priority: int):
+        if self.active < self.limit and not self.waiting:
+            self.active += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._order), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as this waiter was cancelled: pass it on
+                self.release()
+            raise
+
+    def release(self):
+        # A released slot goes straight to the next live waiter; cancelled ones are skipped
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+class PurposeStats:
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.queue_wait_seconds = 0.0
+        self.provider_seconds = 0.0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.queue_waits: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    def snapshot(self) -> dict:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "queue_wait_seconds": round(self.queue_wait_seconds, 3),
+            "queue_wait_p95": percentile(list(self.queue_waits), 0.95),
+            "provider_seconds": round(self.provider_seconds, 3),
+            "provider_p50": percentile(list(self.latencies), 0.5),
+            "provider_p95": percentile(list(self.latencies), 0.95),
+            "prompt_tokens_estimated": self.prompt_tokens,
+            "completion_tokens_estimated": self.completion_tokens
+        }
+
+class LLMGateway:
+    """Concurrency limits, priorities, single-flight and timeouts for LLM calls"""
+
+    def __init__(self, max_concurrency: int = 8, model_concurrency: Optional[Dict[str, int]] = None,
+                 default_timeout_seconds: float = 60):
+        self.max_concurrency = max_concurrency
+        self.model_concurrency = dict(model_concurrency or {})
+        self.default_timeout_seconds = default_timeout_seconds
+        self._semaphores: Dict[str, PrioritySemaphore] = {}
+        self._flights: Dict[str, list] = {}  # key -> [task, waiting callers]
+        self._stats: Dict[str, PurposeStats] = {}
+
+    def semaphore(self, model: str) -> PrioritySemaphore:
+        semaphore = self._semaphores.get(model)
+        if semaphore is None:
+            semaphore = self._semaphores[model] = PrioritySemaphore(self.model_concurrency.get(model, self.max_concurrency))
+        return semaphore
+
+    def timeout(self, purpose: str) -> float:
+        return TIMEOUT_SECONDS.get(purpose, self.default_timeout_seconds)
+
+    def purpose_stats(self, purpose: str) -> PurposeStats:
+        stats = self._stats.get(purpose)
+        if stats is None:
+            stats = self._stats[purpose] = PurposeStats()
+        return stats
+
+    async def _acquire(self, stats: PurposeStats, semaphore: PrioritySemaphore, purpose: str, priority: Optional[int]) -> float:
+        """Wait for a model slot; returns when the call started"""
+        stats.calls += 1
+        queued = time.perf_counter()
+        await semaphore.acquire(PRIORITIES.get(purpose, STANDARD) if priority is None else priority)
+        started = time.perf_counter()
+        stats.queue_wait_seconds += started - queued
+        stats.queue_waits.append(started - queued)
+        stats.in_flight += 1
+        return started
+
+    async def send(self, purpose: str, model: str, chat, text: str, system_message: str = "",
+                   priority: Optional[int] = None) -> str:
+        """chat.send_message(text), queued by priority and coalesced with identical calls in flight"""
+        key = hashlib.sha256("\0".join((purpose, model, system_message, text)).encode("utf-8")).hexdigest()
+        flight = self._flights.get(key)
+        if flight is None:
+            task = asyncio.create_task(self._call(purpose, model, chat, text, system_message, priority))
+            flight = self._flights[key] = [task, 0]
+            task.add_done_callback(lambda _: self._flights.pop(key, None))
+        else:
+            self.purpose_stats(purpose).coalesced += 1
+
+        flight[1] += 1
+        try:
+            return await asyncio.shield(flight[0])
+        finally:
+            flight[1] -= 1
+            if flight[1] == 0 and not flight[0].done():
+                # Nobody is waiting for the answer any more
+                flight[0].cancel()
+
+    async def _call(self, purpose: str, model: str, chat, text: str, system_message: str, priority: Optional[int]) -> str:
+        stats = self.purpose_stats(purpose)
+        semaphore = self.semaphore(model)
+        started = await self._acquire(stats, semaphore, purpose, priority)
+        timeout = self.timeout(purpose)
+        try:
+            response = await asyncio.wait_for(chat.send_message(UserMessage(text=text)), timeout)
+        except asyncio.TimeoutError:
+            stats.timeouts += 1
+            raise LLMTimeoutError(f"{purpose} call to {model} timed out after {timeout:g}s")
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            stats.in_flight -= 1
+            semaphore.release()
+
+        latency = time.perf_counter() - started
+        stats.provider_seconds += latency
+        stats.latencies.append(latency)
+        stats.prompt_tokens += estimate_tokens(system_message) + estimate_tokens(text)
+        stats.completion_tokens += estimate_tokens(response)
+        return response
+
+    async def stream(self, purpose: str, model: str, chunks: AsyncIterator[str], text: str, system_message: str = "",
+                     priority: Optional[int] = None) -> AsyncIterator[str]:
+        """Pass a reply stream through, holding a model slot while it runs
+
+        Streams are per-client and never coalesced; the timeout applies to
+        each wait for the next chunk.
+        """
+        stats = self.purpose_stats(purpose)
+        semaphore = self.semaphore(model)
+        started = await self._acquire(stats, semaphore, purpose, priority)
+        timeout = self.timeout(purpose)
+        completion = 0
+        try:
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), timeout)
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError:
+                    stats.timeouts += 1
+                    raise LLMTimeoutError(f"{purpose} stream from {model} stalled for {timeout:g}s")
+                completion += len(chunk)
+                yield chunk
+        except LLMTimeoutError:
+            raise
+        except Exception:
+            stats.errors += 1
+            raise
+        finally:
+            stats.in_flight -= 1
+            semaphore.release()
+            await chunks.aclose()
+
+        latency = time.perf_counter() - started
+        stats.provider_seconds += latency
+        stats.latencies.append(latency)
+        stats.prompt_tokens += estimate_tokens(system_message) + estimate_tokens(text)
+        stats.completion_tokens += (completion + 3) // 4
+
+    def stats(self) -> dict:
+        return {
+            "models": {
+                model: {"limit": semaphore.limit, "active": semaphore.active, "waiting": semaphore.waiting}
+                for model, semaphore in self._semaphores.items()
+            },
+            "in_flight_keys": len(self._flights),
+            "purposes": {purpose: stats.snapshot() for purpose, stats in self._stats.items()}
+        }
+
+
+# Global LLM gateway instance
+_llm_gateway = None
+
+def get_llm_gateway() -> LLMGateway:
+    """Get or create LLM gateway instance"""
+    global _llm_gateway
+    if _llm_gateway is None:
+        model_concurrency = {}
+        for item in os.environ.get('LLM_MODEL_CONCURRENCY', '').split(','):
+            if '=' in item:
+                model, limit = item.split('=', 1)
+                model_concurrency[model.strip()] = int(limit)
+        _llm_gateway = LLMGateway(
+            max_concurrency=int(os.environ.get('LLM_MAX_CONCURRENCY', 8)),
+            model_concurrency=model_concurrency,
+            default_timeout_seconds=float(os.environ.get('LLM_TIMEOUT_SECONDS', 60))
+        )
+    return _llm_gateway
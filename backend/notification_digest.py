@@ -0,0 +1,225 @@
+"""
+Per-recipient coalescing of assignment notifications.
+
+Assignment events (project, task, work order) are buffered in the
+``notification_digests`` collection, one open document per recipient.
+The first event opens a window of window_seconds; when it closes (or the
+buffer reaches max_items) a background worker flushes it as one email and
+one ``notifications`` document. A window holding a single event sends that
+event's own email, so a lone assignment looks exactly as before; several
+are merged into an assignment digest. Digest documents left in
+``flushing`` by a crashed worker are reclaimed once their lease expires.
+"""
+from datetime import datetime, timedelta, timezone
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from typing import List, Optional
+import asyncio
+import logging
+import os
+import uuid
+
+from email_service import get_email_service
+from email_templates import assignment_digest_email, assignment_digest_emails
+
+logger = logging.getLogger(__name__)
+
+def display_name(user: dict, default: str = "Employee") -> str:
+    return f"{user.get('first_name', '')} {user.get('last_name', '')}".strip() or user.get("username", default)
+
+def digest_items(events: List[dict]) -> List[dict]:
+    """Events as assignment_digest items, with a display item type"""
+    return [dict(event, item_type=event["item_type"].replace("_", " ").title()) for event in events]
+
+class NotificationDigest:
+    """Coalesces assignment emails per recipient over a short window"""
+
+    def __init__(self, db, portal_url: str, enabled: bool = True, window_seconds: float = 120, max_items: int = 20,
+                 poll_interval_seconds: float = 5, lease_seconds: float = 300, flush_batch: int = 50):
+        self.db = db
+        self.portal_url = portal_url
+        self.enabled = enabled
+        self.window_seconds = window_seconds
+        self.max_items = max_items
+        self.poll_interval_seconds = poll_interval_seconds
+        self.lease_seconds = lease_seconds
+        self.flush_batch = flush_batch
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self.events = 0
+        self.digests_sent = 0
+        self.emails_sent = 0
+
+    def configure(self, settings: dict):
+        """Apply the digest_* fields of the notification settings"""
+        if settings.get("digest_assignments") is not None:
+            self.enabled = bool(settings["digest_assignments"])
+        if settings.get("digest_window_seconds") is not None:
+            self.window_seconds = max(0, settings["digest_window_seconds"])
+        if settings.get("digest_max_items") is not None:
+            self.max_items = max(1, settings["digest_max_items"])
+
+    async def add(self, user: dict, item_type: str, item_id: str, item_title: str, assigned_by: str,
+                  portal_url: str, email: dict):
+        """Record that user was assigned to an item; email is that item's own subject/html"""
+        if not user.get("email"):
+            return
+        self.events += 1
+        event = {
+            "item_type": item_type,
+            "item_id": item_id,
+            "item_title": item_title,
+            "assigned_by": assigned_by,
+            "portal_url": portal_url,
+            "subject": email["subject"],
+            "html": email["html"],
+            "created_at": datetime.now(timezone.utc)
+        }
+        if not self.enabled or self.window_seconds <= 0:
+            await self._deliver({"user_id": user["id"], "to_email": user["email"], "user_name": display_name(user)}, [event])
+            return
+
+        now = datetime.now(timezone.utc)
+        for attempt in range(2):
+            try:
+                digest = await self.db.notification_digests.find_one_and_update(
+                    {"user_id": user["id"], "status": "open"},
+                    {
+                        "$push": {"events": event},
+                        "$inc": {"count": 1},
+                        "$setOnInsert": {
+                            "id": str(uuid.uuid4()),
+                            "to_email": user["email"],
+                            "user_name": display_name(user),
+                            "flush_at": now + timedelta(seconds=self.window_seconds),
+                            "created_at": now
+                        }
+                    },
+                    projection={"_id": 0, "id": 1, "count": 1},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER
+                )
+                break
+            except DuplicateKeyError:
+                # Another request opened this recipient's digest at the same time; push onto that one
+                if attempt:
+                    raise
+
+        if digest and digest["count"] >= self.max_items:
+            await self.db.notification_digests.update_one({"id": digest["id"], "status": "open"}, {"$set": {"flush_at": now}})
+            self._wakeup.set()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._worker())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _worker(self):
+        while True:
+            try:
+                digests = []
+                while len(digests) < self.flush_batch:
+                    digest = await self._claim()
+                    if digest is None:
+                        break
+                    digests.append(digest)
+                if digests:
+                    await self._flush(digests)
+                    continue
+            except Exception as e:
+                logger.error(f"Notification digest flush failed: {str(e)}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _claim(self) -> Optional[dict]:
+        now = datetime.now(timezone.utc)
+        return await self.db.notification_digests.find_one_and_update(
+            {"$or": [
+                {"status": "open", "flush_at": {"$lte": now}},
+                {"status": "flushing", "locked_at": {"$lte": now - timedelta(seconds=self.lease_seconds)}}
+            ]},
+            {"$set": {"status": "flushing", "locked_at": now}},
+            sort=[("flush_at", 1)],
+            projection={"_id": 0},
+            return_document=ReturnDocument.BEFORE
+        )
+
+    async def _flush(self, digests: List[dict]):
+        """Deliver claimed digests, rendering all the multi-event ones in one batch"""
+        merged = [digest for digest in digests if len(digest["events"]) > 1]
+        emails = dict(zip(
+            (digest["id"] for digest in merged),
+            assignment_digest_emails([(digest["user_name"], digest_items(digest["events"])) for digest in merged], self.portal_url)
+        ))
+        for digest in digests:
+            try:
+                await self._deliver(digest, digest["events"], emails.get(digest["id"]))
+                await self.db.notification_digests.delete_one({"id": digest["id"]})
+            except Exception as e:
+                # Left in flushing, so it is retried once its lease expires
+                logger.error(f"Notification digest flush failed for {digest['id']}: {str(e)}")
+
+    async def _deliver(self, recipient: dict, events: List[dict], digest_email: Optional[dict] = None):
+        """One email and one notification document for everything in events"""
+        if len(events) == 1:
+            event = events[0]
+            subject, html = event["subject"], event["html"]
+            notification = {
+                "type": f"{event['item_type']}_assigned",
+                "message": f"You have been assigned to {event['item_type'].replace('_', ' ')}: {event['item_title']}"
+            }
+        else:
+            email = digest_email or assignment_digest_email(user_name=recipient["user_name"], items=digest_items(events),
+                                                            portal_url=self.portal_url)
+            subject, html = email["subject"], email["html"]
+            notification = {
+                "type": "assignment_digest",
+                "message": f"You have been assigned to {len(events)} items",
+                "items": [{k: event[k] for k in ("item_type", "item_id", "item_title")} for event in events]
+            }
+
+        await get_email_service().send_email(recipient["to_email"], subject, html)
+        await self.db.notifications.insert_one({
+            "id": str(uuid.uuid4()),
+            "user_id": recipient["user_id"],
+            "title": subject,
+            **notification,
+            "read": False,
+            "created_at": datetime.now(timezone.utc)
+        })
+        self.emails_sent += 1
+        if len(events) > 1:
+            self.digests_sent += 1
+
+    async def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "window_seconds": self.window_seconds,
+            "max_items": self.max_items,
+            "open": await self.db.notification_digests.count_documents({"status": "open"}),
+            "events": self.events,
+            "emails_sent": self.emails_sent,
+            "digests_sent": self.digests_sent
+        }
+
+
+# Global notification digest instance
+_notification_digest = None
+
+def get_notification_digest(db) -> NotificationDigest:
+    """Get or create notification digest instance"""
+    global _notification_digest
+    if _notification_digest is None:
+        _notification_digest = NotificationDigest(
+            db,
+            portal_url=os.environ.get('REACT_APP_BACKEND_URL', 'https://williams-portal.preview.emergentagent.com')
+        )
+    return _notification_digest
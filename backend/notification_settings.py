@@ -0,0 +1,167 @@
+"""
+Cached notification settings.
+
+The single ``notification_settings`` document is read once and kept in
+memory. save() bumps its ``version`` stamp and refreshes this process
+straight away; other processes see the change through a change stream on
+the collection or, where change streams are unavailable (standalone
+mongod), by polling the version stamp. Every refresh reconfigures the
+shared EmailService and the assignment digest, so invitations,
+assignments and test emails all go through one sender with the same
+configuration and none of them reads the settings from Mongo.
+"""
+from datetime import datetime, timezone
+from typing import Optional
+import asyncio
+import logging
+import os
+import uuid
+
+from email_service import EmailService, get_email_service
+from notification_digest import get_notification_digest
+
+logger = logging.getLogger(__name__)
+
+def default_notification_settings() -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "admin_email": "admin@williamsdiverse.com",
+        "smtp_server": "smtp.gmail.com",
+        "smtp_port": 587,
+        "smtp_username": "",
+        "smtp_password": "",
+        "smtp_from_email": "",
+        "notify_task_created": True,
+        "notify_file_upload": True,
+        "notify_status_change": True,
+        "notify_assignments": True,
+        "digest_assignments": True,
+        "digest_window_seconds": 120,
+        "digest_max_items": 20,
+        "enabled": False,
+        "updated_at": datetime.now(timezone.utc)
+    }
+
+class NotificationSettingsCache:
+    """In-memory copy of the notification settings that configures the shared sender"""
+
+    def __init__(self, db, poll_interval_seconds: float = 30):
+        self.db = db
+        self.poll_interval_seconds = poll_interval_seconds
+        self._settings: Optional[dict] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.version = None
+        self.mode = None
+        self.hits = 0
+        self.refreshes = 0
+        self.last_refreshed_at: Optional[datetime] = None
+
+    async def get(self) -> dict:
+        """Current settings ({} if none were ever saved)"""
+        if self._settings is None:
+            await self.refresh()
+        else:
+            self.hits += 1
+        return dict(self._settings)
+
+    async def email_service(self) -> EmailService:
+        """The shared sender, configured from the current settings"""
+        await self.get()
+        return get_email_service()
+
+    async def refresh(self):
+        async with self._lock:
+            settings = await self.db.notification_settings.find_one({}, {"_id": 0}) or {}
+            self._apply(settings)
+
+    async def save(self, update: dict) -> dict:
+        """Apply a partial update (creating the document with defaults if needed) and refresh"""
+        current = await self.db.notification_settings.find_one({}, {"_id": 0}) or default_notification_settings()
+        current.update(update)
+        current["updated_at"] = datetime.now(timezone.utc)
+        current.pop("version", None)
+        await self.db.notification_settings.update_one(
+            {},
+            {"$set": current, "$inc": {"version": 1}},
+            upsert=True
+        )
+        await self.refresh()
+        return await self.get()
+
+    def _apply(self, settings: dict):
+        self._settings = settings
+        self.version = settings.get("version", 0)
+        self.refreshes += 1
+        self.last_refreshed_at = datetime.now(timezone.utc)
+
+        if settings.get("enabled") and settings.get("smtp_server"):
+            get_email_service(
+                smtp_server=settings.get("smtp_server"),
+                smtp_port=settings.get("smtp_port"),
+                username=settings.get("smtp_username"),
+                password=settings.get("smtp_password"),
+                from_email=settings.get("smtp_from_email") or settings.get("admin_email")
+            )
+        else:
+            # Notifications disabled in the settings: back to the SMTP_* environment configuration
+            get_email_service(smtp_server=os.environ.get('SMTP_SERVER', ''))
+        get_notification_digest(self.db).configure(settings)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _watch(self):
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.error(f"Failed to load notification settings: {str(e)}")
+        try:
+            async with self.db.notification_settings.watch() as stream:
+                self.mode = "change_stream"
+                async for _ in stream:
+                    await self.refresh()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"Notification settings change stream unavailable ({str(e)}), polling every {self.poll_interval_seconds:.0f}s")
+
+        self.mode = "polling"
+        while True:
+            await asyncio.sleep(self.poll_interval_seconds)
+            try:
+                stamp = await self.db.notification_settings.find_one({}, {"_id": 0, "version": 1}) or {}
+                if stamp.get("version", 0) != self.version:
+                    await self.refresh()
+            except Exception as e:
+                logger.error(f"Notification settings refresh failed: {str(e)}")
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "mode": self.mode,
+            "hits": self.hits,
+            "refreshes": self.refreshes,
+            "last_refreshed_at": self.last_refreshed_at.isoformat() if self.last_refreshed_at else None
+        }
+
+
+# Global notification settings cache instance
+_notification_settings_cache = None
+
+def get_notification_settings_cache(db) -> NotificationSettingsCache:
+    """Get or create notification settings cache instance"""
+    global _notification_settings_cache
+    if _notification_settings_cache is None:
+        _notification_settings_cache = NotificationSettingsCache(
+            db,
+            poll_interval_seconds=float(os.environ.get('NOTIFICATION_SETTINGS_POLL_SECONDS', 30))
+        )
+    return _notification_settings_cache
@@ -0,0 +1,190 @@
+from fastapi import Depends, HTTPException, Query, Response
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Generic, List, Optional, TypeVar, Union
+import base64
+import inspect
+import json
+
+from streaming import NDJSONResponse, StreamParams
+
+T = TypeVar("T")
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# Set on bare (limit/cursor-less) calls that were cut short; ?cursor= continues from it
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+def page_response(model):
+    """Response model for list endpoints: a bare list, or a Page envelope when pagination is requested"""
+    return Union[List[model], Page[model]]
+
+class PageParams:
+    """Query parameters shared by every paginated list endpoint
+
+    Bare calls return a plain list of up to MAX_PAGE_SIZE rows (or every row
+    on endpoints that never had a cap); when rows were left out the response
+    carries NEXT_CURSOR_HEADER.
+    """
+
+    def __init__(
+        self,
+        limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size; returns a paginated envelope"),
+        cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+        include_total: bool = Query(False, description="Also return the total number of matching documents"),
+        streaming: StreamParams = Depends(),
+        response: Response = None,
+    ):
+        self.response = response
+        self.limit = limit
+        self.cursor = cursor
+        self.include_total = include_total
+        self.stream = streaming.requested
+
+    @property
+    def requested(self) -> bool:
+        """Clients opt into the envelope by passing limit or cursor; bare calls keep the legacy list shape"""
+        return self.limit is not None or self.cursor is not None
+
+    def page_size(self, bare_limit: Optional[int] = MAX_PAGE_SIZE) -> Optional[int]:
+        """Rows to return; None for an uncapped bare call"""
+        if self.limit is not None:
+            return self.limit
+        return DEFAULT_PAGE_SIZE if self.cursor is not None else bare_limit
+
+class Paginated:
+    """One page of results plus the cursor needed to fetch the next one"""
+
+    def __init__(self, items: list, next_cursor: Optional[str], total: Optional[int], params: PageParams, stream: Optional[NDJSONResponse] = None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.total = total
+        self.params = params
+        self.stream = stream
+
+    async def hydrate(self, func):
+        """Apply func(items) - sync or async - to this page, or to each chunk of a stream"""
+        if self.stream is not None:
+            self.stream.add_batch_hook(func)
+            return
+        result = func(self.items)
+        if inspect.isawaitable(result):
+            await result
+
+    def response(self):
+        if self.stream is not None:
+            return self.stream
+        if not self.params.requested:
+            if self.next_cursor and self.params.response is not None:
+                # The legacy list shape has nowhere else to say it was truncated
+                self.params.response.headers[NEXT_CURSOR_HEADER] = self.next_cursor
+            return self.items
+        return {"items": self.items, "next_cursor": self.next_cursor, "total": self.total}
+
+# BSON sort order of the value types a sort field can hold, lowest first
+TYPE_ORDER = ["null", "number", "string", "bool", "date"]
+
+DEFAULT_SORT = ("created_at", -1)
+
+def encode_cursor(doc: dict, sort: tuple = DEFAULT_SORT) -> str:
+    field, direction = sort
+    value = doc.get(field)
+    if isinstance(value, datetime):
+        payload = {"t": "date", "v": value.isoformat()}
+    elif value is None:
+        payload = {"t": "null", "v": None}
+    elif isinstance(value, bool):
+        payload = {"t": "bool", "v": value}
+    elif isinstance(value, (int, float)):
+        payload = {"t": "number", "v": value}
+    else:
+        payload = {"t": "string", "v": str(value)}
+    payload.update({"id": doc.get("id"), "s": field, "d": direction})
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, sort: tuple = DEFAULT_SORT) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload["t"] == "date":
+            payload["v"] = datetime.fromisoformat(payload["v"])
+        elif payload["t"] == "str":
+            payload["t"] = "string"
+        if payload["t"] not in TYPE_ORDER:
+            raise ValueError(payload["t"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    if (payload.get("s", DEFAULT_SORT[0]), payload.get("d", DEFAULT_SORT[1])) != tuple(sort):
+        raise HTTPException(status_code=400, detail="Pagination cursor does not match the requested sort")
+    return payload
+
+def keyset_filter(cursor: dict, sort: tuple = DEFAULT_SORT) -> dict:
+    """Documents strictly after the cursor in (field, id) order.
+
+    Range operators only match values of the cursor's own BSON type, so the
+    types that sort after it (e.g. legacy ISO strings after dates, descending)
+    are admitted explicitly.
+    """
+    field, direction = sort
+    value, last_id = cursor["v"], cursor["id"]
+    op = "$lt" if direction < 0 else "$gt"
+    rank = TYPE_ORDER.index(cursor["t"])
+    later_types = TYPE_ORDER[:rank] if direction < 0 else TYPE_ORDER[rank + 1:]
+
+    if cursor["t"] == "null":
+        clauses = [{field: None, "id": {op: last_id}}]
+    else:
+        clauses = [
+            {field: {op: value}},
+            {field: value, "id": {op: last_id}},
+        ]
+    for type_name in later_types:
+        clauses.append({field: None} if type_name == "null" else {field: {"$type": type_name}})
+    return {"$or": clauses}
+
+async def paginate(collection, query: dict, params: PageParams, projection: Optional[dict] = None, sort: tuple = DEFAULT_SORT,
+                   bare_limit: Optional[int] = MAX_PAGE_SIZE) -> Paginated:
+    """Keyset-paginate a collection over (sort field, id); newest first by default
+
+    bare_limit caps calls without limit/cursor; None keeps returning every
+    row, for endpoints that always did.
+    """
+    field, direction = sort
+    projection = dict(projection) if projection is not None else {"_id": 0}
+    if any(value == 1 for value in projection.values()):
+        # Inclusion projections must still carry the cursor keys
+        projection.update({field: 1, "id": 1})
+
+    find_query = query
+    if params.cursor:
+        after = keyset_filter(decode_cursor(params.cursor, sort), sort)
+        find_query = {"$and": [query, after]} if query else after
+
+    if params.stream:
+        # Streams walk the whole result set (or up to an explicit limit) straight off the cursor
+        cursor = collection.find(find_query, projection).sort([(field, direction), ("id", direction)])
+        if params.limit is not None:
+            cursor = cursor.limit(params.limit)
+        return Paginated([], None, None, params, stream=NDJSONResponse(cursor))
+
+    page_size = params.page_size(bare_limit)
+    total = await collection.count_documents(query) if params.include_total else None
+    if page_size is None:
+        items = await collection.find(find_query, projection).sort([(field, direction), ("id", direction)]).to_list(length=None)
+        return Paginated(items, None, total, params)
+
+    # Fetch one extra row to learn whether another page exists without a count
+    items = await collection.find(find_query, projection).sort(
+        [(field, direction), ("id", direction)]
+    ).limit(page_size + 1).to_list(page_size + 1)
+
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        next_cursor = encode_cursor(items[-1], sort)
+    return Paginated(items, next_cursor, total, params)
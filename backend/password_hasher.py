@@ -0,0 +1,81 @@
+from concurrent.futures import ThreadPoolExecutor
+from passlib.context import CryptContext
+import asyncio
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class PasswordHasher:
+    """Runs bcrypt hashing/verification on a size-limited thread pool so it never blocks the event loop"""
+
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+        self.context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hasher")
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.max_queue_depth = 0
+        self.completed = 0
+        self.total_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(self.context.verify, plain_password, hashed_password)
+
+    async def _run(self, func, *args):
+        submitted_at = time.perf_counter()
+        with self._lock:
+            self.queued += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queued)
+
+        def job():
+            started_at = time.perf_counter()
+            with self._lock:
+                self.queued -= 1
+                self.active += 1
+                self.total_wait_seconds += started_at - submitted_at
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self.active -= 1
+                    self.completed += 1
+                    self.total_run_seconds += time.perf_counter() - started_at
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, job)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "queue_depth": self.queued,
+                "active": self.active,
+                "max_queue_depth": self.max_queue_depth,
+                "completed": self.completed,
+                "avg_wait_ms": round(self.total_wait_seconds / self.completed * 1000, 2) if self.completed else 0.0,
+                "avg_run_ms": round(self.total_run_seconds / self.completed * 1000, 2) if self.completed else 0.0
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+# Global password hasher instance
+_password_hasher = None
+
+def get_password_hasher() -> PasswordHasher:
+    """Get or create password hasher instance"""
+    global _password_hasher
+    if _password_hasher is None:
+        _password_hasher = PasswordHasher(
+            max_workers=int(os.environ.get('PASSWORD_HASH_WORKERS', 4))
+        )
+    return _password_hasher
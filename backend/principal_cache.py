@@ -0,0 +1,120 @@
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Optional
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class PrincipalCache:
+    """Bounded LRU/TTL cache of authenticated users, keyed by session token or JWT subject"""
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 60.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (user, expires_at_monotonic, session_expires_at)
+        self._keys_by_user = {}  # user_id -> set of cache keys
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def session_key(session_token: str) -> str:
+        return f"session:{session_token}"
+
+    @staticmethod
+    def jwt_key(user_id: str) -> str:
+        return f"jwt:{user_id}"
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return a copy of the cached user, or None on miss/expiry"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            user, expires_at, session_expires_at = entry
+            if expires_at <= time.monotonic() or (
+                session_expires_at is not None and session_expires_at <= datetime.now(timezone.utc)
+            ):
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(user)
+
+    def set(self, key: str, user: dict, session_expires_at: Optional[datetime] = None):
+        """Cache a resolved user under the given key"""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (dict(user), time.monotonic() + self.ttl_seconds, session_expires_at)
+            self._keys_by_user.setdefault(user['id'], set()).add(key)
+
+            while len(self._entries) > self.max_size:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def invalidate_key(self, key: str):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+                self.invalidations += 1
+
+    def invalidate_user(self, user_id: str):
+        """Drop every cached principal (sessions and JWT) belonging to a user"""
+        with self._lock:
+            for key in list(self._keys_by_user.get(user_id, ())):
+                self._remove(key)
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
+
+    def _remove(self, key: str):
+        # Caller must hold self._lock
+        user, _, _ = self._entries.pop(key)
+        keys = self._keys_by_user.get(user['id'])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[user['id']]
+
+
+# Global principal cache instance
+_principal_cache = None
+
+def get_principal_cache() -> PrincipalCache:
+    """Get or create principal cache instance"""
+    global _principal_cache
+    if _principal_cache is None:
+        _principal_cache = PrincipalCache(
+            max_size=int(os.environ.get('PRINCIPAL_CACHE_SIZE', 1024)),
+            ttl_seconds=float(os.environ.get('PRINCIPAL_CACHE_TTL_SECONDS', 60))
+        )
+    return _principal_cache
@@ -0,0 +1,131 @@
+"""
+Whitelisted filter/sort grammar for collection endpoints.
+
+Filters are plain query parameters, one per field, optionally prefixed with
+an operator:
+
+    ?status=in:todo,in_progress&priority=high&due_date=lt:2025-01-01
+    ?expense_date=gte:2025-01-01&expense_date=lt:2025-02-01
+    ?sort=-due_date
+
+Only fields listed in FILTERABLE_FIELDS may be filtered, values are coerced to
+the field's model type, and sorting is limited to fields with a declared
+(field, id) index so every sorted page is an index walk.
+"""
+from fastapi import HTTPException, Query, Request
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Type, Union, get_args, get_origin
+
+from date_codec import to_datetime
+from db_indexes import INDEX_SPECS
+from pagination import DEFAULT_SORT
+
+FILTERABLE_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "clients": ("name", "company", "created_by", "created_at"),
+    "projects": ("status", "client_id", "assigned_to", "deadline", "created_at"),
+    "tasks": ("status", "priority", "project_id", "assigned_to", "due_date", "created_at"),
+    "work_orders": ("status", "priority", "project_id", "assigned_to", "due_date", "created_at"),
+    "employees": ("status", "department", "position", "hire_date", "created_at"),
+    "policies": ("category", "requires_acknowledgment", "effective_date", "created_at"),
+    "fleet_inspections": ("status", "vehicle_name", "vehicle_number", "inspection_date", "created_at"),
+    "invoices": ("status", "client_id", "project_id", "amount", "due_date", "created_at"),
+    "expenses": ("category", "project_id", "amount", "expense_date", "created_at"),
+    "reports": ("report_type", "period", "created_at"),
+    "compliance": ("status", "compliance_type", "due_date", "created_at"),
+    "contracts": ("status", "client_id", "value", "start_date", "end_date", "created_at"),
+    "equipment": ("status", "equipment_type", "location", "assigned_to", "purchase_date", "created_at"),
+    "timesheets": ("employee_name", "project_id", "date", "hours_worked", "created_at"),
+    "safety_reports": ("status", "severity", "incident_type", "location", "incident_date", "created_at"),
+    "certifications": ("status", "certification_type", "employee_name", "issue_date", "expiry_date", "created_at"),
+    "inventory": ("category", "location", "project_id", "supplier", "quantity", "created_at"),
+    "documents": ("category", "document_type", "tags", "created_at"),
+}
+
+# Query parameters owned by other dependencies (pagination, fieldsets, ...)
+RESERVED_PARAMS = {"limit", "cursor", "include_total", "fields", "sort", "stream"}
+
+SCALAR_OPERATORS = {"eq": "$eq", "ne": "$ne", "in": "$in", "nin": "$nin"}
+RANGE_OPERATORS = {"lt": "$lt", "lte": "$lte", "gt": "$gt", "gte": "$gte"}
+
+def field_type(model: Type[BaseModel], name: str) -> type:
+    """The scalar type of a model field, unwrapping Optional[...] and List[...]"""
+    annotation = model.model_fields[name].annotation
+    while get_origin(annotation) in (Union, list, List):
+        annotation = next(arg for arg in get_args(annotation) if arg is not type(None))
+    return annotation
+
+def coerce(value: str, target: type):
+    try:
+        if target is datetime:
+            return to_datetime(value)
+        if target is bool:
+            if value.lower() not in ("true", "false", "1", "0"):
+                raise ValueError(value)
+            return value.lower() in ("true", "1")
+        if target in (int, float):
+            return target(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {target.__name__} value: {value}")
+    return value
+
+def split_operator(raw: str) -> Tuple[str, str]:
+    """'lt:5' -> ('lt', '5'); values without a known operator prefix are equality matches"""
+    operator, separator, value = raw.partition(":")
+    if separator and (operator in SCALAR_OPERATORS or operator in RANGE_OPERATORS or operator == "exists"):
+        return operator, value
+    return "eq", raw
+
+def sortable_fields(collection_name: str) -> set:
+    """Fields with a declared (field, id) compound index"""
+    fields = set()
+    for keys, _ in INDEX_SPECS.get(collection_name, []):
+        if len(keys) == 2 and keys[1][0] == "id" and keys[0][1] == keys[1][1]:
+            fields.add(keys[0][0])
+    return fields
+
+class QueryFilters:
+    """Translates whitelisted filter/sort query parameters into a Mongo query and sort key"""
+
+    def __init__(
+        self,
+        request: Request,
+        sort: Optional[str] = Query(None, description="Sort field, prefixed with - for descending, e.g. sort=-due_date"),
+    ):
+        self.params = request.query_params
+        self.sort_param = sort
+
+    def query(self, collection_name: str, model: Type[BaseModel], base: Optional[dict] = None) -> dict:
+        allowed = FILTERABLE_FIELDS.get(collection_name, ())
+        conditions = {}
+        for name in self.params.keys():
+            if name in RESERVED_PARAMS:
+                continue
+            if name not in allowed:
+                raise HTTPException(status_code=400, detail=f"Filtering on '{name}' is not supported")
+            target = field_type(model, name)
+            for raw in self.params.getlist(name):
+                operator, value = split_operator(raw)
+                condition = conditions.setdefault(name, {})
+                if operator == "exists":
+                    condition["$exists"] = coerce(value, bool)
+                elif operator in ("in", "nin"):
+                    condition[SCALAR_OPERATORS[operator]] = [coerce(item, target) for item in value.split(",") if item]
+                elif operator in RANGE_OPERATORS:
+                    if target not in (int, float, datetime):
+                        raise HTTPException(status_code=400, detail=f"Range filters are not supported on '{name}'")
+                    condition[RANGE_OPERATORS[operator]] = coerce(value, target)
+                else:
+                    condition[SCALAR_OPERATORS[operator]] = coerce(value, target)
+
+        if base and conditions:
+            return {"$and": [base, conditions]}
+        return conditions or base or {}
+
+    def sort(self, collection_name: str) -> tuple:
+        if not self.sort_param:
+            return DEFAULT_SORT
+        field = self.sort_param.lstrip("-")
+        if field not in sortable_fields(collection_name):
+            raise HTTPException(status_code=400, detail=f"Sorting on '{field}' is not supported (no index)")
+        return (field, -1 if self.sort_param.startswith("-") else 1)
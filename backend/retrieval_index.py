@@ -0,0 +1,338 @@
+"""
+Retrieval index that grounds the chat assistant in the company's own data.
+
+/ai/chat used to send the whole company profile with every message, while
+the model knew nothing about the actual projects, tasks or policies, so
+users pasted records in by hand. RetrievalIndex keeps an in-process BM25
+index over projects, tasks, work orders, policies, documents and the
+sections of the company profile (ai_prompts.COMPANY_PROFILE). Each chat turn
+gets only the top-k snippets matching the message that the user may see:
+employees only projects, tasks and work orders assigned to them, as on the
+list endpoints; policies, documents and the profile are visible to all.
+
+The write handlers keep the index current through record(). A periodic
+rebuild from the collections picks up writes made by other servers or
+outside the API; records made while it runs are replayed onto the new index.
+"""
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+import asyncio
+import itertools
+import logging
+import math
+import os
+import re
+import time
+
+import numpy as np
+
+from ai_prompts import COMPANY_PROFILE
+from command_matcher import stem
+
+logger = logging.getLogger(__name__)
+
+COMPANY = "company"
+
+# collection -> (label, title field, snippet fields, visible to employees only when assigned)
+INDEXED_COLLECTIONS: Dict[str, Tuple[str, str, Tuple[str, ...], bool]] = {
+    "projects": ("Project", "name", ("status", "deadline", "address", "description"), True),
+    "tasks": ("Task", "title", ("status", "priority", "due_date", "address", "description"), True),
+    "work_orders": ("Work order", "title", ("status", "priority", "due_date", "address", "description"), True),
+    "policies": ("Policy", "title", ("category", "version", "effective_date", "description"), False),
+    "documents": ("Document", "title", ("category", "document_type", "tags", "description"), False),
+}
+
+SNIPPET_CHARS = 320
+# Results scoring below this share of the best match are left out
+MIN_RELATIVE_SCORE = 0.25
+
+STOPWORDS = frozenset("""
+    a about all an and any are as at be been but by can could did do does for from get had has have how i
+    if in into is it its me my no not of on or our please should so tell than that the their them there
+    these they this to up us was we were what whats when where which who why will with would you your
+""".split())
+
+WORD = re.compile(r"[a-z0-9]+")
+
+def terms(text: str) -> List[str]:
+    return [stem(word) for word in WORD.findall(text.lower()) if word not in STOPWORDS]
+
+def field_text(value) -> str:
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, list):
+        return ", ".join(str(item) for item in value)
+    return str(value)
+
+def document_text(collection: str, doc: dict) -> Tuple[str, str]:
+    """(full text to index, snippet of at most SNIPPET_CHARS) for a record"""
+    label, title_field, fields, _ = INDEXED_COLLECTIONS[collection]
+    title = doc.get(title_field) or "untitled"
+    values, details = [], []
+    description = ""
+    for field in fields:
+        value = doc.get(field)
+        if value in (None, "", []):
+            continue
+        if field == "description":
+            description = " ".join(str(value).split())
+            continue
+        text = field_text(value)
+        if field.endswith("date") or field == "deadline":
+            text = text[:10]
+        values.append(text)
+        details.append(f"{field.replace('_', ' ')}: {text}")
+    snippet = f"{label}: {title}"
+    if details:
+        snippet += f" ({'; '.join(details)})"
+    if description:
+        snippet += f" - {description}"
+    if len(snippet) > SNIPPET_CHARS:
+        snippet = snippet[:SNIPPET_CHARS - 1].rstrip() + "…"
+    # Field names ("status", "priority") are left out of the indexed text so they don't match every record
+    return " ".join([label, title, *values, description]), snippet
+
+class BM25Index:
+    """Okapi BM25 over snippets, updated in place
+
+    Each entry holds a slot in the length/order arrays; a term's postings are
+    kept as a dict for cheap updates and turned into slot/frequency arrays the
+    first time a search needs them after a change, so scoring is vectorized.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[int, int]] = {}  # term -> slot -> frequency
+        self._arrays: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        # key -> (slot, snippet, assignees or None when public, term frequencies)
+        self.entries: Dict[tuple, Tuple[int, str, Optional[frozenset], Counter]] = {}
+        self._keys: List[Optional[tuple]] = []
+        self._free: List[int] = []
+        self._lengths = np.zeros(64, dtype=np.float64)
+        self._order = np.zeros(64, dtype=np.int64)
+        self._sequence = itertools.count(1)
+        self.total_length = 0
+
+    def add(self, key: tuple, text: str, snippet: str, assignees: Optional[frozenset] = None):
+        self.remove(key)
+        frequencies = Counter(terms(text))
+        if self._free:
+            slot = self._free.pop()
+            self._keys[slot] = key
+        else:
+            slot = len(self._keys)
+            self._keys.append(key)
+            if slot == len(self._lengths):
+                self._lengths = np.concatenate([self._lengths, np.zeros_like(self._lengths)])
+                self._order = np.concatenate([self._order, np.zeros_like(self._order)])
+        for term, frequency in frequencies.items():
+            self.postings.setdefault(term, {})[slot] = frequency
+            self._arrays.pop(term, None)
+        length = sum(frequencies.values())
+        self._lengths[slot] = length
+        self._order[slot] = next(self._sequence)
+        self.entries[key] = (slot, snippet, assignees, frequencies)
+        self.total_length += length
+
+    def remove(self, key: tuple):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        slot = entry[0]
+        for term in entry[3]:
+            postings = self.postings[term]
+            del postings[slot]
+            self._arrays.pop(term, None)
+            if not postings:
+                del self.postings[term]
+        self.total_length -= int(self._lengths[slot])
+        self._keys[slot] = None
+        self._free.append(slot)
+
+    def _postings(self, term: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            postings = self.postings.get(term)
+            if not postings:
+                return None
+            arrays = self._arrays[term] = (
+                np.fromiter(postings.keys(), dtype=np.int64, count=len(postings)),
+                np.fromiter(postings.values(), dtype=np.float64, count=len(postings))
+            )
+        return arrays
+
+    def search(self, query: str, k: int, visible: Callable[[Optional[frozenset]], bool]) -> List[Tuple[float, str]]:
+        """Top-k (score, snippet) for query among the entries visible() allows, newest first on ties"""
+        if not self.entries:
+            return []
+        count = len(self.entries)
+        average_length = self.total_length / count or 1.0
+        scores = np.zeros(len(self._keys), dtype=np.float64)
+        for term in set(terms(query)):
+            arrays = self._postings(term)
+            if arrays is None:
+                continue
+            slots, frequencies = arrays
+            idf = math.log(1 + (count - len(slots) + 0.5) / (len(slots) + 0.5))
+            norm = frequencies + self.k1 * (1 - self.b + self.b * self._lengths[slots] / average_length)
+            scores[slots] += idf * frequencies * (self.k1 + 1) / norm
+
+        candidates = np.flatnonzero(scores)
+        if not len(candidates):
+            return []
+        ranked = candidates[np.lexsort((-self._order[candidates], -scores[candidates]))]
+        results = []
+        for slot in ranked:
+            entry = self.entries[self._keys[slot]]
+            if visible(entry[2]):
+                results.append((float(scores[slot]), entry[1]))
+                if len(results) == k:
+                    break
+        if not results:
+            return []
+        floor = results[0][0] * MIN_RELATIVE_SCORE
+        return [(round(score, 3), snippet) for score, snippet in results if score >= floor]
+
+class RetrievalIndex:
+    """Role-aware BM25 retrieval over company records, kept current on writes"""
+
+    def __init__(self, db, top_k: int = 5, rebuild_interval_seconds: float = 900):
+        self.db = db
+        self.top_k = top_k
+        self.rebuild_interval_seconds = rebuild_interval_seconds
+        self._index = self._build({})
+        self._pending: Optional[List[Tuple[str, str, Optional[dict]]]] = None
+        self._task: Optional[asyncio.Task] = None
+        self.last_rebuild: Optional[dict] = None
+        self.searches = 0
+        self.empty_searches = 0
+        self.snippets_returned = 0
+        self.snippet_chars_returned = 0
+
+    @staticmethod
+    def _entry(collection: str, doc: dict) -> Tuple[str, str, Optional[frozenset]]:
+        text, snippet = document_text(collection, doc)
+        if not INDEXED_COLLECTIONS[collection][3]:
+            return text, snippet, None
+        assigned = doc.get("assigned_to") or ()
+        # Older records store a single assignee as a string
+        return text, snippet, frozenset([assigned] if isinstance(assigned, str) else assigned)
+
+    @classmethod
+    def _build(cls, docs: Dict[str, List[dict]]) -> BM25Index:
+        index = BM25Index()
+        for title, text in COMPANY_PROFILE.items():
+            index.add((COMPANY, title), f"{title} {text}", f"{title}: {text}")
+        for collection, items in docs.items():
+            for doc in items:
+                index.add((collection, doc["id"]), *cls._entry(collection, doc))
+        return index
+
+    def record(self, collection: str, item_id: str, doc: Optional[dict]):
+        """Index a created/updated record (its current state), or drop it with doc=None"""
+        if self._pending is not None:
+            self._pending.append((collection, item_id, doc))
+        self._apply(self._index, collection, item_id, doc)
+
+    def _apply(self, index: BM25Index, collection: str, item_id: str, doc: Optional[dict]):
+        try:
+            if doc is None:
+                index.remove((collection, item_id))
+            else:
+                index.add((collection, item_id), *self._entry(collection, doc))
+        except Exception as e:
+            # The next rebuild repairs the index; never fail the user's write over it
+            logger.error(f"Failed to index {collection} {item_id}: {str(e)}")
+
+    def search(self, query: str, user: dict, k: Optional[int] = None) -> List[Tuple[float, str]]:
+        """(score, snippet) of the best matches for query among the records user may see"""
+        user_id = user.get("id")
+        restricted = user.get("role") == "employee"
+
+        def visible(assignees: Optional[frozenset]) -> bool:
+            return assignees is None or not restricted or user_id in assignees
+
+        results = self._index.search(query, k or self.top_k, visible)
+        self.searches += 1
+        self.empty_searches += not results
+        self.snippets_returned += len(results)
+        self.snippet_chars_returned += sum(len(snippet) for _, snippet in results)
+        return results
+
+    def context(self, query: str, user: dict, k: Optional[int] = None) -> str:
+        """The matching snippets as prompt lines ("" when nothing matches)"""
+        return "\n".join(f"- {snippet}" for _, snippet in self.search(query, user, k))
+
+    async def rebuild(self) -> dict:
+        """Re-index every record from the collections and swap the new index in"""
+        started = time.perf_counter()
+        self._pending = []
+        try:
+            docs = {}
+            for collection, (_, title_field, fields, assigned) in INDEXED_COLLECTIONS.items():
+                projection = {"_id": 0, "id": 1, title_field: 1, **{field: 1 for field in fields}}
+                if assigned:
+                    projection["assigned_to"] = 1
+                docs[collection] = await self.db[collection].find({}, projection).to_list(None)
+            index = await asyncio.to_thread(self._build, docs)
+            for collection, item_id, doc in self._pending:
+                self._apply(index, collection, item_id, doc)
+            self._index = index
+        finally:
+            self._pending = None
+
+        self.last_rebuild = {
+            "rebuilt_at": datetime.now(timezone.utc).isoformat(),
+            "entries": len(index.entries),
+            "terms": len(index.postings),
+            "seconds": round(time.perf_counter() - started, 3)
+        }
+        logger.info(f"Retrieval index rebuilt: {self.last_rebuild}")
+        return self.last_rebuild
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._rebuild_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _rebuild_loop(self):
+        while True:
+            try:
+                await self.rebuild()
+            except Exception as e:
+                logger.error(f"Retrieval index rebuild failed: {str(e)}")
+            await asyncio.sleep(self.rebuild_interval_seconds)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._index.entries),
+            "terms": len(self._index.postings),
+            "top_k": self.top_k,
+            "searches": self.searches,
+            "empty_searches": self.empty_searches,
+            "avg_snippets": round(self.snippets_returned / self.searches, 2) if self.searches else 0.0,
+            "avg_context_tokens": round(self.snippet_chars_returned / 4 / self.searches, 1) if self.searches else 0.0,
+            "last_rebuild": self.last_rebuild
+        }
+
+
+# Global retrieval index instance
+_retrieval_index = None
+
+def get_retrieval_index(db) -> RetrievalIndex:
+    """Get or create retrieval index instance"""
+    global _retrieval_index
+    if _retrieval_index is None:
+        _retrieval_index = RetrievalIndex(
+            db,
+            top_k=int(os.environ.get('RETRIEVAL_TOP_K', 5)),
+            rebuild_interval_seconds=float(os.environ.get('RETRIEVAL_REBUILD_SECONDS', 900))
+        )
+    return _retrieval_index
@@ -1,20 +1,40 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, File, UploadFile, Form, Cookie, Response, Request
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Query, status, File, UploadFile, Form, Cookie, Response, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, RedirectResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
 import os
+import asyncio
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict, field_validator, EmailStr
 from typing import List, Optional
 import uuid
 from datetime import datetime, timezone, timedelta
-from passlib.context import CryptContext
 import jwt
-from email_service import get_email_service
+from email_service import get_email_service, use_email_outbox
+from email_outbox import get_email_outbox
+from notification_digest import display_name, get_notification_digest
+from notification_settings import get_notification_settings_cache
+from ai_response_cache import CACHE_TTL_SECONDS, get_ai_response_cache
+from expense_classifier import get_expense_classifier
+from retrieval_index import get_retrieval_index
+from llm_gateway import BATCH as LLM_BATCH, get_llm_gateway
+from principal_cache import get_principal_cache
+from password_hasher import get_password_hasher
+from db_indexes import get_index_manager
+from db_migrations import run_pending_migrations, migration_status
+from pagination import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, PageParams, page_response, paginate
+from date_codec import to_datetime
+from fieldsets import FieldSelection
+from query_filters import QueryFilters
+from streaming import EventSourceResponse, EventStreamParams, NDJSONResponse, StreamParams, STREAM_BATCH_SIZE
+from dashboard_counters import get_dashboard_counters
+from inventory_valuation import get_inventory_valuation
+from hydration import fetch_by_ids, find_one_joined, hydrate
 import shutil
 from authlib.integrations.starlette_client import OAuth
 
@@ -23,7 +43,7 @@ load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(mongo_url, tz_aware=True)
 db = client[os.environ['DB_NAME']]
 
 # OAuth Configuration
@@ -39,7 +59,7 @@ oauth.register(
 )
 
 # Create the main app without a prefix
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Add session middleware for OAuth (required by authlib)
 app.add_middleware(SessionMiddleware, secret_key=os.environ.get('SECRET_KEY', 'your-secret-key-change-in-production'))
@@ -52,18 +72,17 @@ SECRET_KEY = os.environ.get('SECRET_KEY', 'your-secret-key-change-in-production'
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 1440  # 24 hours
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 
 # ============================================
 # AUTHENTICATION UTILITIES
 # ============================================
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password, hashed_password):
+    return await get_password_hasher().verify(plain_password, hashed_password)
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+async def get_password_hash(password):
+    return await get_password_hasher().hash(password)
 
 def create_access_token(data: dict):
     to_encode = data.copy()
@@ -81,15 +100,23 @@ async def get_current_user(
     Authenticate user from session_token cookie (priority) or Authorization header (fallback)
     """
     token = None
+    principal_cache = get_principal_cache()
     
     # Priority 1: Check session_token from cookie (Emergent Auth)
     if session_token:
+        cache_key = principal_cache.session_key(session_token)
+        cached_user = principal_cache.get(cache_key)
+        if cached_user:
+            return cached_user
+        
         session = await db.user_sessions.find_one({"session_token": session_token}, {"_id": 0})
         if session:
             # Check if session is expired
-            if datetime.fromisoformat(session['expires_at']) > datetime.now(timezone.utc):
+            session_expires_at = to_datetime(session['expires_at'])
+            if session_expires_at > datetime.now(timezone.utc):
                 user = await db.users.find_one({"id": session['user_id']}, {"_id": 0})
                 if user and user.get('is_active', True):
+                    principal_cache.set(cache_key, user, session_expires_at=session_expires_at)
                     return user
     
     # Priority 2: Check Authorization header (existing JWT system)
@@ -113,11 +140,17 @@ async def get_current_user(
         except Exception as e:
             raise HTTPException(status_code=401, detail="Could not validate credentials")
         
+        cache_key = principal_cache.jwt_key(user_id)
+        cached_user = principal_cache.get(cache_key)
+        if cached_user:
+            return cached_user
+        
         user = await db.users.find_one({"id": user_id}, {"_id": 0})
         if user is None:
             raise HTTPException(status_code=401, detail="User not found")
         if not user.get('is_active', True):
             raise HTTPException(status_code=403, detail="User account is deactivated")
+        principal_cache.set(cache_key, user)
         return user
     
     raise HTTPException(status_code=401, detail="Not authenticated")
@@ -911,6 +944,10 @@ class NotificationSettings(BaseModel):
     notify_file_upload: bool = True
     notify_status_change: bool = True
     notify_assignments: bool = True
+    # Coalesce a recipient's assignment emails arriving within the window into one digest
+    digest_assignments: bool = True
+    digest_window_seconds: int = 120
+    digest_max_items: int = 20
     enabled: bool = False
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
@@ -925,6 +962,9 @@ class NotificationSettingsUpdate(BaseModel):
     notify_file_upload: Optional[bool] = None
     notify_status_change: Optional[bool] = None
     notify_assignments: Optional[bool] = None
+    digest_assignments: Optional[bool] = None
+    digest_window_seconds: Optional[int] = None
+    digest_max_items: Optional[int] = None
     enabled: Optional[bool] = None
 
 # ============================================
@@ -943,7 +983,7 @@ async def register(user_data: UserCreate):
         raise HTTPException(status_code=400, detail="Invalid or expired invitation code")
     
     # Check if invitation has expired (7 days)
-    if datetime.fromisoformat(invitation['expires_at']) < datetime.now(timezone.utc):
+    if to_datetime(invitation['expires_at']) < datetime.now(timezone.utc):
         raise HTTPException(status_code=400, detail="Invitation code has expired")
     
     # Check if user already exists
@@ -968,8 +1008,7 @@ async def register(user_data: UserCreate):
         role=invitation['role']
     )
     user_dict = user.model_dump()
-    user_dict['password_hash'] = get_password_hash(user_data.password)
-    user_dict['created_at'] = user_dict['created_at'].isoformat()
+    user_dict['password_hash'] = await get_password_hash(user_data.password)
     
     await db.users.insert_one(user_dict)
     
@@ -1007,7 +1046,7 @@ async def login(credentials: UserLogin):
         raise HTTPException(status_code=403, detail="Account is deactivated. Contact admin.")
     
     # Verify password
-    if not verify_password(credentials.password, user['password_hash']):
+    if not await verify_password(credentials.password, user['password_hash']):
         raise HTTPException(status_code=401, detail="Invalid username or password")
     
     # Create access token
@@ -1096,7 +1135,6 @@ async def google_callback(request: Request, response: Response):
             )
             
             user_dict = new_user.model_dump()
-            user_dict['created_at'] = user_dict['created_at'].isoformat()
             # No password_hash for OAuth users
             
             await db.users.insert_one(user_dict)
@@ -1112,11 +1150,11 @@ async def google_callback(request: Request, response: Response):
         )
         
         session_dict = user_session.model_dump()
-        session_dict['created_at'] = session_dict['created_at'].isoformat()
-        session_dict['expires_at'] = session_dict['expires_at'].isoformat()
+        # Kept as a BSON date so the expires_at TTL index can purge it
         
         # Delete old sessions for this user
         await db.user_sessions.delete_many({"user_id": user['id']})
+        get_principal_cache().invalidate_user(user['id'])
         
         # Insert new session
         await db.user_sessions.insert_one(session_dict)
@@ -1149,6 +1187,7 @@ async def logout(response: Response, current_user: dict = Depends(get_current_us
     try:
         # Delete all sessions for this user
         await db.user_sessions.delete_many({"user_id": current_user['id']})
+        get_principal_cache().invalidate_user(current_user['id'])
         
         # Clear cookie
         response.delete_cookie(
@@ -1167,86 +1206,36 @@ async def logout(response: Response, current_user: dict = Depends(get_current_us
 # AI SERVICE - Direct Gemini 2.5 Pro Integration
 # ============================================
 
-from emergentintegrations.llm.chat import LlmChat, UserMessage
-
-EMERGENT_LLM_KEY = os.environ.get('EMERGENT_LLM_KEY')
+from ai_prompts import FORM_ASSIST_PROMPT, FORMFILL_PROMPT, PROPOSAL_PROMPT
+from ai_streaming import chat_events, proposal_events
+from command_matcher import CONFIDENCE_THRESHOLD as COMMAND_CONFIDENCE_THRESHOLD, SCREEN_REGISTRY, CommandMatcher
 
 @api_router.post("/ai/chat")
-async def ai_chat(request: Request, current_user: dict = Depends(get_current_user)):
-    """AI chat assistant using Gemini 2.5 Flash (Fast version)"""
+async def ai_chat(request: Request, events: EventStreamParams = Depends(), current_user: dict = Depends(get_current_user)):
+    """AI chat assistant using Gemini 2.5 Flash (Fast version)
+
+    With `Accept: text/event-stream` or `?stream=1` the reply is streamed as
+    `token` events followed by `done` ({"reply": ...}).
+    """
     try:
         body = await request.json()
         message = body.get('message', '')
         context = body.get('context', {})
         
-        # Custom system message for Williams Diversified
-        system_message = f"""You are the Williams Diversified LLC AI Assistant.
-
-COMPANY PROFILE:
-Company: Williams Diversified LLC
-Description: Nationwide and worldwide rapid-deployment, base-operations, and infrastructure services company. Delivers turnkey emergency response, environmental, power, housing, and logistics solutions through an AI-integrated Command Center.
-
-SCOPE & CAPABILITIES:
-- Reach: Nationwide (all 50 states) and Worldwide (allied bases and overseas missions)
-- Mobilization: 48 hours or less for U.S. deployments
-- Owner/Authorized Officer: Nalen Williams
-
-DIVISIONS:
-1. Rapid Deployment: Disaster response, debris removal, site cleanup, FEMA & USACE logistics
-2. Temporary Housing: Modular housing, base camps, RVs, utilities, crew accommodations
-3. Emergency Power: Generator deployment, fueling, temporary grids, AI power monitoring
-4. Environmental Services: Erosion control, hazardous waste, stormwater/soil remediation, EPA/USACE compliance
-5. Security: Physical & digital site security, patrol, fencing, lighting, access control with AI cameras
-6. Base Operations: BOS and O&M services for military/federal bases (LOGCAP V, AFCAP V, NAVFAC BOS, USACE O&M)
-
-FEDERAL PARTNERS:
-FEMA, USACE, DoD, GSA, AshBritt, Ceres Environmental, Phillips & Jordan, CrowderGulf, Amentum, Fluor, KBR, V2X, AECOM, Jacobs, WSP USA
-
-COMMAND CENTER CAPABILITIES:
-- AI Chat Assist & Auto-Proposal Generator
-- Form-Fill Automation
-- Certified Payroll System (WH-347)
-- Employee Self-Onboarding
-- Plaid Banking Integration
-- Environmental & Compliance Modules
-- Security Command Link
-- Vendor Portal Automation
-
-MISSION: Deliver high-performance, technology-driven solutions that sustain operations and restore infrastructure anywhere in the world.
-
-GOALS:
-- $10-15M annual revenue within 24-30 months
-- Prime and subcontractor capability under FEMA, USACE, DoD programs
-- Global operations expansion
-- AI-automated workflows across all departments
-
-YOUR ROLE:
-- Help employees manage projects, tasks, work orders, and operations
-- Provide disaster response, construction, and federal contracting advice
-- Assist with payroll, compliance, environmental reporting
-- Help compose professional communications
-- Generate proposals and assist with data entry
-- Answer questions about app features and workflows
-- ONLY discuss Williams Diversified business topics
-- Keep responses concise and actionable
-
-CURRENT USER: {current_user.get('first_name', '')} {current_user.get('last_name', '')} ({current_user.get('role', 'employee')})
-CURRENT PAGE: {context.get('current_page', 'Unknown')}
-
-Focus on practical, mission-critical responses relevant to federal contracting and disaster response operations."""
-
-        # Initialize chat with Gemini 2.5 Flash (much faster!)
-        chat = LlmChat(
-            api_key=EMERGENT_LLM_KEY,
-            session_id=f"user_{current_user['id']}",
-            system_message=system_message
-        ).with_model("gemini", "gemini-2.5-flash")  # Changed to Flash for speed
-        
-        # Create user message
-        user_message = UserMessage(text=message)
-        
-        # Get response
-        response = await chat.send_message(user_message)
+        # Williams Diversified assistant prompt (ai_prompts), Gemini 2.5 Flash for speed,
+        # grounded in the profile sections and records matching the message that the user may see
+        session_id = f"user_{current_user['id']}"
+        slots = {
+            "user_name": f"{current_user.get('first_name', '')} {current_user.get('last_name', '')}",
+            "role": current_user.get('role', 'employee'),
+            "current_page": context.get('current_page', 'Unknown'),
+            "records": get_retrieval_index(db).context(message, current_user) or "None matched this message."
+        }
+        
+        if events.requested:
+            return EventSourceResponse(chat_events(get_ai_service().stream_message("chat", session_id, message, **slots)))
+        
+        response = await get_ai_service().complete("chat", session_id, message, **slots)
         
         return {"reply": response}
     except Exception as e:
@@ -1254,60 +1243,26 @@ Focus on practical, mission-critical responses relevant to federal contracting a
         raise HTTPException(status_code=500, detail=f"AI service error: {str(e)}")
 
 @api_router.post("/ai/proposal")
-async def ai_proposal(request: Request, current_user: dict = Depends(get_current_user)):
-    """Generate construction proposal using Gemini 2.5 Flash"""
+async def ai_proposal(request: Request, events: EventStreamParams = Depends(), current_user: dict = Depends(get_current_user)):
+    """Generate construction proposal using Gemini 2.5 Flash
+
+    With `Accept: text/event-stream` or `?stream=1` each top-level proposal field
+    is sent as a `section` event as soon as it is generated, then `done` with the
+    whole proposal.
+    """
     try:
         body = await request.json()
         project = body.get('project', {})
         notes = body.get('notes', '')
         
-        # Custom system message for Williams Diversified proposals
-        system_message = """You are a federal contracting and disaster response proposal expert for Williams Diversified LLC.
-
-COMPANY PROFILE:
-Company: Williams Diversified LLC
-Business: Nationwide and worldwide rapid-deployment, base-operations, and infrastructure services
-Owner/Authorized Officer: Nalen Williams
-
-DIVISIONS & SERVICES:
-1. Rapid Deployment: FEMA/USACE disaster response, debris removal, site cleanup, logistics
-2. Temporary Housing: Modular housing, base camps, RVs, utilities, crew accommodations
-3. Emergency Power: Generator deployment, fueling, temporary grids, AI power monitoring
-4. Environmental: Erosion control, hazardous waste, stormwater/soil remediation, EPA/USACE compliance
-5. Security: Physical/digital site security, patrol, fencing, lighting, AI camera integration
-6. Base Operations: Military/federal BOS and O&M (LOGCAP V, AFCAP V, NAVFAC BOS, USACE O&M)
-
-FEDERAL CAPABILITIES:
-- FEMA, USACE, DoD, GSA prime and subcontracting
-- 48-hour mobilization for U.S. deployments
-- Nationwide and worldwide operations
-- Full compliance and audit integration
-
-Generate professional federal contracting proposals in JSON format only.
-Focus on disaster response, base operations, environmental services, and infrastructure."""
-
-        # Initialize chat with Gemini 2.5 Flash (faster)
-        chat = LlmChat(
-            api_key=EMERGENT_LLM_KEY,
-            session_id=f"proposal_{current_user['id']}",
-            system_message=system_message
-        ).with_model("gemini", "gemini-2.5-flash")  # Changed to Flash
-        
-        prompt = f"""Generate a construction proposal for:
-Project: {project}
-Notes: {notes}
-
-Return ONLY valid JSON with:
-{{
-  "scopeOfWork": "Detailed work description",
-  "inclusions": [{{"trade": "Trade Name", "items": ["item1", "item2"]}}],
-  "itemizedPricing": [{{"description": "Item", "cost": 0.00}}],
-  "totalLumpSum": 0.00,
-  "notes": "Terms and conditions"
-}}"""
-        
-        user_message = UserMessage(text=prompt)
-        response = await chat.send_message(user_message)
+        # Williams Diversified proposal prompt (ai_prompts), Gemini 2.5 Flash
+        session_id = f"proposal_{current_user['id']}"
+        prompt = PROPOSAL_PROMPT.render(project=project, notes=notes)
+        
+        if events.requested:
+            return EventSourceResponse(proposal_events(get_ai_service().stream_message("proposal", session_id, prompt)))
+        
+        response = await get_ai_service().complete("proposal", session_id, prompt)
         
         # Try to parse as JSON
         import json
@@ -1330,22 +1285,9 @@ async def ai_formfill(request: Request, current_user: dict = Depends(get_current
         schema = body.get('schema', '')
         defaults = body.get('defaults', {})
         
-        # Initialize chat
-        chat = LlmChat(
-            api_key=EMERGENT_LLM_KEY,
-            session_id=f"formfill_{current_user['id']}",
-            system_message="You are a data extraction expert. Convert notes into structured JSON data."
-        ).with_model("gemini", "gemini-2.5-pro")
+        prompt = FORMFILL_PROMPT.render(schema=schema, notes=notes, defaults=defaults)
         
-        prompt = f"""Extract data from these notes and return JSON matching this schema:
-Schema: {schema}
-Notes: {notes}
-Defaults: {defaults}
-
-Return a JSON object with the extracted data."""
-        
-        user_message = UserMessage(text=prompt)
-        response = await chat.send_message(user_message)
+        response = await get_ai_service().complete("formfill", f"formfill_{current_user['id']}", prompt)
         
         # Try to parse as JSON
         import json
@@ -1363,31 +1305,11 @@ Return a JSON object with the extracted data."""
 # AI COMMAND ROUTER - Natural Language Navigation
 # ============================================
 
-# Screen registry for Williams Diversified app
-SCREEN_REGISTRY = [
-    {"key": "dashboard", "path": "/", "aliases": ["home", "command center", "main"]},
-    {"key": "projects", "path": "/projects", "aliases": ["jobs", "sites"]},
-    {"key": "tasks", "path": "/tasks", "aliases": ["to-do", "todos"]},
-    {"key": "work-orders", "path": "/work-orders", "aliases": ["work orders", "jobs"]},
-    {"key": "clients", "path": "/clients", "aliases": ["customers", "contacts"]},
-    {"key": "employees", "path": "/employees", "aliases": ["staff", "team", "workers"]},
-    {"key": "invoices", "path": "/invoices", "aliases": ["billing", "accounts receivable"]},
-    {"key": "expenses", "path": "/expenses", "aliases": ["costs", "spending"]},
-    {"key": "contracts", "path": "/contracts", "aliases": ["agreements"]},
-    {"key": "equipment", "path": "/equipment", "aliases": ["tools", "machinery"]},
-    {"key": "timesheets", "path": "/timesheets", "aliases": ["timecards", "hours", "clock"]},
-    {"key": "inventory", "path": "/inventory", "aliases": ["stock", "materials"]},
-    {"key": "schedules", "path": "/schedules", "aliases": ["calendar", "appointments"]},
-    {"key": "safety", "path": "/safety-reports", "aliases": ["safety reports", "incidents"]},
-    {"key": "certifications", "path": "/certifications", "aliases": ["licenses", "credentials"]},
-    {"key": "reports", "path": "/reports", "aliases": ["analytics", "metrics"]},
-    {"key": "compliance", "path": "/compliance", "aliases": ["regulations"]},
-    {"key": "handbook", "path": "/handbook-policies", "aliases": ["policies", "procedures"]},
-    {"key": "fleet", "path": "/fleet", "aliases": ["fleet inspection", "trucks", "vehicles"]},
-    {"key": "admin", "path": "/admin", "aliases": ["admin panel", "settings", "users"]},
-    {"key": "notifications", "path": "/notifications", "aliases": ["alerts", "email settings"]},
-    {"key": "payroll", "path": "/payroll", "aliases": ["certified payroll", "wh-347", "pay run"]},
-]
+# Screen registry and its local matcher, built once at startup
+command_matcher = CommandMatcher(SCREEN_REGISTRY)
+
+# The registry as shown to the LLM in the command prompt, built once
+SCREEN_REGISTRY_PROMPT = str([{"key": s['key'], "path": s['path'], "aliases": s['aliases']} for s in SCREEN_REGISTRY])
 
 @api_router.post("/ai/command")
 async def ai_command_router(request: Request, current_user: dict = Depends(get_current_user)):
@@ -1399,47 +1321,18 @@ async def ai_command_router(request: Request, current_user: dict = Depends(get_c
         if not command:
             return {"error": "Missing command"}
         
-        # Try simple keyword matching first (fast)
-        command_lower = command.lower()
-        for screen in SCREEN_REGISTRY:
-            if screen['key'] in command_lower or screen['path'] in command_lower:
-                return {
-                    "intent": "NAVIGATE",
-                    "route": screen['path'],
-                    "screen_key": screen['key'],
-                    "confidence": 0.9,
-                    "reason": "keyword_match"
-                }
-            for alias in screen['aliases']:
-                if alias in command_lower:
-                    return {
-                        "intent": "NAVIGATE",
-                        "route": screen['path'],
-                        "screen_key": screen['key'],
-                        "confidence": 0.85,
-                        "reason": "alias_match"
-                    }
-        
-        # If no simple match, use AI (Gemini Flash for speed)
-        system_message = """You map user commands to app navigation routes.
-Screen registry available:
-""" + str([{"key": s['key'], "path": s['path'], "aliases": s['aliases']} for s in SCREEN_REGISTRY]) + """
-
-Return JSON with:
-- intent: "NAVIGATE" or "UNKNOWN"
-- route: the path (e.g. "/projects") or empty
-- screen_key: the screen key or empty
-- confidence: 0-1
-- reason: brief explanation"""
-
-        chat = LlmChat(
-            api_key=EMERGENT_LLM_KEY,
-            session_id=f"nav_{current_user['id']}",
-            system_message=system_message
-        ).with_model("gemini", "gemini-2.5-flash")
-        
-        user_message = UserMessage(text=f"User command: {command}")
-        response = await chat.send_message(user_message)
+        # Try the local matcher first (fast, tolerates typos and filler words)
+        match = command_matcher.match(command)
+        if match and match['confidence'] >= COMMAND_CONFIDENCE_THRESHOLD:
+            return match
+        
+        # Not confident locally: use AI (Gemini Flash for speed); repeated commands come from the response cache
+        response = await get_ai_service().complete(
+            "command",
+            f"nav_{current_user['id']}",
+            f"User command: {command}",
+            screens=SCREEN_REGISTRY_PROMPT
+        )
         
         # Parse AI response
         import json
@@ -1447,16 +1340,14 @@ Return JSON with:
             result = json.loads(response)
             if result.get('intent') == 'NAVIGATE' and result.get('route'):
                 return result
-            else:
-                return {
-                    "intent": "UNKNOWN",
-                    "suggestions": [s['path'] for s in SCREEN_REGISTRY[:5]]
-                }
         except:
-            return {
-                "intent": "UNKNOWN",
-                "suggestions": [s['path'] for s in SCREEN_REGISTRY[:5]]
-            }
+            pass
+        # Suggest the local candidates, if there were any
+        suggestions = [match['route']] + match.get('alternatives', []) if match else [s['path'] for s in SCREEN_REGISTRY[:5]]
+        return {
+            "intent": "UNKNOWN",
+            "suggestions": suggestions
+        }
             
     except Exception as e:
         logging.error(f"Command router error: {str(e)}")
@@ -1466,16 +1357,19 @@ Return JSON with:
 # API ROUTES - ADMIN - USER MANAGEMENT
 # ============================================
 
-@api_router.get("/admin/users", response_model=List[UserResponse])
-async def get_all_users(admin_user: dict = Depends(get_admin_user)):
-    users = await db.users.find({}, {"_id": 0, "password_hash": 0}).to_list(1000)
-    # Ensure all users have required fields with defaults
+def fill_user_defaults(users: List[dict]):
+    """Ensure all users have required fields with defaults"""
     for user in users:
         if 'role' not in user:
             user['role'] = 'employee'
         if 'is_active' not in user:
             user['is_active'] = True
-    return users
+
+@api_router.get("/admin/users", response_model=page_response(UserResponse))
+async def get_all_users(page: PageParams = Depends(), fields: FieldSelection = Depends(), admin_user: dict = Depends(get_admin_user)):
+    users = await paginate(db.users, {}, page, projection=fields.projection(UserResponse, default={"_id": 0, "password_hash": 0}))
+    await users.hydrate(fill_user_defaults)
+    return fields.response(UserResponse, users.response())
 
 @api_router.put("/admin/users/{user_id}")
 async def update_user(user_id: str, user_data: UserUpdate, admin_user: dict = Depends(get_admin_user)):
@@ -1486,6 +1380,7 @@ async def update_user(user_id: str, user_data: UserUpdate, admin_user: dict = De
     update_data = {k: v for k, v in user_data.model_dump().items() if v is not None}
     if update_data:
         await db.users.update_one({"id": user_id}, {"$set": update_data})
+        get_principal_cache().invalidate_user(user_id)
     
     updated_user = await db.users.find_one({"id": user_id}, {"_id": 0, "password_hash": 0})
     return updated_user
@@ -1497,6 +1392,7 @@ async def delete_user(user_id: str, admin_user: dict = Depends(get_admin_user)):
         raise HTTPException(status_code=400, detail="Cannot delete your own account")
     
     result = await db.users.delete_one({"id": user_id})
+    get_principal_cache().invalidate_user(user_id)
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="User not found")
     return {"message": "User deleted successfully"}
@@ -1533,17 +1429,15 @@ async def create_invitation(invitation_data: InvitationCreate, admin_user: dict
     )
     
     invitation_dict = invitation.model_dump()
-    invitation_dict['created_at'] = invitation_dict['created_at'].isoformat()
-    invitation_dict['expires_at'] = invitation_dict['expires_at'].isoformat()
     
     await db.invitations.insert_one(invitation_dict)
     
     # Send invitation email
     try:
-        # Get notification settings for email configuration
-        notification_settings = await db.notification_settings.find_one({}, {"_id": 0})
+        # Shared sender, configured from the cached notification settings
+        email_svc = await get_notification_settings_cache(db).email_service()
         
-        if notification_settings and notification_settings.get('smtp_server'):
+        if email_svc.enabled:
             # Create registration link
             # Frontend is on the same domain as backend (which includes /api)
             # Get backend URL from environment or use default
@@ -1592,7 +1486,7 @@ async def create_invitation(invitation_data: InvitationCreate, admin_user: dict
                 <p style="margin: 5px 0;"><strong>Your Invitation Details:</strong></p>
                 <p style="margin: 5px 0;">👤 Role: <strong>{invitation_data.role.title()}</strong></p>
                 <p style="margin: 5px 0;">🔑 Invitation Code: <span class="code">{invitation_code}</span></p>
-                <p style="margin: 5px 0;">⏰ Expires: <strong>{datetime.fromisoformat(invitation_dict['expires_at']).strftime('%B %d, %Y at %I:%M %p UTC')}</strong></p>
+                <p style="margin: 5px 0;">⏰ Expires: <strong>{invitation_dict['expires_at'].strftime('%B %d, %Y at %I:%M %p UTC')}</strong></p>
             </div>
             
             <p><strong>To complete your registration, click the button below:</strong></p>
@@ -1621,14 +1515,6 @@ async def create_invitation(invitation_data: InvitationCreate, admin_user: dict
 """
             
             # Send email using email service
-            email_svc = get_email_service(
-                smtp_server=notification_settings.get('smtp_server'),
-                smtp_port=notification_settings.get('smtp_port'),
-                username=notification_settings.get('smtp_username'),
-                password=notification_settings.get('smtp_password'),
-                from_email=notification_settings.get('admin_email', notification_settings.get('smtp_username'))
-            )
-            
             await email_svc.send_email(
                 to_email=invitation_data.email,
                 subject=subject,
@@ -1651,9 +1537,9 @@ async def create_invitation(invitation_data: InvitationCreate, admin_user: dict
     }
 
 @api_router.get("/admin/invitations")
-async def get_invitations(admin_user: dict = Depends(get_admin_user)):
-    invitations = await db.invitations.find({}, {"_id": 0}).to_list(1000)
-    return invitations
+async def get_invitations(page: PageParams = Depends(), admin_user: dict = Depends(get_admin_user)):
+    invitations = await paginate(db.invitations, {}, page)
+    return invitations.response()
 
 @api_router.delete("/admin/invitations/{invitation_id}")
 async def delete_invitation(invitation_id: str, admin_user: dict = Depends(get_admin_user)):
@@ -1669,29 +1555,12 @@ async def delete_invitation(invitation_id: str, admin_user: dict = Depends(get_a
 @api_router.get("/admin/notification-settings")
 async def get_notification_settings(admin_user: dict = Depends(get_admin_user)):
     """Get notification settings"""
-    settings = await db.notification_settings.find_one({}, {"_id": 0})
+    settings_cache = get_notification_settings_cache(db)
+    settings = await settings_cache.get()
     if not settings:
-        # Return default settings
-        default_settings = {
-            "id": str(uuid.uuid4()),
-            "admin_email": "admin@williamsdiverse.com",
-            "smtp_server": "smtp.gmail.com",
-            "smtp_port": 587,
-            "smtp_username": "",
-            "smtp_password": "",
-            "smtp_from_email": "",
-            "notify_task_created": True,
-            "notify_file_upload": True,
-            "notify_status_change": True,
-            "notify_assignments": True,
-            "enabled": False,
-            "updated_at": datetime.now(timezone.utc).isoformat()
-        }
-        await db.notification_settings.insert_one(default_settings)
-        return default_settings
+        # Store and return default settings
+        settings = await settings_cache.save({})
     
-    if isinstance(settings.get('updated_at'), datetime):
-        settings['updated_at'] = settings['updated_at'].isoformat()
     return settings
 
 @api_router.put("/admin/notification-settings")
@@ -1700,70 +1569,21 @@ async def update_notification_settings(
     admin_user: dict = Depends(get_admin_user)
 ):
     """Update notification settings"""
-    current_settings = await db.notification_settings.find_one({}, {"_id": 0})
-    
-    if not current_settings:
-        # Create new settings
-        new_settings = {
-            "id": str(uuid.uuid4()),
-            "admin_email": "admin@williamsdiverse.com",
-            "smtp_server": "smtp.gmail.com",
-            "smtp_port": 587,
-            "smtp_username": "",
-            "smtp_password": "",
-            "smtp_from_email": "",
-            "notify_task_created": True,
-            "notify_file_upload": True,
-            "notify_status_change": True,
-            "notify_assignments": True,
-            "enabled": False,
-            "updated_at": datetime.now(timezone.utc).isoformat()
-        }
-        current_settings = new_settings
-    
-    # Update with provided values
-    update_data = settings_update.model_dump(exclude_unset=True)
-    update_data['updated_at'] = datetime.now(timezone.utc).isoformat()
-    
-    for key, value in update_data.items():
-        current_settings[key] = value
-    
-    # Update or insert
-    await db.notification_settings.update_one(
-        {},
-        {"$set": current_settings},
-        upsert=True
-    )
-    
-    # Reload email service with new settings if enabled
-    if current_settings.get('enabled'):
-        get_email_service(
-            smtp_server=current_settings.get('smtp_server'),
-            smtp_port=current_settings.get('smtp_port'),
-            username=current_settings.get('smtp_username'),
-            password=current_settings.get('smtp_password'),
-            from_email=current_settings.get('smtp_from_email')
-        )
-    
-    return current_settings
+    # Saving refreshes the cached settings, which reconfigures the email service and digest
+    return await get_notification_settings_cache(db).save(settings_update.model_dump(exclude_unset=True))
 
 @api_router.post("/admin/test-notification")
 async def test_notification(admin_user: dict = Depends(get_admin_user)):
     """Send a test notification email"""
-    settings = await db.notification_settings.find_one({}, {"_id": 0})
+    settings_cache = get_notification_settings_cache(db)
+    settings = await settings_cache.get()
     
-    if not settings or not settings.get('enabled'):
+    if not settings.get('enabled'):
         raise HTTPException(status_code=400, detail="Email notifications are not enabled")
     
-    email_service = get_email_service(
-        smtp_server=settings.get('smtp_server'),
-        smtp_port=settings.get('smtp_port'),
-        username=settings.get('smtp_username'),
-        password=settings.get('smtp_password'),
-        from_email=settings.get('smtp_from_email')
-    )
+    email_service = await settings_cache.email_service()
     
-    success = email_service.send_email(
+    success = await email_service.send_now(
         to_email=settings.get('admin_email'),
         subject="Test Notification - Project Command Center",
         body="""
@@ -1791,47 +1611,37 @@ async def test_notification(admin_user: dict = Depends(get_admin_user)):
 # API ROUTES - USERS
 # ============================================
 
-@api_router.get("/users", response_model=List[UserResponse])
-async def get_users(current_user: dict = Depends(get_current_user)):
-    users = await db.users.find({}, {"_id": 0, "password_hash": 0}).to_list(1000)
-    # Ensure all users have required fields with defaults
-    for user in users:
-        if 'role' not in user:
-            user['role'] = 'employee'
-        if 'is_active' not in user:
-            user['is_active'] = True
-    return users
+@api_router.get("/users", response_model=page_response(UserResponse))
+async def get_users(page: PageParams = Depends(), fields: FieldSelection = Depends(), current_user: dict = Depends(get_current_user)):
+    users = await paginate(db.users, {}, page, projection=fields.projection(UserResponse, default={"_id": 0, "password_hash": 0}))
+    await users.hydrate(fill_user_defaults)
+    return fields.response(UserResponse, users.response())
 
 # ============================================
 # API ROUTES - CLIENTS
 # ============================================
 
-@api_router.get("/clients", response_model=List[Client])
-async def get_clients(current_user: dict = Depends(get_current_user)):
-    clients = await db.clients.find({}, {"_id": 0}).to_list(1000)
-    for client in clients:
-        if isinstance(client['created_at'], str):
-            client['created_at'] = datetime.fromisoformat(client['created_at'])
-    return clients
+@api_router.get("/clients", response_model=page_response(Client))
+async def get_clients(page: PageParams = Depends(), fields: FieldSelection = Depends(), filters: QueryFilters = Depends(), current_user: dict = Depends(get_current_user)):
+    clients = await paginate(db.clients, filters.query("clients", Client), page, projection=fields.projection(Client), sort=filters.sort("clients"))
+    return fields.response(Client, clients.response())
 
 @api_router.post("/clients", response_model=Client)
 async def create_client(client_data: ClientCreate, current_user: dict = Depends(get_current_user)):
     client = Client(**client_data.model_dump(), created_by=current_user['id'])
     client_dict = client.model_dump()
-    client_dict['created_at'] = client_dict['created_at'].isoformat()
     
     await db.clients.insert_one(client_dict)
+    await get_dashboard_counters(db).record("clients", None, client_dict)
     return client
 
 @api_router.get("/clients/{client_id}", response_model=Client)
-async def get_client(client_id: str, current_user: dict = Depends(get_current_user)):
-    client = await db.clients.find_one({"id": client_id}, {"_id": 0})
+async def get_client(client_id: str, fields: FieldSelection = Depends(), current_user: dict = Depends(get_current_user)):
+    client = await db.clients.find_one({"id": client_id}, fields.projection(Client))
     if not client:
         raise HTTPException(status_code=404, detail="Client not found")
     
-    if isinstance(client['created_at'], str):
-        client['created_at'] = datetime.fromisoformat(client['created_at'])
-    return client
+    return fields.response(Client, client, many=False)
 
 @api_router.put("/clients/{client_id}", response_model=Client)
 async def update_client(client_id: str, client_data: ClientUpdate, current_user: dict = Depends(get_current_user)):
@@ -1844,23 +1654,22 @@ async def update_client(client_id: str, client_data: ClientUpdate, current_user:
         await db.clients.update_one({"id": client_id}, {"$set": update_data})
     
     updated_client = await db.clients.find_one({"id": client_id}, {"_id": 0})
-    if isinstance(updated_client['created_at'], str):
-        updated_client['created_at'] = datetime.fromisoformat(updated_client['created_at'])
     return updated_client
 
 @api_router.delete("/clients/{client_id}")
 async def delete_client(client_id: str, current_user: dict = Depends(get_current_user)):
-    result = await db.clients.delete_one({"id": client_id})
-    if result.deleted_count == 0:
+    deleted = await db.clients.find_one_and_delete({"id": client_id}, {"_id": 0, "status": 1})
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Client not found")
+    await get_dashboard_counters(db).record("clients", deleted, None)
     return {"message": "Client deleted successfully"}
 
 # ============================================
 # API ROUTES - PROJECTS
 # ============================================
 
-@api_router.get("/projects", response_model=List[Project])
-async def get_projects(current_user: dict = Depends(get_current_user)):
+@api_router.get("/projects", response_model=page_response(Project))
+async def get_projects(page: PageParams = Depends(), fields: FieldSelection = Depends(), filters: QueryFilters = Depends(), current_user: dict = Depends(get_current_user)):
     # Employees only see projects assigned to them
     if current_user.get('role') == 'employee':
         query = {"assigned_to": {"$in": [current_user['id']]}}
@@ -1868,13 +1677,8 @@ async def get_projects(current_user: dict = Depends(get_current_user)):
         # Admins and managers see all projects
         query = {}
     
-    projects = await db.projects.find(query, {"_id": 0}).to_list(1000)
-    for project in projects:
-        if isinstance(project['created_at'], str):
-            project['created_at'] = datetime.fromisoformat(project['created_at'])
-        if project.get('deadline') and isinstance(project['deadline'], str):
-            project['deadline'] = datetime.fromisoformat(project['deadline'])
-    return projects
+    projects = await paginate(db.projects, filters.query("projects", Project, query), page, projection=fields.projection(Project), sort=filters.sort("projects"))
+    return fields.response(Project, projects.response())
 
 @api_router.post("/projects", response_model=Project)
 async def create_project(project_data: ProjectCreate, current_user: dict = Depends(get_current_user)):
@@ -1883,51 +1687,58 @@ async def create_project(project_data: ProjectCreate, current_user: dict = Depen
     project = Project(**project_dict)
     
     project_dict = project.model_dump()
-    project_dict['created_at'] = project_dict['created_at'].isoformat()
-    if project_dict.get('deadline'):
-        project_dict['deadline'] = project_dict['deadline'].isoformat()
     
     await db.projects.insert_one(project_dict)
+    await get_dashboard_counters(db).record("projects", None, project_dict)
+    get_retrieval_index(db).record("projects", project.id, project_dict)
     
-    # Send notifications to all assigned users
+    # Notify assigned users (coalesced per recipient, see notification_digest)
     if project.assigned_to:
         email_service = get_email_service()
+        notification_digest = get_notification_digest(db)
         portal_url = os.environ.get('REACT_APP_BACKEND_URL', 'https://williams-portal.preview.emergentagent.com')
-        for user_id in project.assigned_to:
+        assigned_by = f"{current_user.get('first_name', '')} {current_user.get('last_name', '')}".strip() or current_user['username']
+        assigned_users = await fetch_by_ids(db.users, project.assigned_to, projection={"_id": 0, "password_hash": 0})
+        recipients = [assigned_users[user_id] for user_id in project.assigned_to if assigned_users.get(user_id, {}).get('email')]
+        start_date_str = datetime.now(timezone.utc).strftime('%B %d, %Y')
+        end_date_str = project.deadline.strftime('%B %d, %Y') if project.deadline else 'To be determined'
+        try:
+            emails = email_service.build_assignment_emails(
+                "project",
+                [(display_name(user), user.get('role', 'employee')) for user in recipients],
+                project_name=project.name,
+                project_description=project.description or 'No description provided',
+                start_date=start_date_str,
+                end_date=end_date_str,
+                assigned_by=assigned_by,
+                portal_url=f"{portal_url}/projects"
+            )
+        except Exception as e:
+            print(f"Failed to build assignment emails: {e}")
+            emails = []
+        for user, email in zip(recipients, emails):
             try:
-                user = await db.users.find_one({"id": user_id}, {"_id": 0})
-                if user and user.get('email'):
-                    user_name = f"{user.get('first_name', '')} {user.get('last_name', '')}".strip() or user['username']
-                    start_date_str = datetime.now(timezone.utc).strftime('%B %d, %Y')
-                    end_date_str = project.deadline.strftime('%B %d, %Y') if project.deadline else 'To be determined'
-                    
-                    await email_service.send_project_assignment_email(
-                        to_email=user['email'],
-                        user_name=user_name,
-                        user_role=user.get('role', 'employee'),
-                        project_name=project.name,
-                        project_description=project.description or 'No description provided',
-                        start_date=start_date_str,
-                        end_date=end_date_str,
-                        assigned_by=f"{current_user.get('first_name', '')} {current_user.get('last_name', '')}".strip() or current_user['username'],
-                        portal_url=f"{portal_url}/projects"
-                    )
+                await notification_digest.add(
+                    user,
+                    item_type="project",
+                    item_id=project.id,
+                    item_title=project.name,
+                    assigned_by=assigned_by,
+                    portal_url=f"{portal_url}/projects",
+                    email=email
+                )
             except Exception as e:
-                print(f"Failed to send notification to user {user_id}: {e}")
+                print(f"Failed to send notification to user {user['id']}: {e}")
     
     return project
 
 @api_router.get("/projects/{project_id}", response_model=Project)
-async def get_project(project_id: str, current_user: dict = Depends(get_current_user)):
-    project = await db.projects.find_one({"id": project_id}, {"_id": 0})
+async def get_project(project_id: str, fields: FieldSelection = Depends(), current_user: dict = Depends(get_current_user)):
+    project = await db.projects.find_one({"id": project_id}, fields.projection(Project))
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    if isinstance(project['created_at'], str):
-        project['created_at'] = datetime.fromisoformat(project['created_at'])
-    if project.get('deadline') and isinstance(project['deadline'], str):
-        project['deadline'] = datetime.fromisoformat(project['deadline'])
-    return project
+    return fields.response(Project, project, many=False)
 
 @api_router.put("/projects/{project_id}", response_model=Project)
 async def update_project(project_id: str, project_data: ProjectUpdate, current_user: dict = Depends(get_current_user)):
@@ -1936,8 +1747,6 @@ async def update_project(project_id: str, project_data: ProjectUpdate, current_u
         raise HTTPException(status_code=404, detail="Project not found")
     
     update_data = {k: v for k, v in project_data.model_dump().items() if v is not None}
-    if update_data.get('deadline'):
-        update_data['deadline'] = update_data['deadline'].isoformat()
     
     # Check for new user assignments
     old_assigned = set(project.get('assigned_to') or [])
@@ -1946,54 +1755,68 @@ async def update_project(project_id: str, project_data: ProjectUpdate, current_u
     
     if update_data:
         await db.projects.update_one({"id": project_id}, {"$set": update_data})
+        await get_dashboard_counters(db).record("projects", project, {**project, **update_data})
     
-    # Send notifications to newly assigned users
+    # Notify newly assigned users (coalesced per recipient, see notification_digest)
     if newly_assigned:
         email_service = get_email_service()
+        notification_digest = get_notification_digest(db)
         portal_url = os.environ.get('REACT_APP_BACKEND_URL', 'https://williams-portal.preview.emergentagent.com')
-        for user_id in newly_assigned:
+        assigned_by = f"{current_user.get('first_name', '')} {current_user.get('last_name', '')}".strip() or current_user['username']
+        assigned_users = await fetch_by_ids(db.users, newly_assigned, projection={"_id": 0, "password_hash": 0})
+        recipients = [assigned_users[user_id] for user_id in newly_assigned if assigned_users.get(user_id, {}).get('email')]
+        start_date_str = datetime.now(timezone.utc).strftime('%B %d, %Y')
+
+        deadline_str = project.get('deadline', 'To be determined')
+        if isinstance(deadline_str, str) and deadline_str != 'To be determined':
             try:
-                user = await db.users.find_one({"id": user_id}, {"_id": 0})
-                if user and user.get('email'):
-                    user_name = f"{user.get('first_name', '')} {user.get('last_name', '')}".strip() or user['username']
-                    start_date_str = datetime.now(timezone.utc).strftime('%B %d, %Y')
-                    
-                    deadline_str = project.get('deadline', 'To be determined')
-                    if isinstance(deadline_str, str) and deadline_str != 'To be determined':
-                        try:
-                            deadline_obj = datetime.fromisoformat(deadline_str)
-                            deadline_str = deadline_obj.strftime('%B %d, %Y')
-                        except:
-                            pass
-                    elif isinstance(deadline_str, datetime):
-                        deadline_str = deadline_str.strftime('%B %d, %Y')
-                    
-                    await email_service.send_project_assignment_email(
-                        to_email=user['email'],
-                        user_name=user_name,
-                        user_role=user.get('role', 'employee'),
-                        project_name=project['name'],
-                        project_description=project.get('description', 'No description provided'),
-                        start_date=start_date_str,
-                        end_date=deadline_str,
-                        assigned_by=f"{current_user.get('first_name', '')} {current_user.get('last_name', '')}".strip() or current_user['username'],
-                        portal_url=f"{portal_url}/projects"
-                    )
+                deadline_obj = datetime.fromisoformat(deadline_str)
+                deadline_str = deadline_obj.strftime('%B %d, %Y')
+            except:
+                pass
+        elif isinstance(deadline_str, datetime):
+            deadline_str = deadline_str.strftime('%B %d, %Y')
+
+        try:
+            emails = email_service.build_assignment_emails(
+                "project",
+                [(display_name(user), user.get('role', 'employee')) for user in recipients],
+                project_name=project['name'],
+                project_description=project.get('description', 'No description provided'),
+                start_date=start_date_str,
+                end_date=deadline_str,
+                assigned_by=assigned_by,
+                portal_url=f"{portal_url}/projects"
+            )
+        except Exception as e:
+            print(f"Failed to build assignment emails: {e}")
+            emails = []
+        for user, email in zip(recipients, emails):
+            try:
+                await notification_digest.add(
+                    user,
+                    item_type="project",
+                    item_id=project['id'],
+                    item_title=project['name'],
+                    assigned_by=assigned_by,
+                    portal_url=f"{portal_url}/projects",
+                    email=email
+                )
             except Exception as e:
-                print(f"Failed to send notification to user {user_id}: {e}")
+                print(f"Failed to send notification to user {user['id']}: {e}")
     
     updated_project = await db.projects.find_one({"id": project_id}, {"_id": 0})
-    if isinstance(updated_project['created_at'], str):
-        updated_project['created_at'] = datetime.fromisoformat(updated_project['created_at'])
-    if updated_project.get('deadline') and isinstance(updated_project['deadline'], str):
-        updated_project['deadline'] = datetime.fromisoformat(updated_project['deadline'])
+    if updated_project:
+        get_retrieval_index(db).record("projects", project_id, updated_project)
     return updated_project
 
 @api_router.delete("/projects/{project_id}")
 async def delete_project(project_id: str, current_user: dict = Depends(get_current_user)):
-    result = await db.projects.delete_one({"id": project_id})
-    if result.deleted_count == 0:
+    deleted = await db.projects.find_one_and_delete({"id": project_id}, {"_id": 0, "status": 1})
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Project not found")
+    await get_dashboard_counters(db).record("projects", deleted, None)
+    get_retrieval_index(db).record("projects", project_id, None)
     return {"message": "Project deleted successfully"}
 
 # ============================================
@@ -2027,7 +1850,7 @@ async def upload_file(
             "size": file_path.stat().st_size,
             "content_type": file.content_type,
             "uploaded_by": current_user['username'],
-            "uploaded_at": datetime.now(timezone.utc).isoformat()
+            "uploaded_at": datetime.now(timezone.utc)
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"File upload failed: {str(e)}")
@@ -2046,8 +1869,8 @@ async def get_uploaded_file(filename: str):
 # API ROUTES - TASKS
 # ============================================
 
-@api_router.get("/tasks", response_model=List[Task])
-async def get_tasks(current_user: dict = Depends(get_current_user)):
+@api_router.get("/tasks", response_model=page_response(Task))
+async def get_tasks(page: PageParams = Depends(), fields: FieldSelection = Depends(), filters: QueryFilters = Depends(), current_user: dict = Depends(get_current_user)):
     # Employees only see tasks assigned to them
     if current_user.get('role') == 'employee':
         query = {"assigned_to": {"$in": [current_user['id']]}}
@@ -2055,13 +1878,8 @@ async def get_tasks(current_user: dict = Depends(get_current_user)):
         # Admins and managers see all tasks
         query = {}
     
-    tasks = await db.tasks.find(query, {"_id": 0}).to_list(1000)
-    for task in tasks:
-        if isinstance(task['created_at'], str):
-            task['created_at'] = datetime.fromisoformat(task['created_at'])
-        if task.get('due_date') and isinstance(task['due_date'], str):
-            task['due_date'] = datetime.fromisoformat(task['due_date'])
-    return tasks
+    tasks = await paginate(db.tasks, filters.query("tasks", Task, query), page, projection=fields.projection(Task), sort=filters.sort("tasks"))
+    return fields.response(Task, tasks.response())
 
 @api_router.post("/tasks", response_model=Task)
 async def create_task(task_data: TaskCreate, current_user: dict = Depends(get_current_user)):
@@ -2070,50 +1888,57 @@ async def create_task(task_data: TaskCreate, current_user: dict = Depends(get_cu
     task = Task(**task_dict)
     
     task_dict = task.model_dump()
-    task_dict['created_at'] = task_dict['created_at'].isoformat()
-    if task_dict.get('due_date'):
-        task_dict['due_date'] = task_dict['due_date'].isoformat()
     
     await db.tasks.insert_one(task_dict)
+    await get_dashboard_counters(db).record("tasks", None, task_dict)
+    get_retrieval_index(db).record("tasks", task.id, task_dict)
     
-    # Send notifications to all assigned users
+    # Notify assigned users (coalesced per recipient, see notification_digest)
     if task.assigned_to:
         email_service = get_email_service()
+        notification_digest = get_notification_digest(db)
         portal_url = os.environ.get('REACT_APP_BACKEND_URL', 'https://williams-portal.preview.emergentagent.com')
-        for user_id in task.assigned_to:
+        assigned_by = f"{current_user.get('first_name', '')} {current_user.get('last_name', '')}".strip() or current_user['username']
+        assigned_users = await fetch_by_ids(db.users, task.assigned_to, projection={"_id": 0, "password_hash": 0})
+        recipients = [assigned_users[user_id] for user_id in task.assigned_to if assigned_users.get(user_id, {}).get('email')]
+        due_date_str = task.due_date.strftime('%B %d, %Y') if task.due_date else 'Not specified'
+        try:
+            emails = email_service.build_assignment_emails(
+                "task",
+                [(display_name(user), user.get('role', 'employee')) for user in recipients],
+                task_title=task.title,
+                task_description=task.description or 'No description provided',
+                due_date=due_date_str,
+                priority=task.priority.capitalize(),
+                assigned_by=assigned_by,
+                portal_url=f"{portal_url}/tasks"
+            )
+        except Exception as e:
+            print(f"Failed to build assignment emails: {e}")
+            emails = []
+        for user, email in zip(recipients, emails):
             try:
-                user = await db.users.find_one({"id": user_id}, {"_id": 0})
-                if user and user.get('email'):
-                    user_name = f"{user.get('first_name', '')} {user.get('last_name', '')}".strip() or user['username']
-                    due_date_str = task.due_date.strftime('%B %d, %Y') if task.due_date else 'Not specified'
-                    
-                    await email_service.send_task_assignment_email(
-                        to_email=user['email'],
-                        user_name=user_name,
-                        user_role=user.get('role', 'employee'),
-                        task_title=task.title,
-                        task_description=task.description or 'No description provided',
-                        due_date=due_date_str,
-                        priority=task.priority.capitalize(),
-                        assigned_by=f"{current_user.get('first_name', '')} {current_user.get('last_name', '')}".strip() or current_user['username'],
-                        portal_url=f"{portal_url}/tasks"
-                    )
+                await notification_digest.add(
+                    user,
+                    item_type="task",
+                    item_id=task.id,
+                    item_title=task.title,
+                    assigned_by=assigned_by,
+                    portal_url=f"{portal_url}/tasks",
+                    email=email
+                )
             except Exception as e:
-                print(f"Failed to send notification to user {user_id}: {e}")
+                print(f"Failed to send notification to user {user['id']}: {e}")
     
     return task
 
 @api_router.get("/tasks/{task_id}", response_model=Task)
-async def get_task(task_id: str, current_user: dict = Depends(get_current_user)):
-    task = await db.tasks.find_one({"id": task_id}, {"_id": 0})
+async def get_task(task_id: str, fields: FieldSelection = Depends(), current_user: dict = Depends(get_current_user)):
+    task = await db.tasks.find_one({"id": task_id}, fields.projection(Task))
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    if isinstance(task['created_at'], str):
-        task['created_at'] = datetime.fromisoformat(task['created_at'])
-    if task.get('due_date') and isinstance(task['due_date'], str):
-        task['due_date'] = datetime.fromisoformat(task['due_date'])
-    return task
+    return fields.response(Task, task, many=False)
 
 @api_router.put("/tasks/{task_id}", response_model=Task)
 async def update_task(task_id: str, task_data: TaskUpdate, current_user: dict = Depends(get_current_user)):
@@ -2122,8 +1947,6 @@ async def update_task(task_id: str, task_data: TaskUpdate, current_user: dict =
         raise HTTPException(status_code=404, detail="Task not found")
     
     update_data = {k: v for k, v in task_data.model_dump().items() if v is not None}
-    if update_data.get('due_date'):
-        update_data['due_date'] = update_data['due_date'].isoformat()
     
     # Check for new user assignments
     old_assigned = set(task.get('assigned_to') or [])
@@ -2132,61 +1955,75 @@ async def update_task(task_id: str, task_data: TaskUpdate, current_user: dict =
     
     if update_data:
         await db.tasks.update_one({"id": task_id}, {"$set": update_data})
+        await get_dashboard_counters(db).record("tasks", task, {**task, **update_data})
     
-    # Send notifications to newly assigned users
+    # Notify newly assigned users (coalesced per recipient, see notification_digest)
     if newly_assigned:
         email_service = get_email_service()
+        notification_digest = get_notification_digest(db)
         portal_url = os.environ.get('REACT_APP_BACKEND_URL', 'https://williams-portal.preview.emergentagent.com')
-        for user_id in newly_assigned:
+        assigned_by = f"{current_user.get('first_name', '')} {current_user.get('last_name', '')}".strip() or current_user['username']
+        assigned_users = await fetch_by_ids(db.users, newly_assigned, projection={"_id": 0, "password_hash": 0})
+        recipients = [assigned_users[user_id] for user_id in newly_assigned if assigned_users.get(user_id, {}).get('email')]
+        due_date_str = task.get('due_date', 'Not specified')
+        if isinstance(due_date_str, str) and due_date_str != 'Not specified':
             try:
-                user = await db.users.find_one({"id": user_id}, {"_id": 0})
-                if user and user.get('email'):
-                    user_name = f"{user.get('first_name', '')} {user.get('last_name', '')}".strip() or user['username']
-                    due_date_str = task.get('due_date', 'Not specified')
-                    if isinstance(due_date_str, str) and due_date_str != 'Not specified':
-                        try:
-                            due_date_obj = datetime.fromisoformat(due_date_str)
-                            due_date_str = due_date_obj.strftime('%B %d, %Y')
-                        except:
-                            pass
-                    elif isinstance(due_date_str, datetime):
-                        due_date_str = due_date_str.strftime('%B %d, %Y')
-                    
-                    await email_service.send_task_assignment_email(
-                        to_email=user['email'],
-                        user_name=user_name,
-                        user_role=user.get('role', 'employee'),
-                        task_title=task['title'],
-                        task_description=task.get('description', 'No description provided'),
-                        due_date=due_date_str,
-                        priority=task.get('priority', 'medium').capitalize(),
-                        assigned_by=f"{current_user.get('first_name', '')} {current_user.get('last_name', '')}".strip() or current_user['username'],
-                        portal_url=f"{portal_url}/tasks"
-                    )
+                due_date_obj = datetime.fromisoformat(due_date_str)
+                due_date_str = due_date_obj.strftime('%B %d, %Y')
+            except:
+                pass
+        elif isinstance(due_date_str, datetime):
+            due_date_str = due_date_str.strftime('%B %d, %Y')
+
+        try:
+            emails = email_service.build_assignment_emails(
+                "task",
+                [(display_name(user), user.get('role', 'employee')) for user in recipients],
+                task_title=task['title'],
+                task_description=task.get('description', 'No description provided'),
+                due_date=due_date_str,
+                priority=task.get('priority', 'medium').capitalize(),
+                assigned_by=assigned_by,
+                portal_url=f"{portal_url}/tasks"
+            )
+        except Exception as e:
+            print(f"Failed to build assignment emails: {e}")
+            emails = []
+        for user, email in zip(recipients, emails):
+            try:
+                await notification_digest.add(
+                    user,
+                    item_type="task",
+                    item_id=task['id'],
+                    item_title=task['title'],
+                    assigned_by=assigned_by,
+                    portal_url=f"{portal_url}/tasks",
+                    email=email
+                )
             except Exception as e:
-                print(f"Failed to send notification to user {user_id}: {e}")
+                print(f"Failed to send notification to user {user['id']}: {e}")
     
     updated_task = await db.tasks.find_one({"id": task_id}, {"_id": 0})
-    if isinstance(updated_task['created_at'], str):
-        updated_task['created_at'] = datetime.fromisoformat(updated_task['created_at'])
-    if updated_task.get('due_date') and isinstance(updated_task['due_date'], str):
-        updated_task['due_date'] = datetime.fromisoformat(updated_task['due_date'])
+    if updated_task:
+        get_retrieval_index(db).record("tasks", task_id, updated_task)
     
     return updated_task
 
 @api_router.delete("/tasks/{task_id}")
 async def delete_task(task_id: str, current_user: dict = Depends(get_current_user)):
-    result = await db.tasks.delete_one({"id": task_id})
-    if result.deleted_count == 0:
+    deleted = await db.tasks.find_one_and_delete({"id": task_id}, {"_id": 0, "status": 1})
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Task not found")
+    await get_dashboard_counters(db).record("tasks", deleted, None)
+    get_retrieval_index(db).record("tasks", task_id, None)
     return {"message": "Task deleted successfully"}
 
 # ============================================
 # API ROUTES - WORK ORDERS
 # ============================================
 
-@api_router.get("/work-orders", response_model=List[WorkOrder])
-async def get_work_orders(current_user: dict = Depends(get_current_user)):
+@api_router.get("/work-orders", response_model=page_response(WorkOrder))
+async def get_work_orders(page: PageParams = Depends(), fields: FieldSelection = Depends(), filters: QueryFilters = Depends(), current_user: dict = Depends(get_current_user)):
     # Employees only see work orders assigned to them
     if current_user.get('role') == 'employee':
         query = {"assigned_to": {"$in": [current_user['id']]}}
@@ -2194,13 +2031,8 @@ async def get_work_orders(current_user: dict = Depends(get_current_user)):
         # Admins and managers see all work orders
         query = {}
     
-    work_orders = await db.work_orders.find(query, {"_id": 0}).to_list(length=None)
-    for work_order in work_orders:
-        if isinstance(work_order['created_at'], str):
-            work_order['created_at'] = datetime.fromisoformat(work_order['created_at'])
-        if work_order.get('due_date') and isinstance(work_order['due_date'], str):
-            work_order['due_date'] = datetime.fromisoformat(work_order['due_date'])
-    return work_orders
+    work_orders = await paginate(db.work_orders, filters.query("work_orders", WorkOrder, query), page, projection=fields.projection(WorkOrder), sort=filters.sort("work_orders"), bare_limit=None)
+    return fields.response(WorkOrder, work_orders.response())
 
 @api_router.post("/work-orders", response_model=WorkOrder)
 async def create_work_order(work_order_data: WorkOrderCreate, current_user: dict = Depends(get_current_user)):
@@ -2209,50 +2041,56 @@ async def create_work_order(work_order_data: WorkOrderCreate, current_user: dict
     work_order = WorkOrder(**work_order_dict)
     
     work_order_dict = work_order.model_dump()
-    work_order_dict['created_at'] = work_order_dict['created_at'].isoformat()
-    if work_order_dict.get('due_date'):
-        work_order_dict['due_date'] = work_order_dict['due_date'].isoformat()
     
     await db.work_orders.insert_one(work_order_dict)
+    get_retrieval_index(db).record("work_orders", work_order.id, work_order_dict)
     
-    # Send notifications to all assigned users
+    # Notify assigned users (coalesced per recipient, see notification_digest)
     if work_order.assigned_to:
         email_service = get_email_service()
+        notification_digest = get_notification_digest(db)
         portal_url = os.environ.get('REACT_APP_BACKEND_URL', 'https://williams-portal.preview.emergentagent.com')
-        for user_id in work_order.assigned_to:
+        assigned_by = f"{current_user.get('first_name', '')} {current_user.get('last_name', '')}".strip() or current_user['username']
+        assigned_users = await fetch_by_ids(db.users, work_order.assigned_to, projection={"_id": 0, "password_hash": 0})
+        recipients = [assigned_users[user_id] for user_id in work_order.assigned_to if assigned_users.get(user_id, {}).get('email')]
+        start_date_str = datetime.now(timezone.utc).strftime('%B %d, %Y')
+        try:
+            emails = email_service.build_assignment_emails(
+                "work_order",
+                [(display_name(user), user.get('role', 'employee')) for user in recipients],
+                work_order_number=work_order.id[:8],  # Use first 8 chars of ID as work order number
+                work_order_title=work_order.title,
+                assigned_by=assigned_by,
+                start_date=start_date_str,
+                location=work_order.address or 'To be determined',
+                portal_url=f"{portal_url}/work-orders"
+            )
+        except Exception as e:
+            print(f"Failed to build assignment emails: {e}")
+            emails = []
+        for user, email in zip(recipients, emails):
             try:
-                user = await db.users.find_one({"id": user_id}, {"_id": 0})
-                if user and user.get('email'):
-                    user_name = f"{user.get('first_name', '')} {user.get('last_name', '')}".strip() or user['username']
-                    start_date_str = datetime.now(timezone.utc).strftime('%B %d, %Y')
-                    
-                    await email_service.send_work_order_assignment_email(
-                        to_email=user['email'],
-                        user_name=user_name,
-                        user_role=user.get('role', 'employee'),
-                        work_order_number=work_order.id[:8],  # Use first 8 chars of ID as work order number
-                        work_order_title=work_order.title,
-                        assigned_by=f"{current_user.get('first_name', '')} {current_user.get('last_name', '')}".strip() or current_user['username'],
-                        start_date=start_date_str,
-                        location=work_order.address or 'To be determined',
-                        portal_url=f"{portal_url}/work-orders"
-                    )
+                await notification_digest.add(
+                    user,
+                    item_type="work_order",
+                    item_id=work_order.id,
+                    item_title=work_order.title,
+                    assigned_by=assigned_by,
+                    portal_url=f"{portal_url}/work-orders",
+                    email=email
+                )
             except Exception as e:
-                print(f"Failed to send notification to user {user_id}: {e}")
+                print(f"Failed to send notification to user {user['id']}: {e}")
     
     return work_order
 
 @api_router.get("/work-orders/{work_order_id}", response_model=WorkOrder)
-async def get_work_order(work_order_id: str, current_user: dict = Depends(get_current_user)):
-    work_order = await db.work_orders.find_one({"id": work_order_id}, {"_id": 0})
+async def get_work_order(work_order_id: str, fields: FieldSelection = Depends(), current_user: dict = Depends(get_current_user)):
+    work_order = await db.work_orders.find_one({"id": work_order_id}, fields.projection(WorkOrder))
     if not work_order:
         raise HTTPException(status_code=404, detail="Work order not found")
     
-    if isinstance(work_order['created_at'], str):
-        work_order['created_at'] = datetime.fromisoformat(work_order['created_at'])
-    if work_order.get('due_date') and isinstance(work_order['due_date'], str):
-        work_order['due_date'] = datetime.fromisoformat(work_order['due_date'])
-    return work_order
+    return fields.response(WorkOrder, work_order, many=False)
 
 @api_router.put("/work-orders/{work_order_id}", response_model=WorkOrder)
 async def update_work_order(work_order_id: str, work_order_data: WorkOrderUpdate, current_user: dict = Depends(get_current_user)):
@@ -2261,8 +2099,6 @@ async def update_work_order(work_order_id: str, work_order_data: WorkOrderUpdate
         raise HTTPException(status_code=404, detail="Work order not found")
     
     update_data = {k: v for k, v in work_order_data.model_dump().items() if v is not None}
-    if update_data.get('due_date'):
-        update_data['due_date'] = update_data['due_date'].isoformat()
     
     # Check for new user assignments
     old_assigned = set(work_order.get('assigned_to') or [])
@@ -2272,36 +2108,46 @@ async def update_work_order(work_order_id: str, work_order_data: WorkOrderUpdate
     if update_data:
         await db.work_orders.update_one({"id": work_order_id}, {"$set": update_data})
     
-    # Send notifications to newly assigned users
+    # Notify newly assigned users (coalesced per recipient, see notification_digest)
     if newly_assigned:
         email_service = get_email_service()
+        notification_digest = get_notification_digest(db)
         portal_url = os.environ.get('REACT_APP_BACKEND_URL', 'https://williams-portal.preview.emergentagent.com')
-        for user_id in newly_assigned:
+        assigned_by = f"{current_user.get('first_name', '')} {current_user.get('last_name', '')}".strip() or current_user['username']
+        assigned_users = await fetch_by_ids(db.users, newly_assigned, projection={"_id": 0, "password_hash": 0})
+        recipients = [assigned_users[user_id] for user_id in newly_assigned if assigned_users.get(user_id, {}).get('email')]
+        start_date_str = datetime.now(timezone.utc).strftime('%B %d, %Y')
+        try:
+            emails = email_service.build_assignment_emails(
+                "work_order",
+                [(display_name(user), user.get('role', 'employee')) for user in recipients],
+                work_order_number=work_order['id'][:8],  # Use first 8 chars of ID as work order number
+                work_order_title=work_order['title'],
+                assigned_by=assigned_by,
+                start_date=start_date_str,
+                location=work_order.get('address', 'To be determined'),
+                portal_url=f"{portal_url}/work-orders"
+            )
+        except Exception as e:
+            print(f"Failed to build assignment emails: {e}")
+            emails = []
+        for user, email in zip(recipients, emails):
             try:
-                user = await db.users.find_one({"id": user_id}, {"_id": 0})
-                if user and user.get('email'):
-                    user_name = f"{user.get('first_name', '')} {user.get('last_name', '')}".strip() or user['username']
-                    start_date_str = datetime.now(timezone.utc).strftime('%B %d, %Y')
-                    
-                    await email_service.send_work_order_assignment_email(
-                        to_email=user['email'],
-                        user_name=user_name,
-                        user_role=user.get('role', 'employee'),
-                        work_order_number=work_order['id'][:8],  # Use first 8 chars of ID as work order number
-                        work_order_title=work_order['title'],
-                        assigned_by=f"{current_user.get('first_name', '')} {current_user.get('last_name', '')}".strip() or current_user['username'],
-                        start_date=start_date_str,
-                        location=work_order.get('address', 'To be determined'),
-                        portal_url=f"{portal_url}/work-orders"
-                    )
+                await notification_digest.add(
+                    user,
+                    item_type="work_order",
+                    item_id=work_order['id'],
+                    item_title=work_order['title'],
+                    assigned_by=assigned_by,
+                    portal_url=f"{portal_url}/work-orders",
+                    email=email
+                )
             except Exception as e:
-                print(f"Failed to send notification to user {user_id}: {e}")
+                print(f"Failed to send notification to user {user['id']}: {e}")
     
     updated_work_order = await db.work_orders.find_one({"id": work_order_id}, {"_id": 0})
-    if isinstance(updated_work_order['created_at'], str):
-        updated_work_order['created_at'] = datetime.fromisoformat(updated_work_order['created_at'])
-    if updated_work_order.get('due_date') and isinstance(updated_work_order['due_date'], str):
-        updated_work_order['due_date'] = datetime.fromisoformat(updated_work_order['due_date'])
+    if updated_work_order:
+        get_retrieval_index(db).record("work_orders", work_order_id, updated_work_order)
     
     return updated_work_order
 
@@ -2310,21 +2156,17 @@ async def delete_work_order(work_order_id: str, current_user: dict = Depends(get
     result = await db.work_orders.delete_one({"id": work_order_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Work order not found")
+    get_retrieval_index(db).record("work_orders", work_order_id, None)
     return {"message": "Work order deleted successfully"}
 
 # ============================================
 # API ROUTES - EMPLOYEES
 # ============================================
 
-@api_router.get("/employees", response_model=List[Employee])
-async def get_employees(current_user: dict = Depends(get_current_user)):
-    employees = await db.employees.find({}, {"_id": 0}).to_list(1000)
-    for employee in employees:
-        if isinstance(employee['created_at'], str):
-            employee['created_at'] = datetime.fromisoformat(employee['created_at'])
-        if employee.get('hire_date') and isinstance(employee['hire_date'], str):
-            employee['hire_date'] = datetime.fromisoformat(employee['hire_date'])
-    return employees
+@api_router.get("/employees", response_model=page_response(Employee))
+async def get_employees(page: PageParams = Depends(), fields: FieldSelection = Depends(), filters: QueryFilters = Depends(), current_user: dict = Depends(get_current_user)):
+    employees = await paginate(db.employees, filters.query("employees", Employee), page, projection=fields.projection(Employee), sort=filters.sort("employees"))
+    return fields.response(Employee, employees.response())
 
 @api_router.post("/employees", response_model=Employee)
 async def create_employee(employee_data: EmployeeCreate, current_user: dict = Depends(get_current_user)):
@@ -2335,24 +2177,18 @@ async def create_employee(employee_data: EmployeeCreate, current_user: dict = De
     
     employee = Employee(**employee_data.model_dump(), created_by=current_user['id'])
     employee_dict = employee.model_dump()
-    employee_dict['created_at'] = employee_dict['created_at'].isoformat()
-    if employee_dict.get('hire_date'):
-        employee_dict['hire_date'] = employee_dict['hire_date'].isoformat()
     
     await db.employees.insert_one(employee_dict)
+    await get_dashboard_counters(db).record("employees", None, employee_dict)
     return employee
 
 @api_router.get("/employees/{employee_id}", response_model=Employee)
-async def get_employee(employee_id: str, current_user: dict = Depends(get_current_user)):
-    employee = await db.employees.find_one({"id": employee_id}, {"_id": 0})
+async def get_employee(employee_id: str, fields: FieldSelection = Depends(), current_user: dict = Depends(get_current_user)):
+    employee = await db.employees.find_one({"id": employee_id}, fields.projection(Employee))
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
     
-    if isinstance(employee['created_at'], str):
-        employee['created_at'] = datetime.fromisoformat(employee['created_at'])
-    if employee.get('hire_date') and isinstance(employee['hire_date'], str):
-        employee['hire_date'] = datetime.fromisoformat(employee['hire_date'])
-    return employee
+    return fields.response(Employee, employee, many=False)
 
 @api_router.put("/employees/{employee_id}", response_model=Employee)
 async def update_employee(employee_id: str, employee_data: EmployeeUpdate, current_user: dict = Depends(get_current_user)):
@@ -2361,64 +2197,49 @@ async def update_employee(employee_id: str, employee_data: EmployeeUpdate, curre
         raise HTTPException(status_code=404, detail="Employee not found")
     
     update_data = {k: v for k, v in employee_data.model_dump().items() if v is not None}
-    if update_data.get('hire_date'):
-        update_data['hire_date'] = update_data['hire_date'].isoformat()
     
     if update_data:
         await db.employees.update_one({"id": employee_id}, {"$set": update_data})
     
     updated_employee = await db.employees.find_one({"id": employee_id}, {"_id": 0})
-    if isinstance(updated_employee['created_at'], str):
-        updated_employee['created_at'] = datetime.fromisoformat(updated_employee['created_at'])
-    if updated_employee.get('hire_date') and isinstance(updated_employee['hire_date'], str):
-        updated_employee['hire_date'] = datetime.fromisoformat(updated_employee['hire_date'])
     return updated_employee
 
 @api_router.delete("/employees/{employee_id}")
 async def delete_employee(employee_id: str, current_user: dict = Depends(get_current_user)):
-    result = await db.employees.delete_one({"id": employee_id})
-    if result.deleted_count == 0:
+    deleted = await db.employees.find_one_and_delete({"id": employee_id}, {"_id": 0, "status": 1})
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Employee not found")
+    await get_dashboard_counters(db).record("employees", deleted, None)
     return {"message": "Employee deleted successfully"}
 
 # ============================================
 # API ROUTES - POLICIES/HANDBOOK
 # ============================================
 
-@api_router.get("/policies", response_model=List[Policy])
-async def get_policies(current_user: dict = Depends(get_current_user)):
-    policies = await db.policies.find({}, {"_id": 0}).to_list(1000)
-    for policy in policies:
-        if isinstance(policy.get('created_at'), str):
-            policy['created_at'] = datetime.fromisoformat(policy['created_at'])
-        if isinstance(policy.get('updated_at'), str):
-            policy['updated_at'] = datetime.fromisoformat(policy['updated_at'])
-        if policy.get('effective_date') and isinstance(policy['effective_date'], str):
-            policy['effective_date'] = datetime.fromisoformat(policy['effective_date'])
-    return policies
+@api_router.get("/policies", response_model=page_response(Policy))
+async def get_policies(page: PageParams = Depends(), fields: FieldSelection = Depends(), filters: QueryFilters = Depends(), current_user: dict = Depends(get_current_user)):
+    policies = await paginate(db.policies, filters.query("policies", Policy), page, projection=fields.projection(Policy), sort=filters.sort("policies"))
+    return fields.response(Policy, policies.response())
 
 @api_router.post("/policies", response_model=Policy)
 async def create_policy(policy: PolicyCreate, admin_user: dict = Depends(get_admin_user)):
     policy_dict = policy.model_dump()
     policy_dict['id'] = str(uuid.uuid4())
     policy_dict['created_by'] = admin_user['username']
-    policy_dict['created_at'] = datetime.now(timezone.utc).isoformat()
-    policy_dict['updated_at'] = datetime.now(timezone.utc).isoformat()
+    policy_dict['created_at'] = datetime.now(timezone.utc)
+    policy_dict['updated_at'] = datetime.now(timezone.utc)
     policy_dict['acknowledgments'] = []
     
-    if policy_dict.get('effective_date'):
-        policy_dict['effective_date'] = policy_dict['effective_date'].isoformat()
     
     await db.policies.insert_one(policy_dict)
+    get_retrieval_index(db).record("policies", policy_dict['id'], policy_dict)
     return policy_dict
 
 @api_router.put("/policies/{policy_id}", response_model=Policy)
 async def update_policy(policy_id: str, policy: PolicyUpdate, admin_user: dict = Depends(get_admin_user)):
     update_data = policy.model_dump(exclude_unset=True)
-    update_data['updated_at'] = datetime.now(timezone.utc).isoformat()
+    update_data['updated_at'] = datetime.now(timezone.utc)
     
-    if update_data.get('effective_date'):
-        update_data['effective_date'] = update_data['effective_date'].isoformat()
     
     result = await db.policies.update_one(
         {"id": policy_id},
@@ -2429,6 +2250,8 @@ async def update_policy(policy_id: str, policy: PolicyUpdate, admin_user: dict =
         raise HTTPException(status_code=404, detail="Policy not found")
     
     updated_policy = await db.policies.find_one({"id": policy_id}, {"_id": 0})
+    if updated_policy:
+        get_retrieval_index(db).record("policies", policy_id, updated_policy)
     return updated_policy
 
 @api_router.delete("/policies/{policy_id}")
@@ -2436,6 +2259,7 @@ async def delete_policy(policy_id: str, admin_user: dict = Depends(get_admin_use
     result = await db.policies.delete_one({"id": policy_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Policy not found")
+    get_retrieval_index(db).record("policies", policy_id, None)
     return {"message": "Policy deleted successfully"}
 
 @api_router.post("/policies/{policy_id}/acknowledge")
@@ -2456,7 +2280,7 @@ async def acknowledge_policy(policy_id: str, current_user: dict = Depends(get_cu
     new_ack = {
         "user_id": current_user['id'],
         "user_name": current_user['username'],
-        "acknowledged_at": datetime.now(timezone.utc).isoformat()
+        "acknowledged_at": datetime.now(timezone.utc)
     }
     
     await db.policies.update_one(
@@ -2470,15 +2294,10 @@ async def acknowledge_policy(policy_id: str, current_user: dict = Depends(get_cu
 # API ROUTES - FLEET INSPECTIONS
 # ============================================
 
-@api_router.get("/fleet-inspections", response_model=List[FleetInspection])
-async def get_fleet_inspections(current_user: dict = Depends(get_current_user)):
-    inspections = await db.fleet_inspections.find({}, {"_id": 0}).to_list(1000)
-    for inspection in inspections:
-        if isinstance(inspection.get('created_at'), str):
-            inspection['created_at'] = datetime.fromisoformat(inspection['created_at'])
-        if isinstance(inspection.get('inspection_date'), str):
-            inspection['inspection_date'] = datetime.fromisoformat(inspection['inspection_date'])
-    return inspections
+@api_router.get("/fleet-inspections", response_model=page_response(FleetInspection))
+async def get_fleet_inspections(page: PageParams = Depends(), fields: FieldSelection = Depends(), filters: QueryFilters = Depends(), current_user: dict = Depends(get_current_user)):
+    inspections = await paginate(db.fleet_inspections, filters.query("fleet_inspections", FleetInspection), page, projection=fields.projection(FleetInspection), sort=filters.sort("fleet_inspections"))
+    return fields.response(FleetInspection, inspections.response())
 
 @api_router.post("/fleet-inspections", response_model=FleetInspection)
 async def create_fleet_inspection(inspection: FleetInspectionCreate, current_user: dict = Depends(get_current_user)):
@@ -2486,10 +2305,8 @@ async def create_fleet_inspection(inspection: FleetInspectionCreate, current_use
     inspection_dict = inspection.model_dump()
     inspection_dict['id'] = str(uuid.uuid4())
     inspection_dict['created_by'] = current_user['username']
-    inspection_dict['created_at'] = datetime.now(timezone.utc).isoformat()
+    inspection_dict['created_at'] = datetime.now(timezone.utc)
     
-    if inspection_dict.get('inspection_date'):
-        inspection_dict['inspection_date'] = inspection_dict['inspection_date'].isoformat()
     
     await db.fleet_inspections.insert_one(inspection_dict)
     return inspection_dict
@@ -2507,8 +2324,6 @@ async def update_fleet_inspection(inspection_id: str, inspection: FleetInspectio
     
     update_data = inspection.model_dump(exclude_unset=True)
     
-    if update_data.get('inspection_date'):
-        update_data['inspection_date'] = update_data['inspection_date'].isoformat()
     
     result = await db.fleet_inspections.update_one(
         {"id": inspection_id},
@@ -2535,32 +2350,23 @@ async def delete_fleet_inspection(inspection_id: str, admin_user: dict = Depends
 # ============================================
 
 # INVOICES
-@api_router.get("/invoices", response_model=List[Invoice])
-async def get_invoices(current_user: dict = Depends(get_current_user)):
-    invoices = await db.invoices.find({}, {"_id": 0}).to_list(1000)
-    for invoice in invoices:
-        if isinstance(invoice.get('created_at'), str):
-            invoice['created_at'] = datetime.fromisoformat(invoice['created_at'])
-        if invoice.get('due_date') and isinstance(invoice['due_date'], str):
-            invoice['due_date'] = datetime.fromisoformat(invoice['due_date'])
-    return invoices
+@api_router.get("/invoices", response_model=page_response(Invoice))
+async def get_invoices(page: PageParams = Depends(), fields: FieldSelection = Depends(), filters: QueryFilters = Depends(), current_user: dict = Depends(get_current_user)):
+    invoices = await paginate(db.invoices, filters.query("invoices", Invoice), page, projection=fields.projection(Invoice), sort=filters.sort("invoices"))
+    return fields.response(Invoice, invoices.response())
 
 @api_router.post("/invoices", response_model=Invoice)
 async def create_invoice(invoice: InvoiceCreate, current_user: dict = Depends(get_current_user)):
     invoice_dict = invoice.model_dump()
     invoice_dict['id'] = str(uuid.uuid4())
     invoice_dict['created_by'] = current_user['username']
-    invoice_dict['created_at'] = datetime.now(timezone.utc).isoformat()
-    if invoice_dict.get('due_date'):
-        invoice_dict['due_date'] = invoice_dict['due_date'].isoformat()
+    invoice_dict['created_at'] = datetime.now(timezone.utc)
     await db.invoices.insert_one(invoice_dict)
     return invoice_dict
 
 @api_router.put("/invoices/{invoice_id}", response_model=Invoice)
 async def update_invoice(invoice_id: str, invoice: InvoiceUpdate, current_user: dict = Depends(get_current_user)):
     update_data = invoice.model_dump(exclude_unset=True)
-    if update_data.get('due_date'):
-        update_data['due_date'] = update_data['due_date'].isoformat()
     result = await db.invoices.update_one({"id": invoice_id}, {"$set": update_data})
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Invoice not found")
@@ -2574,32 +2380,23 @@ async def delete_invoice(invoice_id: str, admin_user: dict = Depends(get_admin_u
     return {"message": "Invoice deleted successfully"}
 
 # EXPENSES
-@api_router.get("/expenses", response_model=List[Expense])
-async def get_expenses(current_user: dict = Depends(get_current_user)):
-    expenses = await db.expenses.find({}, {"_id": 0}).to_list(1000)
-    for expense in expenses:
-        if isinstance(expense.get('created_at'), str):
-            expense['created_at'] = datetime.fromisoformat(expense['created_at'])
-        if isinstance(expense.get('expense_date'), str):
-            expense['expense_date'] = datetime.fromisoformat(expense['expense_date'])
-    return expenses
+@api_router.get("/expenses", response_model=page_response(Expense))
+async def get_expenses(page: PageParams = Depends(), fields: FieldSelection = Depends(), filters: QueryFilters = Depends(), current_user: dict = Depends(get_current_user)):
+    expenses = await paginate(db.expenses, filters.query("expenses", Expense), page, projection=fields.projection(Expense), sort=filters.sort("expenses"))
+    return fields.response(Expense, expenses.response())
 
 @api_router.post("/expenses", response_model=Expense)
 async def create_expense(expense: ExpenseCreate, current_user: dict = Depends(get_current_user)):
     expense_dict = expense.model_dump()
     expense_dict['id'] = str(uuid.uuid4())
     expense_dict['created_by'] = current_user['username']
-    expense_dict['created_at'] = datetime.now(timezone.utc).isoformat()
-    if expense_dict.get('expense_date'):
-        expense_dict['expense_date'] = expense_dict['expense_date'].isoformat()
+    expense_dict['created_at'] = datetime.now(timezone.utc)
     await db.expenses.insert_one(expense_dict)
     return expense_dict
 
 @api_router.put("/expenses/{expense_id}", response_model=Expense)
 async def update_expense(expense_id: str, expense: ExpenseUpdate, current_user: dict = Depends(get_current_user)):
     update_data = expense.model_dump(exclude_unset=True)
-    if update_data.get('expense_date'):
-        update_data['expense_date'] = update_data['expense_date'].isoformat()
     result = await db.expenses.update_one({"id": expense_id}, {"$set": update_data})
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Expense not found")
@@ -2613,10 +2410,10 @@ async def delete_expense(expense_id: str, admin_user: dict = Depends(get_admin_u
     return {"message": "Expense deleted"}
 
 # Reports Endpoints
-@api_router.get("/reports", response_model=List[Report])
-async def get_reports(current_user: dict = Depends(get_current_user)):
-    reports = await db.reports.find({}, {"_id": 0}).to_list(length=None)
-    return [Report(**report) for report in reports]
+@api_router.get("/reports", response_model=page_response(Report))
+async def get_reports(page: PageParams = Depends(), fields: FieldSelection = Depends(), filters: QueryFilters = Depends(), current_user: dict = Depends(get_current_user)):
+    reports = await paginate(db.reports, filters.query("reports", Report), page, projection=fields.projection(Report), sort=filters.sort("reports"), bare_limit=None)
+    return fields.response(Report, reports.response())
 
 @api_router.post("/reports", response_model=Report)
 async def create_report(report: ReportCreate, current_user: dict = Depends(get_current_user)):
@@ -2646,10 +2443,10 @@ async def delete_report(report_id: str, admin_user: dict = Depends(get_admin_use
     return {"message": "Report deleted"}
 
 # Compliance Endpoints
-@api_router.get("/compliance", response_model=List[Compliance])
-async def get_compliance(current_user: dict = Depends(get_current_user)):
-    documents = await db.compliance.find({}, {"_id": 0}).to_list(length=None)
-    return [Compliance(**doc) for doc in documents]
+@api_router.get("/compliance", response_model=page_response(Compliance))
+async def get_compliance(page: PageParams = Depends(), fields: FieldSelection = Depends(), filters: QueryFilters = Depends(), current_user: dict = Depends(get_current_user)):
+    documents = await paginate(db.compliance, filters.query("compliance", Compliance), page, projection=fields.projection(Compliance), sort=filters.sort("compliance"), bare_limit=None)
+    return fields.response(Compliance, documents.response())
 
 @api_router.post("/compliance", response_model=Compliance)
 async def create_compliance(compliance: ComplianceCreate, current_user: dict = Depends(get_current_user)):
@@ -2679,38 +2476,23 @@ async def delete_compliance(compliance_id: str, admin_user: dict = Depends(get_a
     return {"message": "Compliance document deleted"}
 
 # CONTRACTS (Admin/Manager only)
-@api_router.get("/contracts", response_model=List[Contract])
-async def get_contracts(admin_user: dict = Depends(get_admin_user)):
-    contracts = await db.contracts.find({}, {"_id": 0}).to_list(1000)
-    for contract in contracts:
-        if isinstance(contract.get('created_at'), str):
-            contract['created_at'] = datetime.fromisoformat(contract['created_at'])
-        if contract.get('start_date') and isinstance(contract['start_date'], str):
-            contract['start_date'] = datetime.fromisoformat(contract['start_date'])
-        if contract.get('end_date') and isinstance(contract['end_date'], str):
-            contract['end_date'] = datetime.fromisoformat(contract['end_date'])
-    return contracts
+@api_router.get("/contracts", response_model=page_response(Contract))
+async def get_contracts(page: PageParams = Depends(), fields: FieldSelection = Depends(), filters: QueryFilters = Depends(), admin_user: dict = Depends(get_admin_user)):
+    contracts = await paginate(db.contracts, filters.query("contracts", Contract), page, projection=fields.projection(Contract), sort=filters.sort("contracts"))
+    return fields.response(Contract, contracts.response())
 
 @api_router.post("/contracts", response_model=Contract)
 async def create_contract(contract: ContractCreate, admin_user: dict = Depends(get_admin_user)):
     contract_dict = contract.model_dump()
     contract_dict['id'] = str(uuid.uuid4())
     contract_dict['created_by'] = admin_user['username']
-    contract_dict['created_at'] = datetime.now(timezone.utc).isoformat()
-    if contract_dict.get('start_date'):
-        contract_dict['start_date'] = contract_dict['start_date'].isoformat()
-    if contract_dict.get('end_date'):
-        contract_dict['end_date'] = contract_dict['end_date'].isoformat()
+    contract_dict['created_at'] = datetime.now(timezone.utc)
     await db.contracts.insert_one(contract_dict)
     return contract_dict
 
 @api_router.put("/contracts/{contract_id}", response_model=Contract)
 async def update_contract(contract_id: str, contract: ContractUpdate, admin_user: dict = Depends(get_admin_user)):
     update_data = contract.model_dump(exclude_unset=True)
-    if update_data.get('start_date'):
-        update_data['start_date'] = update_data['start_date'].isoformat()
-    if update_data.get('end_date'):
-        update_data['end_date'] = update_data['end_date'].isoformat()
     result = await db.contracts.update_one({"id": contract_id}, {"$set": update_data})
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Contract not found")
@@ -2728,32 +2510,23 @@ async def delete_contract(contract_id: str, admin_user: dict = Depends(get_admin
 # ============================================
 
 # EQUIPMENT/ASSETS
-@api_router.get("/equipment", response_model=List[Equipment])
-async def get_equipment(current_user: dict = Depends(get_current_user)):
-    equipment = await db.equipment.find({}, {"_id": 0}).to_list(1000)
-    for item in equipment:
-        if isinstance(item.get('created_at'), str):
-            item['created_at'] = datetime.fromisoformat(item['created_at'])
-        if item.get('purchase_date') and isinstance(item['purchase_date'], str):
-            item['purchase_date'] = datetime.fromisoformat(item['purchase_date'])
-    return equipment
+@api_router.get("/equipment", response_model=page_response(Equipment))
+async def get_equipment(page: PageParams = Depends(), fields: FieldSelection = Depends(), filters: QueryFilters = Depends(), current_user: dict = Depends(get_current_user)):
+    equipment = await paginate(db.equipment, filters.query("equipment", Equipment), page, projection=fields.projection(Equipment), sort=filters.sort("equipment"))
+    return fields.response(Equipment, equipment.response())
 
 @api_router.post("/equipment", response_model=Equipment)
 async def create_equipment(equipment: EquipmentCreate, current_user: dict = Depends(get_current_user)):
     equipment_dict = equipment.model_dump()
     equipment_dict['id'] = str(uuid.uuid4())
     equipment_dict['created_by'] = current_user['username']
-    equipment_dict['created_at'] = datetime.now(timezone.utc).isoformat()
-    if equipment_dict.get('purchase_date'):
-        equipment_dict['purchase_date'] = equipment_dict['purchase_date'].isoformat()
+    equipment_dict['created_at'] = datetime.now(timezone.utc)
     await db.equipment.insert_one(equipment_dict)
     return equipment_dict
 
 @api_router.put("/equipment/{equipment_id}", response_model=Equipment)
 async def update_equipment(equipment_id: str, equipment: EquipmentUpdate, current_user: dict = Depends(get_current_user)):
     update_data = equipment.model_dump(exclude_unset=True)
-    if update_data.get('purchase_date'):
-        update_data['purchase_date'] = update_data['purchase_date'].isoformat()
     result = await db.equipment.update_one({"id": equipment_id}, {"$set": update_data})
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Equipment not found")
@@ -2767,32 +2540,23 @@ async def delete_equipment(equipment_id: str, admin_user: dict = Depends(get_adm
     return {"message": "Equipment deleted successfully"}
 
 # TIMESHEETS
-@api_router.get("/timesheets", response_model=List[Timesheet])
-async def get_timesheets(current_user: dict = Depends(get_current_user)):
-    timesheets = await db.timesheets.find({}, {"_id": 0}).to_list(1000)
-    for timesheet in timesheets:
-        if isinstance(timesheet.get('created_at'), str):
-            timesheet['created_at'] = datetime.fromisoformat(timesheet['created_at'])
-        if isinstance(timesheet.get('date'), str):
-            timesheet['date'] = datetime.fromisoformat(timesheet['date'])
-    return timesheets
+@api_router.get("/timesheets", response_model=page_response(Timesheet))
+async def get_timesheets(page: PageParams = Depends(), fields: FieldSelection = Depends(), filters: QueryFilters = Depends(), current_user: dict = Depends(get_current_user)):
+    timesheets = await paginate(db.timesheets, filters.query("timesheets", Timesheet), page, projection=fields.projection(Timesheet), sort=filters.sort("timesheets"))
+    return fields.response(Timesheet, timesheets.response())
 
 @api_router.post("/timesheets", response_model=Timesheet)
 async def create_timesheet(timesheet: TimesheetCreate, current_user: dict = Depends(get_current_user)):
     timesheet_dict = timesheet.model_dump()
     timesheet_dict['id'] = str(uuid.uuid4())
     timesheet_dict['created_by'] = current_user['username']
-    timesheet_dict['created_at'] = datetime.now(timezone.utc).isoformat()
-    if timesheet_dict.get('date'):
-        timesheet_dict['date'] = timesheet_dict['date'].isoformat()
+    timesheet_dict['created_at'] = datetime.now(timezone.utc)
     await db.timesheets.insert_one(timesheet_dict)
     return timesheet_dict
 
 @api_router.put("/timesheets/{timesheet_id}", response_model=Timesheet)
 async def update_timesheet(timesheet_id: str, timesheet: TimesheetUpdate, current_user: dict = Depends(get_current_user)):
     update_data = timesheet.model_dump(exclude_unset=True)
-    if update_data.get('date'):
-        update_data['date'] = update_data['date'].isoformat()
     result = await db.timesheets.update_one({"id": timesheet_id}, {"$set": update_data})
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Timesheet not found")
@@ -2806,32 +2570,23 @@ async def delete_timesheet(timesheet_id: str, admin_user: dict = Depends(get_adm
     return {"message": "Timesheet deleted successfully"}
 
 # SAFETY REPORTS
-@api_router.get("/safety-reports", response_model=List[SafetyReport])
-async def get_safety_reports(current_user: dict = Depends(get_current_user)):
-    reports = await db.safety_reports.find({}, {"_id": 0}).to_list(1000)
-    for report in reports:
-        if isinstance(report.get('created_at'), str):
-            report['created_at'] = datetime.fromisoformat(report['created_at'])
-        if isinstance(report.get('incident_date'), str):
-            report['incident_date'] = datetime.fromisoformat(report['incident_date'])
-    return reports
+@api_router.get("/safety-reports", response_model=page_response(SafetyReport))
+async def get_safety_reports(page: PageParams = Depends(), fields: FieldSelection = Depends(), filters: QueryFilters = Depends(), current_user: dict = Depends(get_current_user)):
+    reports = await paginate(db.safety_reports, filters.query("safety_reports", SafetyReport), page, projection=fields.projection(SafetyReport), sort=filters.sort("safety_reports"))
+    return fields.response(SafetyReport, reports.response())
 
 @api_router.post("/safety-reports", response_model=SafetyReport)
 async def create_safety_report(report: SafetyReportCreate, current_user: dict = Depends(get_current_user)):
     report_dict = report.model_dump()
     report_dict['id'] = str(uuid.uuid4())
     report_dict['created_by'] = current_user['username']
-    report_dict['created_at'] = datetime.now(timezone.utc).isoformat()
-    if report_dict.get('incident_date'):
-        report_dict['incident_date'] = report_dict['incident_date'].isoformat()
+    report_dict['created_at'] = datetime.now(timezone.utc)
     await db.safety_reports.insert_one(report_dict)
     return report_dict
 
 @api_router.put("/safety-reports/{report_id}", response_model=SafetyReport)
 async def update_safety_report(report_id: str, report: SafetyReportUpdate, current_user: dict = Depends(get_current_user)):
     update_data = report.model_dump(exclude_unset=True)
-    if update_data.get('incident_date'):
-        update_data['incident_date'] = update_data['incident_date'].isoformat()
     result = await db.safety_reports.update_one({"id": report_id}, {"$set": update_data})
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Safety report not found")
@@ -2845,38 +2600,23 @@ async def delete_safety_report(report_id: str, admin_user: dict = Depends(get_ad
     return {"message": "Safety report deleted successfully"}
 
 # CERTIFICATIONS
-@api_router.get("/certifications", response_model=List[Certification])
-async def get_certifications(current_user: dict = Depends(get_current_user)):
-    certifications = await db.certifications.find({}, {"_id": 0}).to_list(1000)
-    for cert in certifications:
-        if isinstance(cert.get('created_at'), str):
-            cert['created_at'] = datetime.fromisoformat(cert['created_at'])
-        if cert.get('issue_date') and isinstance(cert['issue_date'], str):
-            cert['issue_date'] = datetime.fromisoformat(cert['issue_date'])
-        if cert.get('expiry_date') and isinstance(cert['expiry_date'], str):
-            cert['expiry_date'] = datetime.fromisoformat(cert['expiry_date'])
-    return certifications
+@api_router.get("/certifications", response_model=page_response(Certification))
+async def get_certifications(page: PageParams = Depends(), fields: FieldSelection = Depends(), filters: QueryFilters = Depends(), current_user: dict = Depends(get_current_user)):
+    certifications = await paginate(db.certifications, filters.query("certifications", Certification), page, projection=fields.projection(Certification), sort=filters.sort("certifications"))
+    return fields.response(Certification, certifications.response())
 
 @api_router.post("/certifications", response_model=Certification)
 async def create_certification(certification: CertificationCreate, current_user: dict = Depends(get_current_user)):
     cert_dict = certification.model_dump()
     cert_dict['id'] = str(uuid.uuid4())
     cert_dict['created_by'] = current_user['username']
-    cert_dict['created_at'] = datetime.now(timezone.utc).isoformat()
-    if cert_dict.get('issue_date'):
-        cert_dict['issue_date'] = cert_dict['issue_date'].isoformat()
-    if cert_dict.get('expiry_date'):
-        cert_dict['expiry_date'] = cert_dict['expiry_date'].isoformat()
+    cert_dict['created_at'] = datetime.now(timezone.utc)
     await db.certifications.insert_one(cert_dict)
     return cert_dict
 
 @api_router.put("/certifications/{cert_id}", response_model=Certification)
 async def update_certification(cert_id: str, certification: CertificationUpdate, current_user: dict = Depends(get_current_user)):
     update_data = certification.model_dump(exclude_unset=True)
-    if update_data.get('issue_date'):
-        update_data['issue_date'] = update_data['issue_date'].isoformat()
-    if update_data.get('expiry_date'):
-        update_data['expiry_date'] = update_data['expiry_date'].isoformat()
     result = await db.certifications.update_one({"id": cert_id}, {"$set": update_data})
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Certification not found")
@@ -2890,54 +2630,62 @@ async def delete_certification(cert_id: str, admin_user: dict = Depends(get_admi
     return {"message": "Certification deleted successfully"}
 
 # INVENTORY
-@api_router.get("/inventory", response_model=List[Inventory])
-async def get_inventory(current_user: dict = Depends(get_current_user)):
-    inventory = await db.inventory.find({}, {"_id": 0}).to_list(1000)
-    for item in inventory:
-        if isinstance(item.get('created_at'), str):
-            item['created_at'] = datetime.fromisoformat(item['created_at'])
-    return inventory
+@api_router.get("/inventory", response_model=page_response(Inventory))
+async def get_inventory(page: PageParams = Depends(), fields: FieldSelection = Depends(), filters: QueryFilters = Depends(), current_user: dict = Depends(get_current_user)):
+    # project_id and the other inventory filters come through the shared filter grammar
+    inventory = await paginate(db.inventory, filters.query("inventory", Inventory), page, projection=fields.projection(Inventory), sort=filters.sort("inventory"), bare_limit=None)
+    return fields.response(Inventory, inventory.response())
 
 @api_router.post("/inventory", response_model=Inventory)
 async def create_inventory(inventory: InventoryCreate, current_user: dict = Depends(get_current_user)):
     inventory_dict = inventory.model_dump()
     inventory_dict['id'] = str(uuid.uuid4())
     inventory_dict['created_by'] = current_user['username']
-    inventory_dict['created_at'] = datetime.now(timezone.utc).isoformat()
+    inventory_dict['created_at'] = datetime.now(timezone.utc)
     await db.inventory.insert_one(inventory_dict)
+    await get_inventory_valuation(db).record(None, inventory_dict)
     return inventory_dict
 
 @api_router.put("/inventory/{inventory_id}", response_model=Inventory)
 async def update_inventory(inventory_id: str, inventory: InventoryUpdate, current_user: dict = Depends(get_current_user)):
     update_data = inventory.model_dump(exclude_unset=True)
-    result = await db.inventory.update_one({"id": inventory_id}, {"$set": update_data})
-    if result.matched_count == 0:
+    before = await db.inventory.find_one_and_update(
+        {"id": inventory_id},
+        {"$set": update_data},
+        projection={"_id": 0},
+        return_document=ReturnDocument.BEFORE
+    )
+    if before is None:
         raise HTTPException(status_code=404, detail="Inventory item not found")
-    return await db.inventory.find_one({"id": inventory_id}, {"_id": 0})
+    after = {**before, **update_data}
+    await get_inventory_valuation(db).record(before, after)
+    return after
 
 @api_router.delete("/inventory/{inventory_id}")
 async def delete_inventory(inventory_id: str, admin_user: dict = Depends(get_admin_user)):
-    result = await db.inventory.delete_one({"id": inventory_id})
-    if result.deleted_count == 0:
+    deleted = await db.inventory.find_one_and_delete(
+        {"id": inventory_id},
+        {"_id": 0, "project_id": 1, "unit_cost": 1, "quantity": 1}
+    )
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Inventory item not found")
+    await get_inventory_valuation(db).record(deleted, None)
     return {"message": "Inventory item deleted successfully"}
 
 # DOCUMENTS
-@api_router.get("/documents", response_model=List[Document])
-async def get_documents(current_user: dict = Depends(get_current_user)):
-    documents = await db.documents.find({}, {"_id": 0}).to_list(1000)
-    for doc in documents:
-        if isinstance(doc.get('created_at'), str):
-            doc['created_at'] = datetime.fromisoformat(doc['created_at'])
-    return documents
+@api_router.get("/documents", response_model=page_response(Document))
+async def get_documents(page: PageParams = Depends(), fields: FieldSelection = Depends(), filters: QueryFilters = Depends(), current_user: dict = Depends(get_current_user)):
+    documents = await paginate(db.documents, filters.query("documents", Document), page, projection=fields.projection(Document), sort=filters.sort("documents"))
+    return fields.response(Document, documents.response())
 
 @api_router.post("/documents", response_model=Document)
 async def create_document(document: DocumentCreate, current_user: dict = Depends(get_current_user)):
     document_dict = document.model_dump()
     document_dict['id'] = str(uuid.uuid4())
     document_dict['created_by'] = current_user['username']
-    document_dict['created_at'] = datetime.now(timezone.utc).isoformat()
+    document_dict['created_at'] = datetime.now(timezone.utc)
     await db.documents.insert_one(document_dict)
+    get_retrieval_index(db).record("documents", document_dict['id'], document_dict)
     return document_dict
 
 @api_router.put("/documents/{document_id}", response_model=Document)
@@ -2946,13 +2694,17 @@ async def update_document(document_id: str, document: DocumentUpdate, current_us
     result = await db.documents.update_one({"id": document_id}, {"$set": update_data})
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Document not found")
-    return await db.documents.find_one({"id": document_id}, {"_id": 0})
+    updated_document = await db.documents.find_one({"id": document_id}, {"_id": 0})
+    if updated_document:
+        get_retrieval_index(db).record("documents", document_id, updated_document)
+    return updated_document
 
 @api_router.delete("/documents/{document_id}")
 async def delete_document(document_id: str, admin_user: dict = Depends(get_admin_user)):
     result = await db.documents.delete_one({"id": document_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Document not found")
+    get_retrieval_index(db).record("documents", document_id, None)
     return {"message": "Document deleted successfully"}
 
 
@@ -2961,22 +2713,83 @@ async def delete_document(document_id: str, admin_user: dict = Depends(get_admin
 # ============================================
 
 @api_router.get("/dashboard/stats", response_model=DashboardStats)
-async def get_dashboard_stats(current_user: dict = Depends(get_current_user)):
-    total_clients = await db.clients.count_documents({})
-    total_projects = await db.projects.count_documents({})
-    total_tasks = await db.tasks.count_documents({})
-    total_employees = await db.employees.count_documents({})
-    active_projects = await db.projects.count_documents({"status": "in_progress"})
-    completed_tasks = await db.tasks.count_documents({"status": "completed"})
-    
-    return DashboardStats(
-        total_clients=total_clients,
-        total_projects=total_projects,
-        total_tasks=total_tasks,
-        total_employees=total_employees,
-        active_projects=active_projects,
-        completed_tasks=completed_tasks
-    )
+async def get_dashboard_stats(fresh: bool = False, current_user: dict = Depends(get_current_user)):
+    counters = get_dashboard_counters(db)
+    # fresh=1 bypasses the materialized counters and counts the collections directly
+    counts = await counters.compute() if fresh else await counters.get()
+    return DashboardStats(**counts)
+
+# ============================================
+# API ROUTES - ADMIN - METRICS
+# ============================================
+
+@api_router.get("/admin/metrics")
+async def get_metrics(admin_user: dict = Depends(get_admin_user)):
+    """In-process performance counters"""
+    return {
+        "principal_cache": get_principal_cache().stats(),
+        "password_hasher": get_password_hasher().stats(),
+        "dashboard_counters": get_dashboard_counters(db).stats(),
+        "email_outbox": await get_email_outbox(db).stats(),
+        "notification_digest": await get_notification_digest(db).stats(),
+        "notification_settings": get_notification_settings_cache(db).stats(),
+        "smtp_pool": get_email_service().pool.stats(),
+        "ai_response_cache": get_ai_response_cache(db).stats(),
+        "expense_classifier": get_expense_classifier(db).stats(),
+        "retrieval_index": get_retrieval_index(db).stats(),
+        "llm_gateway": get_llm_gateway().stats()
+    }
+
+@api_router.post("/admin/expense-classifier/retrain")
+async def retrain_expense_classifier(admin_user: dict = Depends(get_admin_user)):
+    """Retrain the local expense classifier from the expenses collection now"""
+    training = await get_expense_classifier(db).retrain()
+    if training is None:
+        raise HTTPException(status_code=409, detail="Not enough categorized expenses to train on")
+    return training
+
+@api_router.delete("/admin/ai-cache")
+async def invalidate_ai_cache(
+    purpose: Optional[str] = Query(None, description="Only drop replies cached for this purpose"),
+    admin_user: dict = Depends(get_admin_user)
+):
+    """Drop cached AI replies, e.g. after a prompt or model change"""
+    if purpose is not None and purpose not in CACHE_TTL_SECONDS:
+        raise HTTPException(status_code=400, detail=f"Unknown cached purpose: {purpose}")
+    removed = await get_ai_response_cache(db).invalidate(purpose)
+    return {"message": f"Removed {removed} cached AI replies", "removed": removed}
+
+@api_router.get("/admin/email-outbox")
+async def get_email_outbox_messages(
+    status: str = Query("dead", pattern="^(pending|sending|sent|dead)$"),
+    page: PageParams = Depends(),
+    admin_user: dict = Depends(get_admin_user)
+):
+    """Outbox messages by status, dead letters by default"""
+    messages = await paginate(db.email_outbox, {"status": status}, page, projection={"_id": 0, "body": 0})
+    return messages.response()
+
+@api_router.post("/admin/email-outbox/{message_id}/retry")
+async def retry_email_outbox_message(message_id: str, admin_user: dict = Depends(get_admin_user)):
+    """Requeue a dead-lettered email"""
+    if not await get_email_outbox(db).retry(message_id):
+        raise HTTPException(status_code=404, detail="Dead-lettered message not found")
+    return {"message": "Email requeued"}
+
+@api_router.get("/admin/indexes")
+async def get_index_status(admin_user: dict = Depends(get_admin_user)):
+    """Report drift between declared and actual indexes, plus migration status"""
+    index_manager = get_index_manager(db)
+    return {
+        "drift": await index_manager.drift_report(),
+        "last_bootstrap": index_manager.last_run,
+        "migrations": await migration_status(db)
+    }
+
+@api_router.post("/admin/indexes/sync")
+async def sync_indexes(admin_user: dict = Depends(get_admin_user)):
+    """Build any missing indexes now"""
+    return await get_index_manager(db).ensure_indexes()
 
 # ============================================
 # SEED ENDPOINT FOR TESTING
@@ -3003,10 +2816,10 @@ async def seed_admin_user():
             "id": str(uuid.uuid4()),
             "username": "admin",
             "email": "admin@williamsdiversified.com",
-            "password_hash": get_password_hash("Admin123!"),
+            "password_hash": await get_password_hash("Admin123!"),
             "role": "admin",
             "is_active": True,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
         
         await db.users.insert_one(admin_user)
@@ -3027,24 +2840,28 @@ async def seed_admin_user():
 async def seed_test_users():
     """Create test users for different roles"""
     try:
+        manager_hash, employee_hash = await asyncio.gather(
+            get_password_hash("Manager123!"),
+            get_password_hash("Employee123!")
+        )
         test_users = [
             {
                 "id": str(uuid.uuid4()),
                 "username": "manager",
                 "email": "manager@williamsdiversified.com",
-                "password_hash": get_password_hash("Manager123!"),
+                "password_hash": manager_hash,
                 "role": "manager",
                 "is_active": True,
-                "created_at": datetime.now(timezone.utc).isoformat()
+                "created_at": datetime.now(timezone.utc)
             },
             {
                 "id": str(uuid.uuid4()),
                 "username": "employee",
                 "email": "employee@williamsdiversified.com",
-                "password_hash": get_password_hash("Employee123!"),
+                "password_hash": employee_hash,
                 "role": "employee",
                 "is_active": True,
-                "created_at": datetime.now(timezone.utc).isoformat()
+                "created_at": datetime.now(timezone.utc)
             }
         ]
         
@@ -3071,7 +2888,7 @@ async def seed_test_users():
 # AI SERVICE ROUTES
 # ============================================
 
-from ai_service import get_ai_service
+from ai_service import get_ai_service, use_ai_response_cache
 from pydantic import BaseModel
 
 class AIGenerateRequest(BaseModel):
@@ -3086,6 +2903,9 @@ class AITaskSuggestionRequest(BaseModel):
     project_title: str
     project_description: str
 
+class AIExpenseBatchRequest(BaseModel):
+    descriptions: List[str] = Field(..., min_length=1, max_length=1000)
+
 class AIChatRequest(BaseModel):
     message: str
     conversation_history: Optional[list] = []
@@ -3114,10 +2934,18 @@ async def ai_suggest_tasks(request: AITaskSuggestionRequest, current_user: dict
 
 @api_router.post("/ai/categorize-expense")
 async def ai_categorize_expense(expense_description: str, current_user: dict = Depends(get_current_user)):
-    """Auto-categorize an expense"""
-    ai_service = get_ai_service()
-    result = await ai_service.categorize_expense(expense_description)
-    return {"category": result}
+    """Auto-categorize an expense (locally when the classifier is confident, otherwise with AI)"""
+    return (await get_expense_classifier(db).categorize([expense_description], get_ai_service()))[0]
+
+@api_router.post("/ai/categorize-expenses")
+async def ai_categorize_expenses(request: AIExpenseBatchRequest, current_user: dict = Depends(get_current_user)):
+    """Categorize a batch of expense descriptions, e.g. an import, in one call"""
+    results = await get_expense_classifier(db).categorize(request.descriptions, get_ai_service(), priority=LLM_BATCH)
+    return {
+        "results": [{"description": description, **result} for description, result in zip(request.descriptions, results)],
+        "local": sum(1 for result in results if result["source"] == "local"),
+        "llm": sum(1 for result in results if result["source"] == "llm")
+    }
 
 @api_router.post("/ai/generate-invoice-description")
 async def ai_generate_invoice_description(project_name: str, work_items: list, current_user: dict = Depends(get_current_user)):
@@ -3148,40 +2976,34 @@ async def ai_chat_assistant(request: AIChatRequest, current_user: dict = Depends
 
 # Inventory Endpoints (Project-Based)
 @api_router.get("/inventory/by-project")
-async def get_inventory_by_project(current_user: dict = Depends(get_current_user)):
-    """Get inventory grouped by project with totals"""
+async def get_inventory_by_project(
+    include_items: bool = True,
+    items_limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    stream: StreamParams = Depends(),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get inventory grouped by project with totals.
+
+    Totals come from the maintained per-project valuations. include_items=false
+    returns the summary only; items_limit caps the newest items embedded per
+    project (page further with /inventory?project_id=...).
+    """
+    pipeline = get_inventory_valuation(db).by_project_pipeline(include_items, items_limit)
+    groups = db.projects.aggregate(pipeline)
+    
+    if stream.requested:
+        return NDJSONResponse(groups, batch_size=1 if include_items else STREAM_BATCH_SIZE)
+    
     try:
-        # Get all projects
-        projects = await db.projects.find({}, {"_id": 0}).to_list(length=None)
-        
-        result = []
-        for project in projects:
-            # Get inventory items for this project
-            items = await db.inventory.find({"project_id": project["id"]}, {"_id": 0}).to_list(length=None)
-            
-            # Calculate totals
-            total_items = len(items)
-            total_value = sum(item.get("unit_cost", 0) * item.get("quantity", 0) for item in items)
-            
-            result.append({
-                "project_id": project["id"],
-                "project_name": project.get("name", "Unknown Project"),
-                "project_status": project.get("status", "active"),
-                "total_items": total_items,
-                "total_value": round(total_value, 2),
-                "items": items
-            })
-        
-        return result
+        return await groups.to_list(None)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@api_router.get("/inventory", response_model=List[Inventory])
-async def get_inventory(project_id: Optional[str] = None, current_user: dict = Depends(get_current_user)):
+@api_router.get("/inventory", response_model=page_response(Inventory))
+async def get_inventory(page: PageParams = Depends(), fields: FieldSelection = Depends(), filters: QueryFilters = Depends(), current_user: dict = Depends(get_current_user)):
     """Get all inventory items, optionally filtered by project"""
-    query = {"project_id": project_id} if project_id else {}
-    items = await db.inventory.find(query, {"_id": 0}).to_list(length=None)
-    return [Inventory(**item) for item in items]
+    items = await paginate(db.inventory, filters.query("inventory", Inventory), page, projection=fields.projection(Inventory), sort=filters.sort("inventory"), bare_limit=None)
+    return fields.response(Inventory, items.response())
 
 @api_router.post("/inventory", response_model=Inventory)
 async def create_inventory(inventory: InventoryCreate, current_user: dict = Depends(get_current_user)):
@@ -3218,6 +3040,7 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Configure logging
@@ -3351,28 +3174,30 @@ async def process_payroll_payment(
 # VENDOR PORTAL PROXY ENDPOINTS
 # ============================================
 
+async def attach_vendor_profiles(vendor_users: List[dict]):
+    await hydrate(vendor_users, "vendor_id", db.vendors, "profile")
+
 @api_router.get("/vendors")
-async def get_vendors(current_user: dict = Depends(get_current_user)):
+async def get_vendors(page: PageParams = Depends(), current_user: dict = Depends(get_current_user)):
     """Get all registered vendors from users table (Admin/Manager)"""
     if current_user["role"] not in ["admin", "manager"]:
         raise HTTPException(status_code=403, detail="Admin/Manager access required")
     
     try:
         # Get all vendor users from database
-        vendor_users = await db.users.find(
+        vendor_users = await paginate(
+            db.users,
             {"role": "vendor"},
-            {"_id": 0, "password_hash": 0}
-        ).to_list(length=None)
+            page,
+            projection={"_id": 0, "password_hash": 0}
+        )
         
         # Get vendor profiles if they exist
-        for vendor_user in vendor_users:
-            vendor_id = vendor_user.get("vendor_id")
-            if vendor_id:
-                vendor_profile = await db.vendors.find_one({"id": vendor_id}, {"_id": 0})
-                if vendor_profile:
-                    vendor_user["profile"] = vendor_profile
-        
-        return vendor_users
+        await vendor_users.hydrate(attach_vendor_profiles)
+        
+        return vendor_users.response()
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching vendors: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -3477,18 +3302,18 @@ async def invite_vendor(
             "phone": vendor_data.get("phone", ""),
             "status": "pending",
             "created_by": current_user["id"],
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "expires_at": (datetime.now(timezone.utc) + timedelta(days=30)).isoformat()
+            "created_at": datetime.now(timezone.utc),
+            "expires_at": datetime.now(timezone.utc) + timedelta(days=30)
         }
         
         await db.vendor_invitations.insert_one(invitation)
         
         # Send invitation email
         try:
-            # Get notification settings for email configuration
-            notification_settings = await db.notification_settings.find_one({}, {"_id": 0})
+            # Shared sender, configured from the cached notification settings
+            email_service = await get_notification_settings_cache(db).email_service()
             
-            if notification_settings and notification_settings.get('smtp_server'):
+            if email_service.enabled:
                 portal_url = f"{os.environ.get('FRONTEND_URL', 'https://williams-portal.preview.emergentagent.com')}/auth?code={invitation_code}&type=vendor"
                 email_content = vendor_invitation_email(
                     vendor_name=vendor_data.get("name"),
@@ -3496,16 +3321,7 @@ async def invite_vendor(
                     portal_url=portal_url
                 )
                 
-                # Create email service with notification settings
-                email_service = get_email_service(
-                    smtp_server=notification_settings.get('smtp_server'),
-                    smtp_port=notification_settings.get('smtp_port'),
-                    username=notification_settings.get('smtp_username'),
-                    password=notification_settings.get('smtp_password'),
-                    from_email=notification_settings.get('admin_email', notification_settings.get('smtp_username'))
-                )
-                
-                email_service.send_email(
+                await email_service.send_email(
                     to_email=vendor_data.get("email"),
                     subject=email_content["subject"],
                     body=email_content["html"],
@@ -3552,12 +3368,12 @@ async def create_vendor_direct(
             "id": vendor_user_id,
             "username": vendor_data.get("email").split("@")[0],
             "email": vendor_data.get("email"),
-            "password_hash": pwd_context.hash(temp_password),
+            "password_hash": await get_password_hash(temp_password),
             "role": "vendor",
             "first_name": vendor_data.get("contact_first_name", ""),
             "last_name": vendor_data.get("contact_last_name", ""),
             "onboarding_completed": True,  # Skip onboarding
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
         
         await db.users.insert_one(vendor_user)
@@ -3583,7 +3399,7 @@ async def create_vendor_direct(
             "contact_email": vendor_data.get("contact_email", vendor_data.get("email")),
             "contact_phone": vendor_data.get("contact_phone", vendor_data.get("phone")),
             "status": "active",
-            "created_at": datetime.now(timezone.utc).isoformat(),
+            "created_at": datetime.now(timezone.utc),
             "created_by": current_user["id"]
         }
         
@@ -3668,7 +3484,7 @@ async def upload_vendor_document(
             "expiration_date": expiration_date,
             "notes": notes,
             "status": "pending",
-            "uploaded_at": datetime.now(timezone.utc).isoformat(),
+            "uploaded_at": datetime.now(timezone.utc),
             "uploaded_by": current_user["id"]
         }
         
@@ -3745,9 +3561,10 @@ async def approve_vendor_document(
 ):
     """Approve vendor document (Admin only)"""
     try:
-        document = await db.vendor_documents.find_one({"id": document_id}, {"_id": 0})
+        document = await find_one_joined(db.vendor_documents, {"id": document_id}, [("vendor_id", "vendors", "vendor")])
         if not document:
             raise HTTPException(status_code=404, detail="Document not found")
+        vendor = document.pop("vendor")
         
         # Update document status
         await db.vendor_documents.update_one(
@@ -3755,12 +3572,10 @@ async def approve_vendor_document(
             {"$set": {
                 "status": "approved",
                 "approved_by": current_user["id"],
-                "approved_at": datetime.now(timezone.utc).isoformat()
+                "approved_at": datetime.now(timezone.utc)
             }}
         )
         
-        # Get vendor info
-        vendor = await db.vendors.find_one({"id": document["vendor_id"]}, {"_id": 0})
         if vendor:
             # Send approval notification
             from email_templates import vendor_document_status_email
@@ -3770,7 +3585,7 @@ async def approve_vendor_document(
                 document_type=document["document_type"],
                 status="approved"
             )
-            email_service.send_email(
+            await email_service.send_email(
                 to_email=vendor.get("email"),
                 subject=email_content["subject"],
                 body=email_content["html"],
@@ -3792,9 +3607,10 @@ async def reject_vendor_document(
 ):
     """Reject vendor document (Admin only)"""
     try:
-        document = await db.vendor_documents.find_one({"id": document_id}, {"_id": 0})
+        document = await find_one_joined(db.vendor_documents, {"id": document_id}, [("vendor_id", "vendors", "vendor")])
         if not document:
             raise HTTPException(status_code=404, detail="Document not found")
+        vendor = document.pop("vendor")
         
         reason = rejection_data.get("reason", "Document does not meet requirements")
         
@@ -3805,12 +3621,10 @@ async def reject_vendor_document(
                 "status": "rejected",
                 "rejection_reason": reason,
                 "rejected_by": current_user["id"],
-                "rejected_at": datetime.now(timezone.utc).isoformat()
+                "rejected_at": datetime.now(timezone.utc)
             }}
         )
         
-        # Get vendor info
-        vendor = await db.vendors.find_one({"id": document["vendor_id"]}, {"_id": 0})
         if vendor:
             # Send rejection notification
             from email_templates import vendor_document_status_email
@@ -3821,7 +3635,7 @@ async def reject_vendor_document(
                 status="rejected",
                 reason=reason
             )
-            email_service.send_email(
+            await email_service.send_email(
                 to_email=vendor.get("email"),
                 subject=email_content["subject"],
                 body=email_content["html"],
@@ -3943,13 +3757,10 @@ from email_templates import (
 async def trigger_invoice_submitted_notification(invoice_id: str):
     """Send notification when vendor submits invoice"""
     try:
-        invoice = await db.vendor_invoices.find_one({"id": invoice_id}, {"_id": 0})
-        if not invoice:
-            return
-        
-        vendor = await db.vendors.find_one({"id": invoice["vendor_id"]}, {"_id": 0})
-        if not vendor:
+        invoice = await find_one_joined(db.vendor_invoices, {"id": invoice_id}, [("vendor_id", "vendors", "vendor")])
+        if not invoice or not invoice["vendor"]:
             return
+        vendor = invoice.pop("vendor")
         
         email_service = get_email_service()
         email_content = vendor_invoice_submitted_email(
@@ -3959,7 +3770,7 @@ async def trigger_invoice_submitted_notification(invoice_id: str):
             portal_url="https://williams-portal.preview.emergentagent.com/vendors"
         )
         
-        email_service.send_email(
+        await email_service.send_email(
             to_email=vendor.get("email"),
             subject=email_content["subject"],
             body=email_content["html"],
@@ -3974,7 +3785,7 @@ async def trigger_invoice_submitted_notification(invoice_id: str):
             "title": email_content["subject"],
             "message": f"Invoice {invoice['invoice_number']} submitted successfully",
             "read": False,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         })
     except Exception as e:
         logger.error(f"Error sending invoice submitted notification: {str(e)}")
@@ -3982,13 +3793,10 @@ async def trigger_invoice_submitted_notification(invoice_id: str):
 async def trigger_invoice_status_change_notification(invoice_id: str, new_status: str, reason: str = ""):
     """Send notification when invoice status changes"""
     try:
-        invoice = await db.vendor_invoices.find_one({"id": invoice_id}, {"_id": 0})
-        if not invoice:
-            return
-        
-        vendor = await db.vendors.find_one({"id": invoice["vendor_id"]}, {"_id": 0})
-        if not vendor:
+        invoice = await find_one_joined(db.vendor_invoices, {"id": invoice_id}, [("vendor_id", "vendors", "vendor")])
+        if not invoice or not invoice["vendor"]:
             return
+        vendor = invoice.pop("vendor")
         
         email_service = get_email_service()
         
@@ -4011,7 +3819,7 @@ async def trigger_invoice_status_change_notification(invoice_id: str, new_status
         else:
             return
         
-        email_service.send_email(
+        await email_service.send_email(
             to_email=vendor.get("email"),
             subject=email_content["subject"],
             body=email_content["html"],
@@ -4026,7 +3834,7 @@ async def trigger_invoice_status_change_notification(invoice_id: str, new_status
             "title": email_content["subject"],
             "message": f"Invoice {invoice['invoice_number']} has been {new_status}",
             "read": False,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         })
     except Exception as e:
         logger.error(f"Error sending invoice status notification: {str(e)}")
@@ -4034,13 +3842,10 @@ async def trigger_invoice_status_change_notification(invoice_id: str, new_status
 async def trigger_payment_notification(payment_id: str, notification_type: str = "processed"):
     """Send payment notification (approved or processed)"""
     try:
-        payment = await db.vendor_payments.find_one({"id": payment_id}, {"_id": 0})
-        if not payment:
-            return
-        
-        vendor = await db.vendors.find_one({"id": payment["vendor_id"]}, {"_id": 0})
-        if not vendor:
+        payment = await find_one_joined(db.vendor_payments, {"id": payment_id}, [("vendor_id", "vendors", "vendor")])
+        if not payment or not payment["vendor"]:
             return
+        vendor = payment.pop("vendor")
         
         email_service = get_email_service()
         
@@ -4065,7 +3870,7 @@ async def trigger_payment_notification(payment_id: str, notification_type: str =
                 transaction_ref=payment.get("transaction_ref", payment["id"][:12])
             )
         
-        email_service.send_email(
+        await email_service.send_email(
             to_email=vendor.get("email"),
             subject=email_content["subject"],
             body=email_content["html"],
@@ -4080,7 +3885,7 @@ async def trigger_payment_notification(payment_id: str, notification_type: str =
             "title": email_content["subject"],
             "message": f"Payment of ${payment['amount']} {notification_type}",
             "read": False,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         })
     except Exception as e:
         logger.error(f"Error sending payment notification: {str(e)}")
@@ -4088,13 +3893,10 @@ async def trigger_payment_notification(payment_id: str, notification_type: str =
 async def trigger_paystub_notification(paystub_id: str):
     """Send notification when paystub is available"""
     try:
-        paystub = await db.paystubs.find_one({"id": paystub_id}, {"_id": 0})
-        if not paystub:
-            return
-        
-        employee = await db.users.find_one({"id": paystub["employee_id"]}, {"_id": 0})
-        if not employee:
+        paystub = await find_one_joined(db.paystubs, {"id": paystub_id}, [("employee_id", "users", "employee")])
+        if not paystub or not paystub["employee"]:
             return
+        employee = paystub.pop("employee")
         
         email_service = get_email_service()
         email_content = employee_paystub_available_email(
@@ -4106,7 +3908,7 @@ async def trigger_paystub_notification(paystub_id: str):
             portal_url="https://williams-portal.preview.emergentagent.com/my-payroll-documents"
         )
         
-        email_service.send_email(
+        await email_service.send_email(
             to_email=employee.get("email"),
             subject=email_content["subject"],
             body=email_content["html"],
@@ -4121,7 +3923,7 @@ async def trigger_paystub_notification(paystub_id: str):
             "title": email_content["subject"],
             "message": f"Paystub for {paystub['pay_period']} is ready",
             "read": False,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         })
     except Exception as e:
         logger.error(f"Error sending paystub notification: {str(e)}")
@@ -4129,10 +3931,6 @@ async def trigger_paystub_notification(paystub_id: str):
 async def trigger_assignment_notification(user_id: str, item_type: str, item_id: str):
     """Send notification when user is assigned to task/project/work order"""
     try:
-        user = await db.users.find_one({"id": user_id}, {"_id": 0})
-        if not user:
-            return
-        
         # Get item details based on type
         collection_map = {
             "task": "tasks",
@@ -4148,39 +3946,39 @@ async def trigger_assignment_notification(user_id: str, item_type: str, item_id:
         if not item:
             return
         
-        assigned_by_user = await db.users.find_one({"id": item.get("created_by", "")}, {"_id": 0})
+        # Assignee and assigner in one query
+        users = await fetch_by_ids(db.users, [user_id, item.get("created_by")], projection={"_id": 0, "password_hash": 0})
+        user = users.get(user_id)
+        if not user:
+            return
+        
+        assigned_by_user = users.get(item.get("created_by"))
         assigned_by_name = "System"
         if assigned_by_user:
             assigned_by_name = f"{assigned_by_user.get('first_name', '')} {assigned_by_user.get('last_name', '')}".strip() or assigned_by_user.get("username", "Manager")
         
         from email_templates import employee_assignment_notification
-        email_service = get_email_service()
+        item_title = item.get("title", item.get("name", "Untitled"))
+        portal_url = f"https://williams-portal.preview.emergentagent.com/{collection}"
         email_content = employee_assignment_notification(
             employee_name=f"{user.get('first_name', '')} {user.get('last_name', '')}".strip() or user.get("username", "Employee"),
             item_type=item_type.title(),
-            item_title=item.get("title", item.get("name", "Untitled")),
+            item_title=item_title,
             assigned_by=assigned_by_name,
             due_date=item.get("due_date", item.get("deadline", "Not specified")),
-            portal_url=f"https://williams-portal.preview.emergentagent.com/{collection}"
+            portal_url=portal_url
         )
         
-        email_service.send_email(
-            to_email=user.get("email"),
-            subject=email_content["subject"],
-            body=email_content["html"],
-            html=True
+        # Email and notification document go out when the recipient's digest window closes
+        await get_notification_digest(db).add(
+            user,
+            item_type=collection[:-1],
+            item_id=item_id,
+            item_title=item_title,
+            assigned_by=assigned_by_name,
+            portal_url=portal_url,
+            email=email_content
         )
-        
-        # Log notification
-        await db.notifications.insert_one({
-            "id": str(uuid.uuid4()),
-            "user_id": user["id"],
-            "type": f"{item_type}_assigned",
-            "title": email_content["subject"],
-            "message": f"You have been assigned to {item_type}: {item.get('title', item.get('name', 'Untitled'))}",
-            "read": False,
-            "created_at": datetime.now(timezone.utc).isoformat()
-        })
     except Exception as e:
         logger.error(f"Error sending assignment notification: {str(e)}")
 
@@ -4238,9 +4036,10 @@ async def complete_employee_onboarding(
                 "state": onboarding_data.get("state"),
                 "zip": onboarding_data.get("zip"),
                 "onboarding_completed": True,
-                "onboarding_completed_at": datetime.now(timezone.utc).isoformat()
+                "onboarding_completed_at": datetime.now(timezone.utc)
             }}
         )
+        get_principal_cache().invalidate_user(current_user["id"])
         
         # Create payroll employee record
         payroll_employee = {
@@ -4260,7 +4059,7 @@ async def complete_employee_onboarding(
             "bank_name": onboarding_data.get("bank_name"),
             "account_type": onboarding_data.get("account_type"),
             "start_date": onboarding_data.get("start_date"),
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
         await db.payroll_employees.insert_one(payroll_employee)
         
@@ -4272,7 +4071,7 @@ async def complete_employee_onboarding(
             "dependents": int(onboarding_data.get("dependents", 0)),
             "extra_withholding": float(onboarding_data.get("extra_withholding", 0)),
             "signature": onboarding_data.get("signature"),
-            "signed_at": datetime.now(timezone.utc).isoformat()
+            "signed_at": datetime.now(timezone.utc)
         }
         await db.employee_tax_info.insert_one(w4_data)
         
@@ -4283,7 +4082,7 @@ async def complete_employee_onboarding(
             "document_type": "employee_nda",
             "accepted": onboarding_data.get("nda_accepted", False),
             "signature": onboarding_data.get("signature"),
-            "signed_at": datetime.now(timezone.utc).isoformat(),
+            "signed_at": datetime.now(timezone.utc),
             "ip_address": "system"
         }
         await db.legal_agreements.insert_one(nda_record)
@@ -4342,7 +4141,7 @@ async def complete_vendor_onboarding(
             raise HTTPException(status_code=400, detail="Invitation already used")
         
         # Create user account for vendor
-        hashed_password = pwd_context.hash("TempPassword123!")  # Temporary password
+        hashed_password = await get_password_hash("TempPassword123!")  # Temporary password
         user = {
             "id": str(uuid.uuid4()),
             "username": email,
@@ -4352,7 +4151,7 @@ async def complete_vendor_onboarding(
             "first_name": contact_first_name,
             "last_name": contact_last_name,
             "onboarding_completed": True,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
         await db.users.insert_one(user)
         
@@ -4384,7 +4183,7 @@ async def complete_vendor_onboarding(
             "routing_number": routing_number,
             "account_number": account_number,
             "status": "pending_approval",
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
         await db.vendors.insert_one(vendor)
         
@@ -4411,7 +4210,7 @@ async def complete_vendor_onboarding(
                 "stored_filename": f"{vendor['id']}_w9_{w9_file.filename}",
                 "file_url": f"/api/vendor_documents/{vendor['id']}_w9_{w9_file.filename}",
                 "status": "pending",
-                "uploaded_at": datetime.now(timezone.utc).isoformat()
+                "uploaded_at": datetime.now(timezone.utc)
             }
             await db.vendor_documents.insert_one(doc_record)
         
@@ -4429,7 +4228,7 @@ async def complete_vendor_onboarding(
                 "file_url": f"/api/vendor_documents/{vendor['id']}_coi_{coi_file.filename}",
                 "expiration_date": insurance_expiry,
                 "status": "pending",
-                "uploaded_at": datetime.now(timezone.utc).isoformat()
+                "uploaded_at": datetime.now(timezone.utc)
             }
             await db.vendor_documents.insert_one(doc_record)
         
@@ -4446,7 +4245,7 @@ async def complete_vendor_onboarding(
                 "stored_filename": f"{vendor['id']}_license_{license_file.filename}",
                 "file_url": f"/api/vendor_documents/{vendor['id']}_license_{license_file.filename}",
                 "status": "pending",
-                "uploaded_at": datetime.now(timezone.utc).isoformat()
+                "uploaded_at": datetime.now(timezone.utc)
             }
             await db.vendor_documents.insert_one(doc_record)
         
@@ -4459,7 +4258,7 @@ async def complete_vendor_onboarding(
             "accepted": nda_accepted,
             "terms_accepted": terms_accepted,
             "signature": signature,
-            "signed_at": datetime.now(timezone.utc).isoformat()
+            "signed_at": datetime.now(timezone.utc)
         }
         await db.legal_agreements.insert_one(nda_record)
         
@@ -4468,7 +4267,7 @@ async def complete_vendor_onboarding(
             {"invitation_code": invitation_code},
             {"$set": {
                 "status": "completed",
-                "completed_at": datetime.now(timezone.utc).isoformat(),
+                "completed_at": datetime.now(timezone.utc),
                 "vendor_id": vendor["id"]
             }}
         )
@@ -4495,31 +4294,14 @@ async def ai_form_assist(
 ):
     """AI-assisted form filling"""
     try:
-        from emergentintegrations.llm.chat import LlmChat, UserMessage
-        
         section = assist_request.get("section")
         current_data = assist_request.get("current_data", {})
         form_type = assist_request.get("form_type")
         
-        # Initialize chat with Gemini 2.5 Flash
-        chat = LlmChat(
-            api_key=os.environ.get("EMERGENT_LLM_KEY"),
-            session_id=f"form_assist_{current_user['id']}",
-            system_message="You are an AI assistant helping users fill out forms with intelligent suggestions."
-        ).with_model("gemini", "gemini-2.5-flash")
+        # Gemini 2.5 Flash; identical requests in flight (same section and data) share one call
+        prompt = FORM_ASSIST_PROMPT.render(form_type=form_type, section=section, current_data=current_data)
         
-        prompt = f"""You are helping fill out a {form_type} form.
-Section: {section}
-Current data: {current_data}
-
-Provide intelligent suggestions for missing or incomplete fields based on common patterns and best practices.
-Return suggestions as a JSON object with field names as keys.
-
-Only suggest for fields that are empty or obviously incorrect.
-"""
-        
-        user_message = UserMessage(text=prompt)
-        response = await chat.send_message(user_message)
+        response = await get_ai_service().complete("form_assist", f"form_assist_{current_user['id']}", prompt)
         
         # Try to parse as JSON, fallback to empty suggestions
         import json
@@ -4548,7 +4330,7 @@ Only suggest for fields that are empty or obviously incorrect.
             portal_url=f"https://williams-portal.preview.emergentagent.com/{collection}"
         )
         
-        email_service.send_email(
+        await email_service.send_email(
             to_email=user.get("email"),
             subject=email_content["subject"],
             body=email_content["html"],
@@ -4563,7 +4345,7 @@ Only suggest for fields that are empty or obviously incorrect.
             "title": email_content["subject"],
             "message": f"You have been assigned to {item_type}: {item.get('title', item.get('name', 'Untitled'))}",
             "read": False,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         })
     except Exception as e:
         logger.error(f"Error sending assignment notification: {str(e)}")
@@ -4604,7 +4386,7 @@ async def mark_notification_read(
             {"$set": {
                 "status": "approved",
                 "approved_by": current_user["id"],
-                "approved_at": datetime.now(timezone.utc).isoformat()
+                "approved_at": datetime.now(timezone.utc)
             }}
         )
         
@@ -4618,7 +4400,7 @@ async def mark_notification_read(
                 document_type=document["document_type"],
                 status="approved"
             )
-            email_service.send_email(
+            await email_service.send_email(
                 to_email=vendor.get("email"),
                 subject=email_content["subject"],
                 body=email_content["html"],
@@ -4653,7 +4435,7 @@ async def reject_vendor_document(
                 "status": "rejected",
                 "rejection_reason": reason,
                 "rejected_by": current_user["id"],
-                "rejected_at": datetime.now(timezone.utc).isoformat()
+                "rejected_at": datetime.now(timezone.utc)
             }}
         )
         
@@ -4668,7 +4450,7 @@ async def reject_vendor_document(
                 status="rejected",
                 reason=reason
             )
-            email_service.send_email(
+            await email_service.send_email(
                 to_email=vendor.get("email"),
                 subject=email_content["subject"],
                 body=email_content["html"],
@@ -4700,6 +4482,36 @@ async def serve_vendor_document(
 # Include the router in the main app (after all endpoints are defined)
 app.include_router(api_router)
 
+async def bootstrap_database():
+    """Build declared indexes, apply pending migrations and rebuild derived data without delaying startup"""
+    try:
+        await get_index_manager(db).ensure_indexes()
+        await run_pending_migrations(db)
+        await get_inventory_valuation(db).rebuild()
+    except Exception as e:
+        logger.error(f"Database bootstrap failed: {str(e)}")
+
+@app.on_event("startup")
+async def startup_db_bootstrap():
+    app.state.db_bootstrap_task = asyncio.create_task(bootstrap_database())
+    get_dashboard_counters(db).start_reconciliation()
+    email_outbox = get_email_outbox(db)
+    use_email_outbox(email_outbox)
+    email_outbox.start()
+    # Loads the settings (configuring the shared email service and digest) and watches for changes
+    get_notification_settings_cache(db).start()
+    get_notification_digest(db).start()
+    use_ai_response_cache(get_ai_response_cache(db))
+    get_expense_classifier(db).start()
+    get_retrieval_index(db).start()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await get_dashboard_counters(db).stop_reconciliation()
+    await get_notification_settings_cache(db).stop()
+    await get_notification_digest(db).stop()
+    await get_expense_classifier(db).stop()
+    await get_retrieval_index(db).stop()
+    await get_email_outbox(db).stop()
     client.close()
+    get_password_hasher().shutdown()
@@ -0,0 +1,95 @@
+from fastapi import Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from pydantic_core import to_json
+from typing import Any, AsyncIterable, Callable, List, Tuple, Type
+import inspect
+import logging
+
+from fast_response import document_serializer
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Documents pulled from the cursor, hydrated and written per chunk
+STREAM_BATCH_SIZE = 200
+
+class StreamParams:
+    """Opt-in streaming: `Accept: application/x-ndjson` or `?stream=1`"""
+
+    def __init__(
+        self,
+        request: Request,
+        stream: bool = Query(False, description="Stream the full result set as newline-delimited JSON"),
+    ):
+        self.requested = stream or NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+class NDJSONResponse(StreamingResponse):
+    """Writes documents from an async iterator (e.g. a Motor cursor) as newline-delimited JSON as they arrive"""
+
+    def __init__(self, documents: AsyncIterable[dict], batch_size: int = STREAM_BATCH_SIZE):
+        self.documents = documents
+        self.batch_size = batch_size
+        self.batch_hooks: List[Callable] = []
+        self.serialize = to_json
+        super().__init__(self._lines(), media_type=NDJSON_MEDIA_TYPE)
+
+    def use_model(self, model: Type[BaseModel]) -> "NDJSONResponse":
+        """Serialize each document through a response model"""
+        self.serialize = document_serializer(model)
+        return self
+
+    def add_batch_hook(self, hook: Callable):
+        """Run hook(batch) - sync or async - on each chunk before it is written"""
+        self.batch_hooks.append(hook)
+
+    async def _lines(self):
+        batch = []
+        try:
+            async for doc in self.documents:
+                batch.append(doc)
+                if len(batch) >= self.batch_size:
+                    yield await self._encode(batch)
+                    batch = []
+            if batch:
+                yield await self._encode(batch)
+        except Exception as e:
+            # Headers are already sent; all we can do is log and end the stream early
+            logger.error(f"NDJSON stream aborted: {str(e)}")
+            raise
+
+    async def _encode(self, batch: list) -> bytes:
+        for hook in self.batch_hooks:
+            result = hook(batch)
+            if inspect.isawaitable(result):
+                await result
+        return b"".join(self.serialize(doc) + b"\n" for doc in batch)
+
+SSE_MEDIA_TYPE = "text/event-stream"
+
+class EventStreamParams:
+    """Opt-in Server-Sent Events: `Accept: text/event-stream` or `?stream=1`"""
+
+    def __init__(
+        self,
+        request: Request,
+        stream: bool = Query(False, description="Stream the response as Server-Sent Events"),
+    ):
+        self.requested = stream or SSE_MEDIA_TYPE in request.headers.get("accept", "")
+
+class EventSourceResponse(StreamingResponse):
+    """Writes (event, data) pairs from an async iterator as Server-Sent Events, data as JSON"""
+
+    def __init__(self, events: AsyncIterable[Tuple[str, Any]]):
+        self.events = events
+        super().__init__(
+            self._frames(),
+            media_type=SSE_MEDIA_TYPE,
+            # Proxies (nginx) must pass each event through rather than buffer the response
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+
+    async def _frames(self):
+        async for event, data in self.events:
+            yield b"event: " + event.encode() + b"\ndata: " + to_json(data) + b"\n\n"
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+AI response cache benchmark.
+
+Replays a workload of expense categorizations with repeated, near-identical
+descriptions against the fake LLM (fake_llm), with and without the
+in-memory response cache, and reports wall time, model calls and hit rate.
+
+Usage:
+    python benchmark_ai_response_cache.py --requests 200 --tokens-per-second 1000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+DESCRIPTIONS = [
+    "fuel for generator", "Fuel for generator", "fuel  for generator ", "diesel for excavator",
+    "lumber 2x4s", "Lumber 2x4s", "office printer paper", "crew lunch", "truck tire repair",
+    "portable toilet rental", "dumpster haul", "safety vests", "Safety vests", "chainsaw chain",
+]
+
+async def run(service, descriptions):
+    started = time.perf_counter()
+    for description in descriptions:
+        await service.categorize_expense(description)
+    return time.perf_counter() - started
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="categorizations per run")
+    parser.add_argument("--tokens-per-second", type=float, default=1000, help="fake LLM generation rate")
+    args = parser.parse_args()
+
+    os.environ["AI_FAKE_LLM_TOKENS_PER_SECOND"] = str(args.tokens_per_second)
+    from ai_response_cache import AIResponseCache
+    from ai_service import AIService, use_ai_response_cache
+
+    random.seed(7)
+    descriptions = [random.choice(DESCRIPTIONS) for _ in range(args.requests)]
+    service = AIService()
+
+    use_ai_response_cache(None)
+    uncached = await run(service, descriptions)
+
+    cache = AIResponseCache()
+    use_ai_response_cache(cache)
+    cached = await run(service, descriptions)
+    stats = cache.stats()["purposes"]["expense_categorization"]
+
+    print("=" * 64)
+    print(f"Expense categorization, {args.requests} requests, {len(DESCRIPTIONS)} distinct descriptions")
+    print("=" * 64)
+    print(f"no cache     {uncached:>7.2f}s   {args.requests} model calls")
+    print(f"with cache   {cached:>7.2f}s   {stats['misses']} model calls, hit rate {stats['hit_rate']:.1%}, "
+          f"{stats['saved_seconds']:.2f}s of model time saved")
+    print(f"speedup      {uncached / cached:>7.1f}x")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+AI streaming latency benchmark.
+
+Runs the chat and proposal event streams (ai_streaming) against the local
+fake LLM (fake_llm) at a given token rate and compares when the client
+gets something useful - the first token, or the first proposal section -
+with the buffered endpoints, which answer only after the whole reply.
+
+Usage:
+    python benchmark_ai_streaming.py --tokens-per-second 40
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+from ai_streaming import chat_events, proposal_events  # noqa: E402
+from fake_llm import FakeLlmChat  # noqa: E402
+
+async def measure(purpose, events, tokens_per_second):
+    chat = FakeLlmChat(purpose, "benchmark", "", tokens_per_second=tokens_per_second)
+    started = time.perf_counter()
+    first = None
+    sections = []
+    async for event, data in events(chat.stream_message(None)):
+        elapsed = time.perf_counter() - started
+        if first is None:
+            first = elapsed
+        if event == "section":
+            sections.append((data["name"], elapsed))
+    return first, time.perf_counter() - started, sections
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens-per-second", type=float, default=40, help="fake LLM generation rate")
+    args = parser.parse_args()
+
+    print("=" * 64)
+    print(f"AI streaming vs buffered, fake LLM at {args.tokens_per_second:g} tokens/s")
+    print("=" * 64)
+    for purpose, events, label in (("chat", chat_events, "first token"), ("proposal", proposal_events, "first section")):
+        first, total, sections = await measure(purpose, events, args.tokens_per_second)
+        if sections:
+            first = sections[0][1]
+        print(f"{purpose:<10} buffered {total:>6.2f}s   streamed {label} {first:>6.2f}s")
+        for name, elapsed in sections:
+            print(f"{'':<12}{name:<18}{elapsed:>6.2f}s")
+
+if __name__ == "__main__":
+    asyncio.run(main())
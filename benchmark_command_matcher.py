@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Command matcher accuracy and latency benchmark.
+
+Scores the labeled navigation commands in command_corpus.json with the old
+substring pass of /api/ai/command and with the local CommandMatcher. A
+command labeled with a screen is correct when it resolves locally to that
+screen, wrong when it resolves to another one, and goes to the LLM when
+nothing matches confidently. Commands labeled null are out of scope, or
+ambiguous ("jobs" is both projects and work orders), and should go to the
+LLM.
+
+Usage:
+    python benchmark_command_matcher.py --rounds 200 --verbose
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+from command_matcher import CONFIDENCE_THRESHOLD, SCREEN_REGISTRY, CommandMatcher  # noqa: E402
+
+CORPUS = Path(__file__).parent / "command_corpus.json"
+
+def substring_match(command):
+    """The router's previous keyword/alias scan"""
+    command_lower = command.lower()
+    for screen in SCREEN_REGISTRY:
+        if screen['key'] in command_lower or screen['path'] in command_lower:
+            return screen['key']
+        for alias in screen['aliases']:
+            if alias in command_lower:
+                return screen['key']
+    return None
+
+def evaluate(name, resolve, corpus, rounds, verbose):
+    correct = wrong = llm = 0
+    for entry in corpus:
+        screen = resolve(entry["command"])
+        if screen is None:
+            llm += 1
+            if entry["screen"] is None:
+                correct += 1
+            elif verbose:
+                print(f"  {name}: LLM   {entry['command']!r} (expected {entry['screen']})")
+        elif screen == entry["screen"]:
+            correct += 1
+        else:
+            wrong += 1
+            if verbose:
+                print(f"  {name}: WRONG {entry['command']!r} -> {screen} (expected {entry['screen']})")
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for entry in corpus:
+            resolve(entry["command"])
+    per_command = (time.perf_counter() - started) / (rounds * len(corpus))
+    return correct, wrong, llm, per_command
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=200, help="timing passes over the corpus")
+    parser.add_argument("--verbose", action="store_true", help="list commands that are wrong or go to the LLM")
+    args = parser.parse_args()
+
+    corpus = json.loads(CORPUS.read_text())
+    started = time.perf_counter()
+    matcher = CommandMatcher(SCREEN_REGISTRY)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    def local_match(command):
+        match = matcher.match(command)
+        return match["screen_key"] if match and match["confidence"] >= CONFIDENCE_THRESHOLD else None
+
+    print("=" * 72)
+    print(f"Command matching, {len(corpus)} labeled commands (matcher built in {build_ms:.2f}ms)")
+    print("=" * 72)
+    print(f"{'matcher':<12}{'correct':>10}{'wrong':>8}{'to LLM':>9}{'µs/command':>14}")
+    for name, resolve in (("substring", substring_match), ("fuzzy", local_match)):
+        correct, wrong, llm, per_command = evaluate(name, resolve, corpus, args.rounds, args.verbose)
+        print(f"{name:<12}{correct / len(corpus):>10.1%}{wrong:>8}{llm:>9}{per_command * 1e6:>14.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Chunked document analysis benchmark.
+
+Builds a USACE-style specification (numbered sections with parts, articles
+and paragraphs) of --pages pages and runs AIService.analyze_document on it
+against the fake LLM (fake_llm) with an in-memory response cache. Reports
+the chunking (chunk count, largest prompt vs. the single-prompt size) and
+the wall time and model calls of a first analysis, a re-analysis of the
+unchanged document and one after editing a single section. (The fake LLM
+gives every chunk the same reply, so after the edit the final reduce is a
+cache hit too; with a real model it is one more call.)
+
+Usage:
+    python benchmark_document_analysis.py --pages 300 --tokens-per-second 100
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+from document_chunks import split_document  # noqa: E402
+
+WORDS = ("contractor shall submit provide install schedule government approval days written notice "
+         "material equipment inspection testing warranty requirements delivery site safety compliance "
+         "payment retainage change order quality control drawings specifications").split()
+
+def specification(pages, rng):
+    lines, size = [], 0
+    section = 0
+    while size < pages * 3000:
+        section += 1
+        lines.append(f"SECTION {section // 100:02d} {section % 100:02d} 00 - {' '.join(rng.sample(WORDS, 3)).upper()}")
+        for part, title in enumerate(("GENERAL", "PRODUCTS", "EXECUTION"), 1):
+            lines.append(f"PART {part} - {title}")
+            for article in range(1, rng.randint(3, 7)):
+                lines.append(f"{part}.{article} {' '.join(rng.sample(WORDS, 2)).upper()}")
+                for _ in range(rng.randint(1, 3)):
+                    sentences = [" ".join(rng.choices(WORDS, k=rng.randint(8, 20))).capitalize() + "."
+                                 for _ in range(rng.randint(2, 6))]
+                    lines.append(" ".join(sentences) + "\n")
+                    size += len(lines[-1])
+    return "\n".join(lines)
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=300, help="document length (about 3000 characters per page)")
+    parser.add_argument("--analysis-type", default="risks", choices=["summarize", "risks", "actions", "insights"])
+    parser.add_argument("--tokens-per-second", type=float, default=100, help="fake LLM generation rate")
+    args = parser.parse_args()
+
+    os.environ["AI_FAKE_LLM_TOKENS_PER_SECOND"] = str(args.tokens_per_second)
+    import ai_service
+    from ai_response_cache import AIResponseCache
+
+    cache = AIResponseCache()
+    ai_service.use_ai_response_cache(cache)
+    service = ai_service.get_ai_service()
+    purposes = service.gateway.stats
+
+    document = specification(args.pages, random.Random(7))
+    chunks = split_document(document, service.document_chunk_tokens)
+
+    def model_calls():
+        stats = purposes()["purposes"]
+        return sum(stats.get(purpose, {}).get("calls", 0) for purpose in ("document_chunk", "document_analysis"))
+
+    print("=" * 64)
+    print(f"Document analysis ({args.analysis_type}), {args.pages} pages, {len(document) // 4} tokens")
+    print("=" * 64)
+    print(f"chunks                   {len(chunks):>8}  (budget {service.document_chunk_tokens} tokens, "
+          f"largest {max(len(chunk) for chunk in chunks) // 4})")
+    print(f"single prompt would be   {len(document) // 4:>8} tokens")
+
+    edited = document.replace("PART 2 - PRODUCTS", "PART 2 - PRODUCTS AND MATERIALS", 1)
+    for label, text in (("first analysis", document), ("unchanged again", document), ("one section edited", edited)):
+        calls = model_calls()
+        started = time.perf_counter()
+        result = await service.analyze_document(text, args.analysis_type)
+        seconds = time.perf_counter() - started
+        assert not result.startswith("Analysis failed"), result
+        print(f"{label:<24} {seconds:>8.2f}s  {model_calls() - calls:>4} model calls")
+
+if __name__ == "__main__":
+    asyncio.run(main())
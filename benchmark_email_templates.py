@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Email template rendering benchmark.
+
+Renders every branded template with representative data, the way
+generate_all_email_samples.py does, and reports renders/sec for one-at-a-time
+calls and for render_batch() fan-out (one template, many recipients).
+
+With --baseline REV the email_templates.py from that git revision is timed
+as well (e.g. the f-string implementation before the template registry),
+over the templates both revisions have, and its fan-out is one call per
+recipient.
+
+Usage:
+    python benchmark_email_templates.py --rounds 200 --fanout 50 --baseline HEAD~1
+"""
+import argparse
+import importlib.util
+import inspect
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND = Path(__file__).parent / "backend"
+sys.path.insert(0, str(BACKEND))
+
+import email_templates  # noqa: E402
+
+SAMPLE_VALUES = {
+    "invoice_numbers": ["INV-2024-001", "INV-2024-002", "INV-2024-003"],
+    "status": "rejected",
+    "reason": "Certificate of insurance has expired",
+    "expiry_days": 14,
+    "priority": "high",
+    "portal_url": "https://williams-portal.preview.emergentagent.com/tasks",
+    "items": [
+        {"item_type": "Task", "item_title": f"Sample task {i}", "assigned_by": "Sample manager",
+         "portal_url": "https://williams-portal.preview.emergentagent.com/tasks"}
+        for i in range(5)
+    ],
+}
+
+
+def sample_kwargs(func):
+    return {
+        name: SAMPLE_VALUES.get(name, f"Sample {name.replace('_', ' ')}")
+        for name in inspect.signature(func).parameters
+    }
+
+
+def template_functions(module):
+    """Public template functions of an email_templates module (anything returning a subject/html dict)"""
+    return [
+        func for name, func in inspect.getmembers(module, inspect.isfunction)
+        if func.__module__ == module.__name__ and not name.startswith("get_")
+        and inspect.signature(func).return_annotation is dict
+    ]
+
+
+def load_revision(rev):
+    source = subprocess.run(
+        ["git", "show", f"{rev}:backend/email_templates.py"],
+        cwd=BACKEND.parent, check=True, capture_output=True, text=True
+    ).stdout
+    path = Path(tempfile.mkdtemp()) / "email_templates_baseline.py"
+    path.write_text(source)
+    spec = importlib.util.spec_from_file_location("email_templates_baseline", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def time_calls(funcs, rounds):
+    calls = [(func, sample_kwargs(func)) for func in funcs]
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for func, kwargs in calls:
+            func(**kwargs)
+    elapsed = time.perf_counter() - started
+    return rounds * len(calls) / elapsed
+
+
+def time_fanout(recipients, rounds, module=None):
+    """One task assigned to many employees: render_batch, or one call per recipient on module"""
+    kwargs = sample_kwargs(email_templates.employee_task_assignment)
+    contexts = [dict(kwargs, employee_name=f"Employee {i}") for i in range(recipients)]
+    started = time.perf_counter()
+    for _ in range(rounds):
+        if module is None:
+            email_templates.assignment_emails("task", [(context["employee_name"], "employee") for context in contexts],
+                                              **{k: v for k, v in kwargs.items() if k != "employee_name"})
+        else:
+            for context in contexts:
+                module.employee_task_assignment(**context)
+    elapsed = time.perf_counter() - started
+    return rounds * recipients / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=200, help="passes over every template")
+    parser.add_argument("--fanout", type=int, default=50, help="recipients per render_batch call")
+    parser.add_argument("--baseline", metavar="REV", help="also time email_templates.py from this git revision")
+    args = parser.parse_args()
+
+    funcs = template_functions(email_templates)
+    baseline = load_revision(args.baseline) if args.baseline else None
+    if baseline is not None:
+        common = {func.__name__ for func in template_functions(baseline)}
+        funcs = [func for func in funcs if func.__name__ in common]
+
+    print("=" * 64)
+    print(f"Email template rendering, {len(funcs)} templates x {args.rounds} rounds")
+    print("=" * 64)
+
+    results = []
+    if baseline is not None:
+        results.append((f"baseline ({args.baseline}), one at a time", time_calls(template_functions(baseline), args.rounds)))
+    results.append(("registry, one at a time", time_calls(funcs, args.rounds)))
+    if baseline is not None:
+        results.append((f"baseline ({args.baseline}), x{args.fanout} calls", time_fanout(args.fanout, args.rounds, baseline)))
+    results.append((f"registry, render_batch x{args.fanout}", time_fanout(args.fanout, args.rounds)))
+
+    for label, per_second in results:
+        print(f"{label:<38}{per_second:>12,.0f} renders/s {1e6 / per_second:>8.1f} us/render")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Local expense classifier benchmark.
+
+Generates labeled expense descriptions the way crews type them (vendor
+names, quantities, abbreviations, the odd typo), trains the TF-IDF +
+softmax model from expense_classifier on them, and reports training time,
+accuracy on unseen descriptions, the share answered locally at the
+confidence threshold and the per-description latency, one at a time and
+as a batch import.
+
+Usage:
+    python benchmark_expense_classifier.py --samples 5000 --min-confidence 0.7
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+from expense_classifier import train_model  # noqa: E402
+
+ITEMS = {
+    "Materials": ["lumber 2x4", "plywood sheets", "concrete mix", "rebar", "drywall", "pvc pipe", "roofing shingles",
+                  "insulation rolls", "gravel", "framing nails", "anchor bolts", "asphalt patch"],
+    "Labor": ["subcontractor crew", "overtime hours", "day laborers", "temp staffing", "framing crew", "demo crew labor",
+              "electrician labor", "weekend shift wages"],
+    "Equipment": ["excavator rental", "skid steer rental", "generator purchase", "scissor lift", "chainsaw", "compactor rental",
+                  "pressure washer", "boom lift rental"],
+    "Transportation": ["fuel for truck", "diesel", "mileage reimbursement", "hotel for crew", "airfare", "tolls",
+                       "truck rental", "gas for fleet"],
+    "Utilities": ["electric bill", "water service", "site power hookup", "internet service", "natural gas bill",
+                  "portable toilet service", "trash service"],
+    "Office Supplies": ["printer paper", "toner cartridges", "pens and notepads", "file folders", "office chair",
+                        "label maker tape", "staples"],
+    "Professional Services": ["legal fees", "engineering review", "accounting services", "permit consultant",
+                              "surveyor fee", "environmental assessment", "architect drawings"],
+    "Insurance": ["general liability premium", "workers comp insurance", "vehicle insurance", "builders risk policy",
+                  "bond premium", "umbrella policy renewal"],
+    "Maintenance": ["truck oil change", "tire repair", "hvac service", "generator maintenance", "equipment repair parts",
+                    "brake replacement", "filter replacement"],
+    "Other": ["crew lunch", "holiday party", "bank fee", "donation", "parking ticket", "misc", "coffee for site"],
+}
+VENDORS = ["Home Depot", "Lowes", "Sunbelt", "United Rentals", "Shell", "Costco", "Staples", "Grainger", "Ferguson", "local vendor"]
+PATTERNS = ["{item}", "{item} - {vendor}", "{vendor} {item}", "{item} for {site}", "{qty} {item}", "{item} ({vendor})", "{item} {site} job"]
+SITES = ["Smith project", "county road", "warehouse", "storm cleanup", "main st", "job 1042"]
+
+def typo(text, rng):
+    if len(text) < 5 or rng.random() > 0.15:
+        return text
+    i = rng.randrange(1, len(text) - 2)
+    return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+
+def generate(samples, rng):
+    texts, labels = [], []
+    for _ in range(samples):
+        category = rng.choice(list(ITEMS))
+        text = rng.choice(PATTERNS).format(item=rng.choice(ITEMS[category]), vendor=rng.choice(VENDORS),
+                                            site=rng.choice(SITES), qty=rng.randint(2, 400))
+        texts.append(typo(text, rng))
+        labels.append(category)
+    return texts, labels
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=5000, help="labeled expenses to train on")
+    parser.add_argument("--min-confidence", type=float, default=0.7, help="threshold for answering locally")
+    parser.add_argument("--batch", type=int, default=500, help="descriptions per batch import")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    texts, labels = generate(args.samples, rng)
+    test_texts, test_labels = generate(2000, rng)
+
+    started = time.perf_counter()
+    model = train_model(texts, labels)
+    train_seconds = time.perf_counter() - started
+
+    predictions = model.predict(test_texts)
+    correct = [p is not None and p[0] == label for p, label in zip(predictions, test_labels)]
+    confident = [p is not None and p[1] >= args.min_confidence for p in predictions]
+    local_correct = sum(c for c, k in zip(correct, confident) if k)
+
+    started = time.perf_counter()
+    for text in test_texts[:1000]:
+        model.predict([text])
+    single_us = (time.perf_counter() - started) / 1000 * 1e6
+    started = time.perf_counter()
+    model.predict(test_texts[:args.batch])
+    batch_ms = (time.perf_counter() - started) * 1000
+
+    print("=" * 64)
+    print(f"Expense classifier, {args.samples} training samples, {len(model.vectorizer.vocabulary)} features")
+    print("=" * 64)
+    print(f"training                 {train_seconds:>8.2f}s")
+    print(f"accuracy (all)           {sum(correct) / len(correct):>8.1%}")
+    print(f"answered locally         {sum(confident) / len(confident):>8.1%}  (confidence >= {args.min_confidence:g})")
+    print(f"accuracy when local      {local_correct / max(sum(confident), 1):>8.1%}")
+    print(f"single description       {single_us:>8.1f}µs")
+    print(f"batch of {args.batch:<5}           {batch_ms:>8.2f}ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+LLM gateway benchmark.
+
+Simulates a burst against one model with the fake LLM (fake_llm): a batch
+import queues --batch categorization calls, then --interactive users ask the
+assistant while it drains, and --duplicates users request the same
+form-assist section at once. Reports interactive latency with the priority
+queue vs. plain FIFO, and provider calls with and without single-flight.
+
+Usage:
+    python benchmark_llm_gateway.py --concurrency 4 --batch 60 --interactive 10
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+from fake_llm import FakeLlmChat  # noqa: E402
+from llm_gateway import BATCH, INTERACTIVE, LLMGateway  # noqa: E402
+
+class CountingChat(FakeLlmChat):
+    calls = 0
+
+    async def send_message(self, message) -> str:
+        CountingChat.calls += 1
+        return await super().send_message(message)
+
+async def burst(gateway, args, interactive_priority):
+    def chat():
+        return CountingChat("chat", "benchmark", "", tokens_per_second=args.tokens_per_second)
+
+    batch = [
+        asyncio.create_task(gateway.send("expense_categorization", "model", chat(), f"expense {i}", priority=BATCH))
+        for i in range(args.batch)
+    ]
+    await asyncio.sleep(0.01)
+
+    async def interactive(i):
+        started = time.perf_counter()
+        await gateway.send("chat", "model", chat(), f"question {i}", priority=interactive_priority)
+        return time.perf_counter() - started
+
+    latencies = await asyncio.gather(*(interactive(i) for i in range(args.interactive)))
+    await asyncio.gather(*batch)
+    return latencies
+
+async def duplicates(args, coalesce):
+    gateway = LLMGateway(max_concurrency=args.concurrency)
+    CountingChat.calls = 0
+    started = time.perf_counter()
+
+    async def assist(i):
+        chat = CountingChat("form_assist", "benchmark", "", tokens_per_second=args.tokens_per_second)
+        # Without single-flight every caller's message is unique
+        return await gateway.send("form_assist", "model", chat, "section: site safety" if coalesce else f"section: site safety #{i}")
+
+    await asyncio.gather(*(assist(i) for i in range(args.duplicates)))
+    return CountingChat.calls, time.perf_counter() - started
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=4, help="model slots")
+    parser.add_argument("--batch", type=int, default=60, help="queued batch calls")
+    parser.add_argument("--interactive", type=int, default=10, help="interactive calls arriving during the batch")
+    parser.add_argument("--duplicates", type=int, default=20, help="identical form-assist requests")
+    parser.add_argument("--tokens-per-second", type=float, default=500, help="fake LLM generation rate")
+    args = parser.parse_args()
+
+    print("=" * 64)
+    print(f"LLM gateway, {args.concurrency} slots, {args.batch} batch + {args.interactive} interactive calls")
+    print("=" * 64)
+    for label, priority in (("FIFO", BATCH), ("priority", INTERACTIVE)):
+        latencies = await burst(LLMGateway(max_concurrency=args.concurrency), args, priority)
+        print(f"interactive latency, {label:<9} p50 {statistics.median(latencies):>6.2f}s   max {max(latencies):>6.2f}s")
+    for label, coalesce in (("without", False), ("with", True)):
+        calls, seconds = await duplicates(args, coalesce)
+        print(f"{args.duplicates} identical form-assists {label:<8} single-flight: {calls:>3} provider calls, {seconds:.2f}s")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Login-storm benchmark: measures latency of an unrelated endpoint (/api/tasks)
+while many users log in at once (bcrypt-heavy).
+
+Usage:
+    python benchmark_login_storm.py --base-url http://localhost:8001 --logins 40
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(label, samples):
+    print(f"{label:<28} n={len(samples):<5} "
+          f"p50={percentile(samples, 50):8.1f} ms  "
+          f"p99={percentile(samples, 99):8.1f} ms  "
+          f"max={max(samples, default=0):8.1f} ms  "
+          f"mean={statistics.mean(samples) if samples else 0:8.1f} ms")
+
+
+async def probe_tasks(client, headers, stop_event, samples, interval):
+    """Repeatedly call /api/tasks and record latency until stopped"""
+    while not stop_event.is_set():
+        started = time.perf_counter()
+        await client.get("/api/tasks", headers=headers)
+        samples.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(interval)
+
+
+async def login(client, username, password, samples):
+    started = time.perf_counter()
+    await client.post("/api/auth/login", json={"username": username, "password": password})
+    samples.append((time.perf_counter() - started) * 1000)
+
+
+async def run(args):
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60.0) as client:
+        response = await client.post("/api/auth/login", json={"username": args.username, "password": args.password})
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        # Baseline: /api/tasks with no login pressure
+        baseline = []
+        stop_event = asyncio.Event()
+        probe = asyncio.create_task(probe_tasks(client, headers, stop_event, baseline, args.probe_interval))
+        await asyncio.sleep(args.baseline_seconds)
+        stop_event.set()
+        await probe
+
+        # Storm: same probe while N logins run concurrently
+        storm = []
+        login_samples = []
+        stop_event = asyncio.Event()
+        probe = asyncio.create_task(probe_tasks(client, headers, stop_event, storm, args.probe_interval))
+        storm_started = time.perf_counter()
+        await asyncio.gather(*(
+            login(client, args.username, args.password, login_samples)
+            for _ in range(args.logins)
+        ))
+        storm_elapsed = time.perf_counter() - storm_started
+        stop_event.set()
+        await probe
+
+        print("=" * 70)
+        print(f"Login storm: {args.logins} concurrent logins against {args.base_url}")
+        print("=" * 70)
+        summarize("/api/tasks (baseline)", baseline)
+        summarize("/api/tasks (during storm)", storm)
+        summarize("/api/auth/login", login_samples)
+        print(f"Storm wall time: {storm_elapsed:.2f} s")
+
+        metrics = await client.get("/api/admin/metrics", headers=headers)
+        if metrics.status_code == 200:
+            print(f"Password hasher: {metrics.json().get('password_hasher')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="Admin123!")
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--baseline-seconds", type=float, default=3.0)
+    parser.add_argument("--probe-interval", type=float, default=0.02)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Chat retrieval index benchmark.
+
+Generates --records projects, tasks, work orders, policies and documents
+assigned across --employees employees and indexes them with
+retrieval_index. Reports the build time, the incremental update and
+per-question search latency, recall@k (a question built from a record's
+title and description finds that record), that employees never get records
+assigned to someone else, and the chat system prompt size with the whole
+company profile (what every call sent before) vs. with the retrieved
+snippets.
+
+Usage:
+    python benchmark_retrieval_index.py --records 20000 --queries 1000
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+from ai_prompts import COMPANY_PROFILE, SYSTEM_PROMPTS  # noqa: E402
+from retrieval_index import INDEXED_COLLECTIONS, RetrievalIndex  # noqa: E402
+
+PLACES = ["Lee County", "Fort Bragg", "Camp Lejeune", "Tampa", "Baton Rouge", "Galveston", "Fort Hood", "Mobile",
+          "Panama City", "Lake Charles", "Savannah", "Norfolk", "Pensacola", "Biloxi", "Key West", "Houma"]
+SUBJECTS = ["debris removal", "generator fueling", "base camp setup", "erosion control", "perimeter fencing",
+            "stormwater permit", "modular housing", "hazmat cleanup", "roof tarping", "water distribution",
+            "camera install", "grid restoration", "site survey", "fuel delivery", "crew lodging", "road clearing"]
+DETAILS = ["haul vegetative debris", "stage two 500kW generators", "set up tents and latrines", "install silt fence",
+           "coordinate with USACE inspector", "submit daily tickets", "replace damaged culverts", "run access control",
+           "order additional trailers", "schedule night patrol", "file FEMA paperwork", "test water samples"]
+POLICY_TOPICS = ["PTO accrual", "overtime approval", "vehicle use", "PPE requirements", "per diem rates",
+                 "incident reporting", "drug testing", "timesheet deadlines", "travel booking", "heat illness prevention"]
+
+def generate(records, employees, rng):
+    docs = {collection: [] for collection in INDEXED_COLLECTIONS}
+    for i in range(records):
+        collection = rng.choices(list(INDEXED_COLLECTIONS), weights=[2, 5, 4, 1, 1])[0]
+        place, subject = rng.choice(PLACES), rng.choice(SUBJECTS)
+        doc = {"id": str(uuid.UUID(int=rng.getrandbits(128))),
+               "description": f"{rng.choice(DETAILS).capitalize()} for the {place} {subject} #{i}"}
+        if collection == "projects":
+            doc.update(name=f"{place} {subject} {i}", status=rng.choice(["in_progress", "not_started", "completed"]))
+        elif collection in ("tasks", "work_orders"):
+            doc.update(title=f"{subject.capitalize()} at {place} {i}", status=rng.choice(["todo", "in_progress", "done"]),
+                       priority=rng.choice(["low", "medium", "high"]))
+        elif collection == "policies":
+            doc.update(title=f"{rng.choice(POLICY_TOPICS).capitalize()} policy {i}", category="HR", version="1.0")
+        else:
+            doc.update(title=f"{place} {subject} plan {i}", category="Plans", tags=[subject, place])
+        if INDEXED_COLLECTIONS[collection][3]:
+            doc["assigned_to"] = rng.sample([f"employee-{n}" for n in range(employees)], rng.randint(1, 3))
+        docs[collection].append(doc)
+    return docs
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=20000, help="records to index")
+    parser.add_argument("--employees", type=int, default=50, help="employees records are assigned to")
+    parser.add_argument("--queries", type=int, default=1000, help="questions to time")
+    parser.add_argument("--top-k", type=int, default=5, help="snippets per question")
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    docs = generate(args.records, args.employees, rng)
+    index = RetrievalIndex(db=None, top_k=args.top_k)
+
+    started = time.perf_counter()
+    index._index = index._build(docs)
+    build_seconds = time.perf_counter() - started
+
+    records = [(collection, doc) for collection, items in docs.items() for doc in items]
+    started = time.perf_counter()
+    for collection, doc in records[:1000]:
+        index.record(collection, doc["id"], doc)
+    update_us = (time.perf_counter() - started) / min(len(records), 1000) * 1e6
+
+    found = leaked = 0
+    latencies, prompt_chars = [], []
+    base = SYSTEM_PROMPTS["chat"].render(user_name="Pat Doe", role="employee", current_page="Dashboard", records="")
+    before = len(base) + sum(len(title) + len(text) + 2 for title, text in COMPANY_PROFILE.items())
+    by_description = {doc["description"]: doc for _, doc in records}
+    for collection, doc in rng.sample(records, args.queries):
+        assignees = doc.get("assigned_to")
+        user = {"id": assignees[0], "role": "employee"} if assignees else {"id": "manager", "role": "manager"}
+        title = doc.get("name") or doc["title"]
+        question = f"What is the status of {title.rsplit(' ', 1)[0].lower()}? {doc['description'].split(' for ')[0]}"
+        started = time.perf_counter()
+        results = index.search(question, user)
+        latencies.append(time.perf_counter() - started)
+        found += any(doc["description"] in snippet for _, snippet in results)
+        prompt_chars.append(len(base) + len("\n".join(f"- {snippet}" for _, snippet in results)))
+        for _, snippet in results:
+            match = by_description.get(snippet.rsplit(" - ", 1)[-1])
+            if match and user["role"] == "employee" and user["id"] not in (match.get("assigned_to") or [user["id"]]):
+                leaked += 1
+
+    print("=" * 64)
+    print(f"Retrieval index, {args.records} records, {len(index._index.postings)} terms")
+    print("=" * 64)
+    print(f"build                    {build_seconds:>8.2f}s")
+    print(f"incremental update       {update_us:>8.1f}µs per record")
+    print(f"search p50 / max         {statistics.median(latencies) * 1e3:>8.2f}ms / {max(latencies) * 1e3:.2f}ms")
+    print(f"recall@{args.top_k:<2}                {found / args.queries:>8.1%}")
+    print(f"records outside role     {leaked:>8}")
+    print(f"chat system prompt       {before // 4:>8} tokens with the full profile, "
+          f"{statistics.mean(prompt_chars) / 4:.0f} with retrieved snippets (mean)")
+
+if __name__ == "__main__":
+    main()
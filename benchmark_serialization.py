@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Serialization benchmark: FastAPI's response_model path vs the precompiled
+TypeAdapter path used for list endpoints.
+
+Builds representative Mongo-shaped documents for Project, Task and Inventory
+and times one full list response (validate + encode) for each path.
+
+Usage:
+    python benchmark_serialization.py --rows 1000 --repeat 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "benchmark")
+
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+
+from fast_response import document_serializer  # noqa: E402
+from server import Inventory, Project, Task  # noqa: E402
+
+
+def project_doc(i):
+    now = datetime.now(timezone.utc)
+    return {
+        "id": str(uuid.uuid4()), "name": f"Project {i}", "client_id": str(uuid.uuid4()),
+        "status": "in_progress", "deadline": now + timedelta(days=i % 90),
+        "description": "Site preparation, grading and utility work. " * 5,
+        "address": f"{i} Main Street", "assigned_to": [str(uuid.uuid4()) for _ in range(3)],
+        "files": [{"filename": f"plan-{i}.pdf", "url": f"/api/uploads/plan-{i}.pdf"}],
+        "created_by": str(uuid.uuid4()), "created_at": now,
+    }
+
+
+def task_doc(i):
+    now = datetime.now(timezone.utc)
+    return {
+        "id": str(uuid.uuid4()), "title": f"Task {i}", "description": "Inspect and document. " * 4,
+        "project_id": str(uuid.uuid4()), "assigned_to": [str(uuid.uuid4())], "status": "todo",
+        "due_date": now + timedelta(days=i % 30), "priority": "high", "address": None,
+        "files": [], "created_by": str(uuid.uuid4()), "created_at": now,
+    }
+
+
+def inventory_doc(i):
+    return {
+        "id": str(uuid.uuid4()), "item_name": f"Item {i}", "category": "Materials", "quantity": float(i % 500),
+        "unit": "pcs", "project_id": str(uuid.uuid4()), "location": "Yard B", "minimum_stock": 10.0,
+        "supplier": "Acme Supply", "unit_cost": 12.5, "notes": None, "files": [],
+        "created_by": str(uuid.uuid4()), "created_at": datetime.now(timezone.utc),
+    }
+
+
+def fastapi_path(model, response_class):
+    """What FastAPI does for response_model=List[model]: validate, dump to Python, then encode"""
+    field = create_response_field(name=f"Response_{model.__name__}", type_=List[model])
+
+    def run(docs):
+        content = asyncio.run(serialize_response(field=field, response_content=docs, is_coroutine=True))
+        return response_class(content).body
+    return run
+
+
+def time_path(run, docs, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run(docs)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print("=" * 68)
+    print(f"List serialization, {args.rows} rows, median of {args.repeat} runs (ms)")
+    print("=" * 68)
+    print(f"{'model':<12}{'fastapi+json':>15}{'fastapi+orjson':>16}{'TypeAdapter':>14}{'speedup':>10}")
+
+    for model, factory in ((Project, project_doc), (Task, task_doc), (Inventory, inventory_doc)):
+        docs = [factory(i) for i in range(args.rows)]
+        paths = [
+            fastapi_path(model, JSONResponse),
+            fastapi_path(model, ORJSONResponse),
+            document_serializer(List[model]),
+        ]
+        for run in paths:
+            run(docs)  # warm up (adapter compilation, imports)
+        timings = [time_path(run, docs, args.repeat) for run in paths]
+        print(f"{model.__name__:<12}" + "".join(f"{t:>{w}.2f}" for t, w in zip(timings, (15, 16, 14)))
+              + f"{timings[0] / timings[2]:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
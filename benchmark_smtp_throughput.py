@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+SMTP throughput benchmark: one connection per message (connect, STARTTLS,
+AUTH, send, QUIT - the old EmailService.send_email) vs the pooled sessions
+and batched delivery used by the email outbox.
+
+Runs against a local aiosmtpd stand-in (pip install aiosmtpd). With --tls
+the server offers STARTTLS using a throwaway self-signed certificate
+(requires the openssl CLI), which is what makes per-message handshakes
+expensive in production.
+
+Usage:
+    python benchmark_smtp_throughput.py --messages 500 --concurrency 4 --batch-size 10 --tls
+"""
+import argparse
+import logging
+import os
+import smtplib
+import ssl
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "backend"))
+
+from aiosmtpd.controller import Controller  # noqa: E402
+from aiosmtpd.smtp import AuthResult  # noqa: E402
+
+from email_service import EmailService, SMTPConnectionPool  # noqa: E402
+
+# aiosmtpd logs a deprecation warning on every AUTH
+logging.getLogger("mail.log").setLevel(logging.ERROR)
+
+USERNAME = "bench"
+PASSWORD = "bench"
+FROM_EMAIL = "noreply@example.com"
+BODY = "<html><body>\n<p>Benchmark message</p>\n" + "<p>Lorem ipsum dolor sit amet.</p>\n" * 40 + "</body></html>"
+
+
+class CountingHandler:
+    def __init__(self):
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 Message accepted"
+
+
+def self_signed_context(directory):
+    cert, key = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+         "-subj", "/CN=localhost", "-keyout", key, "-out", cert],
+        check=True, capture_output=True
+    )
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert, key)
+    return context
+
+
+def start_server(port, tls_context):
+    handler = CountingHandler()
+    controller = Controller(
+        handler, hostname="127.0.0.1", port=port,
+        authenticator=lambda *args: AuthResult(success=True),
+        auth_require_tls=tls_context is not None,
+        require_starttls=tls_context is not None,
+        tls_context=tls_context
+    )
+    controller.start()
+    return controller, handler
+
+
+def unpooled_sender(service, use_tls):
+    """The pre-pool send path: a fresh authenticated connection per message"""
+    def send(to_email):
+        msg = service.build_message(to_email, "Benchmark", BODY)
+        with smtplib.SMTP(service.smtp_server, service.smtp_port) as server:
+            if use_tls:
+                server.starttls()
+            server.login(service.username, service.password)
+            server.send_message(msg)
+    return lambda recipients: [send(r) for r in recipients]
+
+
+def pooled_sender(service):
+    def send(recipients):
+        errors = service.deliver_batch([{"to_email": r, "subject": "Benchmark", "body": BODY} for r in recipients])
+        failed = [e for e in errors if e is not None]
+        if failed:
+            raise failed[0]
+    return send
+
+
+def run(sender, messages, concurrency, batch_size):
+    recipients = [f"user{i}@example.com" for i in range(messages)]
+    batches = [recipients[i:i + batch_size] for i in range(0, messages, batch_size)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(sender, batches))
+    return messages / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=4, help="sender threads (outbox workers)")
+    parser.add_argument("--batch-size", type=int, default=10, help="messages per pooled session checkout")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--tls", action="store_true", help="require STARTTLS with a self-signed certificate")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        controller, handler = start_server(args.port, self_signed_context(directory) if args.tls else None)
+        try:
+            pool = SMTPConnectionPool("127.0.0.1", args.port, USERNAME, PASSWORD,
+                                      max_connections=args.concurrency, use_tls=args.tls)
+            service = EmailService("127.0.0.1", args.port, USERNAME, PASSWORD, FROM_EMAIL, pool=pool)
+
+            print("=" * 72)
+            print(f"SMTP throughput, {args.messages} messages, {args.concurrency} threads, "
+                  f"STARTTLS {'on' if args.tls else 'off'}")
+            print("=" * 72)
+            before = run(unpooled_sender(service, args.tls), args.messages, args.concurrency, 1)
+            print(f"{'connection per message':<32}{before:>10.1f} msg/s")
+            after = run(pooled_sender(service), args.messages, args.concurrency, args.batch_size)
+            print(f"{'pooled, batch of ' + str(args.batch_size):<32}{after:>10.1f} msg/s   {after / before:.1f}x")
+            print(f"pool: {pool.stats()}")
+            pool.close()
+        finally:
+            controller.stop()
+        assert handler.received == 2 * args.messages, f"server received {handler.received} messages"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+The local command matcher must only answer when it is sure.
+
+A command it resolves confidently (at or above CONFIDENCE_THRESHOLD) must
+go to the screen command_corpus.json labels it with; anything ambiguous or
+out of scope must fall below the threshold so /ai/command asks the LLM.
+"""
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from command_matcher import CONFIDENCE_THRESHOLD, SCREEN_REGISTRY, CommandMatcher  # noqa: E402
+
+CORPUS = json.loads((Path(__file__).parent.parent / "command_corpus.json").read_text())
+
+matcher = CommandMatcher(SCREEN_REGISTRY)
+
+def test_shared_alias_goes_to_llm():
+    # "jobs" is an alias of both projects and work orders
+    match = matcher.match("jobs")
+    assert match["route"] == "/projects"
+    assert match["alternatives"] == ["/work-orders"]
+    assert match["confidence"] < CONFIDENCE_THRESHOLD
+
+@pytest.mark.parametrize("entry", CORPUS, ids=lambda entry: entry["command"])
+def test_confident_matches_are_right(entry):
+    match = matcher.match(entry["command"])
+    if match and match.get("alternatives"):
+        assert match["confidence"] < CONFIDENCE_THRESHOLD
+    if match and match["confidence"] >= CONFIDENCE_THRESHOLD:
+        assert match["screen_key"] == entry["screen"]
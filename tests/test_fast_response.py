@@ -0,0 +1,99 @@
+"""
+render_documents must not change what an endpoint returns.
+
+For every response model of the API (the ones FieldSelection.response
+renders through render_documents) the precompiled TypeAdapter has to produce
+the same JSON as FastAPI's own response_model pass, and leave out stored
+fields the model doesn't declare: for a document with every field set plus
+such private fields, and for one with only the required fields.
+"""
+import asyncio
+import os
+import sys
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Union, get_args, get_origin
+
+import orjson
+import pytest
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from pydantic import BaseModel, EmailStr
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test")
+
+import server  # noqa: E402
+from fast_response import document_serializer  # noqa: E402
+from pagination import Page  # noqa: E402
+
+# Fields that exist in stored documents but in no response model
+PRIVATE_FIELDS = {"_id": "665f1c2e9b1e8a0012345678", "password": "$2b$12$hash", "password_hash": "$2b$12$hash",
+                  "reset_token": "tok_123", "address_private": "1 Secret Lane"}
+
+SAMPLES = {str: "text", EmailStr: "pat@example.com", int: 3, float: 2.5, bool: True, dict: {"key": "value"},
+           datetime: datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc), date: date(2026, 1, 2)}
+
+def sample(annotation):
+    origin = get_origin(annotation)
+    if origin is Union:
+        return sample(next(arg for arg in get_args(annotation) if arg is not type(None)))
+    if origin in (list, List):
+        args = get_args(annotation)
+        return [sample(args[0])] if args else ["text"]
+    if origin in (dict, Dict):
+        return {"key": "value"}
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return full_document(annotation)
+    return SAMPLES.get(annotation, "text")
+
+def full_document(model):
+    return {name: sample(field.annotation) for name, field in model.model_fields.items()}
+
+def required_document(model):
+    """Only the fields a stored document always has: required ones and generated ids/timestamps"""
+    return {name: sample(field.annotation) for name, field in model.model_fields.items()
+            if field.is_required() or field.default_factory is not None}
+
+def response_model(response_type):
+    """The document model of a model, List[model] or Page[model] response type"""
+    if get_origin(response_type) in (list, List):
+        response_type = get_args(response_type)[0]
+    elif getattr(response_type, "__pydantic_generic_metadata__", {}).get("args"):
+        response_type = response_type.__pydantic_generic_metadata__["args"][0]
+    return response_type if isinstance(response_type, type) and issubclass(response_type, BaseModel) else None
+
+def api_models():
+    models = set()
+    for route in server.app.routes:
+        declared = getattr(route, "response_model", None)
+        for response_type in get_args(declared) or (declared,):
+            model = response_model(response_type)
+            if model is not None:
+                models.add(model)
+    return sorted(models, key=lambda model: model.__name__)
+
+MODELS = api_models()
+
+def render(response_type, payload):
+    return orjson.loads(document_serializer(response_type)(payload))
+
+def fastapi_render(response_type, payload):
+    """What FastAPI returns for response_model=response_type"""
+    field = create_response_field(name="Response", type_=response_type)
+    return orjson.loads(orjson.dumps(asyncio.run(serialize_response(field=field, response_content=payload))))
+
+@pytest.mark.parametrize("model", MODELS, ids=lambda model: model.__name__)
+def test_output_matches_fastapi(model):
+    for doc in (full_document(model), required_document(model)):
+        stored = {**doc, **PRIVATE_FIELDS}
+        assert render(model, stored) == fastapi_render(model, stored)
+        assert render(List[model], [stored, stored]) == fastapi_render(List[model], [stored, stored])
+        page = {"items": [stored], "next_cursor": "abc", "total": 1}
+        assert render(Page[model], page) == fastapi_render(Page[model], page)
+
+@pytest.mark.parametrize("model", MODELS, ids=lambda model: model.__name__)
+def test_private_fields_are_dropped(model):
+    rendered = render(model, {**full_document(model), **PRIVATE_FIELDS})
+    assert set(rendered) == set(model.model_fields)